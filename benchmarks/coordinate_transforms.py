@@ -0,0 +1,54 @@
+"""Compare the scalar and vectorised pixel <-> native srs coordinate conversions on RasterDataset."""
+
+import argparse
+import time
+
+import numpy as np
+from osgeo import gdal
+
+from geospatial_utils.raster.raster_dataset import RasterDataset
+
+DEFAULT_POINTS = 1_000_000
+
+
+def create_raster_dataset(size: int = 10_000) -> RasterDataset:
+    """Create an empty in-memory raster with a rotated geotransform."""
+    ds = gdal.GetDriverByName("MEM").Create("", size, size, 1, gdal.GDT_Byte)
+    ds.SetGeoTransform((-312709.0, 10.0, 0.5, 7171879.0, 0.25, -10.0))
+    return RasterDataset(ds)
+
+
+def run(points: int = DEFAULT_POINTS, seed: int = 0) -> None:
+    raster_ds = create_raster_dataset()
+    rng = np.random.default_rng(seed)
+    pixel_x = rng.integers(0, raster_ds.ds.RasterXSize, points)
+    pixel_y = rng.integers(0, raster_ds.ds.RasterYSize, points)
+
+    start = time.perf_counter()
+    scalar_points = [raster_ds.convert_pixel_coord_to_native_srs(x, y) for x, y in zip(pixel_x, pixel_y)]
+    scalar_pixels = [raster_ds.convert_native_srs_to_pixel_coord(point.x, point.y) for point in scalar_points]
+    scalar_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    x_coords, y_coords = raster_ds.convert_pixel_coords_to_native_srs(pixel_x, pixel_y)
+    vector_x, vector_y = raster_ds.convert_native_srs_to_pixel_coords(x_coords, y_coords)
+    vector_time = time.perf_counter() - start
+
+    assert np.array_equal(np.array(scalar_pixels), np.column_stack((vector_x, vector_y)))
+
+    print(f"Round trip of {points:,} points")
+    print(f"  scalar:     {scalar_time:8.3f} s ({points / scalar_time:14,.0f} points/s)")
+    print(f"  vectorised: {vector_time:8.3f} s ({points / vector_time:14,.0f} points/s)")
+    print(f"  speed up:   {scalar_time / vector_time:8.1f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--points", type=int, default=DEFAULT_POINTS, help="Number of points to convert.")
+    args = parser.parse_args()
+
+    run(points=args.points)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+"""Run benchmarks in isolated processes, recording their throughput and peak memory, and compare the results of runs."""
+
+import gc
+import json
+import platform
+import resource
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any, NamedTuple
+
+DEFAULT_REPEATS = 3
+
+# Relative slow down in throughput (or growth in peak memory) beyond which a benchmark has regressed
+DEFAULT_THRESHOLD = 0.1
+DEFAULT_MEMORY_THRESHOLD = 0.2
+
+# ru_maxrss is in kilobytes on Linux, but bytes on macOS
+MAXRSS_TO_MB = 1 / 1024**2 if sys.platform == "darwin" else 1 / 1024
+
+
+class Benchmark(NamedTuple):
+    """A benchmark, which must be picklable so it can be run in a fresh process.
+
+    Attributes:
+        name: Name of the benchmark.
+        unit: What the benchmark processes, e.g. pixels or features, for reporting its throughput.
+        setup: Called once, in the process running the benchmark, with the directory of the inputs, returning the
+            function to time. That function is called with an empty directory to write any outputs to on each repeat,
+            and returns the number of units it processed.
+        prepare: Optionally called first, in a separate process, with the directory to create any inputs in, so the
+            memory used to create them isn't counted in the peak memory of the benchmark. Defaults to None.
+
+    """
+
+    name: str
+    unit: str
+    setup: Callable[[Path], Callable[[Path], int]]
+    prepare: Callable[[Path], None] | None = None
+
+
+class BenchmarkResult(NamedTuple):
+    """The result of a benchmark.
+
+    Attributes:
+        name: Name of the benchmark.
+        unit: What the benchmark processes.
+        items: Number of units processed on each repeat.
+        seconds: The fastest wall time of the repeats.
+        throughput: Units processed per second, in the fastest repeat.
+        peak_memory_mb: Peak resident memory (in MB) of the process running the benchmark (or of its largest child
+            process, if larger), including any inputs its setup holds in memory, but not the work of its prepare.
+
+    """
+
+    name: str
+    unit: str
+    items: int
+    seconds: float
+    throughput: float
+    peak_memory_mb: float
+
+
+class Regression(NamedTuple):
+    """A benchmark whose throughput fell, or whose peak memory grew, by more than the threshold.
+
+    Attributes:
+        name: Name of the benchmark.
+        metric: Either throughput or peak_memory_mb.
+        baseline: The value of the metric in the baseline results.
+        current: The value of the metric in the current results.
+        change: The relative change of the metric from the baseline.
+
+    """
+
+    name: str
+    metric: str
+    baseline: float
+    current: float
+    change: float
+
+
+def run_benchmark(benchmark: Benchmark, repeats: int = DEFAULT_REPEATS) -> BenchmarkResult:
+    """Run a benchmark in a fresh process, so its peak memory isn't inflated by anything run before it.
+
+    Any inputs are prepared in another process beforehand, so the peak memory covers only the benchmark itself.
+
+    Args:
+        benchmark: The benchmark to run.
+        repeats: Number of times to time the benchmark. The fastest is recorded. Defaults to DEFAULT_REPEATS.
+
+    Returns:
+        The result of the benchmark.
+
+    Raises:
+        ValueError: The number of repeats is not positive.
+
+    """
+    if repeats < 1:
+        raise ValueError(f"The number of repeats must be positive, not {repeats}.")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        input_dir = Path(temp_dir).joinpath("inputs")
+        input_dir.mkdir()
+        if benchmark.prepare is not None:
+            _run_in_fresh_process(benchmark.prepare, input_dir)
+
+        return _run_in_fresh_process(_run_in_process, benchmark, Path(temp_dir), repeats)
+
+
+def _run_in_fresh_process(func: Callable[..., Any], *args: Any) -> Any:
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as executor:
+        return executor.submit(func, *args).result()
+
+
+def _run_in_process(benchmark: Benchmark, temp_dir: Path, repeats: int) -> BenchmarkResult:
+    func = benchmark.setup(temp_dir.joinpath("inputs"))
+
+    timings = []
+    for repeat in range(repeats):
+        output_dir = temp_dir.joinpath(f"outputs_{repeat}")
+        output_dir.mkdir()
+        gc.collect()
+
+        start = time.perf_counter()
+        items = func(output_dir)
+        timings.append(time.perf_counter() - start)
+
+    peak_memory = max(
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    )
+    seconds = min(timings)
+
+    return BenchmarkResult(
+        name=benchmark.name,
+        unit=benchmark.unit,
+        items=items,
+        seconds=seconds,
+        throughput=items / seconds,
+        peak_memory_mb=peak_memory * MAXRSS_TO_MB,
+    )
+
+
+def get_environment() -> dict[str, str]:
+    """Describe the machine running the benchmarks, as results are only comparable on the same machine."""
+    return {"python": platform.python_version(), "platform": platform.platform(), "machine": platform.machine()}
+
+
+def save_results(
+    results: list[BenchmarkResult], output_path: str | Path, environment: dict[str, Any] | None = None
+) -> None:
+    """Save the results of benchmarks as JSON, along with a description of the environment they were run in."""
+    content = {"environment": environment or get_environment(), "results": [result._asdict() for result in results]}
+    Path(output_path).write_text(json.dumps(content, indent=2))
+
+
+def load_results(results_path: str | Path) -> dict[str, BenchmarkResult]:
+    """Load the results of benchmarks saved by save_results, by the name of each benchmark."""
+    content = json.loads(Path(results_path).read_text())
+    return {result["name"]: BenchmarkResult(**result) for result in content["results"]}
+
+
+def compare_results(
+    baseline: dict[str, BenchmarkResult],
+    current: dict[str, BenchmarkResult],
+    threshold: float = DEFAULT_THRESHOLD,
+    memory_threshold: float = DEFAULT_MEMORY_THRESHOLD,
+) -> list[Regression]:
+    """Find the benchmarks which regressed from the baseline.
+
+    Only the benchmarks in both sets of results are compared.
+
+    Args:
+        baseline: The baseline results, by benchmark name.
+        current: The current results, by benchmark name.
+        threshold: Relative fall in throughput beyond which a benchmark has regressed, e.g. 0.1 for 10%. Defaults to
+            DEFAULT_THRESHOLD.
+        memory_threshold: Relative growth in peak memory beyond which a benchmark has regressed. Defaults to
+            DEFAULT_MEMORY_THRESHOLD.
+
+    Returns:
+        The regressions, in the order of the current results.
+
+    Raises:
+        ValueError: A benchmark processed a different number of units in each set of results, so they're not
+            comparable.
+
+    """
+    regressions = []
+    for name, result in current.items():
+        if name not in baseline:
+            continue
+
+        baseline_result = baseline[name]
+        if baseline_result.items != result.items:
+            raise ValueError(
+                f"The {name} benchmark processed {baseline_result.items} {result.unit} in the baseline, but "
+                f"{result.items} now. Please run both with the same sizes."
+            )
+
+        throughput_change = result.throughput / baseline_result.throughput - 1
+        if throughput_change < -threshold:
+            regressions.append(
+                Regression(name, "throughput", baseline_result.throughput, result.throughput, throughput_change)
+            )
+
+        memory_change = result.peak_memory_mb / baseline_result.peak_memory_mb - 1
+        if memory_change > memory_threshold:
+            regressions.append(
+                Regression(name, "peak_memory_mb", baseline_result.peak_memory_mb, result.peak_memory_mb, memory_change)
+            )
+
+    return regressions
+
+
+def print_results(results: list[BenchmarkResult], baseline: dict[str, BenchmarkResult] | None = None) -> None:
+    """Print a table of the results, with their change in throughput from any baseline."""
+    print_header()
+    for result in results:
+        print_result(result, baseline)
+
+
+def print_header() -> None:
+    print(
+        f"  {'benchmark':<30}{'items':>12}{'seconds':>10}{'throughput':>16}  {'unit':<12}{'peak MB':>10}{'change':>9}"
+    )
+
+
+def print_result(result: BenchmarkResult, baseline: dict[str, BenchmarkResult] | None = None) -> None:
+    change = ""
+    if baseline is not None and result.name in baseline:
+        change = f"{result.throughput / baseline[result.name].throughput - 1:+.1%}"
+
+    print(
+        f"  {result.name:<30}{result.items:>12,}{result.seconds:>10.3f}{result.throughput:>16,.0f}"
+        f"  {result.unit + '/s':<12}{result.peak_memory_mb:>10.1f}{change:>9}"
+    )
+
+
+def print_regressions(regressions: list[Regression]) -> None:
+    for regression in regressions:
+        print(
+            f"  REGRESSION {regression.name} {regression.metric}: {regression.baseline:,.1f} -> "
+            f"{regression.current:,.1f} ({regression.change:+.1%})"
+        )
@@ -0,0 +1,297 @@
+"""Benchmark the raster and vector hot paths on synthetic data, and fail if they regress from a baseline.
+
+Record a baseline (e.g. on the main branch), then run the suite again on a change and compare it to the baseline:
+
+    python benchmarks/suite.py run --output baseline.json
+    python benchmarks/suite.py run --output current.json --baseline baseline.json --threshold 0.1
+
+Results are only comparable when run on the same machine with the same sizes.
+"""
+
+import argparse
+import sys
+from collections.abc import Callable
+from functools import partial
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+from coordinate_transforms import create_raster_dataset
+from harness import (
+    DEFAULT_MEMORY_THRESHOLD,
+    DEFAULT_REPEATS,
+    DEFAULT_THRESHOLD,
+    Benchmark,
+    BenchmarkResult,
+    compare_results,
+    get_environment,
+    load_results,
+    print_header,
+    print_regressions,
+    print_result,
+    run_benchmark,
+    save_results,
+)
+from osgeo import gdal
+from vector_reprojection import create_input as create_vector
+from vector_writing import create_features, write_batched
+from warp_profiles import create_input as create_raster
+
+from geospatial_utils.raster.cog import convert_to_cog
+from geospatial_utils.raster.reprojection import reproject_raster
+from geospatial_utils.srs.cache import get_srs
+from geospatial_utils.vector.constants import GEOPACKAGE_DRIVER
+from geospatial_utils.vector.vector_dataset import VectorDataset
+
+
+class BenchmarkSizes(NamedTuple):
+    """The sizes of the synthetic data the benchmarks process.
+
+    Attributes:
+        raster_size: Width and height (in pixels) of the 3 band raster.
+        features: Number of polygons in the vector layer.
+        points: Number of points converted by the vectorised coordinate conversions.
+        scalar_points: Number of points converted one at a time by the scalar coordinate conversions.
+        workers: Number of worker processes used to reproject the vector layer.
+
+    """
+
+    raster_size: int = 2048
+    features: int = 50_000
+    points: int = 1_000_000
+    scalar_points: int = 50_000
+    workers: int = 1
+
+
+def prepare_raster(input_dir: Path, raster_size: int) -> None:
+    create_raster(input_dir.joinpath("input.tif"), raster_size)
+
+
+def prepare_vector(input_dir: Path, features: int) -> None:
+    create_vector(input_dir.joinpath("input.gpkg"), features)
+
+
+def setup_reproject_raster(input_dir: Path, raster_size: int) -> Callable[[Path], int]:
+    input_path = input_dir.joinpath("input.tif")
+
+    def run(output_dir: Path) -> int:
+        reproject_raster(input_path, output_dir.joinpath("output.tif"), output_epsg_code=3857)
+        return raster_size**2
+
+    return run
+
+
+def setup_convert_to_cog(input_dir: Path, raster_size: int, output_epsg_code: int) -> Callable[[Path], int]:
+    """Convert to a COG, either directly (for the srs of the input, EPSG:27700) or reprojecting on the way."""
+    input_path = input_dir.joinpath("input.tif")
+
+    def run(output_dir: Path) -> int:
+        convert_to_cog(input_path, output_dir.joinpath("output.tif"), output_epsg_code=output_epsg_code)
+        return raster_size**2
+
+    return run
+
+
+def setup_reproject_layer(input_dir: Path, features: int, workers: int) -> Callable[[Path], int]:
+    input_path = input_dir.joinpath("input.gpkg")
+
+    def run(output_dir: Path) -> int:
+        VectorDataset(input_path).reproject_layer(output_dir.joinpath("output.gpkg"), target_epsg=4326, workers=workers)
+        return features
+
+    return run
+
+
+def setup_write_features(input_dir: Path, features: int) -> Callable[[Path], int]:
+    """Write features with create_vector_dataset and the batched writer of write_feature_to_output_layer."""
+    srs = get_srs(epsg_code=3857)
+    ogr_features = create_features(features)
+
+    def run(output_dir: Path) -> int:
+        write_batched(output_dir.joinpath("output.gpkg"), GEOPACKAGE_DRIVER, srs, ogr_features)
+        return features
+
+    return run
+
+
+def setup_coordinate_conversions(input_dir: Path, points: int, vectorised: bool) -> Callable[[Path], int]:
+    """Round trip random pixel coordinates through the native srs of a raster with a rotated geotransform."""
+    raster_ds = create_raster_dataset()
+    rng = np.random.default_rng(0)
+    pixel_x = rng.integers(0, raster_ds.ds.RasterXSize, points)
+    pixel_y = rng.integers(0, raster_ds.ds.RasterYSize, points)
+
+    def run_vectorised(output_dir: Path) -> int:
+        x_coords, y_coords = raster_ds.convert_pixel_coords_to_native_srs(pixel_x, pixel_y)
+        raster_ds.convert_native_srs_to_pixel_coords(x_coords, y_coords)
+        return points
+
+    def run_scalar(output_dir: Path) -> int:
+        for x, y in zip(pixel_x, pixel_y):
+            point = raster_ds.convert_pixel_coord_to_native_srs(x, y)
+            raster_ds.convert_native_srs_to_pixel_coord(point.x, point.y)
+        return points
+
+    return run_vectorised if vectorised else run_scalar
+
+
+def get_benchmarks(sizes: BenchmarkSizes) -> list[Benchmark]:
+    raster_prepare = partial(prepare_raster, raster_size=sizes.raster_size)
+    vector_prepare = partial(prepare_vector, features=sizes.features)
+    return [
+        Benchmark(
+            "reproject_raster",
+            "pixels",
+            partial(setup_reproject_raster, raster_size=sizes.raster_size),
+            raster_prepare,
+        ),
+        Benchmark(
+            "convert_to_cog",
+            "pixels",
+            partial(setup_convert_to_cog, raster_size=sizes.raster_size, output_epsg_code=27700),
+            raster_prepare,
+        ),
+        Benchmark(
+            "convert_to_cog_reprojected",
+            "pixels",
+            partial(setup_convert_to_cog, raster_size=sizes.raster_size, output_epsg_code=3857),
+            raster_prepare,
+        ),
+        Benchmark(
+            "reproject_layer",
+            "features",
+            partial(setup_reproject_layer, features=sizes.features, workers=sizes.workers),
+            vector_prepare,
+        ),
+        Benchmark("write_features", "features", partial(setup_write_features, features=sizes.features)),
+        Benchmark(
+            "coordinate_conversions",
+            "points",
+            partial(setup_coordinate_conversions, points=sizes.points, vectorised=True),
+        ),
+        Benchmark(
+            "coordinate_conversions_scalar",
+            "points",
+            partial(setup_coordinate_conversions, points=sizes.scalar_points, vectorised=False),
+        ),
+    ]
+
+
+BENCHMARK_NAMES = [benchmark.name for benchmark in get_benchmarks(BenchmarkSizes())]
+
+
+def run(
+    sizes: BenchmarkSizes,
+    output_path: Path | None = None,
+    names: list[str] | None = None,
+    repeats: int = DEFAULT_REPEATS,
+    baseline_path: Path | None = None,
+    threshold: float = DEFAULT_THRESHOLD,
+    memory_threshold: float = DEFAULT_MEMORY_THRESHOLD,
+) -> bool:
+    """Run the benchmarks, returning False if any regressed from the baseline."""
+    benchmarks = [benchmark for benchmark in get_benchmarks(sizes) if names is None or benchmark.name in names]
+    baseline = load_results(baseline_path) if baseline_path is not None else None
+
+    print(f"Running {len(benchmarks)} benchmark(s), taking the fastest of {repeats} repeat(s)")
+    print_header()
+    results = []
+    for benchmark in benchmarks:
+        results.append(run_benchmark(benchmark, repeats))
+        print_result(results[-1], baseline)
+
+    if output_path is not None:
+        environment = {**get_environment(), "gdal": gdal.__version__, "sizes": sizes._asdict()}
+        save_results(results, output_path, environment)
+
+    if baseline is None:
+        return True
+
+    return compare(baseline, {result.name: result for result in results}, threshold, memory_threshold)
+
+
+def compare(
+    baseline: dict[str, BenchmarkResult],
+    current: dict[str, BenchmarkResult],
+    threshold: float = DEFAULT_THRESHOLD,
+    memory_threshold: float = DEFAULT_MEMORY_THRESHOLD,
+) -> bool:
+    """Print any regressions from the baseline, returning False if there are any."""
+    regressions = compare_results(baseline, current, threshold, memory_threshold)
+    if regressions:
+        print(
+            f"{len(regressions)} regression(s) beyond the thresholds ({threshold:.0%} throughput, "
+            f"{memory_threshold:.0%} peak memory)"
+        )
+        print_regressions(regressions)
+        return False
+
+    print(f"No regressions beyond the thresholds ({threshold:.0%} throughput, {memory_threshold:.0%} peak memory)")
+    return True
+
+
+def add_threshold_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help=f"Relative fall in throughput counted as a regression. Defaults to {DEFAULT_THRESHOLD}",
+    )
+    parser.add_argument(
+        "--memory_threshold",
+        type=float,
+        default=DEFAULT_MEMORY_THRESHOLD,
+        help=f"Relative growth in peak memory counted as a regression. Defaults to {DEFAULT_MEMORY_THRESHOLD}",
+    )
+
+
+def main() -> None:
+    defaults = BenchmarkSizes()
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Run the benchmarks, optionally comparing them to a baseline.")
+    run_parser.add_argument("--output", type=Path, help="Path to save the results to, as JSON.")
+    run_parser.add_argument("--baseline", type=Path, help="Path to the results to compare to, failing on regressions.")
+    run_parser.add_argument(
+        "--benchmarks", nargs="+", choices=BENCHMARK_NAMES, help="Benchmarks to run. Defaults to all."
+    )
+    run_parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS, help="Number of times to time each one.")
+    run_parser.add_argument("--raster_size", type=int, default=defaults.raster_size, help="Raster width and height.")
+    run_parser.add_argument("--features", type=int, default=defaults.features, help="Number of vector features.")
+    run_parser.add_argument("--points", type=int, default=defaults.points, help="Number of points to convert.")
+    run_parser.add_argument(
+        "--scalar_points", type=int, default=defaults.scalar_points, help="Number of points to convert one at a time."
+    )
+    run_parser.add_argument(
+        "--workers", type=int, default=defaults.workers, help="Number of processes reprojecting the vector layer."
+    )
+    add_threshold_arguments(run_parser)
+
+    compare_parser = subparsers.add_parser("compare", help="Compare saved results, failing on regressions.")
+    compare_parser.add_argument("baseline", type=Path, help="Path to the baseline results.")
+    compare_parser.add_argument("current", type=Path, help="Path to the current results.")
+    add_threshold_arguments(compare_parser)
+
+    args = parser.parse_args()
+
+    if args.command == "run":
+        sizes = BenchmarkSizes(args.raster_size, args.features, args.points, args.scalar_points, args.workers)
+        passed = run(
+            sizes,
+            output_path=args.output,
+            names=args.benchmarks,
+            repeats=args.repeats,
+            baseline_path=args.baseline,
+            threshold=args.threshold,
+            memory_threshold=args.memory_threshold,
+        )
+    else:
+        passed = compare(load_results(args.baseline), load_results(args.current), args.threshold, args.memory_threshold)
+
+    sys.exit(0 if passed else 1)
+
+
+if __name__ == "__main__":
+    main()
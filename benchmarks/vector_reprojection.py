@@ -0,0 +1,88 @@
+"""Measure how the throughput of sharded, multi-process vector reprojection scales with the number of workers."""
+
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from osgeo import ogr, osr
+
+from geospatial_utils.vector.constants import GEOPACKAGE_DRIVER
+from geospatial_utils.vector.io import DEFAULT_SHARD_SIZE, BatchedFeatureWriter, create_vector_dataset
+from geospatial_utils.vector.types import Field
+from geospatial_utils.vector.vector_dataset import VectorDataset
+
+DEFAULT_FEATURES = 200_000
+FIELDS = [Field("id", ogr.OFTInteger), Field("name", ogr.OFTString)]
+
+
+def create_input(input_path: Path, feature_count: int, seed: int = 0) -> None:
+    """Create a GeoPackage of randomly positioned square polygons in British National Grid."""
+    srs = osr.SpatialReference()
+    srs.ImportFromEPSG(27700)
+    rng = np.random.default_rng(seed)
+
+    output_ds, output_layer = create_vector_dataset(str(input_path), input_path.stem, srs, FIELDS, GEOPACKAGE_DRIVER)
+
+    with BatchedFeatureWriter(output_ds, output_layer) as writer:
+        for index, (x, y) in enumerate(rng.uniform((100_000, 100_000), (600_000, 1_000_000), (feature_count, 2))):
+            feature = ogr.Feature(output_layer.GetLayerDefn())
+            feature.SetGeometry(
+                ogr.CreateGeometryFromWkt(
+                    f"POLYGON (({x} {y}, {x + 100} {y}, {x + 100} {y + 100}, {x} {y + 100}, {x} {y}))"
+                )
+            )
+            feature.SetField("id", index)
+            feature.SetField("name", f"feature_{index}")
+            output_layer.CreateFeature(feature)
+            writer.add_written_features(1)
+
+    del output_ds, output_layer
+
+
+def run(feature_count: int, worker_counts: list[int], shard_size: int, use_arrow: bool) -> None:
+    print(f"Reprojecting {feature_count:,} polygons from EPSG:27700 to EPSG:4326 (features/s)")
+    print(f"  {'workers':<10}{'features/s':>14}{'speed up':>10}")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        input_path = Path(temp_dir).joinpath("input.gpkg")
+        create_input(input_path, feature_count)
+
+        baseline = None
+        for workers in worker_counts:
+            output_path = Path(temp_dir).joinpath(f"output_{workers}.gpkg")
+
+            start = time.perf_counter()
+            VectorDataset(input_path).reproject_layer(
+                output_path, target_epsg=4326, use_arrow=use_arrow, workers=workers, shard_size=shard_size
+            )
+            throughput = feature_count / (time.perf_counter() - start)
+
+            baseline = baseline or throughput
+            print(f"  {workers:<10}{throughput:>14,.0f}{throughput / baseline:>9.1f}x")
+
+
+def main() -> None:
+    cpu_count = os.cpu_count() or 1
+    default_workers = sorted({1, 2, 4, 8, cpu_count} & set(range(1, cpu_count + 1)))
+
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--features", type=int, default=DEFAULT_FEATURES, help="Number of features to reproject.")
+    parser.add_argument(
+        "--workers", type=int, nargs="+", default=default_workers, help="Numbers of worker processes to compare."
+    )
+    parser.add_argument("--shard_size", type=int, default=DEFAULT_SHARD_SIZE, help="Number of features per shard.")
+    parser.add_argument(
+        "--no_arrow", action="store_true", help="Reproject one feature at a time, rather than in Arrow batches."
+    )
+    args = parser.parse_args()
+
+    run(
+        feature_count=args.features, worker_counts=args.workers, shard_size=args.shard_size, use_arrow=not args.no_arrow
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Compare writing features one at a time (flushing after each feature) with the batched, transactional writer."""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from osgeo import ogr, osr
+
+from geospatial_utils.vector.constants import GEOJSON_DRIVER, GEOPACKAGE_DRIVER, SHAPEFILE_DRIVER
+from geospatial_utils.vector.io import (
+    DEFAULT_BATCH_SIZE,
+    BatchedFeatureWriter,
+    create_vector_dataset,
+    write_feature_to_output_layer,
+)
+from geospatial_utils.vector.types import Field
+
+DEFAULT_FEATURES = 20_000
+DRIVER_EXTENSIONS = {SHAPEFILE_DRIVER: ".shp", GEOJSON_DRIVER: ".geojson", GEOPACKAGE_DRIVER: ".gpkg"}
+FIELDS = [Field("id", ogr.OFTInteger), Field("name", ogr.OFTString), Field("value", ogr.OFTReal)]
+
+
+def create_features(feature_count: int, seed: int = 0) -> list[ogr.Feature]:
+    """Create square polygon features with random positions and field values."""
+    rng = np.random.default_rng(seed)
+    layer_defn = ogr.FeatureDefn()
+    for field in FIELDS:
+        layer_defn.AddFieldDefn(ogr.FieldDefn(field.name, field.type))
+
+    features = []
+    for index, (x, y) in enumerate(rng.uniform(-1_000_000, 1_000_000, (feature_count, 2))):
+        feature = ogr.Feature(layer_defn)
+        feature.SetGeometry(
+            ogr.CreateGeometryFromWkt(
+                f"POLYGON (({x} {y}, {x + 100} {y}, {x + 100} {y + 100}, {x} {y + 100}, {x} {y}))"
+            )
+        )
+        feature.SetField("id", index)
+        feature.SetField("name", f"feature_{index}")
+        feature.SetField("value", float(rng.random()))
+        features.append(feature)
+
+    return features
+
+
+def write_per_feature(output_path: Path, driver_name: str, srs: osr.SpatialReference, features: list) -> None:
+    """Write features the way reproject_layer used to, flushing to disk after every feature."""
+    output_ds, output_layer = create_vector_dataset(str(output_path), output_path.stem, srs, FIELDS, driver_name)
+    field_names = [field.name for field in FIELDS]
+
+    for feature in features:
+        write_feature_to_output_layer(output_layer, feature.geometry(), feature, field_names)
+        output_ds.SyncToDisk()
+
+    del output_ds, output_layer
+
+
+def write_batched(output_path: Path, driver_name: str, srs: osr.SpatialReference, features: list) -> None:
+    """Write features using the BatchedFeatureWriter."""
+    output_ds, output_layer = create_vector_dataset(str(output_path), output_path.stem, srs, FIELDS, driver_name)
+    field_names = [field.name for field in FIELDS]
+
+    with BatchedFeatureWriter(output_ds, output_layer, DEFAULT_BATCH_SIZE) as writer:
+        for feature in features:
+            writer.write(feature.geometry(), feature, field_names)
+
+    del output_ds, output_layer
+
+
+def run(feature_count: int = DEFAULT_FEATURES) -> None:
+    srs = osr.SpatialReference()
+    srs.ImportFromEPSG(3857)
+    features = create_features(feature_count)
+
+    print(f"Writing {feature_count:,} polygons (features/s)")
+    print(f"  {'driver':<16}{'per feature':>14}{'batched':>14}{'speed up':>10}")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for driver_name, extension in DRIVER_EXTENSIONS.items():
+            throughputs = []
+            for write_func in (write_per_feature, write_batched):
+                output_path = Path(temp_dir).joinpath(f"{write_func.__name__}{extension}")
+
+                start = time.perf_counter()
+                write_func(output_path, driver_name, srs, features)
+                throughputs.append(feature_count / (time.perf_counter() - start))
+
+            per_feature, batched = throughputs
+            print(f"  {driver_name:<16}{per_feature:>14,.0f}{batched:>14,.0f}{batched / per_feature:>9.1f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--features", type=int, default=DEFAULT_FEATURES, help="Number of features to write.")
+    args = parser.parse_args()
+
+    run(feature_count=args.features)
+
+
+if __name__ == "__main__":
+    main()
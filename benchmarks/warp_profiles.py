@@ -0,0 +1,74 @@
+"""Record the wall time and output size of reprojecting a synthetic raster into a COG with each warp profile."""
+
+import argparse
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from osgeo import gdal
+
+from geospatial_utils.raster.constants import COG_DRIVER, GTIFF_DRIVER
+from geospatial_utils.raster.reprojection import WARP_PROFILES, get_creation_options, reproject_raster
+from geospatial_utils.srs.cache import get_srs
+
+DEFAULT_SIZE = 4096
+
+
+def create_input(input_path: Path, size: int, seed: int = 0) -> None:
+    """Create a 3 band GeoTIFF in British National Grid, of noisy gradients so it compresses like real imagery."""
+    rng = np.random.default_rng(seed)
+    y, x = np.mgrid[0:size, 0:size]
+
+    driver = gdal.GetDriverByName(GTIFF_DRIVER)
+    input_ds = driver.Create(
+        str(input_path), size, size, 3, gdal.GDT_Byte, options=get_creation_options(GTIFF_DRIVER, "NONE")
+    )
+    input_ds.SetGeoTransform((400_000.0, 5.0, 0.0, 300_000.0, 0.0, -5.0))
+    input_ds.SetSpatialRef(get_srs(epsg_code=27700))
+
+    for band_index, (x_scale, y_scale) in enumerate([(1, 0), (0, 1), (1, 1)], start=1):
+        gradient = (x * x_scale + y * y_scale) * 255 / (size * (x_scale + y_scale))
+        noise = rng.normal(0, 8, (size, size))
+        input_ds.GetRasterBand(band_index).WriteArray(np.clip(gradient + noise, 0, 255).astype(np.uint8))
+
+    del input_ds
+
+
+def run(size: int, profiles: list[str]) -> None:
+    print(f"Reprojecting a {size:,} x {size:,} pixel, 3 band raster from EPSG:27700 to an EPSG:3857 COG")
+    print(f"  {'profile':<10}{'seconds':>10}{'size (MB)':>12}{'ratio':>8}")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        input_path = Path(temp_dir).joinpath("input.tif")
+        create_input(input_path, size)
+        input_size = input_path.stat().st_size
+
+        for profile in profiles:
+            output_path = Path(temp_dir).joinpath(f"output_{profile}.tif")
+
+            start = time.perf_counter()
+            reproject_raster(input_path, output_path, output_epsg_code=3857, output_format=COG_DRIVER, profile=profile)
+            duration = time.perf_counter() - start
+
+            output_size = output_path.stat().st_size
+            print(f"  {profile:<10}{duration:>10.2f}{output_size / 1e6:>12.1f}{input_size / output_size:>7.1f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=DEFAULT_SIZE, help="Width and height of the raster in pixels.")
+    parser.add_argument(
+        "--profiles",
+        nargs="+",
+        choices=list(WARP_PROFILES),
+        default=list(WARP_PROFILES),
+        help="Warp profiles to compare.",
+    )
+    args = parser.parse_args()
+
+    run(size=args.size, profiles=args.profiles)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,384 @@
+import hashlib
+import logging
+import sqlite3
+from collections.abc import Iterable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import TracebackType
+from typing import NamedTuple
+
+from osgeo import osr
+
+try:
+    import xxhash
+except ImportError:  # pragma: no cover - xxhash is an optional dependency
+    xxhash = None
+
+from geospatial_utils.raster.metadata import DEFAULT_RASTER_PATTERN, DEFAULT_SCAN_WORKERS, find_files
+from geospatial_utils.raster.raster_dataset import Bounds, RasterDataset
+from geospatial_utils.srs.cache import get_coordinate_transformation, get_srs
+
+logger = logging.getLogger(__name__)
+
+# EPSG code of the geographic coordinates the bounds of every raster are indexed in, so rasters in different spatial
+# references can be queried together
+CATALOGUE_EPSG_CODE = 4326
+
+# Number of points added along each edge of the bounds when transforming them, to account for curved edges
+BOUNDS_DENSIFY_POINTS = 21
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+CREATE_TABLES = """
+CREATE TABLE IF NOT EXISTS rasters (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    content_hash TEXT,
+    driver TEXT NOT NULL,
+    x_size INTEGER NOT NULL,
+    y_size INTEGER NOT NULL,
+    band_count INTEGER NOT NULL,
+    epsg_code INTEGER,
+    x_res REAL NOT NULL,
+    y_res REAL NOT NULL,
+    min_x REAL NOT NULL,
+    min_y REAL NOT NULL,
+    max_x REAL NOT NULL,
+    max_y REAL NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS rasters_rtree USING rtree(id, west, east, south, north);
+"""
+
+ENTRY_COLUMNS = (
+    "path, size, mtime_ns, content_hash, driver, x_size, y_size, band_count, epsg_code, x_res, y_res, "
+    "min_x, min_y, max_x, max_y"
+)
+
+
+class CatalogueEntry(NamedTuple):
+    """The catalogued metadata of a raster. The bounds are in the native srs of the raster."""
+
+    path: str
+    size: int
+    mtime_ns: int
+    content_hash: str | None
+    driver: str
+    x_size: int
+    y_size: int
+    band_count: int
+    epsg_code: int | None
+    x_res: float
+    y_res: float
+    min_x: float
+    min_y: float
+    max_x: float
+    max_y: float
+
+
+class RefreshResult(NamedTuple):
+    added: int
+    updated: int
+    removed: int
+    unchanged: int
+    failed: int
+
+
+class RasterCatalogue:
+    """A persistent SQLite index of raster metadata, with an R-tree index of their bounds.
+
+    Refreshing the catalogue only re-opens rasters whose size or modification time has changed since they were last
+    catalogued, so it's cheap to keep up to date. The bounds of each raster are indexed in geographic coordinates
+    (CATALOGUE_EPSG_CODE), so rasters in different spatial references can be queried together.
+
+    It can be used as a context manager, closing the database connection on exit.
+
+    Args:
+        catalogue_path: Path to the SQLite database. It's created if it doesn't exist.
+
+    """
+
+    def __init__(self, catalogue_path: str | Path):
+        self.catalogue_path = Path(catalogue_path)
+        self.connection = sqlite3.connect(self.catalogue_path)
+        self.connection.executescript(CREATE_TABLES)
+
+    def __enter__(self) -> "RasterCatalogue":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        (count,) = self.connection.execute("SELECT COUNT(*) FROM rasters").fetchone()
+        return count
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def refresh(
+        self,
+        directory: str | Path,
+        pattern: str = DEFAULT_RASTER_PATTERN,
+        recursive: bool = True,
+        hash_content: bool = False,
+        workers: int | None = DEFAULT_SCAN_WORKERS,
+    ) -> RefreshResult:
+        """Bring the catalogue up to date with the rasters in a directory tree.
+
+        Rasters which are new, or whose size or modification time differ from their entry, are (re-)read concurrently.
+        Entries for rasters which no longer exist within the directory are removed. Files which can't be read as
+        rasters are logged and left out of the catalogue.
+
+        Args:
+            directory: The directory to catalogue.
+            pattern: Glob pattern the file names must match. Defaults to DEFAULT_RASTER_PATTERN.
+            recursive: Whether to catalogue subdirectories too. Defaults to True.
+            hash_content: Whether to record a hash of the content of each raster read. This requires reading each
+                changed file in full. Defaults to False.
+            workers: Number of threads reading rasters concurrently. Defaults to DEFAULT_SCAN_WORKERS.
+
+        Returns:
+            The number of entries added, updated, removed and unchanged, and the number of files which failed.
+
+        """
+        directory = Path(directory).absolute()
+        catalogued = self._get_catalogued()
+        found = list(find_files(directory, pattern, recursive))
+        found_paths = set(found)
+        removed = [
+            path
+            for path in catalogued
+            if path not in found_paths and path.is_relative_to(directory) and (recursive or path.parent == directory)
+        ]
+
+        return self._update(found, catalogued, removed, hash_content, workers)
+
+    def add(
+        self, file_paths: Iterable[str | Path], hash_content: bool = False, workers: int | None = DEFAULT_SCAN_WORKERS
+    ) -> RefreshResult:
+        """Bring the entries of some rasters up to date, e.g. rasters which aren't within a single directory.
+
+        Like refresh, only the rasters which are new or have changed are (re-)read, but no other entries are removed.
+
+        Args:
+            file_paths: Paths to the rasters.
+            hash_content: Whether to record a hash of the content of each raster read. Defaults to False.
+            workers: Number of threads reading rasters concurrently. Defaults to DEFAULT_SCAN_WORKERS.
+
+        Returns:
+            The number of entries added, updated and unchanged, and the number of files which failed.
+
+        """
+        file_paths = list(dict.fromkeys(Path(file_path).absolute() for file_path in file_paths))
+        return self._update(file_paths, self._get_catalogued(), [], hash_content, workers)
+
+    def get(self, file_path: str | Path) -> CatalogueEntry | None:
+        """Get the entry for a raster, or None if it isn't catalogued."""
+        row = self.connection.execute(
+            f"SELECT {ENTRY_COLUMNS} FROM rasters WHERE path = ?", (str(Path(file_path).absolute()),)
+        ).fetchone()
+
+        return CatalogueEntry(*row) if row else None
+
+    def entries(self) -> list[CatalogueEntry]:
+        """Get every entry in the catalogue, ordered by path."""
+        rows = self.connection.execute(f"SELECT {ENTRY_COLUMNS} FROM rasters ORDER BY path")
+        return [CatalogueEntry(*row) for row in rows]
+
+    def query(
+        self, bbox: tuple[float, float, float, float], bbox_epsg_code: int = CATALOGUE_EPSG_CODE
+    ) -> list[CatalogueEntry]:
+        """Find the rasters whose bounds intersect a bounding box, using the R-tree index.
+
+        Args:
+            bbox: The (min_x, min_y, max_x, max_y) bounding box to search.
+            bbox_epsg_code: EPSG code of the bounding box coordinates. Defaults to CATALOGUE_EPSG_CODE, with the
+                coordinates in longitude/latitude order.
+
+        Returns:
+            The entries of the intersecting rasters, ordered by path.
+
+        """
+        west, south, east, north = _to_catalogue_bounds(Bounds(*bbox), get_srs(epsg_code=bbox_epsg_code))
+        rows = self.connection.execute(
+            f"""
+            SELECT {ENTRY_COLUMNS} FROM rasters JOIN rasters_rtree USING (id)
+            WHERE rasters_rtree.west <= ? AND rasters_rtree.east >= ?
+            AND rasters_rtree.south <= ? AND rasters_rtree.north >= ?
+            ORDER BY path
+            """,
+            (east, west, north, south),
+        )
+
+        return [CatalogueEntry(*row) for row in rows]
+
+    def is_output_up_to_date(self, input_path: str | Path, output_path: str | Path) -> bool:
+        """Check whether an output derived from a catalogued raster is newer than the raster.
+
+        Args:
+            input_path: Path to the catalogued raster.
+            output_path: Path to the output derived from it.
+
+        Returns:
+            False if the raster isn't catalogued, its catalogued size and modification time are out of date, or the
+            output doesn't exist or was modified before the raster. Otherwise True.
+
+        """
+        entry = self.get(input_path)
+        if entry is None:
+            return False
+
+        try:
+            input_stat = Path(input_path).stat()
+            output_stat = Path(output_path).stat()
+        except FileNotFoundError:
+            return False
+
+        if (input_stat.st_size, input_stat.st_mtime_ns) != (entry.size, entry.mtime_ns):
+            return False
+
+        return output_stat.st_mtime_ns >= entry.mtime_ns
+
+    def _get_catalogued(self) -> dict[Path, tuple[int, int]]:
+        """The size and modification time of each catalogued raster, by path."""
+        return {
+            Path(path): (size, mtime_ns)
+            for path, size, mtime_ns in self.connection.execute("SELECT path, size, mtime_ns FROM rasters")
+        }
+
+    def _update(
+        self,
+        file_paths: list[Path],
+        catalogued: dict[Path, tuple[int, int]],
+        removed: list[Path],
+        hash_content: bool,
+        workers: int | None,
+    ) -> RefreshResult:
+        """(Re-)read the rasters which are new or changed since they were catalogued, and delete the removed ones."""
+        changed = []
+        for file_path in file_paths:
+            try:
+                stat = file_path.stat()
+            except FileNotFoundError:
+                changed.append(file_path)
+                continue
+
+            if catalogued.get(file_path) != (stat.st_size, stat.st_mtime_ns):
+                changed.append(file_path)
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            entries = list(pool.map(lambda path: _try_read_entry(path, hash_content), changed))
+
+        with self.connection:
+            self._delete(removed)
+            self._upsert(filter(None, entries))
+
+        read = [entry for entry, _ in filter(None, entries)]
+        updated = sum(Path(entry.path) in catalogued for entry in read)
+
+        return RefreshResult(
+            added=len(read) - updated,
+            updated=updated,
+            removed=len(removed),
+            unchanged=len(file_paths) - len(changed),
+            failed=entries.count(None),
+        )
+
+    def _upsert(self, entries: Iterable[tuple[CatalogueEntry, Bounds | None]]) -> None:
+        for entry, catalogue_bounds in entries:
+            self._delete([Path(entry.path)])
+            cursor = self.connection.execute(
+                f"INSERT INTO rasters ({ENTRY_COLUMNS}) VALUES ({', '.join('?' * len(entry))})", entry
+            )
+
+            if catalogue_bounds is not None:
+                west, south, east, north = catalogue_bounds
+                self.connection.execute(
+                    "INSERT INTO rasters_rtree (id, west, east, south, north) VALUES (?, ?, ?, ?, ?)",
+                    (cursor.lastrowid, west, east, south, north),
+                )
+
+    def _delete(self, file_paths: Iterable[Path]) -> None:
+        for file_path in file_paths:
+            row = self.connection.execute("SELECT id FROM rasters WHERE path = ?", (str(file_path),)).fetchone()
+            if row is None:
+                continue
+
+            self.connection.execute("DELETE FROM rasters_rtree WHERE id = ?", row)
+            self.connection.execute("DELETE FROM rasters WHERE id = ?", row)
+
+
+def get_content_hash(file_path: str | Path) -> str:
+    """Hash the content of a file, reading it in chunks.
+
+    XXH3 is used if the optional xxhash dependency is installed, as it's much faster than the BLAKE2b fallback. The
+    hash is prefixed with the name of the algorithm, so hashes from different algorithms never match.
+    """
+    if xxhash is not None:
+        algorithm, file_hash = "xxh3_128", xxhash.xxh3_128()
+    else:
+        algorithm, file_hash = "blake2b", hashlib.blake2b(digest_size=16)
+
+    with open(file_path, "rb") as file:
+        while chunk := file.read(HASH_CHUNK_SIZE):
+            file_hash.update(chunk)
+
+    return f"{algorithm}:{file_hash.hexdigest()}"
+
+
+def _read_entry(file_path: Path, hash_content: bool) -> tuple[CatalogueEntry, Bounds | None]:
+    """Read the catalogue entry for a raster, along with its bounds in the catalogue srs (None if it has no srs)."""
+    stat = file_path.stat()
+    raster_ds = RasterDataset(file_path, metadata_only=True)
+    x_size, y_size = raster_ds.size
+    bounds = raster_ds.bounds
+
+    entry = CatalogueEntry(
+        path=str(file_path),
+        size=stat.st_size,
+        mtime_ns=stat.st_mtime_ns,
+        content_hash=get_content_hash(file_path) if hash_content else None,
+        driver=raster_ds.ds.GetDriver().ShortName,
+        x_size=x_size,
+        y_size=y_size,
+        band_count=raster_ds.band_count,
+        epsg_code=int(raster_ds.epsg_code) if raster_ds.epsg_code else None,
+        x_res=raster_ds.geotransform.x_res,
+        y_res=raster_ds.geotransform.y_res,
+        min_x=bounds.min_x,
+        min_y=bounds.min_y,
+        max_x=bounds.max_x,
+        max_y=bounds.max_y,
+    )
+
+    catalogue_bounds = _to_catalogue_bounds(bounds, raster_ds.srs) if raster_ds.srs is not None else None
+    return entry, catalogue_bounds
+
+
+def _try_read_entry(file_path: Path, hash_content: bool) -> tuple[CatalogueEntry, Bounds | None] | None:
+    try:
+        return _read_entry(file_path, hash_content)
+    except (IOError, RuntimeError, ValueError) as error:
+        logger.warning(f"Skipping {file_path}, it could not be catalogued: {error}")
+        return None
+
+
+def _to_catalogue_bounds(bounds: Bounds, srs: osr.SpatialReference) -> Bounds:
+    """Transform bounds into longitude/latitude bounds in the catalogue srs."""
+    catalogue_srs = get_srs(epsg_code=CATALOGUE_EPSG_CODE, axis_mapping_strategy=osr.OAMS_TRADITIONAL_GIS_ORDER)
+    if srs.IsSame(catalogue_srs):
+        return bounds
+
+    # Bounding boxes are given in x/y order, whatever the axis order of the spatial reference
+    source_srs = srs.Clone()
+    source_srs.SetAxisMappingStrategy(osr.OAMS_TRADITIONAL_GIS_ORDER)
+
+    coord_transform = get_coordinate_transformation(source_srs, catalogue_srs)
+    return Bounds(*coord_transform.TransformBounds(*bounds, BOUNDS_DENSIFY_POINTS))
@@ -0,0 +1,73 @@
+from pathlib import Path
+
+from osgeo import gdal
+
+from geospatial_utils.raster.constants import COG_DRIVER
+from geospatial_utils.raster.reprojection import (
+    WarpProfile,
+    get_config_options,
+    get_profile_creation_options,
+    get_warp_profile,
+    reproject_raster,
+)
+from geospatial_utils.srs.cache import get_srs
+
+
+def convert_to_cog(
+    input_path: str | Path,
+    output_path: str | Path,
+    output_epsg_code: int,
+    compression: str | None = None,
+    compression_level: int | float | None = None,
+    profile: WarpProfile | str | None = None,
+) -> None:
+    """Convert a raster into a Cloud Optimized GeoTIFF, reprojecting it to the output EPSG code if required.
+
+    Rasters which need reprojecting are warped straight into the COG by `reproject_raster`, otherwise the raster is
+    written out directly using the GDAL COG driver. Either way the output is only written once.
+
+    Args:
+        input_path: Path to the raster to be converted.
+        output_path: Path to save the COG to.
+        output_epsg_code: EPSG code representing the spatial reference of the output COG.
+        compression: Compression codec for the COG, e.g. DEFLATE, ZSTD or LERC. Defaults to that of the profile.
+        compression_level: Compression level (or maximum error for LERC) for the COG. Defaults to that of the profile.
+        profile: The WarpProfile, or the name of one of the WARP_PROFILES. Defaults to DEFAULT_PROFILE.
+
+    Raises:
+        ValueError: The input raster could not be opened.
+        ValueError: The input raster could not be converted.
+
+    """
+    input_ds = gdal.Open(str(input_path))
+    if input_ds is None:
+        raise ValueError(f"Could not open {input_path}. Please check it exists.")
+
+    output_srs = get_srs(epsg_code=output_epsg_code)
+
+    input_srs = input_ds.GetSpatialRef()
+
+    if input_srs is None or not input_srs.IsSame(output_srs):
+        del input_ds
+        reproject_raster(
+            input_path=input_path,
+            output_path=output_path,
+            output_epsg_code=output_epsg_code,
+            output_format=COG_DRIVER,
+            compression=compression,
+            compression_level=compression_level,
+            profile=profile,
+        )
+        return
+
+    profile = get_warp_profile(profile, compression=compression, compression_level=compression_level)
+    creation_options = get_profile_creation_options(COG_DRIVER, profile)
+    translate_options = gdal.TranslateOptions(format=COG_DRIVER, creationOptions=creation_options)
+
+    with gdal.config_options(get_config_options(profile)):
+        output_ds = gdal.Translate(str(output_path), input_ds, options=translate_options)
+        if output_ds is None:
+            raise ValueError(f"Could not convert {input_path} to a COG.")
+
+        # Ensure the output dataset is properly closed by deleting it
+        del output_ds
@@ -0,0 +1,4 @@
+GTIFF_DRIVER = "GTiff"
+COG_DRIVER = "COG"
+VRT_DRIVER = "VRT"
+MEM_DRIVER = "MEM"
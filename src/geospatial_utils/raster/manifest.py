@@ -0,0 +1,150 @@
+import json
+import sqlite3
+import time
+from pathlib import Path
+from types import TracebackType
+from typing import Any, NamedTuple
+
+from geospatial_utils.raster.catalogue import get_content_hash
+
+CREATE_TABLES = """
+CREATE TABLE IF NOT EXISTS outputs (
+    output_path TEXT PRIMARY KEY,
+    input_path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    content_hash TEXT,
+    parameters TEXT NOT NULL,
+    completed_at REAL NOT NULL
+);
+"""
+
+
+class Fingerprint(NamedTuple):
+    size: int
+    mtime_ns: int
+    content_hash: str | None = None
+
+
+def get_fingerprint(file_path: str | Path, hash_content: bool = False) -> Fingerprint:
+    """Get the size and modification time of a file, and optionally a hash of its content (see get_content_hash)."""
+    stat = Path(file_path).stat()
+    content_hash = get_content_hash(file_path) if hash_content else None
+    return Fingerprint(size=stat.st_size, mtime_ns=stat.st_mtime_ns, content_hash=content_hash)
+
+
+class OutputManifest:
+    """A persistent record of the outputs that have been completed, the inputs they were made from and how.
+
+    Each output is recorded with the fingerprint of its input and the parameters used to make it, once it has been
+    fully written. An output is up to date if it still exists, it was made with the same parameters and its input
+    is unchanged. Inputs are unchanged if their size and modification time match, or (when a content hash was recorded)
+    if their content hashes match, so inputs which are touched or copied without being changed aren't redone.
+
+    It can be used as a context manager, closing the database connection on exit.
+
+    Args:
+        manifest_path: Path to the SQLite database. It's created if it doesn't exist.
+
+    """
+
+    def __init__(self, manifest_path: str | Path):
+        self.manifest_path = Path(manifest_path)
+        self.connection = sqlite3.connect(self.manifest_path)
+        self.connection.executescript(CREATE_TABLES)
+
+    def __enter__(self) -> "OutputManifest":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.connection.close()
+
+    def is_up_to_date(
+        self,
+        input_path: str | Path,
+        output_path: str | Path,
+        parameters: dict[str, Any],
+        hash_content: bool = False,
+    ) -> bool:
+        """Check whether an output has been completed from the current version of its input, with the same parameters.
+
+        Args:
+            input_path: Path to the input.
+            output_path: Path to the output.
+            parameters: The parameters the output would be made with. They must be JSON serialisable.
+            hash_content: Whether to compare the hash of the content of the input with the recorded hash (if there is
+                one), when its size or modification time differ. If they match, the recorded size and modification
+                time are updated. Defaults to False.
+
+        Returns:
+            Whether the output can be skipped.
+
+        """
+        row = self.connection.execute(
+            "SELECT input_path, size, mtime_ns, content_hash, parameters FROM outputs WHERE output_path = ?",
+            (_to_key(output_path),),
+        ).fetchone()
+        if row is None or not Path(output_path).exists():
+            return False
+
+        recorded_input_path, size, mtime_ns, content_hash, recorded_parameters = row
+        if recorded_input_path != _to_key(input_path) or recorded_parameters != _serialise(parameters):
+            return False
+
+        fingerprint = get_fingerprint(input_path)
+        if (fingerprint.size, fingerprint.mtime_ns) == (size, mtime_ns):
+            return True
+
+        if not hash_content or content_hash is None or get_content_hash(input_path) != content_hash:
+            return False
+
+        # Record the new size and modification time, so later checks don't have to hash the input again
+        with self.connection:
+            self.connection.execute(
+                "UPDATE outputs SET size = ?, mtime_ns = ? WHERE output_path = ?",
+                (fingerprint.size, fingerprint.mtime_ns, _to_key(output_path)),
+            )
+
+        return True
+
+    def record(
+        self, input_path: str | Path, output_path: str | Path, parameters: dict[str, Any], fingerprint: Fingerprint
+    ) -> None:
+        """Record that an output has been completed.
+
+        Args:
+            input_path: Path to the input.
+            output_path: Path to the completed output.
+            parameters: The parameters the output was made with. They must be JSON serialisable.
+            fingerprint: Fingerprint of the input, taken before the output was made.
+
+        """
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO outputs VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    _to_key(output_path),
+                    _to_key(input_path),
+                    fingerprint.size,
+                    fingerprint.mtime_ns,
+                    fingerprint.content_hash,
+                    _serialise(parameters),
+                    time.time(),
+                ),
+            )
+
+
+def _to_key(file_path: str | Path) -> str:
+    return str(Path(file_path).absolute())
+
+
+def _serialise(parameters: dict[str, Any]) -> str:
+    return json.dumps(parameters, sort_keys=True)
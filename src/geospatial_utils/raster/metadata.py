@@ -0,0 +1,148 @@
+import logging
+import os
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+
+from geospatial_utils.raster.raster_dataset import GeoTransform, RasterDataset
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RASTER_PATTERN = "*.tif"
+
+# Opening rasters is dominated by I/O latency (and GDAL releases the GIL), so more threads than CPUs pays off
+DEFAULT_SCAN_WORKERS = 32
+
+
+class RasterMetadata(NamedTuple):
+    path: str
+    driver: str
+    x_size: int
+    y_size: int
+    band_count: int
+    dtype: str
+    nodata: float | None
+    epsg_code: int | None
+    geotransform: GeoTransform
+    min_x: float
+    min_y: float
+    max_x: float
+    max_y: float
+
+
+def read_raster_metadata(file_path: str | Path) -> RasterMetadata:
+    """Read the metadata of a raster, opening it without listing the contents of its directory.
+
+    Args:
+        file_path: Path to the raster.
+
+    Returns:
+        RasterMetadata of the raster. The data type and nodata value are those of the first band.
+
+    Raises:
+        IOError: The raster doesn't exist or couldn't be opened.
+
+    """
+    raster_ds = RasterDataset(file_path, metadata_only=True)
+    x_size, y_size = raster_ds.size
+    bounds = raster_ds.bounds
+    has_bands = raster_ds.band_count > 0
+
+    return RasterMetadata(
+        path=str(file_path),
+        driver=raster_ds.ds.GetDriver().ShortName,
+        x_size=x_size,
+        y_size=y_size,
+        band_count=raster_ds.band_count,
+        dtype=str(raster_ds.band_dtypes[0]) if has_bands else "",
+        nodata=raster_ds.nodata_values[0] if has_bands else None,
+        epsg_code=int(raster_ds.epsg_code) if raster_ds.epsg_code else None,
+        geotransform=raster_ds.geotransform,
+        min_x=bounds.min_x,
+        min_y=bounds.min_y,
+        max_x=bounds.max_x,
+        max_y=bounds.max_y,
+    )
+
+
+def scan_directory(
+    directory: str | Path,
+    pattern: str = DEFAULT_RASTER_PATTERN,
+    recursive: bool = True,
+    workers: int | None = DEFAULT_SCAN_WORKERS,
+) -> dict[str, np.ndarray]:
+    """Collect the metadata of every raster in a directory tree concurrently, as a columnar table.
+
+    Each raster is opened with read_raster_metadata. Files which can't be opened are logged and skipped.
+
+    Args:
+        directory: The directory to scan.
+        pattern: Glob pattern the file names must match. Defaults to DEFAULT_RASTER_PATTERN.
+        recursive: Whether to scan subdirectories too. Defaults to True.
+        workers: Number of threads opening rasters concurrently. Defaults to DEFAULT_SCAN_WORKERS.
+
+    Returns:
+        Dictionary mapping each field of RasterMetadata (with the geotransform split into a column per coefficient)
+        to a NumPy array of its values, in the order the files were found. It can be passed directly to
+        pandas.DataFrame or pyarrow.table. Missing nodata values and EPSG codes are NaN and -1 respectively.
+
+    """
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(_try_read_raster_metadata, find_files(Path(directory), pattern, recursive)))
+
+    return to_columns([metadata for metadata in results if metadata is not None])
+
+
+def to_columns(metadata: list[RasterMetadata]) -> dict[str, np.ndarray]:
+    """Convert a list of RasterMetadata into a columnar table. See scan_directory."""
+    columns = {
+        "path": np.array([item.path for item in metadata], dtype=object),
+        "driver": np.array([item.driver for item in metadata], dtype=object),
+        "x_size": np.array([item.x_size for item in metadata], dtype=np.int64),
+        "y_size": np.array([item.y_size for item in metadata], dtype=np.int64),
+        "band_count": np.array([item.band_count for item in metadata], dtype=np.int64),
+        "dtype": np.array([item.dtype for item in metadata], dtype=object),
+        "nodata": np.array([np.nan if item.nodata is None else item.nodata for item in metadata], dtype=np.float64),
+        "epsg_code": np.array([-1 if item.epsg_code is None else item.epsg_code for item in metadata], dtype=np.int64),
+    }
+
+    for field in GeoTransform._fields:
+        columns[field] = np.array([getattr(item.geotransform, field) for item in metadata], dtype=np.float64)
+
+    for field in ("min_x", "min_y", "max_x", "max_y"):
+        columns[field] = np.array([getattr(item, field) for item in metadata], dtype=np.float64)
+
+    return columns
+
+
+def find_files(directory: str | Path, pattern: str = DEFAULT_RASTER_PATTERN, recursive: bool = True) -> Iterator[Path]:
+    """Lazily find the files matching a pattern, using os.scandir so each entry isn't stat'ed again.
+
+    Args:
+        directory: The directory to search.
+        pattern: Glob pattern the file names must match. Defaults to DEFAULT_RASTER_PATTERN.
+        recursive: Whether to search subdirectories too. Defaults to True.
+
+    Yields:
+        Path to each file found.
+
+    """
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_dir():
+                if recursive:
+                    yield from find_files(Path(entry.path), pattern, recursive)
+            elif fnmatch(entry.name, pattern):
+                yield Path(entry.path)
+
+
+def _try_read_raster_metadata(file_path: Path) -> RasterMetadata | None:
+    try:
+        return read_raster_metadata(file_path)
+    except (IOError, RuntimeError, ValueError) as error:
+        logger.warning(f"Skipping {file_path}, its metadata could not be read: {error}")
+        return None
@@ -0,0 +1,96 @@
+from collections.abc import Iterable
+from pathlib import Path
+
+from osgeo import gdal
+
+from geospatial_utils.raster.constants import COG_DRIVER, VRT_DRIVER
+from geospatial_utils.raster.reprojection import (
+    WarpProfile,
+    get_config_options,
+    get_profile_creation_options,
+    get_warp_kwargs,
+    get_warp_profile,
+)
+from geospatial_utils.srs.cache import get_srs
+
+# Mosaics are typically large enough to make use of every CPU, and a bounded warp memory, by default
+DEFAULT_MOSAIC_PROFILE = "balanced"
+
+
+def build_mosaic_vrt(input_paths: Iterable[str | Path], vrt_path: str | Path = "") -> gdal.Dataset:
+    """Build a virtual mosaic of rasters, without reading or copying any of their data.
+
+    Args:
+        input_paths: Paths to the rasters to mosaic. They must share a spatial reference and band layout.
+        vrt_path: Optional path to save the VRT to. Defaults to an in-memory VRT.
+
+    Returns:
+        The VRT dataset.
+
+    Raises:
+        ValueError: No rasters were provided, or the mosaic could not be built.
+
+    """
+    input_paths = [str(input_path) for input_path in input_paths]
+    if not input_paths:
+        raise ValueError("At least one raster must be provided to build a mosaic.")
+
+    vrt_ds = gdal.BuildVRT(str(vrt_path), input_paths)
+    if vrt_ds is None:
+        raise ValueError(f"Could not build a mosaic of the {len(input_paths)} raster(s).")
+
+    return vrt_ds
+
+
+def mosaic_to_cog(
+    input_paths: Iterable[str | Path],
+    output_path: str | Path,
+    output_epsg_code: int,
+    compression: str | None = None,
+    compression_level: int | float | None = None,
+    profile: WarpProfile | str = DEFAULT_MOSAIC_PROFILE,
+) -> None:
+    """Mosaic many rasters (e.g. adjacent tiles) into a single Cloud Optimized GeoTIFF, with one warp.
+
+    A virtual mosaic of the rasters is warped as a whole, so pixels along the tile edges are resampled from all of the
+    neighbouring tiles and nothing is processed twice. The warp is evaluated chunk by chunk, as the COG driver reads
+    from it, by multiple threads, and written straight into the COG (including its overviews).
+
+    Args:
+        input_paths: Paths to the rasters to mosaic. They must share a spatial reference and band layout.
+        output_path: Path to save the COG to.
+        output_epsg_code: EPSG code representing the spatial reference of the output COG.
+        compression: Compression codec for the COG, e.g. DEFLATE, ZSTD or LERC. Defaults to that of the profile.
+        compression_level: Compression level (or maximum error for LERC) for the COG. Defaults to that of the profile.
+        profile: The WarpProfile, or the name of one of the WARP_PROFILES. Defaults to DEFAULT_MOSAIC_PROFILE.
+
+    Raises:
+        ValueError: The mosaic could not be built or written.
+        ValueError: The rasters don't have a spatial reference.
+
+    """
+    profile = get_warp_profile(profile, compression=compression, compression_level=compression_level)
+
+    mosaic_ds = build_mosaic_vrt(input_paths)
+    output_srs = get_srs(epsg_code=output_epsg_code)
+    mosaic_srs = mosaic_ds.GetSpatialRef()
+    if mosaic_srs is None:
+        raise ValueError("The rasters to mosaic don't have a spatial reference.")
+
+    with gdal.config_options(get_config_options(profile)):
+        source_ds = mosaic_ds
+        if not mosaic_srs.IsSame(output_srs):
+            # As with reproject_raster, the warp is virtual and only evaluated as the COG driver reads from it
+            warp_options = gdal.WarpOptions(dstSRS=output_srs, format=VRT_DRIVER, **get_warp_kwargs(profile))
+            source_ds = gdal.Warp("", mosaic_ds, options=warp_options)
+            if source_ds is None:
+                raise ValueError("Could not warp the mosaic.")
+
+        creation_options = get_profile_creation_options(COG_DRIVER, profile)
+        translate_options = gdal.TranslateOptions(format=COG_DRIVER, creationOptions=creation_options)
+        output_ds = gdal.Translate(str(output_path), source_ds, options=translate_options)
+        if output_ds is None:
+            raise ValueError(f"Could not write the mosaic to {output_path}.")
+
+        # Ensure the datasets are properly closed by deleting them
+        del output_ds, source_ds, mosaic_ds
@@ -0,0 +1,239 @@
+import math
+from collections.abc import Sequence
+
+import numpy as np
+from osgeo import gdal, gdal_array
+
+from geospatial_utils.raster.windows import Window
+
+# Overviews are added until the smallest one fits within a tile of this size (in pixels)
+DEFAULT_MIN_OVERVIEW_SIZE = 256
+
+DEFAULT_OVERVIEW_RESAMPLING = "NEAREST"
+
+# Number of threads used to compute overviews, or ALL_CPUS
+DEFAULT_OVERVIEW_THREADS = "ALL_CPUS"
+
+# Suffix GDAL uses for external overviews, appended to the full raster file name
+EXTERNAL_OVERVIEW_SUFFIX = ".ovr"
+
+# Resampling algorithms available to overviews, and their equivalent when resampling a window with RasterIO
+RASTERIO_RESAMPLING = {
+    "NEAREST": gdal.GRIORA_NearestNeighbour,
+    "AVERAGE": gdal.GRIORA_Average,
+    "BILINEAR": gdal.GRIORA_Bilinear,
+    "CUBIC": gdal.GRIORA_Cubic,
+    "CUBICSPLINE": gdal.GRIORA_CubicSpline,
+    "LANCZOS": gdal.GRIORA_Lanczos,
+    "MODE": gdal.GRIORA_Mode,
+    "GAUSS": gdal.GRIORA_Gauss,
+}
+
+
+def get_overview_levels(x_size: int, y_size: int, min_size: int = DEFAULT_MIN_OVERVIEW_SIZE) -> list[int]:
+    """Choose the overview decimation factors for a raster, halving its size until it fits within a single tile.
+
+    Args:
+        x_size: Width of the raster in pixels.
+        y_size: Height of the raster in pixels.
+        min_size: Size (in pixels) the largest side of the smallest overview must fit within. Defaults to
+            DEFAULT_MIN_OVERVIEW_SIZE.
+
+    Returns:
+        The decimation factors, e.g. [2, 4, 8], or an empty list if the raster already fits within min_size.
+
+    Raises:
+        ValueError: The minimum size isn't positive.
+
+    """
+    if min_size < 1:
+        raise ValueError(f"The minimum overview size must be positive, not {min_size}.")
+
+    levels = []
+    factor = 2
+    while math.ceil(max(x_size, y_size) / (factor // 2)) > min_size:
+        levels.append(factor)
+        factor *= 2
+
+    return levels
+
+
+def get_band_resampling(resampling: str | Sequence[str], band_count: int) -> list[str]:
+    """Expand the overview resampling into one algorithm per band.
+
+    Args:
+        resampling: The resampling algorithm for every band, or a sequence with the algorithm for each band.
+        band_count: Number of bands in the raster.
+
+    Returns:
+        The upper case resampling algorithm of each band.
+
+    Raises:
+        ValueError: The number of algorithms doesn't match the number of bands.
+        ValueError: An algorithm isn't one of the RASTERIO_RESAMPLING algorithms.
+
+    """
+    band_resampling = [resampling] * band_count if isinstance(resampling, str) else list(resampling)
+    if len(band_resampling) != band_count:
+        raise ValueError(f"{len(band_resampling)} resampling algorithms were given for {band_count} bands.")
+
+    band_resampling = [algorithm.upper() for algorithm in band_resampling]
+    for algorithm in band_resampling:
+        if algorithm not in RASTERIO_RESAMPLING:
+            raise ValueError(f"{algorithm} is not a supported overview resampling algorithm.")
+
+    return band_resampling
+
+
+def build_overviews(
+    ds: gdal.Dataset,
+    levels: Sequence[int],
+    resampling: str | Sequence[str] = DEFAULT_OVERVIEW_RESAMPLING,
+    num_threads: int | str = DEFAULT_OVERVIEW_THREADS,
+    compression: str | None = None,
+) -> None:
+    """Build (or rebuild) the overviews of a raster, computing them with multiple threads.
+
+    The overviews are stored within the raster if it's opened for update, otherwise externally in a .ovr file.
+
+    When every band uses the same resampling, all of the bands are computed together in a single pass over the raster.
+    Otherwise the overviews are created empty and then computed band by band, each with its own resampling.
+
+    Args:
+        ds: The raster dataset.
+        levels: The overview decimation factors, see get_overview_levels.
+        resampling: Resampling algorithm for every band, or a sequence with the algorithm for each band, e.g. NEAREST
+            for categorical bands and AVERAGE for continuous ones. Defaults to DEFAULT_OVERVIEW_RESAMPLING.
+        num_threads: Number of threads used to compute the overviews, or ALL_CPUS. Defaults to DEFAULT_OVERVIEW_THREADS.
+        compression: Compression codec for external overviews, e.g. DEFLATE. Internal overviews are compressed in the
+            same way as the raster. Defaults to the GDAL default.
+
+    Raises:
+        ValueError: The overviews couldn't be built.
+
+    """
+    band_resampling = get_band_resampling(resampling, ds.RasterCount)
+    config_options = {"GDAL_NUM_THREADS": str(num_threads)}
+    if compression is not None:
+        config_options["COMPRESS_OVERVIEW"] = compression
+
+    with gdal.config_options(config_options):
+        if len(set(band_resampling)) <= 1:
+            result = ds.BuildOverviews(band_resampling[0] if band_resampling else "NONE", list(levels))
+            if result != gdal.CE_None:
+                raise ValueError(f"Could not build the overviews of {ds.GetDescription()}.")
+            return
+
+        if ds.BuildOverviews("NONE", list(levels)) != gdal.CE_None:
+            raise ValueError(f"Could not build the overviews of {ds.GetDescription()}.")
+
+        for band_index, algorithm in enumerate(band_resampling, start=1):
+            band = ds.GetRasterBand(band_index)
+            overview_bands = [band.GetOverview(index) for index in range(band.GetOverviewCount())]
+            if gdal.RegenerateOverviews(band, overview_bands, algorithm) != gdal.CE_None:
+                raise ValueError(f"Could not compute the overviews of band {band_index} of {ds.GetDescription()}.")
+
+
+def refresh_overviews(
+    ds: gdal.Dataset,
+    window: Window,
+    resampling: str | Sequence[str] = DEFAULT_OVERVIEW_RESAMPLING,
+    overview_ds: gdal.Dataset | None = None,
+) -> list[list[Window]]:
+    """Recompute only the parts of the existing overviews covering a changed window of the raster.
+
+    Each overview window is resampled directly from the full resolution pixels it covers, so the rest of the pyramid
+    is left untouched. This is much cheaper than rebuilding every overview after a small update to a large raster.
+
+    The full resolution pixels are read at their own size and resampled in memory, as GDAL serves a read into a
+    smaller buffer from the closest existing overview, which is the stale one being refreshed.
+
+    Args:
+        ds: The raster dataset, with the changes to its full resolution pixels already written.
+        window: The window of full resolution pixels which changed.
+        resampling: Resampling algorithm for every band, or a sequence with the algorithm for each band. It should match
+            the resampling the overviews were built with. Defaults to DEFAULT_OVERVIEW_RESAMPLING.
+        overview_ds: The external .ovr dataset, opened for update, when the overviews aren't stored within the raster.
+            Otherwise the overviews of ds are updated, so it must be opened for update.
+
+    Returns:
+        The overview window which was recomputed for each overview, per band.
+
+    """
+    band_resampling = get_band_resampling(resampling, ds.RasterCount)
+    x_size, y_size = ds.RasterXSize, ds.RasterYSize
+
+    refreshed = []
+    for band_index, algorithm in enumerate(band_resampling, start=1):
+        band = ds.GetRasterBand(band_index)
+        band_windows = []
+
+        for overview_band in _get_overview_bands(band_index, ds, overview_ds):
+            x_scale = x_size / overview_band.XSize
+            y_scale = y_size / overview_band.YSize
+
+            # The overview pixels touched by the window, and the full resolution pixels they are computed from
+            x_off = math.floor(window.x_off / x_scale)
+            y_off = math.floor(window.y_off / y_scale)
+            overview_window = Window(
+                x_off=x_off,
+                y_off=y_off,
+                x_size=min(math.ceil((window.x_off + window.x_size) / x_scale), overview_band.XSize) - x_off,
+                y_size=min(math.ceil((window.y_off + window.y_size) / y_scale), overview_band.YSize) - y_off,
+            )
+
+            data = _resample_window(band, overview_window, x_scale, y_scale, algorithm)
+            overview_band.WriteArray(data, overview_window.x_off, overview_window.y_off)
+            band_windows.append(overview_window)
+
+        refreshed.append(band_windows)
+
+    return refreshed
+
+
+def _resample_window(
+    band: gdal.Band, overview_window: Window, x_scale: float, y_scale: float, algorithm: str
+) -> np.ndarray:
+    """Resample the full resolution pixels covered by an overview window, without reading any existing overview."""
+    src_x_off = overview_window.x_off * x_scale
+    src_y_off = overview_window.y_off * y_scale
+    src_x_size = min(overview_window.x_size * x_scale, band.XSize - src_x_off)
+    src_y_size = min(overview_window.y_size * y_scale, band.YSize - src_y_off)
+
+    # The whole pixels covering the (possibly fractional) source window
+    read_x_off = math.floor(src_x_off)
+    read_y_off = math.floor(src_y_off)
+    full_resolution = band.ReadAsArray(
+        read_x_off,
+        read_y_off,
+        min(math.ceil(src_x_off + src_x_size), band.XSize) - read_x_off,
+        min(math.ceil(src_y_off + src_y_size), band.YSize) - read_y_off,
+    )
+
+    # A MEM dataset has no overviews, so the resampled read is computed from the full resolution pixels
+    mem_ds = gdal_array.OpenArray(full_resolution)
+    mem_band = mem_ds.GetRasterBand(1)
+    nodata = band.GetNoDataValue()
+    if nodata is not None:
+        mem_band.SetNoDataValue(nodata)
+
+    return mem_band.ReadAsArray(
+        src_x_off - read_x_off,
+        src_y_off - read_y_off,
+        src_x_size,
+        src_y_size,
+        buf_xsize=overview_window.x_size,
+        buf_ysize=overview_window.y_size,
+        resample_alg=RASTERIO_RESAMPLING[algorithm],
+    )
+
+
+def _get_overview_bands(band_index: int, ds: gdal.Dataset, overview_ds: gdal.Dataset | None) -> list[gdal.Band]:
+    """The overview bands of a band, from largest to smallest, from either the raster or its external .ovr dataset."""
+    if overview_ds is None:
+        band = ds.GetRasterBand(band_index)
+        return [band.GetOverview(index) for index in range(band.GetOverviewCount())]
+
+    # The .ovr dataset holds the largest overview, and the smaller ones as its own overviews
+    overview_band = overview_ds.GetRasterBand(band_index)
+    return [overview_band] + [overview_band.GetOverview(index) for index in range(overview_band.GetOverviewCount())]
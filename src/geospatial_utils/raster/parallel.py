@@ -0,0 +1,327 @@
+import os
+import threading
+from abc import ABC, abstractmethod
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+from osgeo import gdal, gdal_array
+
+from geospatial_utils.raster.constants import GTIFF_DRIVER
+from geospatial_utils.raster.raster_dataset import RasterDataset
+from geospatial_utils.raster.reprojection import get_creation_options
+from geospatial_utils.raster.statistics import (
+    BandStatistics,
+    Moments,
+    compute_moments,
+    get_valid_values,
+    merge_moments,
+    moments_to_statistics,
+)
+from geospatial_utils.raster.windows import BlockWindow, Window
+
+THREAD_EXECUTOR = "thread"
+PROCESS_EXECUTOR = "process"
+
+# Windows are kept small by default, so there are enough of them to keep all of the workers busy
+DEFAULT_TILE_MEMORY = 16 * 1024 * 1024
+
+# Number of windows queued per worker, bounding the number of arrays held in memory at once
+TASKS_PER_WORKER = 4
+
+# Each worker thread (or process) opens its own handle to each raster, as GDAL datasets aren't thread safe
+_local = threading.local()
+
+# Sentinel for a raster without any windows, as None can be a valid partial result
+_NO_WINDOWS = object()
+
+
+class Reducer(ABC):
+    """Reduces the valid (non nodata) values of a raster band to a single result.
+
+    Each window is reduced independently with `map` and the partial results are merged with `combine`, in whatever
+    order the windows finish, before `finalise` converts the merged result into the final result.
+    """
+
+    @abstractmethod
+    def map(self, values: np.ndarray) -> Any:
+        """Reduce the valid values of a window to a partial result."""
+
+    @abstractmethod
+    def combine(self, partial: Any, other: Any) -> Any:
+        """Merge two partial results."""
+
+    def finalise(self, partial: Any) -> Any:
+        return partial
+
+
+class CountReducer(Reducer):
+    """Count the number of valid pixels."""
+
+    def map(self, values: np.ndarray) -> int:
+        return int(values.size)
+
+    def combine(self, partial: int, other: int) -> int:
+        return partial + other
+
+
+class SumReducer(Reducer):
+    """Sum the valid pixels, accumulating in float64 (or int64 for integer rasters) to avoid overflow."""
+
+    def map(self, values: np.ndarray) -> np.number:
+        dtype = np.int64 if np.issubdtype(values.dtype, np.integer) else np.float64
+        return values.sum(dtype=dtype)
+
+    def combine(self, partial: np.number, other: np.number) -> np.number:
+        return partial + other
+
+
+class MinMaxReducer(Reducer):
+    """Find the minimum and maximum valid pixel values. The result is None if there are no valid pixels."""
+
+    def map(self, values: np.ndarray) -> tuple[Any, Any] | None:
+        if values.size == 0:
+            return None
+
+        return values.min(), values.max()
+
+    def combine(self, partial: tuple[Any, Any] | None, other: tuple[Any, Any] | None) -> tuple[Any, Any] | None:
+        if partial is None or other is None:
+            return partial if other is None else other
+
+        return min(partial[0], other[0]), max(partial[1], other[1])
+
+
+class HistogramReducer(Reducer):
+    """Calculate a histogram of the valid pixels, with fixed bins so the partial histograms can be summed.
+
+    Args:
+        bins: Number of equal width bins.
+        value_range: The lower and upper edge of the bins. Values outside of the range are ignored.
+
+    """
+
+    def __init__(self, bins: int, value_range: tuple[float, float]):
+        self.bins = bins
+        self.value_range = value_range
+
+    def map(self, values: np.ndarray) -> np.ndarray:
+        counts, _ = np.histogram(values, bins=self.bins, range=self.value_range)
+        return counts
+
+    def combine(self, partial: np.ndarray, other: np.ndarray) -> np.ndarray:
+        return partial + other
+
+    def finalise(self, partial: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Returns the counts and bin edges, in the same format as np.histogram."""
+        return partial, np.linspace(self.value_range[0], self.value_range[1], self.bins + 1)
+
+
+class StatisticsReducer(Reducer):
+    """Calculate the minimum, maximum, mean and standard deviation of the valid pixels, merging the partial statistics
+    of each window with the parallel variant of Welford's algorithm.
+
+    Args:
+        pixel_count: Total number of pixels in the band, valid or not, used for the valid percentage.
+
+    """
+
+    def __init__(self, pixel_count: int):
+        self.pixel_count = pixel_count
+
+    def map(self, values: np.ndarray) -> Moments:
+        return compute_moments(values)
+
+    def combine(self, partial: Moments, other: Moments) -> Moments:
+        return merge_moments(partial, other)
+
+    def finalise(self, partial: Moments) -> BandStatistics:
+        return moments_to_statistics(partial, self.pixel_count)
+
+
+def map_blocks(
+    input_path: str | Path,
+    output_path: str | Path,
+    func: Callable[[np.ndarray], np.ndarray],
+    band_indexes: list[int] | None = None,
+    output_band_count: int = 1,
+    output_dtype: np.dtype | type = np.float32,
+    output_nodata: float | None = None,
+    overlap: int = 0,
+    max_memory: int | None = DEFAULT_TILE_MEMORY,
+    workers: int | None = None,
+    executor: str = THREAD_EXECUTOR,
+    creation_options: list[str] | None = None,
+) -> None:
+    """Apply a function to every window of a raster in parallel, writing the results to a new raster.
+
+    The raster is split into block aligned windows, which are read and processed by a pool of workers, each with its
+    own dataset handle. The results are written to the output raster by a single writer as each window finishes.
+
+    Args:
+        input_path: Path to the raster to process.
+        output_path: Path to save the output GeoTIFF to. It has the same size, geotransform and srs as the input.
+        func: Function applied to each window. It's given an array of shape (bands, rows, cols) and must return an
+            array of shape (rows, cols) or (output_band_count, rows, cols). When using the process executor, it must be
+            picklable (i.e. defined at the top level of a module).
+        band_indexes: Indexes of the bands to read for each window (count starts at one). Defaults to all bands.
+        output_band_count: Number of bands in the output raster. Defaults to 1.
+        output_dtype: NumPy data type of the output raster. Defaults to float32.
+        output_nodata: Optional nodata value for the output bands.
+        overlap: Number of pixels each window read extends past its window on each side, for functions that need
+            neighbouring pixels (e.g. filters). The overlap is stripped from the output of func before it's written.
+        max_memory: Maximum number of bytes read per band for each window. Defaults to DEFAULT_TILE_MEMORY.
+        workers: Number of workers. Defaults to the number of CPUs.
+        executor: Either THREAD_EXECUTOR or PROCESS_EXECUTOR. Threads are usually sufficient, as GDAL releases the GIL
+            during I/O and most NumPy operations release it too. Defaults to THREAD_EXECUTOR.
+        creation_options: GeoTIFF creation options for the output. Defaults to a tiled, DEFLATE compressed GeoTIFF.
+
+    """
+    input_path = str(input_path)
+    input_ds = RasterDataset(input_path)
+    band_indexes = band_indexes or list(range(1, input_ds.ds.RasterCount + 1))
+
+    output_ds = gdal.GetDriverByName(GTIFF_DRIVER).Create(
+        str(output_path),
+        input_ds.ds.RasterXSize,
+        input_ds.ds.RasterYSize,
+        output_band_count,
+        gdal_array.NumericTypeCodeToGDALTypeCode(np.dtype(output_dtype)),
+        options=(creation_options or get_creation_options(GTIFF_DRIVER)) + ["BIGTIFF=IF_SAFER"],
+    )
+    output_ds.SetGeoTransform(input_ds.ds.GetGeoTransform())
+    output_ds.SetProjection(input_ds.ds.GetProjection())
+
+    if output_nodata is not None:
+        for band_index in range(1, output_band_count + 1):
+            output_ds.GetRasterBand(band_index).SetNoDataValue(output_nodata)
+
+    block_windows = input_ds.iter_windows(band_indexes[0], overlap, max_memory)
+    tasks = ((block_window, input_path, band_indexes, func) for block_window in block_windows)
+
+    for (block_window, *_), output_arr in _run_tasks(_map_window, tasks, workers, executor):
+        result = np.asarray(output_arr)
+        if result.ndim == 2:
+            result = result[np.newaxis]
+
+        rows, cols = block_window.core_slices
+        window = block_window.window
+        for band_offset, band_result in enumerate(result):
+            output_ds.GetRasterBand(band_offset + 1).WriteArray(band_result[rows, cols], window.x_off, window.y_off)
+
+    # Ensure the output dataset is properly closed by deleting it
+    del output_ds
+
+
+def reduce_blocks(
+    input_path: str | Path,
+    reducer: Reducer,
+    band_index: int = 1,
+    max_memory: int | None = DEFAULT_TILE_MEMORY,
+    workers: int | None = None,
+    executor: str = THREAD_EXECUTOR,
+) -> Any:
+    """Reduce the valid pixels of a raster band to a single result, processing the windows in parallel.
+
+    Args:
+        input_path: Path to the raster to reduce.
+        reducer: The Reducer to apply, e.g. SumReducer or HistogramReducer.
+        band_index: Index of the band to reduce (count starts at one). Defaults to 1.
+        max_memory: Maximum number of bytes read for each window. Defaults to DEFAULT_TILE_MEMORY.
+        workers: Number of workers. Defaults to the number of CPUs.
+        executor: Either THREAD_EXECUTOR or PROCESS_EXECUTOR. Defaults to THREAD_EXECUTOR.
+
+    Returns:
+        The finalised result of the reducer.
+
+    Raises:
+        ValueError: The raster has no windows to reduce.
+
+    """
+    input_path = str(input_path)
+    block_windows = RasterDataset(input_path).iter_windows(band_index, max_memory=max_memory)
+    tasks = ((block_window.window, input_path, band_index, reducer) for block_window in block_windows)
+
+    partials = (partial for _, partial in _run_tasks(_reduce_window, tasks, workers, executor))
+    result = next(partials, _NO_WINDOWS)
+    if result is _NO_WINDOWS:
+        raise ValueError(f"{input_path} has no windows to reduce.")
+
+    for partial in partials:
+        result = reducer.combine(result, partial)
+
+    return reducer.finalise(result)
+
+
+def _get_dataset(input_path: str) -> RasterDataset:
+    """Get the calling thread's own handle to a raster, opening it on first use."""
+    datasets = getattr(_local, "datasets", None)
+    if datasets is None:
+        datasets = _local.datasets = {}
+
+    if input_path not in datasets:
+        datasets[input_path] = RasterDataset(input_path)
+
+    return datasets[input_path]
+
+
+def _map_window(
+    block_window: BlockWindow, input_path: str, band_indexes: list[int], func: Callable[[np.ndarray], np.ndarray]
+) -> np.ndarray:
+    raster_ds = _get_dataset(input_path)
+    arr = np.stack([raster_ds.read_window(block_window.read_window, band_index) for band_index in band_indexes])
+
+    return func(arr)
+
+
+def _reduce_window(window: Window, input_path: str, band_index: int, reducer: Reducer) -> Any:
+    raster_ds = _get_dataset(input_path)
+    arr = raster_ds.read_window(window, band_index)
+
+    nodata = raster_ds.get_band(band_index).GetNoDataValue()
+
+    return reducer.map(get_valid_values(arr, nodata))
+
+
+def _create_executor(workers: int, executor: str) -> Executor:
+    if executor == THREAD_EXECUTOR:
+        return ThreadPoolExecutor(max_workers=workers)
+
+    if executor == PROCESS_EXECUTOR:
+        return ProcessPoolExecutor(max_workers=workers)
+
+    raise ValueError(f"{executor} is not a valid executor, it should be {THREAD_EXECUTOR} or {PROCESS_EXECUTOR}.")
+
+
+def _run_tasks(
+    func: Callable[..., Any], tasks: Iterable[tuple], workers: int | None, executor: str
+) -> Iterator[tuple[tuple, Any]]:
+    """Run func over each set of task arguments in a pool, yielding the arguments and result as each one finishes.
+
+    Only a few tasks per worker are queued at once, so the results (and their arrays) don't build up in memory.
+    """
+    workers = workers or os.cpu_count() or 1
+    tasks = iter(tasks)
+    pending: dict[Future, tuple] = {}
+
+    with _create_executor(workers, executor) as pool:
+
+        def submit_next() -> bool:
+            task = next(tasks, None)
+            if task is None:
+                return False
+
+            pending[pool.submit(func, *task)] = task
+            return True
+
+        while len(pending) < workers * TASKS_PER_WORKER and submit_next():
+            pass
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                task = pending.pop(future)
+                yield task, future.result()
+                submit_next()
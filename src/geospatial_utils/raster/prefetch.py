@@ -0,0 +1,116 @@
+import asyncio
+from collections import defaultdict
+from collections.abc import Iterable, Sequence
+from pathlib import Path
+from typing import NamedTuple
+
+import numpy as np
+from osgeo import gdal
+
+from geospatial_utils.raster.raster_dataset import RasterDataset
+from geospatial_utils.raster.windows import Window
+from geospatial_utils.vsi.remote import get_remote_config_options, is_remote_path, to_gdal_path
+
+# Number of rasters opened or read at once. Remote reads are dominated by request latency rather than CPU (and GDAL
+# releases the GIL), so many more than the number of CPUs pays off
+DEFAULT_MAX_CONCURRENCY = 16
+
+
+class WindowRequest(NamedTuple):
+    path: str
+    window: Window
+    band_index: int = 1
+
+
+async def open_rasters(
+    file_paths: Iterable[str | Path], max_concurrency: int = DEFAULT_MAX_CONCURRENCY
+) -> list[RasterDataset]:
+    """Open many (typically remote) rasters concurrently, prefetching their headers and metadata.
+
+    Each raster is opened in a worker thread, so the requests for the headers of the different rasters are in flight
+    at the same time rather than one after another. Remote rasters are opened with the REMOTE_CONFIG_OPTIONS, so the
+    header of each is fetched in a single request.
+
+    Args:
+        file_paths: Paths to the rasters, including /vsi* paths and object store URIs.
+        max_concurrency: Maximum number of rasters opened at once. Defaults to DEFAULT_MAX_CONCURRENCY.
+
+    Returns:
+        The opened rasters, in the same order as the paths.
+
+    Raises:
+        IOError: A raster doesn't exist or couldn't be opened.
+
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def open_raster(file_path: str | Path) -> RasterDataset:
+        async with semaphore:
+            return await asyncio.to_thread(_open_raster, file_path)
+
+    return list(await asyncio.gather(*(open_raster(file_path) for file_path in file_paths)))
+
+
+async def read_windows(
+    requests: Sequence[WindowRequest], max_concurrency: int = DEFAULT_MAX_CONCURRENCY
+) -> list[np.ndarray]:
+    """Read many windows from many (typically remote) rasters concurrently.
+
+    The requests are grouped by raster, with each raster opened once in a worker thread and its windows read in turn.
+    Before each window is read, GDAL is advised of it, so all of the tiles it covers are fetched together (as a single
+    multi-range request where the server supports it, with consecutive ranges merged) rather than one by one.
+
+    Args:
+        requests: The windows to read, each with the path of its raster and the band to read.
+        max_concurrency: Maximum number of rasters read at once. Defaults to DEFAULT_MAX_CONCURRENCY.
+
+    Returns:
+        The array read for each request, in the same order as the requests.
+
+    Raises:
+        IOError: A raster doesn't exist or couldn't be opened.
+
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    request_indexes: dict[str, list[int]] = defaultdict(list)
+    for index, request in enumerate(requests):
+        request_indexes[to_gdal_path(request.path)].append(index)
+
+    arrays: list[np.ndarray | None] = [None] * len(requests)
+
+    async def read_raster(file_path: str, indexes: list[int]) -> None:
+        async with semaphore:
+            raster_arrays = await asyncio.to_thread(
+                _read_raster_windows, file_path, [requests[index] for index in indexes]
+            )
+
+        for index, array in zip(indexes, raster_arrays):
+            arrays[index] = array
+
+    await asyncio.gather(*(read_raster(file_path, indexes) for file_path, indexes in request_indexes.items()))
+
+    return arrays
+
+
+def _open_raster(file_path: str | Path) -> RasterDataset:
+    """Open a raster and read (and so cache) its metadata."""
+    raster_ds = RasterDataset(file_path)
+    _ = raster_ds.srs, raster_ds.geotransform, raster_ds.band_dtypes, raster_ds.nodata_values
+
+    return raster_ds
+
+
+def _read_raster_windows(file_path: str, requests: list[WindowRequest]) -> list[np.ndarray]:
+    """Read windows from a single raster within a worker thread, with its own dataset handle."""
+    raster_ds = RasterDataset(file_path)
+
+    arrays = []
+    with gdal.config_options(get_remote_config_options() if is_remote_path(file_path) else {}):
+        for request in requests:
+            window = request.window
+            raster_ds.ds.AdviseRead(
+                window.x_off, window.y_off, window.x_size, window.y_size, band_list=[request.band_index]
+            )
+            arrays.append(raster_ds.read_window(window, request.band_index))
+
+    return arrays
@@ -1,7 +1,45 @@
+from collections.abc import Iterator, Sequence
+from functools import cached_property
 from pathlib import Path
 from typing import NamedTuple
 
-from osgeo import gdal
+import numpy as np
+from numpy.typing import ArrayLike
+from osgeo import gdal, gdal_array, osr
+
+from geospatial_utils.raster.constants import MEM_DRIVER
+from geospatial_utils.raster.overviews import (
+    DEFAULT_MIN_OVERVIEW_SIZE,
+    DEFAULT_OVERVIEW_RESAMPLING,
+    DEFAULT_OVERVIEW_THREADS,
+    EXTERNAL_OVERVIEW_SUFFIX,
+    build_overviews,
+    get_overview_levels,
+    refresh_overviews,
+)
+from geospatial_utils.raster.statistics import (
+    DEFAULT_HISTOGRAM_BINS,
+    BandStatistics,
+    Moments,
+    compute_moments,
+    get_approximate_buffer_size,
+    get_valid_values,
+    merge_moments,
+    moments_to_statistics,
+    read_cached_histogram,
+    read_cached_statistics,
+    write_cached_histogram,
+    write_cached_statistics,
+)
+from geospatial_utils.raster.windows import (
+    DEFAULT_MAX_WINDOW_MEMORY,
+    BlockWindow,
+    Window,
+    allocate_aligned_array,
+    generate_windows,
+    get_window_size,
+)
+from geospatial_utils.vsi.remote import get_remote_config_options, is_remote_path, to_gdal_path
 
 
 class GeoTransform(NamedTuple):
@@ -18,44 +56,586 @@ class Point(NamedTuple):
     y: float
 
 
+class Bounds(NamedTuple):
+    min_x: float
+    min_y: float
+    max_x: float
+    max_y: float
+
+
+# Config options used to open rasters for their metadata only, without listing the directory to find sibling files
+# (e.g. .ovr overviews or .msk masks), which is the dominant cost of opening rasters in large directories
+METADATA_CONFIG_OPTIONS = {"GDAL_DISABLE_READDIR_ON_OPEN": "EMPTY_DIR"}
+
+
 class RasterDataset:
-    def __init__(self, ds: str | Path | gdal.Dataset):
+    def __init__(self, ds: str | Path | gdal.Dataset, metadata_only: bool = False):
+        """Open a raster dataset. Its metadata (srs, geotransform, size etc.) is read on first use and then cached.
+
+        Args:
+            ds: Path to the raster (including /vsi* paths and object store URIs, e.g. s3://bucket/key.tif), or an
+                opened gdal.Dataset.
+            metadata_only: Whether to open the raster for reading its metadata only, without listing the contents of
+                its directory. Sibling files such as external overviews and masks are not found, so this shouldn't be
+                used for reading data. Defaults to False.
+
+        """
         if isinstance(ds, str | Path):
-            self.open_dataset(ds)
+            self.open_dataset(ds, metadata_only)
         elif isinstance(ds, gdal.Dataset):
             self.ds = ds
         else:
             raise ValueError(f"{ds} is not a valid raster dataset.")
 
-        self.srs = self.ds.GetSpatialRef()
-
-        self.geotransform = GeoTransform(*self.ds.GetGeoTransform())
-
-    def open_dataset(self, file_path: str | Path) -> None:
+    def open_dataset(self, file_path: str | Path, metadata_only: bool = False) -> None:
         """Open the raster as a gdal.Dataset and store it as self.ds.
 
         Args:
-            file_path: Path to the raster to be opened.
+            file_path: Path to the raster to be opened. Remote rasters are opened with the REMOTE_CONFIG_OPTIONS.
+            metadata_only: Whether to open the raster without listing the contents of its directory. See __init__.
 
         Raises:
-            IOError: The raster file doesn't exist.
+            IOError: The raster file doesn't exist or couldn't be opened.
 
         """
-        if not Path(file_path).exists():
+        file_path = to_gdal_path(file_path)
+        config_options = get_remote_config_options() if is_remote_path(file_path) else {}
+        if metadata_only:
+            config_options.update(METADATA_CONFIG_OPTIONS)
+
+        with gdal.config_options(config_options):
+            self.ds = gdal.OpenEx(file_path, gdal.OF_RASTER)
+
+        if self.ds is None:
             raise IOError(f"The dataset; {file_path} does not exist")
 
-        self.ds = gdal.Open(str(file_path))
+    @cached_property
+    def srs(self) -> osr.SpatialReference | None:
+        """The spatial reference of the raster, or None if it doesn't have one."""
+        return self.ds.GetSpatialRef()
+
+    @cached_property
+    def geotransform(self) -> GeoTransform:
+        return GeoTransform(*self.ds.GetGeoTransform())
+
+    @cached_property
+    def epsg_code(self) -> str | None:
+        """Returns the EPSG code from the raster, or None if its spatial reference doesn't have one."""
+        if self.srs is None:
+            return None
 
-    @property
-    def epsg_code(self) -> str:
-        """Returns the EPSG code from the raster."""
         return self.srs.GetAuthorityCode(None)
 
+    @cached_property
+    def size(self) -> tuple[int, int]:
+        """The width and height of the raster in pixels."""
+        return self.ds.RasterXSize, self.ds.RasterYSize
+
+    @cached_property
+    def band_count(self) -> int:
+        return self.ds.RasterCount
+
+    @cached_property
+    def band_dtypes(self) -> list[np.dtype]:
+        """The NumPy data type of each band."""
+        return [self.get_band_dtype(band_index) for band_index in range(1, self.band_count + 1)]
+
+    @cached_property
+    def nodata_values(self) -> list[float | None]:
+        """The nodata value of each band, or None for bands without one."""
+        return [self.get_band(band_index).GetNoDataValue() for band_index in range(1, self.band_count + 1)]
+
+    @cached_property
+    def bounds(self) -> Bounds:
+        """The extent of the raster in its native srs, accounting for any rotation."""
+        x_size, y_size = self.size
+        x_coords, y_coords = self.convert_pixel_coords_to_native_srs([0, x_size, 0, x_size], [0, 0, y_size, y_size])
+
+        return Bounds(float(x_coords.min()), float(y_coords.min()), float(x_coords.max()), float(y_coords.max()))
+
+    @property
+    def overview_levels(self) -> list[int]:
+        """The decimation factor of each overview of the raster, from largest to smallest."""
+        band = self.get_band(1)
+        return [round(self.ds.RasterXSize / band.GetOverview(index).XSize) for index in range(band.GetOverviewCount())]
+
     @property
     def is_rgb(self) -> bool:
         """Performs a primitive check to see if the raster is likely to be an RGB or RGBA dataset."""
         return self.ds.RasterCount in (3, 4)
 
+    def get_band(self, band_index: int = 1) -> gdal.Band:
+        """Get a raster band, raising an error if it doesn't exist.
+
+        Args:
+            band_index: Index of the band (count starts at one).
+
+        Raises:
+            ValueError: The raster doesn't have a band with the band index.
+
+        """
+        band = self.ds.GetRasterBand(band_index)
+        if band is None:
+            raise ValueError(f"The raster does not have a band {band_index}, it has {self.ds.RasterCount} bands.")
+
+        return band
+
+    def get_band_dtype(self, band_index: int = 1) -> np.dtype:
+        """The NumPy data type corresponding to the data type of a raster band."""
+        return np.dtype(gdal_array.GDALTypeCodeToNumericTypeCode(self.get_band(band_index).DataType))
+
+    def get_window_size(
+        self, band_index: int = 1, max_memory: int | None = DEFAULT_MAX_WINDOW_MEMORY
+    ) -> tuple[int, int]:
+        """Choose a window size aligned to the natural block size of a band, which fits within a memory ceiling.
+
+        Args:
+            band_index: Index of the band (count starts at one).
+            max_memory: Maximum number of bytes to read for each window. If None, the natural block size is used.
+
+        Returns:
+            The window x and y size in pixels.
+
+        """
+        block_x_size, block_y_size = self.get_band(band_index).GetBlockSize()
+
+        return get_window_size(
+            raster_x_size=self.ds.RasterXSize,
+            raster_y_size=self.ds.RasterYSize,
+            block_x_size=block_x_size,
+            block_y_size=block_y_size,
+            item_size=self.get_band_dtype(band_index).itemsize,
+            max_memory=max_memory,
+        )
+
+    def iter_windows(
+        self, band_index: int = 1, overlap: int = 0, max_memory: int | None = DEFAULT_MAX_WINDOW_MEMORY
+    ) -> Iterator[BlockWindow]:
+        """Split the raster into block aligned windows, sized to fit within a memory ceiling.
+
+        Args:
+            band_index: Index of the band whose block size is used (count starts at one).
+            overlap: Number of pixels each read window extends past its window on each side.
+            max_memory: Maximum number of bytes to read for each window (excluding the overlap). If None, the natural
+                block size is used.
+
+        Yields:
+            BlockWindow for each window.
+
+        """
+        window_x_size, window_y_size = self.get_window_size(band_index, max_memory)
+
+        yield from generate_windows(self.ds.RasterXSize, self.ds.RasterYSize, window_x_size, window_y_size, overlap)
+
+    def allocate_window_buffer(
+        self, band_index: int = 1, overlap: int = 0, max_memory: int | None = DEFAULT_MAX_WINDOW_MEMORY
+    ) -> np.ndarray:
+        """Allocate an array large enough to read any of the windows from iter_windows into.
+
+        Args:
+            band_index: Index of the band (count starts at one).
+            overlap: Number of pixels each read window extends past its window on each side.
+            max_memory: Maximum number of bytes to read for each window (excluding the overlap).
+
+        Returns:
+            Uninitialised, cache line aligned array with the same data type as the band.
+
+        """
+        window_x_size, window_y_size = self.get_window_size(band_index, max_memory)
+        shape = (
+            min(window_y_size + 2 * overlap, self.ds.RasterYSize),
+            min(window_x_size + 2 * overlap, self.ds.RasterXSize),
+        )
+
+        return allocate_aligned_array(shape, self.get_band_dtype(band_index))
+
+    def read_window(self, window: Window, band_index: int = 1, buffer: np.ndarray | None = None) -> np.ndarray:
+        """Read the data for a window of a raster band.
+
+        Args:
+            window: The window to read.
+            band_index: Index of the band to read (count starts at one).
+            buffer: Optional array to read the data into, to avoid allocating a new array. It must be at least as large
+                as the window, and the data is read into its upper left hand corner.
+
+        Returns:
+            Array containing the data. When a buffer is provided, this is a view onto the buffer.
+
+        Raises:
+            ValueError: The buffer is too small for the window.
+
+        """
+        band = self.get_band(band_index)
+
+        if buffer is None:
+            return band.ReadAsArray(window.x_off, window.y_off, window.x_size, window.y_size)
+
+        if buffer.shape[0] < window.y_size or buffer.shape[1] < window.x_size:
+            raise ValueError(f"The buffer of shape {buffer.shape} is too small for the window {window}.")
+
+        view = buffer[: window.y_size, : window.x_size]
+        band.ReadAsArray(window.x_off, window.y_off, window.x_size, window.y_size, buf_obj=view)
+
+        return view
+
+    def read_blocks(
+        self,
+        band_index: int = 1,
+        overlap: int = 0,
+        max_memory: int | None = DEFAULT_MAX_WINDOW_MEMORY,
+        buffer: np.ndarray | None = None,
+    ) -> Iterator[tuple[BlockWindow, np.ndarray]]:
+        """Read a raster band window by window, so only one window is held in memory at once.
+
+        Args:
+            band_index: Index of the band to read (count starts at one).
+            overlap: Number of pixels each read window extends past its window on each side. Use
+                BlockWindow.core_slices to strip the overlap back off the array.
+            max_memory: Maximum number of bytes to read for each window (excluding the overlap). If None, the natural
+                block size is used.
+            buffer: Optional array to read each window into (see allocate_window_buffer). The yielded arrays are then
+                views onto the buffer, which are overwritten by the next window.
+
+        Yields:
+            The BlockWindow and the array of data read for its read window.
+
+        """
+        for block_window in self.iter_windows(band_index, overlap, max_memory):
+            yield block_window, self.read_window(block_window.read_window, band_index, buffer)
+
+    def read_bands(
+        self,
+        window: Window | None = None,
+        band_indexes: list[int] | None = None,
+        buffer: np.ndarray | None = None,
+    ) -> np.ndarray:
+        """Read a window of several bands with a single call, straight into a (bands, rows, columns) array.
+
+        Args:
+            window: The window to read. Defaults to the whole raster.
+            band_indexes: Indexes of the bands to read (count starts at one). Defaults to every band.
+            buffer: Optional array to read the data into, to avoid allocating a new one, e.g. a memory mapped array or
+                a slice of a larger array. It must have the shape (bands, rows, columns) of the window and the data type
+                of the bands, but needn't be contiguous. Defaults to a new cache line aligned array.
+
+        Returns:
+            Array containing the data. When a buffer is provided, this is the buffer.
+
+        Raises:
+            ValueError: The bands have different data types.
+            ValueError: The buffer doesn't match the shape or data type of the window.
+
+        """
+        window = window or Window(0, 0, *self.size)
+        band_indexes = band_indexes or list(range(1, self.band_count + 1))
+        dtypes = {self.get_band_dtype(band_index) for band_index in band_indexes}
+        if len(dtypes) != 1:
+            raise ValueError(f"The bands {band_indexes} have different data types, so can't be read into one array.")
+
+        (dtype,) = dtypes
+        shape = (len(band_indexes), window.y_size, window.x_size)
+        if buffer is None:
+            buffer = allocate_aligned_array(shape, dtype)
+        elif buffer.shape != shape or buffer.dtype != dtype:
+            raise ValueError(
+                f"The buffer of shape {buffer.shape} and type {buffer.dtype} doesn't match {shape} {dtype}."
+            )
+
+        # A single band is read into a 2D array
+        self.ds.ReadAsArray(
+            window.x_off,
+            window.y_off,
+            window.x_size,
+            window.y_size,
+            buf_obj=buffer if len(band_indexes) > 1 else buffer[0],
+            band_list=band_indexes,
+        )
+
+        return buffer
+
+    def export_npy(
+        self,
+        output_path: str | Path,
+        band_indexes: list[int] | None = None,
+        max_memory: int | None = DEFAULT_MAX_WINDOW_MEMORY,
+    ) -> np.memmap:
+        """Export bands of the raster to a memory mapped .npy file, of shape (bands, rows, columns).
+
+        The raster is read window by window straight into the memory mapped file, so the raster is never held in
+        memory in full and no intermediate arrays are allocated. The file can be opened again with numpy.load, using
+        mmap_mode to avoid reading it into memory.
+
+        Args:
+            output_path: Path to save the .npy file to.
+            band_indexes: Indexes of the bands to export (count starts at one). Defaults to every band.
+            max_memory: Maximum number of bytes to read for each window, across all of the bands. If None, the natural
+                block size is used.
+
+        Returns:
+            The memory mapped array.
+
+        Raises:
+            ValueError: The bands have different data types.
+
+        """
+        band_indexes = band_indexes or list(range(1, self.band_count + 1))
+        dtypes = {self.get_band_dtype(band_index) for band_index in band_indexes}
+        if len(dtypes) != 1:
+            raise ValueError(f"The bands {band_indexes} have different data types, so can't be read into one array.")
+
+        x_size, y_size = self.size
+        array = np.lib.format.open_memmap(
+            output_path, mode="w+", dtype=dtypes.pop(), shape=(len(band_indexes), y_size, x_size)
+        )
+
+        band_memory = max_memory // len(band_indexes) if max_memory is not None else None
+        for block_window in self.iter_windows(band_indexes[0], max_memory=band_memory):
+            window = block_window.window
+            self.read_bands(window, band_indexes, buffer=array[(slice(None), *window.slices)])
+
+        array.flush()
+        return array
+
+    def get_statistics(
+        self,
+        band_index: int = 1,
+        approximate: bool = False,
+        force: bool = False,
+        max_memory: int | None = DEFAULT_MAX_WINDOW_MEMORY,
+    ) -> BandStatistics:
+        """Get the minimum, maximum, mean and standard deviation of the valid (non nodata) pixels of a band.
+
+        Exact statistics are calculated in a single pass over the block windows of the band, merging the statistics of
+        each window as it's read, so only one window is held in memory at once. Approximate statistics are calculated
+        from a sample of the band no larger than DEFAULT_APPROXIMATE_SIZE, which GDAL reads from the overviews (or by
+        subsampling if there are none), so they cost a fraction of a full read.
+
+        The statistics are cached in the band metadata, which GDAL saves to the PAM .aux.xml alongside the raster, so
+        later calls (in this or another process) are free.
+
+        Args:
+            band_index: Index of the band (count starts at one).
+            approximate: Whether approximate statistics are acceptable. Cached exact statistics are always used.
+                Defaults to False.
+            force: Whether to recalculate the statistics, even if they are cached. Defaults to False.
+            max_memory: Maximum number of bytes to read for each window of exact statistics.
+
+        Returns:
+            The statistics of the band. If no pixels are valid, the statistics are NaN (and aren't cached).
+
+        """
+        band = self.get_band(band_index)
+        if not force:
+            statistics = read_cached_statistics(band, approximate)
+            if statistics is not None:
+                return statistics
+
+        nodata = band.GetNoDataValue()
+        if approximate:
+            arr = self._read_approximate(band_index)
+            statistics = moments_to_statistics(
+                compute_moments(get_valid_values(arr, nodata)), arr.size, approximate=True
+            )
+        else:
+            moments = Moments()
+            buffer = self.allocate_window_buffer(band_index, max_memory=max_memory)
+            for _, arr in self.read_blocks(band_index, max_memory=max_memory, buffer=buffer):
+                moments = merge_moments(moments, compute_moments(get_valid_values(arr, nodata)))
+
+            statistics = moments_to_statistics(moments, self.ds.RasterXSize * self.ds.RasterYSize)
+
+        write_cached_statistics(band, statistics)
+        self.ds.FlushCache()
+
+        return statistics
+
+    def get_histogram(
+        self,
+        band_index: int = 1,
+        bins: int = DEFAULT_HISTOGRAM_BINS,
+        value_range: tuple[float, float] | None = None,
+        approximate: bool = False,
+        force: bool = False,
+        max_memory: int | None = DEFAULT_MAX_WINDOW_MEMORY,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Get a histogram of the valid (non nodata) pixels of a band, e.g. to stretch a colour ramp.
+
+        Exact histograms are calculated in a single pass over the block windows of the band, and cached as the default
+        histogram of the band in the PAM .aux.xml. Approximate histograms are calculated from the same sample as
+        approximate statistics, and aren't cached.
+
+        Args:
+            band_index: Index of the band (count starts at one).
+            bins: Number of equal width bins. Defaults to DEFAULT_HISTOGRAM_BINS.
+            value_range: The lower and upper edge of the bins. Values outside of the range are ignored. Defaults to the
+                minimum and maximum of the band, from get_statistics. A range of a single value (e.g. of a constant
+                band) is widened by 0.5 either side, as np.histogram does.
+            approximate: Whether an approximate histogram is acceptable. Defaults to False.
+            force: Whether to recalculate the histogram, even if it's cached. Defaults to False.
+            max_memory: Maximum number of bytes to read for each window of an exact histogram.
+
+        Returns:
+            The counts and bin edges, in the same format as np.histogram.
+
+        Raises:
+            ValueError: No pixels of the band are valid, so there's no range to bin them over.
+
+        """
+        band = self.get_band(band_index)
+        if value_range is None:
+            statistics = self.get_statistics(band_index, approximate, max_memory=max_memory)
+            if not statistics.valid_percent:
+                raise ValueError(f"Band {band_index} has no valid pixels to calculate a histogram of.")
+            value_range = (statistics.minimum, statistics.maximum)
+
+        # Widen a range of a single value before counting, so the bin edges (and cached histogram) match the counts
+        if value_range[0] == value_range[1]:
+            value_range = (value_range[0] - 0.5, value_range[1] + 0.5)
+
+        if not force and not approximate:
+            histogram = read_cached_histogram(band, bins, value_range)
+            if histogram is not None:
+                return histogram
+
+        nodata = band.GetNoDataValue()
+        if approximate:
+            return np.histogram(get_valid_values(self._read_approximate(band_index), nodata), bins, value_range)
+
+        counts = np.zeros(bins, dtype=np.int64)
+        buffer = self.allocate_window_buffer(band_index, max_memory=max_memory)
+        for _, arr in self.read_blocks(band_index, max_memory=max_memory, buffer=buffer):
+            counts += np.histogram(get_valid_values(arr, nodata), bins, value_range)[0]
+
+        bin_edges = np.linspace(value_range[0], value_range[1], bins + 1)
+        write_cached_histogram(band, counts, bin_edges)
+        self.ds.FlushCache()
+
+        return counts, bin_edges
+
+    def _read_approximate(self, band_index: int) -> np.ndarray:
+        """Read a band shrunk to fit within DEFAULT_APPROXIMATE_SIZE, which GDAL reads from the best overview."""
+        buf_x_size, buf_y_size = get_approximate_buffer_size(self.ds.RasterXSize, self.ds.RasterYSize)
+        return self.get_band(band_index).ReadAsArray(buf_xsize=buf_x_size, buf_ysize=buf_y_size)
+
+    def build_overviews(
+        self,
+        levels: Sequence[int] | None = None,
+        resampling: str | Sequence[str] = DEFAULT_OVERVIEW_RESAMPLING,
+        external: bool = False,
+        min_size: int = DEFAULT_MIN_OVERVIEW_SIZE,
+        num_threads: int | str = DEFAULT_OVERVIEW_THREADS,
+        compression: str | None = None,
+    ) -> list[int]:
+        """Build the overviews (pyramid) of the raster, so zoomed out reads don't have to read every pixel.
+
+        Args:
+            levels: The overview decimation factors. Defaults to halving the raster until it fits within min_size.
+            resampling: Resampling algorithm for every band, or a sequence with the algorithm for each band. Defaults
+                to DEFAULT_OVERVIEW_RESAMPLING.
+            external: Whether to store the overviews in a separate .ovr file, leaving the raster untouched, rather than
+                within the raster. In-memory rasters always store them internally. Defaults to False.
+            min_size: Size (in pixels) the smallest overview must fit within, when choosing the levels. Defaults to
+                DEFAULT_MIN_OVERVIEW_SIZE.
+            num_threads: Number of threads used to compute the overviews, or ALL_CPUS. Defaults to
+                DEFAULT_OVERVIEW_THREADS.
+            compression: Compression codec for external overviews. Defaults to the GDAL default.
+
+        Returns:
+            The decimation factors of the overviews built.
+
+        Raises:
+            IOError: The raster couldn't be reopened to write the overviews.
+            ValueError: The overviews couldn't be built.
+
+        """
+        if levels is None:
+            levels = get_overview_levels(*self.size, min_size)
+
+        if self.ds.GetDriver().ShortName == MEM_DRIVER:
+            build_overviews(self.ds, levels, resampling, num_threads, compression)
+            return list(levels)
+
+        file_path = self.ds.GetDescription()
+        try:
+            ds = self._reopen(update=not external)
+            build_overviews(ds, levels, resampling, num_threads, compression)
+            del ds
+        finally:
+            # Reopen the raster so the new overviews are picked up
+            self.open_dataset(file_path)
+
+        return list(levels)
+
+    def refresh_overviews(
+        self, window: Window, resampling: str | Sequence[str] = DEFAULT_OVERVIEW_RESAMPLING
+    ) -> list[list[Window]]:
+        """Recompute only the parts of the existing overviews covering a changed window of the raster.
+
+        Args:
+            window: The window of full resolution pixels which changed.
+            resampling: Resampling algorithm for every band, or a sequence with the algorithm for each band. It should
+                match the resampling the overviews were built with. Defaults to DEFAULT_OVERVIEW_RESAMPLING.
+
+        Returns:
+            The overview window which was recomputed for each overview, per band.
+
+        Raises:
+            IOError: The raster (or its external overviews) couldn't be reopened to write the overviews.
+
+        """
+        if self.ds.GetDriver().ShortName == MEM_DRIVER:
+            return refresh_overviews(self.ds, window, resampling)
+
+        file_path = self.ds.GetDescription()
+        overview_path = Path(f"{file_path}{EXTERNAL_OVERVIEW_SUFFIX}")
+        try:
+            if overview_path.exists():
+                ds = self._reopen(update=False)
+                overview_ds = gdal.OpenEx(str(overview_path), gdal.OF_RASTER | gdal.OF_UPDATE)
+                if overview_ds is None:
+                    raise IOError(f"The overviews; {overview_path} could not be opened for update")
+            else:
+                ds = self._reopen(update=True)
+                overview_ds = None
+
+            refreshed = refresh_overviews(ds, window, resampling, overview_ds)
+            del ds, overview_ds
+        finally:
+            self.open_dataset(file_path)
+
+        return refreshed
+
+    def _reopen(self, update: bool) -> gdal.Dataset:
+        """Open a second handle to the raster file, for update or read only."""
+        file_path = self.ds.GetDescription()
+        ds = gdal.OpenEx(file_path, gdal.OF_RASTER | (gdal.OF_UPDATE if update else gdal.OF_READONLY))
+        if ds is None:
+            raise IOError(f"The dataset; {file_path} could not be opened{' for update' if update else ''}")
+
+        return ds
+
+    @cached_property
+    def inverse_geotransform(self) -> GeoTransform:
+        """The inverse of the geotransform, converting native srs coordinates to pixel coordinates.
+
+        Raises:
+            ValueError: The geotransform can't be inverted.
+
+        """
+        ul_x, x_res, x_rot, ul_y, y_rot, y_res = self.geotransform
+        determinant = x_res * y_res - x_rot * y_rot
+        if determinant == 0:
+            raise ValueError(f"The geotransform {self.geotransform} can't be inverted.")
+
+        return GeoTransform(
+            ul_x=(x_rot * ul_y - y_res * ul_x) / determinant,
+            x_res=y_res / determinant,
+            x_rot=-x_rot / determinant,
+            ul_y=(y_rot * ul_x - x_res * ul_y) / determinant,
+            y_rot=-y_rot / determinant,
+            y_res=x_res / determinant,
+        )
+
     def convert_pixel_coord_to_native_srs(self, pixel_x: int, pixel_y: int) -> Point:
         """Converts a pixel coordinate to its corresponding native srs x/y coordinate of the upper left hand corner.
 
@@ -84,11 +664,53 @@ class RasterDataset:
             Pixel coordinates rounded to the nearest integer.
 
         """
-        x_pixel = (
-            x_coord
-            - self.geotransform.ul_x
-            - self.geotransform.x_rot / self.geotransform.y_res * (y_coord - self.geotransform.ul_y)
-        ) / (self.geotransform.x_res - self.geotransform.x_rot * self.geotransform.y_rot / self.geotransform.y_res)
+        inverse = self.inverse_geotransform
+        x_pixel = inverse.ul_x + x_coord * inverse.x_res + y_coord * inverse.x_rot
+        y_pixel = inverse.ul_y + x_coord * inverse.y_rot + y_coord * inverse.y_res
 
-        y_pixel = (y_coord - self.geotransform.ul_y - x_coord * self.geotransform.y_rot) / self.geotransform.y_res
         return int(round(x_pixel, 0)), int(round(y_pixel, 0))
+
+    def convert_pixel_coords_to_native_srs(
+        self, pixel_x: ArrayLike, pixel_y: ArrayLike
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Vectorised version of convert_pixel_coord_to_native_srs, converting arrays of pixel coordinates at once.
+
+        Args:
+            pixel_x: Array of pixel x coordinates.
+            pixel_y: Array of pixel y coordinates, the same shape as pixel_x.
+
+        Returns:
+            Arrays of the native srs x and y coordinates of the upper left hand corner of each pixel.
+
+        """
+        return _apply_geotransform(self.geotransform, pixel_x, pixel_y)
+
+    def convert_native_srs_to_pixel_coords(
+        self, x_coords: ArrayLike, y_coords: ArrayLike
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Vectorised version of convert_native_srs_to_pixel_coord, converting arrays of coordinates at once.
+
+        Args:
+            x_coords: Array of x coordinates in the native srs for the raster.
+            y_coords: Array of y coordinates in the native srs for the raster, the same shape as x_coords.
+
+        Returns:
+            Arrays of the pixel x and y coordinates, rounded to the nearest integer.
+
+        """
+        x_pixels, y_pixels = _apply_geotransform(self.inverse_geotransform, x_coords, y_coords)
+
+        return np.rint(x_pixels).astype(np.int64), np.rint(y_pixels).astype(np.int64)
+
+
+def _apply_geotransform(
+    geotransform: GeoTransform, x_values: ArrayLike, y_values: ArrayLike
+) -> tuple[np.ndarray, np.ndarray]:
+    """Apply an affine geotransform to arrays of x/y values."""
+    x_values = np.asarray(x_values, dtype=np.float64)
+    y_values = np.asarray(y_values, dtype=np.float64)
+
+    x_out = geotransform.ul_x + x_values * geotransform.x_res + y_values * geotransform.x_rot
+    y_out = geotransform.ul_y + x_values * geotransform.y_rot + y_values * geotransform.y_res
+
+    return x_out, y_out
@@ -1,21 +1,266 @@
 from pathlib import Path
+from typing import NamedTuple
 
-from osgeo import gdal, osr
+from osgeo import gdal
+
+from geospatial_utils.raster.constants import COG_DRIVER, GTIFF_DRIVER, VRT_DRIVER
+from geospatial_utils.srs.cache import get_srs
+
+DEFAULT_COMPRESSION = "DEFLATE"
+DEFAULT_GTIFF_DEFLATE_LEVEL = 9
+
+# Name of the creation option used to set the compression level for each codec, per output driver
+COMPRESSION_LEVEL_OPTIONS = {
+    GTIFF_DRIVER: {
+        "DEFLATE": "ZLEVEL",
+        "ZSTD": "ZSTD_LEVEL",
+        "LERC": "MAX_Z_ERROR",
+        "LERC_DEFLATE": "MAX_Z_ERROR",
+        "LERC_ZSTD": "MAX_Z_ERROR",
+    },
+    COG_DRIVER: {
+        "DEFLATE": "LEVEL",
+        "ZSTD": "LEVEL",
+        "LERC": "MAX_Z_ERROR",
+        "LERC_DEFLATE": "MAX_Z_ERROR",
+        "LERC_ZSTD": "MAX_Z_ERROR",
+    },
+}
+
+# Codecs which benefit from a horizontal differencing predictor
+PREDICTOR_CODECS = ("DEFLATE", "ZSTD", "LZW")
+
+
+class WarpProfile(NamedTuple):
+    """The performance settings used to warp and write a raster. Settings left as None use the GDAL default.
+
+    Attributes:
+        warp_threads: Number of threads used to warp each chunk, or ALL_CPUS.
+        io_threads: Number of threads used to decode and compress blocks (GDAL_NUM_THREADS), or ALL_CPUS.
+        warp_memory_limit: Memory (in MB) the warper may use for each chunk it processes.
+        cache_max: Size (in MB) of the GDAL block cache (GDAL_CACHEMAX).
+        block_size: Width and height (in pixels) of the output tiles.
+        resampling: Resampling algorithm, e.g. near, bilinear, cubic or lanczos.
+        error_threshold: Maximum error (in pixels) of the approximate transformer. 0 transforms every pixel exactly.
+        compression: Compression codec for the output, e.g. DEFLATE, ZSTD or LERC.
+        compression_level: Compression level (or maximum error for LERC). See get_creation_options.
+        overview_resampling: Resampling algorithm used to compute the overviews of COG outputs, e.g. AVERAGE.
+
+    """
+
+    warp_threads: int | str | None = None
+    io_threads: int | str | None = None
+    warp_memory_limit: int | None = None
+    cache_max: int | None = None
+    block_size: int | None = None
+    resampling: str = "near"
+    error_threshold: float | None = None
+    compression: str = DEFAULT_COMPRESSION
+    compression_level: int | float | None = None
+    overview_resampling: str | None = None
+
+
+DEFAULT_PROFILE = WarpProfile()
+
+# Named profiles, trading the time taken against the size of the output. They all keep nearest neighbour resampling,
+# as the right algorithm depends on the data (e.g. categorical or colourised rasters) rather than on performance
+WARP_PROFILES = {
+    "fast": WarpProfile(
+        warp_threads="ALL_CPUS",
+        io_threads="ALL_CPUS",
+        warp_memory_limit=1024,
+        block_size=512,
+        error_threshold=0.5,
+        compression="ZSTD",
+        compression_level=1,
+    ),
+    "balanced": WarpProfile(
+        warp_threads="ALL_CPUS",
+        io_threads="ALL_CPUS",
+        warp_memory_limit=512,
+        block_size=512,
+        error_threshold=0.125,
+        compression="DEFLATE",
+        compression_level=6,
+    ),
+    "archive": WarpProfile(
+        warp_threads="ALL_CPUS",
+        io_threads="ALL_CPUS",
+        warp_memory_limit=512,
+        block_size=256,
+        error_threshold=0,
+        compression="ZSTD",
+        compression_level=19,
+    ),
+}
+
+
+def get_warp_profile(profile: WarpProfile | str | None = None, **overrides: int | float | str | None) -> WarpProfile:
+    """Get a warp profile, optionally overriding some of its settings.
+
+    Args:
+        profile: The profile, or the name of one of the WARP_PROFILES. Defaults to DEFAULT_PROFILE.
+        **overrides: Settings of the WarpProfile to override. Overrides which are None are ignored. Overriding the
+            compression codec resets the compression level, unless that's overridden too.
+
+    Returns:
+        The WarpProfile.
+
+    Raises:
+        ValueError: The profile name isn't one of the WARP_PROFILES.
+
+    """
+    if profile is None:
+        profile = DEFAULT_PROFILE
+    elif isinstance(profile, str):
+        if profile not in WARP_PROFILES:
+            raise ValueError(f"{profile} is not a warp profile. Choose from {', '.join(WARP_PROFILES)}.")
+
+        profile = WARP_PROFILES[profile]
+
+    overrides = {name: value for name, value in overrides.items() if value is not None}
+
+    # The level of one codec doesn't carry over to another, e.g. a ZSTD level would be a very lossy LERC error
+    if overrides.get("compression", profile.compression).upper() != profile.compression.upper():
+        overrides.setdefault("compression_level", None)
+
+    return profile._replace(**overrides)
+
+
+def get_warp_kwargs(profile: WarpProfile) -> dict[str, bool | int | float | str | list[str]]:
+    """Construct the keyword arguments of gdal.WarpOptions for a warp profile."""
+    warp_kwargs = {"resampleAlg": profile.resampling}
+
+    if profile.warp_threads is not None:
+        warp_kwargs["multithread"] = True
+        warp_kwargs["warpOptions"] = [f"NUM_THREADS={profile.warp_threads}"]
+
+    if profile.warp_memory_limit is not None:
+        warp_kwargs["warpMemoryLimit"] = profile.warp_memory_limit
+
+    if profile.error_threshold is not None:
+        warp_kwargs["errorThreshold"] = profile.error_threshold
+
+    return warp_kwargs
+
+
+def get_config_options(profile: WarpProfile) -> dict[str, str]:
+    """Construct the GDAL configuration options for a warp profile, for use with gdal.config_options."""
+    config_options = {}
+
+    if profile.io_threads is not None:
+        config_options["GDAL_NUM_THREADS"] = str(profile.io_threads)
+
+    if profile.cache_max is not None:
+        config_options["GDAL_CACHEMAX"] = str(profile.cache_max)
+
+    return config_options
+
+
+def get_profile_creation_options(output_format: str, profile: WarpProfile) -> list[str]:
+    """Construct the creation options for a warp profile, including its block size and (for COGs) overview resampling.
+
+    See get_creation_options.
+    """
+    creation_options = get_creation_options(output_format, profile.compression, profile.compression_level)
+
+    if profile.block_size is not None:
+        if output_format == COG_DRIVER:
+            creation_options.append(f"BLOCKSIZE={profile.block_size}")
+        else:
+            creation_options.extend([f"BLOCKXSIZE={profile.block_size}", f"BLOCKYSIZE={profile.block_size}"])
+
+    if profile.overview_resampling is not None and output_format == COG_DRIVER:
+        creation_options.append(f"OVERVIEW_RESAMPLING={profile.overview_resampling.upper()}")
+
+    return creation_options
+
+
+def get_creation_options(
+    output_format: str = GTIFF_DRIVER,
+    compression: str = DEFAULT_COMPRESSION,
+    compression_level: int | float | None = None,
+) -> list[str]:
+    """Construct the creation options for a tiled and compressed GeoTIFF or COG.
+
+    Args:
+        output_format: Driver used to write the raster, either GTIFF_DRIVER or COG_DRIVER. Defaults to GTIFF_DRIVER.
+        compression: Compression codec to use, e.g. DEFLATE, ZSTD, LZW, LERC or NONE. Defaults to DEFLATE.
+        compression_level: The compression level for DEFLATE (1-12) or ZSTD (1-22), or the maximum error for the LERC
+            codecs. If not provided the driver default is used, apart from DEFLATE compressed GeoTIFFs, which default to
+            DEFAULT_GTIFF_DEFLATE_LEVEL.
+
+    Returns:
+        List of creation options.
+
+    Raises:
+        ValueError: The output format isn't supported.
+        ValueError: A compression level is provided for a codec that doesn't support one.
+
+    """
+    if output_format not in COMPRESSION_LEVEL_OPTIONS:
+        raise ValueError(f"{output_format} is not a supported output format.")
+
+    compression = compression.upper()
+
+    if output_format == GTIFF_DRIVER:
+        creation_options = ["TILED=YES", f"COMPRESS={compression}"]
+        if compression in PREDICTOR_CODECS:
+            creation_options.append("PREDICTOR=2")
+
+        if compression == "DEFLATE" and compression_level is None:
+            compression_level = DEFAULT_GTIFF_DEFLATE_LEVEL
+    else:
+        creation_options = [f"COMPRESS={compression}", "OVERVIEWS=AUTO", "BIGTIFF=IF_SAFER"]
+        if compression in PREDICTOR_CODECS:
+            creation_options.append("PREDICTOR=YES")
+
+    if compression_level is not None:
+        level_option = COMPRESSION_LEVEL_OPTIONS[output_format].get(compression)
+        if level_option is None:
+            raise ValueError(f"A compression level can't be set for {compression} compression.")
+
+        if level_option != "MAX_Z_ERROR":
+            compression_level = int(compression_level)
+
+        creation_options.append(f"{level_option}={compression_level}")
+
+    return creation_options
 
 
 def reproject_raster(
-    input_path: str | Path, output_path: str | Path, output_epsg_code: int, input_epsg_code: int = None
+    input_path: str | Path,
+    output_path: str | Path,
+    output_epsg_code: int,
+    input_epsg_code: int = None,
+    output_format: str = GTIFF_DRIVER,
+    compression: str | None = None,
+    compression_level: int | float | None = None,
+    profile: WarpProfile | str | None = None,
 ) -> None:
     """
     Reproject a raster to the provided output EPSG Code
 
+    When the output format is COG_DRIVER, the raster is warped into an in-memory VRT which is then written straight
+    into a Cloud Optimized GeoTIFF (including its overviews), so the output is only written and compressed once.
+
+    The threads, memory, block size, resampling, accuracy and compression of the warp are set by a WarpProfile, either
+    one of the named WARP_PROFILES (fast, balanced or archive) or a custom one.
+
     Args:
         input_path: Path to the raster to be reprojected
         output_path: Path to save the reprojected raster to
-        epsg_code: EPSG code representing the output spatial reference to project the raster to,
+        output_epsg_code: EPSG code representing the output spatial reference to project the raster to,
+        input_epsg_code: EPSG code of the input raster, only used when the input raster has no spatial reference.
+        output_format: Driver used to write the output, either GTIFF_DRIVER or COG_DRIVER. Defaults to GTIFF_DRIVER.
+        compression: Compression codec for the output, e.g. DEFLATE, ZSTD or LERC. Defaults to that of the profile.
+        compression_level: Compression level (or maximum error for LERC) for the output. Defaults to that of the
+            profile. See get_creation_options.
+        profile: The WarpProfile, or the name of one of the WARP_PROFILES. Defaults to DEFAULT_PROFILE, which uses the
+            GDAL defaults.
 
     """
-    input_ds = gdal.Open(input_path)
+    input_ds = gdal.Open(str(input_path))
     if input_ds is None:
         raise ValueError(f"Could not find {input_ds}. Please check it exists.")
 
@@ -25,18 +270,39 @@ def reproject_raster(
         if input_epsg_code is None:
             raise ValueError("Please provide an input epsg code for the input raster.")
 
-        # Construct the input spatial reference usign the input_epsg_code parameter
-        input_srs = osr.SpatialReference()
-        input_srs.ImportFromEPSG(input_epsg_code)
+        # Get the input spatial reference using the input_epsg_code parameter
+        input_srs = get_srs(epsg_code=input_epsg_code)
 
-    output_srs = osr.SpatialReference()
-    output_srs.ImportFromEPSG(output_epsg_code)
+    output_srs = get_srs(epsg_code=output_epsg_code)
 
     if input_srs.IsSame(output_srs):
         raise ValueError(f"The raster is already projected to EPSG: {output_epsg_code}")
 
-    creation_options = ["TILED=YES", "COMPRESS=DEFLATE", "PREDICTOR=2", "ZLEVEL=9"]
+    profile = get_warp_profile(profile, compression=compression, compression_level=compression_level)
+    creation_options = get_profile_creation_options(output_format, profile)
+    warp_kwargs = get_warp_kwargs(profile)
+
+    with gdal.config_options(get_config_options(profile)):
+        if output_format == COG_DRIVER:
+            # The COG driver can't be written to directly by gdal.Warp, so warp into a virtual dataset which is only
+            # evaluated as the COG driver reads from it
+            warp_options = gdal.WarpOptions(dstSRS=output_srs, srcSRS=input_srs, format=VRT_DRIVER, **warp_kwargs)
+            warped_ds = gdal.Warp("", input_ds, options=warp_options)
+
+            translate_options = gdal.TranslateOptions(format=COG_DRIVER, creationOptions=creation_options)
+            output_ds = gdal.Translate(str(output_path), warped_ds, options=translate_options)
+            if output_ds is None:
+                raise ValueError(f"Could not write the reprojected raster to {output_path}.")
+
+            # Ensure the output dataset is properly closed by deleting it
+            del output_ds, warped_ds
+            return
+
+        warp_options = gdal.WarpOptions(
+            dstSRS=output_srs, srcSRS=input_srs, creationOptions=creation_options, **warp_kwargs
+        )
 
-    warp_options = gdal.WarpOptions(dstSRS=output_srs, srcSRS=input_srs, creationOptions=creation_options)
+        output_ds = gdal.Warp(str(output_path), input_ds, options=warp_options)
 
-    gdal.Warp(str(output_path), input_ds, options=warp_options)
+        # Ensure the output dataset is closed (and flushed) within the configuration options it was written with
+        del output_ds
@@ -0,0 +1,230 @@
+import numpy as np
+from numpy.typing import ArrayLike
+from osgeo import osr
+
+from geospatial_utils.raster.raster_dataset import RasterDataset
+from geospatial_utils.raster.windows import Window
+from geospatial_utils.srs.cache import LRUCache, get_coordinate_transformation, get_srs
+from geospatial_utils.vector.arrow import get_point_coords
+from geospatial_utils.vector.vector_dataset import FID_COLUMN, GEOMETRY_COLUMN, VectorDataset
+
+NEAREST = "nearest"
+BILINEAR = "bilinear"
+INTERPOLATIONS = (NEAREST, BILINEAR)
+
+# Number of blocks (of every sampled band) held in the block cache of each sampler
+DEFAULT_BLOCK_CACHE_SIZE = 256
+
+
+class PointSampler:
+    """Samples the values of raster bands at points, reading each block the points fall in only once.
+
+    The points are sorted by the block they fall in, so each block is read (with every band at once) and all of its
+    points looked up with a single fancy index, rather than reading a pixel per point. Blocks are kept in an LRU cache
+    between calls, so sampling many batches of nearby points doesn't read the same blocks again.
+
+    Args:
+        raster_ds: The raster to sample.
+        band_indexes: Indexes of the bands to sample (count starts at one), which must share a data type. Defaults to
+            every band.
+        cache_size: Maximum number of blocks to cache. Defaults to DEFAULT_BLOCK_CACHE_SIZE.
+
+    """
+
+    def __init__(
+        self,
+        raster_ds: RasterDataset,
+        band_indexes: list[int] | None = None,
+        cache_size: int = DEFAULT_BLOCK_CACHE_SIZE,
+    ):
+        self.raster_ds = raster_ds
+        self.band_indexes = band_indexes or list(range(1, raster_ds.band_count + 1))
+        self.nodata_values = [raster_ds.nodata_values[band_index - 1] for band_index in self.band_indexes]
+        self.block_size = raster_ds.get_band(self.band_indexes[0]).GetBlockSize()
+        self._cache = LRUCache(cache_size)
+
+    def sample(
+        self,
+        x_coords: ArrayLike,
+        y_coords: ArrayLike,
+        srs: osr.SpatialReference | int | str | None = None,
+        interpolation: str = NEAREST,
+    ) -> np.ma.MaskedArray:
+        """Sample the bands at arrays of points.
+
+        Args:
+            x_coords: Array of the x coordinates of the points.
+            y_coords: Array of the y coordinates of the points, the same shape as x_coords.
+            srs: The spatial reference of the points, as an osr.SpatialReference, EPSG code or WKT string. The points
+                are reprojected into the raster srs in bulk. EPSG codes and WKT use the x/y (e.g. longitude/latitude)
+                axis order. Defaults to the raster srs.
+            interpolation: Either NEAREST, the value of the pixel each point falls in, or BILINEAR, interpolated from
+                the four nearest pixel centres (ignoring any which are nodata). Defaults to NEAREST.
+
+        Returns:
+            Masked array of shape (points, bands). Points outside of the raster, or on nodata, are masked. Nearest
+            values have the data type of the bands, and bilinear values are float64.
+
+        Raises:
+            ValueError: The interpolation isn't one of the INTERPOLATIONS.
+
+        """
+        if interpolation not in INTERPOLATIONS:
+            raise ValueError(f"{interpolation} is not a valid interpolation, it should be one of {INTERPOLATIONS}.")
+
+        x_coords = np.asarray(x_coords, dtype=np.float64).ravel()
+        y_coords = np.asarray(y_coords, dtype=np.float64).ravel()
+        if srs is not None:
+            x_coords, y_coords = self._to_raster_srs(x_coords, y_coords, srs)
+
+        # Fractional pixel coordinates, with (0, 0) the upper left hand corner of the raster
+        inverse = self.raster_ds.inverse_geotransform
+        pixel_x = inverse.ul_x + x_coords * inverse.x_res + y_coords * inverse.x_rot
+        pixel_y = inverse.ul_y + x_coords * inverse.y_rot + y_coords * inverse.y_res
+
+        if interpolation == NEAREST:
+            return self._lookup(np.floor(pixel_x), np.floor(pixel_y))
+
+        # The four pixel centres surrounding each point, and the weight of each
+        left = np.floor(pixel_x - 0.5)
+        top = np.floor(pixel_y - 0.5)
+        x_fraction = pixel_x - 0.5 - left
+        y_fraction = pixel_y - 0.5 - top
+
+        total = np.zeros((len(pixel_x), len(self.band_indexes)))
+        total_weight = np.zeros_like(total)
+        for x_offset, y_offset, weight in (
+            (0, 0, (1 - x_fraction) * (1 - y_fraction)),
+            (1, 0, x_fraction * (1 - y_fraction)),
+            (0, 1, (1 - x_fraction) * y_fraction),
+            (1, 1, x_fraction * y_fraction),
+        ):
+            values = self._lookup(left + x_offset, top + y_offset)
+            weights = np.where(np.ma.getmaskarray(values), 0.0, weight[:, np.newaxis])
+            total += weights * values.filled(0).astype(np.float64)
+            total_weight += weights
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.ma.masked_array(total / total_weight, mask=total_weight == 0)
+
+    def _lookup(self, pixel_x: np.ndarray, pixel_y: np.ndarray) -> np.ma.MaskedArray:
+        """Look up the values of whole pixel coordinates, block by block."""
+        x_size, y_size = self.raster_ds.size
+        block_x_size, block_y_size = self.block_size
+
+        inside = np.isfinite(pixel_x) & np.isfinite(pixel_y)
+        inside[inside] = (
+            (pixel_x[inside] >= 0) & (pixel_x[inside] < x_size) & (pixel_y[inside] >= 0) & (pixel_y[inside] < y_size)
+        )
+
+        dtype = self.raster_ds.get_band_dtype(self.band_indexes[0])
+        values = np.zeros((len(pixel_x), len(self.band_indexes)), dtype=dtype)
+        point_indexes = np.flatnonzero(inside)
+        cols = pixel_x[inside].astype(np.int64)
+        rows = pixel_y[inside].astype(np.int64)
+
+        # Sort the points by block, so each block is visited once
+        blocks_per_row = -(-x_size // block_x_size)
+        block_keys = (rows // block_y_size) * blocks_per_row + cols // block_x_size
+        order = np.argsort(block_keys, kind="stable")
+        block_keys, point_indexes, cols, rows = block_keys[order], point_indexes[order], cols[order], rows[order]
+
+        unique_keys, starts = np.unique(block_keys, return_index=True)
+        for block_key, start, end in zip(unique_keys.tolist(), starts, [*starts[1:], len(block_keys)]):
+            block_y, block_x = divmod(block_key, blocks_per_row)
+            x_off, y_off = block_x * block_x_size, block_y * block_y_size
+
+            block, _ = self._cache.get(block_key, lambda x_off=x_off, y_off=y_off: self._read_block(x_off, y_off))
+            values[point_indexes[start:end]] = block[:, rows[start:end] - y_off, cols[start:end] - x_off].T
+
+        mask = np.repeat(~inside[:, np.newaxis], len(self.band_indexes), axis=1)
+        for band_offset, nodata in enumerate(self.nodata_values):
+            if nodata is not None:
+                band_values = values[:, band_offset]
+                mask[:, band_offset] |= np.isnan(band_values) if np.isnan(nodata) else band_values == nodata
+
+        return np.ma.masked_array(values, mask=mask)
+
+    def _read_block(self, x_off: int, y_off: int) -> np.ndarray:
+        x_size, y_size = self.raster_ds.size
+        block_x_size, block_y_size = self.block_size
+        window = Window(x_off, y_off, min(block_x_size, x_size - x_off), min(block_y_size, y_size - y_off))
+
+        return self.raster_ds.read_bands(window, self.band_indexes)
+
+    def _to_raster_srs(
+        self, x_coords: np.ndarray, y_coords: np.ndarray, srs: osr.SpatialReference | int | str
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Reproject the points into the raster srs with a single call to TransformPoints."""
+        if not isinstance(srs, osr.SpatialReference):
+            srs_kwargs = {"epsg_code": srs} if isinstance(srs, int) else {"wkt": srs}
+            srs = get_srs(**srs_kwargs, axis_mapping_strategy=osr.OAMS_TRADITIONAL_GIS_ORDER)
+
+        if self.raster_ds.srs is None or srs.IsSame(self.raster_ds.srs) or not len(x_coords):
+            return x_coords, y_coords
+
+        coords = np.column_stack([x_coords, y_coords])
+        transformed = np.asarray(get_coordinate_transformation(srs, self.raster_ds.srs).TransformPoints(coords))
+
+        return transformed[:, 0], transformed[:, 1]
+
+
+def sample_points(
+    raster_ds: RasterDataset,
+    x_coords: ArrayLike,
+    y_coords: ArrayLike,
+    srs: osr.SpatialReference | int | str | None = None,
+    band_indexes: list[int] | None = None,
+    interpolation: str = NEAREST,
+) -> np.ma.MaskedArray:
+    """Sample the values of raster bands at arrays of points. See PointSampler.sample.
+
+    Returns:
+        Masked array of shape (points, bands), with points outside of the raster or on nodata masked.
+
+    """
+    return PointSampler(raster_ds, band_indexes).sample(x_coords, y_coords, srs, interpolation)
+
+
+def sample_vector(
+    raster_ds: RasterDataset,
+    vector_ds: VectorDataset,
+    band_indexes: list[int] | None = None,
+    interpolation: str = NEAREST,
+    where: str | None = None,
+) -> tuple[np.ndarray, np.ma.MaskedArray]:
+    """Sample the values of raster bands at the features of a point layer.
+
+    The points are read with VectorDataset.to_numpy and their coordinates taken straight from the WKB, so no
+    geometry objects are created per feature. They are reprojected into the raster srs if the layer srs differs.
+
+    Args:
+        raster_ds: The raster to sample.
+        vector_ds: The point layer.
+        band_indexes: Indexes of the bands to sample (count starts at one). Defaults to every band.
+        interpolation: Either NEAREST or BILINEAR. Defaults to NEAREST.
+        where: Optional attribute filter selecting the features to sample, as an OGR SQL WHERE clause.
+
+    Returns:
+        The FID of each feature, and a masked array of shape (features, bands) of the values sampled. Features without
+        a geometry, outside of the raster or on nodata are masked.
+
+    Raises:
+        ValueError: The layer contains geometries other than points.
+
+    """
+    table = vector_ds.to_numpy(where=where, columns=[])
+    geometries = table[GEOMETRY_COLUMN]
+    has_geometry = np.array([geometry is not None for geometry in geometries], dtype=bool)
+
+    x_coords = np.full(len(geometries), np.nan)
+    y_coords = np.full(len(geometries), np.nan)
+    if has_geometry.any():
+        wkb_values = [bytes(geometry) for geometry in geometries[has_geometry]]
+        offsets = np.concatenate([[0], np.cumsum([len(wkb) for wkb in wkb_values])])
+        data = np.frombuffer(b"".join(wkb_values), dtype=np.uint8)
+        x_coords[has_geometry], y_coords[has_geometry] = get_point_coords(data, offsets)
+
+    values = PointSampler(raster_ds, band_indexes).sample(x_coords, y_coords, vector_ds.srs, interpolation)
+
+    return table[FID_COLUMN], values
@@ -0,0 +1,189 @@
+import math
+from typing import NamedTuple
+
+import numpy as np
+from osgeo import gdal
+
+# Size (in pixels) of the longest side of the sample read for approximate statistics and histograms
+DEFAULT_APPROXIMATE_SIZE = 1024
+
+DEFAULT_HISTOGRAM_BINS = 256
+
+# PAM metadata items GDAL stores band statistics under, in the .aux.xml alongside the raster
+STATISTICS_METADATA_KEYS = {
+    "minimum": "STATISTICS_MINIMUM",
+    "maximum": "STATISTICS_MAXIMUM",
+    "mean": "STATISTICS_MEAN",
+    "std_dev": "STATISTICS_STDDEV",
+    "valid_percent": "STATISTICS_VALID_PERCENT",
+}
+APPROXIMATE_METADATA_KEY = "STATISTICS_APPROXIMATE"
+
+
+class Moments(NamedTuple):
+    """Partial statistics of a set of pixels, which can be merged with those of another set."""
+
+    count: int = 0
+    mean: float = 0.0
+    sum_sq_dev: float = 0.0
+    minimum: float = math.inf
+    maximum: float = -math.inf
+
+
+class BandStatistics(NamedTuple):
+    minimum: float
+    maximum: float
+    mean: float
+    std_dev: float
+    valid_percent: float
+    approximate: bool = False
+
+
+def get_valid_values(arr: np.ndarray, nodata: float | None) -> np.ndarray:
+    """Get the values of an array which aren't nodata, as a flat array."""
+    if nodata is None:
+        return arr.ravel()
+
+    if np.isnan(nodata):
+        return arr[~np.isnan(arr)]
+
+    return arr[arr != nodata]
+
+
+def compute_moments(values: np.ndarray) -> Moments:
+    """Compute the partial statistics of an array of valid values. NaN values are ignored.
+
+    Args:
+        values: The valid values, e.g. from get_valid_values.
+
+    Returns:
+        The count, mean, sum of squared deviations from the mean, minimum and maximum of the values.
+
+    """
+    if np.issubdtype(values.dtype, np.floating):
+        values = values[~np.isnan(values)]
+
+    if values.size == 0:
+        return Moments()
+
+    mean = values.mean(dtype=np.float64)
+    sum_sq_dev = np.square(values - mean).sum()
+
+    return Moments(int(values.size), float(mean), float(sum_sq_dev), float(values.min()), float(values.max()))
+
+
+def merge_moments(moments: Moments, other: Moments) -> Moments:
+    """Merge the partial statistics of two disjoint sets of pixels, with the parallel variant of Welford's algorithm.
+
+    The merge is exact (up to rounding) and doesn't depend on the order the sets are merged in, so the partial
+    statistics of windows can be merged as they are read, or as parallel workers finish.
+    """
+    if not other.count:
+        return moments
+    if not moments.count:
+        return other
+
+    count = moments.count + other.count
+    delta = other.mean - moments.mean
+
+    return Moments(
+        count=count,
+        mean=moments.mean + delta * other.count / count,
+        sum_sq_dev=moments.sum_sq_dev + other.sum_sq_dev + delta**2 * moments.count * other.count / count,
+        minimum=min(moments.minimum, other.minimum),
+        maximum=max(moments.maximum, other.maximum),
+    )
+
+
+def moments_to_statistics(moments: Moments, pixel_count: int, approximate: bool = False) -> BandStatistics:
+    """Convert merged partial statistics into the statistics of a band.
+
+    Args:
+        moments: The merged partial statistics of every pixel read.
+        pixel_count: The number of pixels read, valid or not.
+        approximate: Whether the pixels were a sample of the band. Defaults to False.
+
+    Returns:
+        The statistics, with a population standard deviation (as GDAL computes). If no pixels are valid, every
+        statistic apart from the valid percentage is NaN.
+
+    """
+    if not moments.count:
+        return BandStatistics(math.nan, math.nan, math.nan, math.nan, 0.0, approximate)
+
+    return BandStatistics(
+        minimum=moments.minimum,
+        maximum=moments.maximum,
+        mean=moments.mean,
+        std_dev=math.sqrt(moments.sum_sq_dev / moments.count),
+        valid_percent=100 * moments.count / pixel_count if pixel_count else 0.0,
+        approximate=approximate,
+    )
+
+
+def get_approximate_buffer_size(x_size: int, y_size: int, max_size: int = DEFAULT_APPROXIMATE_SIZE) -> tuple[int, int]:
+    """Get the size of the sample read for approximate statistics, shrinking the raster to fit within max_size."""
+    scale = min(1.0, max_size / max(x_size, y_size))
+    return max(1, round(x_size * scale)), max(1, round(y_size * scale))
+
+
+def read_cached_statistics(band: gdal.Band, approximate: bool = False) -> BandStatistics | None:
+    """Read the statistics stored in the metadata of a band (from its PAM .aux.xml or the raster itself).
+
+    Args:
+        band: The band.
+        approximate: Whether approximate statistics are acceptable. Defaults to False.
+
+    Returns:
+        The statistics, or None if there aren't any (or they are approximate and exact statistics are required).
+
+    """
+    metadata = band.GetMetadata() or {}
+    if any(key not in metadata for key in STATISTICS_METADATA_KEYS.values()):
+        return None
+
+    is_approximate = metadata.get(APPROXIMATE_METADATA_KEY, "NO").upper() == "YES"
+    if is_approximate and not approximate:
+        return None
+
+    values = {name: float(metadata[key]) for name, key in STATISTICS_METADATA_KEYS.items()}
+    return BandStatistics(**values, approximate=is_approximate)
+
+
+def write_cached_statistics(band: gdal.Band, statistics: BandStatistics) -> None:
+    """Store the statistics of a band in its metadata, which GDAL saves to the PAM .aux.xml when the raster is flushed.
+
+    The values are written with repr rather than with band.SetStatistics, which rounds them to 14 significant digits,
+    so they are read back exactly. Statistics without any valid pixels are not stored.
+    """
+    if not statistics.valid_percent:
+        return
+
+    for name, key in STATISTICS_METADATA_KEYS.items():
+        band.SetMetadataItem(key, repr(float(getattr(statistics, name))))
+    band.SetMetadataItem(APPROXIMATE_METADATA_KEY, "YES" if statistics.approximate else None)
+
+
+def read_cached_histogram(
+    band: gdal.Band, bins: int, value_range: tuple[float, float]
+) -> tuple[np.ndarray, np.ndarray] | None:
+    """Read the default histogram stored for a band, if it has the same bins and range.
+
+    Returns:
+        The counts and bin edges, in the same format as np.histogram, or None if there's no matching histogram.
+
+    """
+    histogram = band.GetDefaultHistogram(force=False)
+    if histogram is None:
+        return None
+
+    minimum, maximum, bucket_count, counts = histogram
+    if bucket_count != bins or not np.allclose((minimum, maximum), value_range):
+        return None
+
+    return np.asarray(counts, dtype=np.int64), np.linspace(minimum, maximum, bins + 1)
+
+
+def write_cached_histogram(band: gdal.Band, counts: np.ndarray, bin_edges: np.ndarray) -> None:
+    """Store a histogram as the default histogram of a band, saved to the PAM .aux.xml when the raster is flushed."""
+    band.SetDefaultHistogram(float(bin_edges[0]), float(bin_edges[-1]), [int(count) for count in counts])
@@ -0,0 +1,406 @@
+import math
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from osgeo import gdal, osr
+
+from geospatial_utils.raster.constants import MEM_DRIVER, VRT_DRIVER
+from geospatial_utils.raster.raster_dataset import RasterDataset
+from geospatial_utils.srs.bounds import transform_bounds
+from geospatial_utils.srs.cache import get_srs
+from geospatial_utils.tiles.grid import (
+    DEFAULT_TILE_SIZE,
+    MAX_ZOOM,
+    WEB_MERCATOR_EPSG,
+    WEB_MERCATOR_EXTENT,
+    Tile,
+    TileRange,
+    clamp_to_world,
+    get_children,
+    get_parent,
+    get_tile_bounds,
+    get_tile_id,
+    get_tile_range,
+    get_tile_resolution,
+)
+from geospatial_utils.tiles.stores import PNG_FORMAT, WEBP_FORMAT, TileStore
+
+# Colour ramps as evenly spaced RGB stops, from the lowest to the highest value
+COLOUR_RAMPS = {
+    "greyscale": [(0, 0, 0), (255, 255, 255)],
+    "viridis": [(68, 1, 84), (59, 82, 139), (33, 145, 140), (94, 201, 98), (253, 231, 37)],
+    "magma": [(0, 0, 4), (81, 18, 124), (183, 55, 121), (252, 137, 97), (252, 253, 191)],
+    "terrain": [(51, 102, 153), (0, 153, 102), (204, 204, 102), (153, 102, 51), (255, 255, 255)],
+    "red_blue": [(178, 24, 43), (244, 165, 130), (247, 247, 247), (146, 197, 222), (33, 102, 172)],
+}
+DEFAULT_COLOUR_RAMP = "viridis"
+
+# Number of entries in the lookup table each colour ramp is interpolated into
+COLOUR_TABLE_SIZE = 256
+
+DEFAULT_RESAMPLING = "bilinear"
+DEFAULT_WEBP_QUALITY = 90
+
+# Number of subtrees rendered per worker, so the pool stays busy when some subtrees are mostly empty
+SUBTREES_PER_WORKER = 4
+
+
+def get_colour_table(colour_ramp: str) -> np.ndarray:
+    """Interpolate a colour ramp into a (COLOUR_TABLE_SIZE, 3) lookup table.
+
+    Raises:
+        ValueError: The colour ramp isn't one of the COLOUR_RAMPS.
+
+    """
+    if colour_ramp not in COLOUR_RAMPS:
+        raise ValueError(f"{colour_ramp} is not a colour ramp. Choose from {', '.join(COLOUR_RAMPS)}.")
+
+    stops = np.array(COLOUR_RAMPS[colour_ramp], dtype=np.float64)
+    positions = np.linspace(0, 1, len(stops))
+    table_positions = np.linspace(0, 1, COLOUR_TABLE_SIZE)
+
+    channels = [np.interp(table_positions, positions, stops[:, channel]) for channel in range(3)]
+    return np.round(np.stack(channels, axis=-1)).astype(np.uint8)
+
+
+def apply_colour_ramp(
+    values: np.ndarray, alpha: np.ndarray, value_range: tuple[float, float], colour_ramp: str = DEFAULT_COLOUR_RAMP
+) -> np.ndarray:
+    """Colour the values of a band with a colour ramp, stretched linearly over a value range.
+
+    Args:
+        values: 2D array of the values.
+        alpha: 2D array of the opacity of each value (0 to 255), e.g. the alpha band of a warp. NaN values are always
+            transparent.
+        value_range: The values coloured with the first and last colours of the ramp. Values outside of the range are
+            clamped to it.
+        colour_ramp: Name of one of the COLOUR_RAMPS. Defaults to DEFAULT_COLOUR_RAMP.
+
+    Returns:
+        Array of shape (rows, cols, 4) of RGBA uint8 colours.
+
+    """
+    colour_table = get_colour_table(colour_ramp)
+    lower, upper = value_range
+    scale = (COLOUR_TABLE_SIZE - 1) / (upper - lower) if upper > lower else 0.0
+
+    values = values.astype(np.float64, copy=False)
+    valid = ~np.isnan(values)
+    indexes = np.clip((np.where(valid, values, lower) - lower) * scale, 0, COLOUR_TABLE_SIZE - 1).astype(np.intp)
+
+    rgba = np.empty((*values.shape, 4), dtype=np.uint8)
+    rgba[..., :3] = colour_table[indexes]
+    rgba[..., 3] = np.where(valid, alpha, 0)
+
+    return rgba
+
+
+def downsample_rgba(children: list[np.ndarray | None]) -> np.ndarray | None:
+    """Build a tile from its four children (see get_children), halving their resolution.
+
+    Each output pixel is the alpha weighted average of the 2 x 2 child pixels it covers, so transparent pixels don't
+    darken the edges of the data.
+
+    Args:
+        children: The RGBA arrays of the upper left, upper right, lower left and lower right children, or None for
+            children which are empty.
+
+    Returns:
+        The RGBA array of the tile, the same size as each child, or None if every child is empty.
+
+    """
+    shape = next((child.shape for child in children if child is not None), None)
+    if shape is None:
+        return None
+
+    tile_size = shape[0]
+    mosaic = np.zeros((2 * tile_size, 2 * tile_size, 4), dtype=np.float64)
+    for index, child in enumerate(children):
+        if child is not None:
+            row, col = divmod(index, 2)
+            mosaic[row * tile_size : (row + 1) * tile_size, col * tile_size : (col + 1) * tile_size] = child
+
+    alpha = mosaic[..., 3:]
+    premultiplied = np.concatenate([mosaic[..., :3] * alpha, alpha], axis=-1)
+    summed = premultiplied.reshape(tile_size, 2, tile_size, 2, 4).sum(axis=(1, 3))
+
+    rgba = np.zeros((tile_size, tile_size, 4), dtype=np.uint8)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rgba[..., :3] = np.nan_to_num(np.round(summed[..., :3] / summed[..., 3:]))
+    rgba[..., 3] = np.round(summed[..., 3] / 4)
+
+    return rgba if rgba[..., 3].any() else None
+
+
+def encode_tile(rgba: np.ndarray, tile_format: str = PNG_FORMAT, quality: int = DEFAULT_WEBP_QUALITY) -> bytes:
+    """Encode an RGBA array as a PNG or WebP image, in memory.
+
+    Args:
+        rgba: Array of shape (rows, cols, 4) of RGBA uint8 colours.
+        tile_format: Either PNG_FORMAT or WEBP_FORMAT. Defaults to PNG_FORMAT.
+        quality: Quality (1 to 100) of lossy WebP images. Defaults to DEFAULT_WEBP_QUALITY.
+
+    Returns:
+        The encoded image.
+
+    Raises:
+        ValueError: The tile format isn't PNG_FORMAT or WEBP_FORMAT.
+
+    """
+    if tile_format == PNG_FORMAT:
+        driver_name, options = "PNG", ["ZLEVEL=6"]
+    elif tile_format == WEBP_FORMAT:
+        driver_name, options = "WEBP", [f"QUALITY={quality}"]
+    else:
+        raise ValueError(
+            f"{tile_format} is not a valid raster tile format, it should be {PNG_FORMAT} or {WEBP_FORMAT}."
+        )
+
+    rows, cols, band_count = rgba.shape
+    image_ds = gdal.GetDriverByName(MEM_DRIVER).Create("", cols, rows, band_count, gdal.GDT_Byte)
+    for band_offset in range(band_count):
+        image_ds.GetRasterBand(band_offset + 1).WriteArray(rgba[..., band_offset])
+
+    vsimem_path = f"/vsimem/tile_{uuid.uuid4().hex}.{tile_format}"
+    try:
+        output_ds = gdal.GetDriverByName(driver_name).CreateCopy(vsimem_path, image_ds, options=options)
+        if output_ds is None:
+            raise ValueError(f"Could not encode the tile as {tile_format}.")
+
+        # Ensure the image is written to memory by deleting the dataset
+        del output_ds
+        return bytes(gdal.VSIGetMemFileBuffer_unsafe(vsimem_path))
+    finally:
+        gdal.Unlink(vsimem_path)
+
+
+def get_web_mercator_bounds(raster_ds: RasterDataset) -> tuple[float, float, float, float]:
+    """The (min_x, min_y, max_x, max_y) bounds of a raster in WebMercator, clamped to the WebMercator world."""
+    if raster_ds.srs is None:
+        return clamp_to_world(raster_ds.bounds)
+
+    web_mercator_srs = get_srs(epsg_code=WEB_MERCATOR_EPSG, axis_mapping_strategy=osr.OAMS_TRADITIONAL_GIS_ORDER)
+    return clamp_to_world(transform_bounds(raster_ds.bounds, raster_ds.srs, web_mercator_srs))
+
+
+def get_native_zoom(raster_ds: RasterDataset, tile_size: int = DEFAULT_TILE_SIZE) -> int:
+    """The lowest zoom level whose tiles are at least as detailed as the raster."""
+    min_x, _, max_x, _ = get_web_mercator_bounds(raster_ds)
+    resolution = (max_x - min_x) / raster_ds.size[0]
+
+    zoom = math.ceil(math.log2(2 * WEB_MERCATOR_EXTENT / (tile_size * resolution)))
+    return min(max(zoom, 0), MAX_ZOOM)
+
+
+def generate_tiles(
+    raster_ds: RasterDataset,
+    store: TileStore,
+    min_zoom: int,
+    max_zoom: int,
+    band_index: int = 1,
+    colour_ramp: str = DEFAULT_COLOUR_RAMP,
+    value_range: tuple[float, float] | None = None,
+    resampling: str = DEFAULT_RESAMPLING,
+    tile_size: int = DEFAULT_TILE_SIZE,
+    quality: int = DEFAULT_WEBP_QUALITY,
+    workers: int | None = None,
+) -> int:
+    """Render a raster into a pyramid of XYZ (WebMercator) tiles, written to a tile store.
+
+    Only the tiles of the maximum zoom level are warped from the raster, through a virtual warped dataset aligned to
+    the tile grid. Each lower zoom level is then built by downsampling the four tiles below it, so the raster is only
+    read (and reprojected) once. Tiles which are entirely transparent (outside of the raster or nodata) are skipped.
+
+    The tiles are split into subtrees, each rooted at a tile of an intermediate zoom level, which are rendered in
+    parallel by a pool of threads, each with its own handle to the raster. The subtrees are rendered in Hilbert curve
+    order, so sibling subtrees complete close together, and each tile above them is built as soon as its children are
+    complete. Only the arrays of the tiles still waiting for a sibling are kept in memory.
+
+    Single band rasters are coloured with a colour ramp, while RGB rasters keep their own colours.
+
+    Args:
+        raster_ds: The raster to tile. Rasters which aren't saved to a file (e.g. MEM datasets) are rendered on a
+            single thread.
+        store: The TileStore to write the tiles to. Its tile format must be PNG_FORMAT or WEBP_FORMAT.
+        min_zoom: The lowest zoom level to render.
+        max_zoom: The highest zoom level to render, see get_native_zoom.
+        band_index: Index of the band to colour (count starts at one). Defaults to 1.
+        colour_ramp: Name of one of the COLOUR_RAMPS. Defaults to DEFAULT_COLOUR_RAMP.
+        value_range: The values coloured with the first and last colours of the ramp. Defaults to the minimum and
+            maximum of the band, from its approximate statistics.
+        resampling: Resampling algorithm used to warp the maximum zoom level, e.g. near or bilinear. Defaults to
+            DEFAULT_RESAMPLING.
+        tile_size: Width and height (in pixels) of the tiles. Defaults to DEFAULT_TILE_SIZE.
+        quality: Quality (1 to 100) of WebP tiles. Defaults to DEFAULT_WEBP_QUALITY.
+        workers: Number of threads. Defaults to the number of CPUs.
+
+    Returns:
+        The number of tiles written.
+
+    Raises:
+        ValueError: The zoom levels are invalid.
+
+    """
+    if not 0 <= min_zoom <= max_zoom <= MAX_ZOOM:
+        raise ValueError(f"The zoom levels {min_zoom} to {max_zoom} should be between 0 and {MAX_ZOOM}.")
+
+    get_colour_table(colour_ramp)
+    is_rgb = raster_ds.is_rgb
+    if not is_rgb and value_range is None:
+        statistics = raster_ds.get_statistics(band_index, approximate=True)
+        value_range = (statistics.minimum, statistics.maximum)
+
+    bounds = get_web_mercator_bounds(raster_ds)
+    tile_ranges = {zoom: get_tile_range(bounds, zoom) for zoom in range(min_zoom, max_zoom + 1)}
+
+    source_path = raster_ds.ds.GetDescription()
+    if not source_path or gdal.IdentifyDriver(source_path) is None:
+        source, workers = raster_ds.ds, 1
+    else:
+        source, workers = source_path, workers or os.cpu_count() or 1
+
+    renderer = _TileRenderer(
+        source=source,
+        store=store,
+        tile_ranges=tile_ranges,
+        band_indexes=[1, 2, 3] if is_rgb else [band_index],
+        colour_ramp=None if is_rgb else colour_ramp,
+        value_range=value_range,
+        resampling=resampling,
+        tile_size=tile_size,
+        quality=quality,
+    )
+
+    # Split at the lowest zoom level with enough tiles to keep every worker busy
+    split_zoom = next(
+        (zoom for zoom, tile_range in tile_ranges.items() if tile_range.tile_count >= workers * SUBTREES_PER_WORKER),
+        max_zoom,
+    )
+
+    subtree_tiles = sorted(tile_ranges[split_zoom].iter_tiles(), key=get_tile_id)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        for tile, rgba in zip(subtree_tiles, pool.map(renderer.render, subtree_tiles)):
+            renderer.add_to_parent(tile, rgba)
+
+    return store.tile_count
+
+
+class _TileRenderer:
+    """Renders the subtree of tiles below a tile, warping the maximum zoom level and downsampling the levels above."""
+
+    def __init__(
+        self,
+        source: str | gdal.Dataset,
+        store: TileStore,
+        tile_ranges: dict[int, TileRange],
+        band_indexes: list[int],
+        colour_ramp: str | None,
+        value_range: tuple[float, float] | None,
+        resampling: str,
+        tile_size: int,
+        quality: int,
+    ):
+        self.source = source
+        self.store = store
+        self.tile_ranges = tile_ranges
+        self.band_indexes = band_indexes
+        self.colour_ramp = colour_ramp
+        self.value_range = value_range
+        self.resampling = resampling
+        self.tile_size = tile_size
+        self.quality = quality
+        self.max_zoom = max(tile_ranges)
+        self.min_zoom = min(tile_ranges)
+        self._local = threading.local()
+
+        # The children rendered so far of each tile above the subtrees, only used by the calling thread
+        self._pending: dict[Tile, dict[Tile, np.ndarray | None]] = {}
+
+    def render(self, tile: Tile) -> np.ndarray | None:
+        """Render (and write) a tile and every tile below it, depth first, returning its RGBA array."""
+        if not self.tile_ranges[tile.z].contains(tile):
+            return None
+
+        if tile.z == self.max_zoom:
+            rgba = self._warp(tile)
+        else:
+            rgba = downsample_rgba([self.render(child) for child in get_children(tile)])
+
+        return self.write(tile, rgba)
+
+    def add_to_parent(self, tile: Tile, rgba: np.ndarray | None) -> None:
+        """Hold the RGBA array of a rendered tile until its siblings are rendered, then build (and write) its parent,
+        releasing the arrays of the children. Each parent is added to its own parent in turn, up to the minimum zoom."""
+        while tile.z > self.min_zoom:
+            parent = get_parent(tile)
+            children = get_children(parent)
+            rendered = self._pending.setdefault(parent, {})
+            rendered[tile] = rgba
+            if len(rendered) < sum(self.tile_ranges[tile.z].contains(child) for child in children):
+                return
+
+            del self._pending[parent]
+            tile, rgba = parent, self.write(parent, downsample_rgba([rendered.get(child) for child in children]))
+
+    def write(self, tile: Tile, rgba: np.ndarray | None) -> np.ndarray | None:
+        """Write a tile to the store, unless it's empty."""
+        if rgba is not None and tile.z >= self.min_zoom:
+            self.store.write(tile, encode_tile(rgba, self.store.tile_format, self.quality))
+
+        return rgba
+
+    def _warp(self, tile: Tile) -> np.ndarray | None:
+        tile_range = self.tile_ranges[self.max_zoom]
+        warped_ds = self._get_warped_dataset()
+        x_off = (tile.x - tile_range.min_x) * self.tile_size
+        y_off = (tile.y - tile_range.min_y) * self.tile_size
+
+        # Read the alpha band first, so empty tiles are skipped without reading their data
+        alpha_band = warped_ds.GetRasterBand(warped_ds.RasterCount)
+        alpha = alpha_band.ReadAsArray(x_off, y_off, self.tile_size, self.tile_size)
+        if not alpha.any():
+            return None
+
+        if self.colour_ramp is None:
+            rgb = warped_ds.ReadAsArray(x_off, y_off, self.tile_size, self.tile_size, band_list=[1, 2, 3])
+            rgba = np.concatenate([np.moveaxis(rgb, 0, -1), alpha[..., np.newaxis]], axis=-1).astype(np.uint8)
+        else:
+            values = warped_ds.GetRasterBand(1).ReadAsArray(x_off, y_off, self.tile_size, self.tile_size)
+            rgba = apply_colour_ramp(values, alpha, self.value_range, self.colour_ramp)
+
+        return rgba if rgba[..., 3].any() else None
+
+    def _get_warped_dataset(self) -> gdal.Dataset:
+        """Get the calling thread's own virtual warped dataset, covering the tile range of the maximum zoom level."""
+        datasets = getattr(self._local, "datasets", None)
+        if datasets is not None:
+            return datasets[-1]
+
+        source_ds = gdal.Open(self.source) if isinstance(self.source, str) else self.source
+        selected_ds = gdal.Translate("", source_ds, format=VRT_DRIVER, bandList=self.band_indexes)
+
+        tile_range = self.tile_ranges[self.max_zoom]
+        min_x, _, _, max_y = get_tile_bounds(Tile(tile_range.z, tile_range.min_x, tile_range.min_y))
+        _, min_y, max_x, _ = get_tile_bounds(Tile(tile_range.z, tile_range.max_x, tile_range.max_y))
+        resolution = get_tile_resolution(tile_range.z, self.tile_size)
+
+        warp_options = gdal.WarpOptions(
+            format=VRT_DRIVER,
+            dstSRS=f"EPSG:{WEB_MERCATOR_EPSG}",
+            outputBounds=(min_x, min_y, max_x, max_y),
+            xRes=resolution,
+            yRes=resolution,
+            resampleAlg=self.resampling,
+            dstAlpha=True,
+        )
+        warped_ds = gdal.Warp("", selected_ds, options=warp_options)
+        if warped_ds is None:
+            raise ValueError("Could not warp the raster into the tile grid.")
+
+        # The virtual datasets only reference their sources, so every dataset in the chain must be kept open
+        self._local.datasets = (source_ds, selected_ds, warped_ds)
+
+        return warped_ds
@@ -0,0 +1,153 @@
+from collections.abc import Iterator
+from typing import NamedTuple
+
+import numpy as np
+from numpy.typing import DTypeLike
+
+# Default upper limit on the size of the array read for each window (64 MiB)
+DEFAULT_MAX_WINDOW_MEMORY = 64 * 1024 * 1024
+
+# Byte alignment of allocated buffers, matching a cache line (and the widest SIMD registers)
+DEFAULT_BUFFER_ALIGNMENT = 64
+
+
+class Window(NamedTuple):
+    x_off: int
+    y_off: int
+    x_size: int
+    y_size: int
+
+    @property
+    def slices(self) -> tuple[slice, slice]:
+        """Row and column slices covering the window within an array of the full raster."""
+        return slice(self.y_off, self.y_off + self.y_size), slice(self.x_off, self.x_off + self.x_size)
+
+
+class BlockWindow(NamedTuple):
+    window: Window
+    read_window: Window
+
+    @property
+    def core_slices(self) -> tuple[slice, slice]:
+        """Row and column slices covering the window within the array read for the read window.
+
+        The read window extends past the window by any requested overlap, so these slices strip the overlap back off.
+        """
+        row_start = self.window.y_off - self.read_window.y_off
+        col_start = self.window.x_off - self.read_window.x_off
+        return (
+            slice(row_start, row_start + self.window.y_size),
+            slice(col_start, col_start + self.window.x_size),
+        )
+
+
+def get_window_size(
+    raster_x_size: int,
+    raster_y_size: int,
+    block_x_size: int,
+    block_y_size: int,
+    item_size: int,
+    max_memory: int | None = DEFAULT_MAX_WINDOW_MEMORY,
+) -> tuple[int, int]:
+    """Choose the largest window, aligned to the natural block size, whose array fits within a memory ceiling.
+
+    Whole rows of blocks are preferred, as they are read contiguously for both striped and tiled rasters. If a single
+    row of blocks doesn't fit, the window is a run of blocks along a row, falling back to part of a single block if even
+    one block exceeds the ceiling.
+
+    Args:
+        raster_x_size: Width of the raster in pixels.
+        raster_y_size: Height of the raster in pixels.
+        block_x_size: Width of the natural block of the raster band.
+        block_y_size: Height of the natural block of the raster band.
+        item_size: Number of bytes per pixel.
+        max_memory: Maximum number of bytes to read for each window. If None, the natural block size is used.
+
+    Returns:
+        The window x and y size in pixels.
+
+    """
+    block_x_size = min(block_x_size, raster_x_size)
+    block_y_size = min(block_y_size, raster_y_size)
+
+    if max_memory is None:
+        return block_x_size, block_y_size
+
+    block_row_memory = raster_x_size * block_y_size * item_size
+    if block_row_memory <= max_memory:
+        block_rows = max_memory // block_row_memory
+        return raster_x_size, min(block_y_size * block_rows, raster_y_size)
+
+    block_memory = block_x_size * block_y_size * item_size
+    if block_memory <= max_memory:
+        blocks = max_memory // block_memory
+        return min(block_x_size * blocks, raster_x_size), block_y_size
+
+    return block_x_size, max(1, min(block_y_size, max_memory // (block_x_size * item_size)))
+
+
+def generate_windows(
+    raster_x_size: int,
+    raster_y_size: int,
+    window_x_size: int,
+    window_y_size: int,
+    overlap: int = 0,
+) -> Iterator[BlockWindow]:
+    """Split a raster into a grid of windows, row by row.
+
+    Args:
+        raster_x_size: Width of the raster in pixels.
+        raster_y_size: Height of the raster in pixels.
+        window_x_size: Width of each window in pixels.
+        window_y_size: Height of each window in pixels.
+        overlap: Number of pixels each read window extends past its window on each side, clipped to the raster extent.
+
+    Yields:
+        BlockWindow for each window.
+
+    Raises:
+        ValueError: The window size is not positive or the overlap is negative.
+
+    """
+    if window_x_size < 1 or window_y_size < 1:
+        raise ValueError(f"The window size must be positive, not {window_x_size}x{window_y_size}.")
+
+    if overlap < 0:
+        raise ValueError(f"The overlap must not be negative, not {overlap}.")
+
+    for y_off in range(0, raster_y_size, window_y_size):
+        y_size = min(window_y_size, raster_y_size - y_off)
+        read_y_off = max(0, y_off - overlap)
+        read_y_size = min(raster_y_size, y_off + y_size + overlap) - read_y_off
+
+        for x_off in range(0, raster_x_size, window_x_size):
+            x_size = min(window_x_size, raster_x_size - x_off)
+            read_x_off = max(0, x_off - overlap)
+            read_x_size = min(raster_x_size, x_off + x_size + overlap) - read_x_off
+
+            yield BlockWindow(
+                window=Window(x_off, y_off, x_size, y_size),
+                read_window=Window(read_x_off, read_y_off, read_x_size, read_y_size),
+            )
+
+
+def allocate_aligned_array(
+    shape: int | tuple[int, ...], dtype: DTypeLike, alignment: int = DEFAULT_BUFFER_ALIGNMENT
+) -> np.ndarray:
+    """Allocate an uninitialised C contiguous array whose data starts on a byte alignment boundary.
+
+    Args:
+        shape: Shape of the array.
+        dtype: Data type of the array.
+        alignment: Byte alignment of the start of the data. Defaults to DEFAULT_BUFFER_ALIGNMENT.
+
+    Returns:
+        The uninitialised array, a view onto a slightly larger allocation.
+
+    """
+    dtype = np.dtype(dtype)
+    nbytes = int(np.prod(shape)) * dtype.itemsize
+    raw = np.empty(nbytes + alignment, dtype=np.uint8)
+    offset = -raw.ctypes.data % alignment
+
+    return raw[offset : offset + nbytes].view(dtype).reshape(shape)
@@ -0,0 +1,31 @@
+from osgeo import osr
+
+from geospatial_utils.srs.cache import get_coordinate_transformation
+
+# Number of points added along each edge of the bounds when transforming them, so curved edges are accounted for
+DEFAULT_DENSIFY_POINTS = 21
+
+
+def transform_bounds(
+    bounds: tuple[float, float, float, float],
+    source_srs: osr.SpatialReference,
+    target_srs: osr.SpatialReference,
+    densify_points: int = DEFAULT_DENSIFY_POINTS,
+) -> tuple[float, float, float, float]:
+    """Transform (min_x, min_y, max_x, max_y) bounds into another spatial reference.
+
+    Args:
+        bounds: The bounds, in the axis order of the source srs.
+        source_srs: The spatial reference of the bounds.
+        target_srs: The spatial reference to transform the bounds into.
+        densify_points: Number of points added along each edge. Defaults to DEFAULT_DENSIFY_POINTS.
+
+    Returns:
+        The smallest bounds in the target srs containing the transformed edges of the bounds.
+
+    """
+    if source_srs.IsSame(target_srs):
+        return bounds
+
+    coord_transform = get_coordinate_transformation(source_srs, target_srs)
+    return tuple(coord_transform.TransformBounds(*bounds, densify_points))
@@ -0,0 +1,170 @@
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from typing import Any, NamedTuple
+
+from osgeo import osr
+
+DEFAULT_CACHE_SIZE = 128
+
+SRS_CACHE = "srs"
+TRANSFORMATION_CACHE = "transformation"
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+
+
+class LRUCache:
+    """A bounded least recently used cache.
+
+    Args:
+        max_size: Maximum number of items to hold, with the least recently used item dropped when it's exceeded.
+
+    """
+
+    def __init__(self, max_size: int = DEFAULT_CACHE_SIZE):
+        self.max_size = max_size
+        self._items: OrderedDict[Hashable, Any] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def get(self, key: Hashable, factory: Callable[[], Any]) -> tuple[Any, bool]:
+        """Get an item from the cache, creating it with the factory if it isn't cached.
+
+        Args:
+            key: The key of the item.
+            factory: Function to create the item if it isn't cached.
+
+        Returns:
+            The item, and whether it was already cached.
+
+        """
+        if key in self._items:
+            self._items.move_to_end(key)
+            return self._items[key], True
+
+        item = factory()
+        self._items[key] = item
+        if len(self._items) > self.max_size:
+            self._items.popitem(last=False)
+
+        return item, False
+
+    def clear(self) -> None:
+        self._items.clear()
+
+
+# osr objects share a PROJ context with the thread that created them and must not be used concurrently, so each
+# thread has its own caches. Only the hit/miss counters are shared between threads.
+_local = threading.local()
+_counter_lock = threading.Lock()
+_counters = {SRS_CACHE: [0, 0], TRANSFORMATION_CACHE: [0, 0]}
+
+
+def get_srs(
+    epsg_code: int | None = None, wkt: str | None = None, axis_mapping_strategy: int | None = None
+) -> osr.SpatialReference:
+    """Get a spatial reference for an EPSG code or WKT string from the calling thread's cache.
+
+    The returned object is shared with other callers on the same thread, so it must not be modified. Clone it if
+    changes are needed.
+
+    Args:
+        epsg_code: EPSG code of the spatial reference. If this isn't used, then wkt must be provided.
+        wkt: WKT (or any other definition accepted by SetFromUserInput) of the spatial reference.
+        axis_mapping_strategy: Optional axis mapping strategy to set, e.g. osr.OAMS_TRADITIONAL_GIS_ORDER. Defaults to
+            the GDAL default of following the authority's axis order.
+
+    Returns:
+        The cached osr.SpatialReference.
+
+    Raises:
+        ValueError: Neither an EPSG code or WKT has been provided.
+        ValueError: The spatial reference could not be created.
+
+    """
+    if epsg_code is None and wkt is None:
+        raise ValueError("Either an epsg_code or a wkt should be provided.")
+
+    def create_srs() -> osr.SpatialReference:
+        srs = osr.SpatialReference()
+        error = srs.ImportFromEPSG(int(epsg_code)) if epsg_code is not None else srs.SetFromUserInput(wkt)
+        if error:
+            raise ValueError(f"Could not create a spatial reference for {epsg_code if epsg_code is not None else wkt}")
+
+        if axis_mapping_strategy is not None:
+            srs.SetAxisMappingStrategy(axis_mapping_strategy)
+
+        return srs
+
+    key = ("epsg", int(epsg_code)) if epsg_code is not None else ("wkt", wkt)
+    return _get_cached(SRS_CACHE, (key, axis_mapping_strategy), create_srs)
+
+
+def get_coordinate_transformation(
+    source_srs: osr.SpatialReference | int | str, target_srs: osr.SpatialReference | int | str
+) -> osr.CoordinateTransformation:
+    """Get a coordinate transformation between two spatial references from the calling thread's cache.
+
+    Transformations are keyed on the definition and the data axis order of both spatial references, so spatial
+    references with the same definition but different axis mapping strategies get different transformations.
+
+    Args:
+        source_srs: The spatial reference to transform from, as an osr.SpatialReference, EPSG code or WKT string.
+        target_srs: The spatial reference to transform to, as an osr.SpatialReference, EPSG code or WKT string.
+
+    Returns:
+        The cached osr.CoordinateTransformation.
+
+    """
+    source_srs = _as_srs(source_srs)
+    target_srs = _as_srs(target_srs)
+
+    key = (_srs_key(source_srs), _srs_key(target_srs))
+    return _get_cached(TRANSFORMATION_CACHE, key, lambda: osr.CoordinateTransformation(source_srs, target_srs))
+
+
+def cache_info() -> dict[str, CacheInfo]:
+    """Get the number of hits and misses of the spatial reference and transformation caches, across all threads."""
+    with _counter_lock:
+        return {name: CacheInfo(*counts) for name, counts in _counters.items()}
+
+
+def clear_cache() -> None:
+    """Clear the calling thread's caches and reset the hit/miss counters."""
+    for cache in getattr(_local, "caches", {}).values():
+        cache.clear()
+
+    with _counter_lock:
+        for counts in _counters.values():
+            counts[:] = [0, 0]
+
+
+def _get_cached(cache_name: str, key: Hashable, factory: Callable[[], Any]) -> Any:
+    caches = getattr(_local, "caches", None)
+    if caches is None:
+        caches = _local.caches = {SRS_CACHE: LRUCache(), TRANSFORMATION_CACHE: LRUCache()}
+
+    item, hit = caches[cache_name].get(key, factory)
+
+    with _counter_lock:
+        _counters[cache_name][0 if hit else 1] += 1
+
+    return item
+
+
+def _as_srs(srs: osr.SpatialReference | int | str) -> osr.SpatialReference:
+    if isinstance(srs, osr.SpatialReference):
+        return srs
+
+    if isinstance(srs, int):
+        return get_srs(epsg_code=srs)
+
+    return get_srs(wkt=srs)
+
+
+def _srs_key(srs: osr.SpatialReference) -> tuple[str, tuple[int, ...]]:
+    return srs.ExportToWkt(), tuple(srs.GetDataAxisToSRSAxisMapping())
@@ -0,0 +1,150 @@
+import math
+from collections.abc import Iterator
+from typing import NamedTuple
+
+WEB_MERCATOR_EPSG = 3857
+
+# Radius of the sphere WebMercator projects, and half the width (and height) of the WebMercator world, in metres
+EARTH_RADIUS = 6378137.0
+WEB_MERCATOR_EXTENT = math.pi * EARTH_RADIUS
+
+DEFAULT_TILE_SIZE = 256
+
+# Deepest zoom level tile IDs (and the PMTiles Hilbert curve) can address
+MAX_ZOOM = 30
+
+
+class Tile(NamedTuple):
+    """An XYZ tile, with y counted down from the top (north) of the world."""
+
+    z: int
+    x: int
+    y: int
+
+
+class TileRange(NamedTuple):
+    """An inclusive range of the tiles at a zoom level."""
+
+    z: int
+    min_x: int
+    min_y: int
+    max_x: int
+    max_y: int
+
+    def contains(self, tile: Tile) -> bool:
+        return tile.z == self.z and self.min_x <= tile.x <= self.max_x and self.min_y <= tile.y <= self.max_y
+
+    @property
+    def tile_count(self) -> int:
+        return (self.max_x - self.min_x + 1) * (self.max_y - self.min_y + 1)
+
+    def iter_tiles(self) -> Iterator[Tile]:
+        """Iterate over the tiles of the range, row by row."""
+        for y in range(self.min_y, self.max_y + 1):
+            for x in range(self.min_x, self.max_x + 1):
+                yield Tile(self.z, x, y)
+
+
+def get_tile_resolution(zoom: int, tile_size: int = DEFAULT_TILE_SIZE) -> float:
+    """The size (in metres) of a pixel of a tile at a zoom level."""
+    return 2 * WEB_MERCATOR_EXTENT / (tile_size * 2**zoom)
+
+
+def get_tile_bounds(tile: Tile) -> tuple[float, float, float, float]:
+    """The (min_x, min_y, max_x, max_y) bounds of a tile, in WebMercator metres."""
+    tile_width = 2 * WEB_MERCATOR_EXTENT / 2**tile.z
+    min_x = -WEB_MERCATOR_EXTENT + tile.x * tile_width
+    max_y = WEB_MERCATOR_EXTENT - tile.y * tile_width
+
+    return min_x, max_y - tile_width, min_x + tile_width, max_y
+
+
+def get_lon_lat_bounds(bounds: tuple[float, float, float, float]) -> tuple[float, float, float, float]:
+    """Convert (min_x, min_y, max_x, max_y) WebMercator bounds to (min_lon, min_lat, max_lon, max_lat) bounds."""
+    min_x, min_y, max_x, max_y = bounds
+
+    def to_lon(x: float) -> float:
+        return math.degrees(x / EARTH_RADIUS)
+
+    def to_lat(y: float) -> float:
+        return math.degrees(2 * math.atan(math.exp(y / EARTH_RADIUS)) - math.pi / 2)
+
+    return to_lon(min_x), to_lat(min_y), to_lon(max_x), to_lat(max_y)
+
+
+def clamp_to_world(bounds: tuple[float, float, float, float]) -> tuple[float, float, float, float]:
+    """Clamp (min_x, min_y, max_x, max_y) WebMercator bounds to the extent of the WebMercator world."""
+    min_x, min_y, max_x, max_y = bounds
+    return (
+        max(min_x, -WEB_MERCATOR_EXTENT),
+        max(min_y, -WEB_MERCATOR_EXTENT),
+        min(max_x, WEB_MERCATOR_EXTENT),
+        min(max_y, WEB_MERCATOR_EXTENT),
+    )
+
+
+def get_tile_range(bounds: tuple[float, float, float, float], zoom: int) -> TileRange:
+    """Find the tiles at a zoom level which intersect (min_x, min_y, max_x, max_y) WebMercator bounds.
+
+    Raises:
+        ValueError: The zoom level isn't between 0 and MAX_ZOOM.
+
+    """
+    if not 0 <= zoom <= MAX_ZOOM:
+        raise ValueError(f"The zoom level {zoom} should be between 0 and {MAX_ZOOM}.")
+
+    min_x, min_y, max_x, max_y = bounds
+    tile_count = 2**zoom
+    tile_width = 2 * WEB_MERCATOR_EXTENT / tile_count
+
+    def clamp(index: float) -> int:
+        return min(max(int(index), 0), tile_count - 1)
+
+    # Bounds touching the edge of a tile don't include the tile beyond it
+    return TileRange(
+        z=zoom,
+        min_x=clamp(math.floor((min_x + WEB_MERCATOR_EXTENT) / tile_width)),
+        min_y=clamp(math.floor((WEB_MERCATOR_EXTENT - max_y) / tile_width)),
+        max_x=clamp(math.ceil((max_x + WEB_MERCATOR_EXTENT) / tile_width) - 1),
+        max_y=clamp(math.ceil((WEB_MERCATOR_EXTENT - min_y) / tile_width) - 1),
+    )
+
+
+def get_children(tile: Tile) -> list[Tile]:
+    """The four tiles at the next zoom level covering a tile, in the order upper left, upper right, lower left and
+    lower right."""
+    z, x, y = tile.z + 1, tile.x * 2, tile.y * 2
+    return [Tile(z, x, y), Tile(z, x + 1, y), Tile(z, x, y + 1), Tile(z, x + 1, y + 1)]
+
+
+def get_parent(tile: Tile) -> Tile:
+    """The tile at the previous zoom level covering a tile."""
+    return Tile(tile.z - 1, tile.x // 2, tile.y // 2)
+
+
+def to_tms_y(tile: Tile) -> int:
+    """The row of a tile in the TMS scheme (used by MBTiles), with y counted up from the bottom (south) of the world."""
+    return 2**tile.z - 1 - tile.y
+
+
+def get_tile_id(tile: Tile) -> int:
+    """The PMTiles ID of a tile: its position along the Hilbert curve of its zoom level, after every tile of the
+    lower zoom levels."""
+    tile_id = (4**tile.z - 1) // 3
+    x, y = tile.x, tile.y
+    size = 2**tile.z
+
+    scale = size // 2
+    while scale > 0:
+        rx = 1 if x & scale else 0
+        ry = 1 if y & scale else 0
+        tile_id += scale * scale * ((3 * rx) ^ ry)
+
+        # Rotate the quadrant, so the curve is continuous
+        if ry == 0:
+            if rx == 1:
+                x, y = size - 1 - x, size - 1 - y
+            x, y = y, x
+        scale //= 2
+
+    return tile_id
@@ -0,0 +1,235 @@
+import struct
+from typing import Any
+
+# Geometry types of Mapbox Vector Tile features
+POINT = 1
+LINESTRING = 2
+POLYGON = 3
+
+MVT_VERSION = 2
+DEFAULT_EXTENT = 4096
+
+# Commands of the geometry encoding
+MOVE_TO = 1
+LINE_TO = 2
+CLOSE_PATH = 7
+
+# Protobuf wire types
+VARINT = 0
+FIXED64 = 1
+LENGTH_DELIMITED = 2
+
+Coords = list[tuple[int, int]]
+
+
+class VectorTileLayer:
+    """A layer of a Mapbox Vector Tile (version 2), with its features' attribute keys and values deduplicated.
+
+    Features are added with their geometry already in tile coordinates, i.e. integers from 0 to the extent, with y
+    counted down from the top of the tile.
+
+    Args:
+        name: Name of the layer.
+        extent: Width and height of the tile in tile coordinates. Defaults to DEFAULT_EXTENT.
+
+    """
+
+    def __init__(self, name: str, extent: int = DEFAULT_EXTENT):
+        self.name = name
+        self.extent = extent
+        self.features: list[bytes] = []
+        self._keys: dict[str, int] = {}
+        self._values: dict[tuple[type, Any], int] = {}
+
+    def add_points(self, points: Coords, attributes: dict[str, Any], fid: int | None = None) -> None:
+        """Add a point (or multipoint) feature."""
+        if points:
+            self._add_feature(POINT, encode_points(points), attributes, fid)
+
+    def add_lines(self, lines: list[Coords], attributes: dict[str, Any], fid: int | None = None) -> None:
+        """Add a linestring (or multilinestring) feature. Lines with fewer than two distinct points are dropped."""
+        commands = encode_lines(lines)
+        if commands:
+            self._add_feature(LINESTRING, commands, attributes, fid)
+
+    def add_polygons(self, polygons: list[list[Coords]], attributes: dict[str, Any], fid: int | None = None) -> None:
+        """Add a polygon (or multipolygon) feature, each polygon given as its exterior ring followed by any interior
+        rings. Rings which collapse to no area are dropped, along with polygons whose exterior ring collapses."""
+        commands = encode_polygons(polygons)
+        if commands:
+            self._add_feature(POLYGON, commands, attributes, fid)
+
+    def encode(self) -> bytes:
+        data = bytearray()
+        _write_field(data, 15, VARINT, MVT_VERSION)
+        _write_field(data, 1, LENGTH_DELIMITED, self.name.encode())
+        for feature in self.features:
+            _write_field(data, 2, LENGTH_DELIMITED, feature)
+        for key in self._keys:
+            _write_field(data, 3, LENGTH_DELIMITED, key.encode())
+        for value_type, value in self._values:
+            _write_field(data, 4, LENGTH_DELIMITED, _encode_value(value_type, value))
+        _write_field(data, 5, VARINT, self.extent)
+
+        return bytes(data)
+
+    def _add_feature(
+        self, geometry_type: int, commands: list[int], attributes: dict[str, Any], fid: int | None
+    ) -> None:
+        tags = []
+        for key, value in attributes.items():
+            if value is None:
+                continue
+
+            tags.append(self._keys.setdefault(key, len(self._keys)))
+            tags.append(self._values.setdefault((type(value), value), len(self._values)))
+
+        data = bytearray()
+        if fid is not None and fid >= 0:
+            _write_field(data, 1, VARINT, fid)
+        if tags:
+            _write_field(data, 2, LENGTH_DELIMITED, _pack_varints(tags))
+        _write_field(data, 3, VARINT, geometry_type)
+        _write_field(data, 4, LENGTH_DELIMITED, _pack_varints(commands))
+
+        self.features.append(bytes(data))
+
+
+def encode_tile(layers: list[VectorTileLayer]) -> bytes:
+    """Encode the layers with features into a Mapbox Vector Tile."""
+    data = bytearray()
+    for layer in layers:
+        if layer.features:
+            _write_field(data, 3, LENGTH_DELIMITED, layer.encode())
+
+    return bytes(data)
+
+
+def encode_points(points: Coords) -> list[int]:
+    """Encode points as a single MoveTo command."""
+    commands = [_command(MOVE_TO, len(points))]
+    cursor = (0, 0)
+    for point in points:
+        commands.extend(_delta(cursor, point))
+        cursor = point
+
+    return commands
+
+
+def encode_lines(lines: list[Coords]) -> list[int]:
+    """Encode lines as a MoveTo and LineTo command each, dropping repeated points."""
+    commands: list[int] = []
+    cursor = (0, 0)
+    for line in lines:
+        points = _remove_repeated_points(line)
+        if len(points) >= 2:
+            cursor = _append_path(commands, cursor, points, close=False)
+
+    return commands
+
+
+def encode_polygons(polygons: list[list[Coords]]) -> list[int]:
+    """Encode polygons as a MoveTo, LineTo and ClosePath command per ring.
+
+    The rings are reoriented as the specification requires: exterior rings have a positive (clockwise, as y points
+    down) area and interior rings a negative area.
+    """
+    commands: list[int] = []
+    cursor = (0, 0)
+    for polygon in polygons:
+        for index, ring in enumerate(polygon):
+            points = _remove_repeated_points(ring)
+            if len(points) > 1 and points[0] == points[-1]:
+                points = points[:-1]
+
+            area = get_ring_area(points)
+            if len(points) < 3 or area == 0:
+                # Interior rings are dropped on their own, but a collapsed exterior ring drops the whole polygon
+                if index == 0:
+                    break
+                continue
+
+            if (area > 0) != (index == 0):
+                points = points[::-1]
+
+            cursor = _append_path(commands, cursor, points, close=True)
+
+    return commands
+
+
+def get_ring_area(ring: Coords) -> float:
+    """The signed area of a ring, positive when it's clockwise in tile coordinates (with y pointing down)."""
+    return sum(x1 * y2 - x2 * y1 for (x1, y1), (x2, y2) in zip(ring, [*ring[1:], ring[0]])) / 2 if ring else 0
+
+
+def zigzag(value: int) -> int:
+    """Map a signed integer onto an unsigned one, so small magnitudes encode to short varints."""
+    return (value << 1) ^ (value >> 63)
+
+
+def _command(command_id: int, count: int) -> int:
+    return (command_id & 0x7) | (count << 3)
+
+
+def _delta(cursor: tuple[int, int], point: tuple[int, int]) -> tuple[int, int]:
+    return zigzag(point[0] - cursor[0]), zigzag(point[1] - cursor[1])
+
+
+def _append_path(commands: list[int], cursor: tuple[int, int], points: Coords, close: bool) -> tuple[int, int]:
+    """Append the commands drawing a line or ring from the cursor, returning the new position of the cursor."""
+    commands.append(_command(MOVE_TO, 1))
+    commands.extend(_delta(cursor, points[0]))
+    commands.append(_command(LINE_TO, len(points) - 1))
+    for previous, point in zip(points, points[1:]):
+        commands.extend(_delta(previous, point))
+    if close:
+        commands.append(_command(CLOSE_PATH, 1))
+
+    return points[-1]
+
+
+def _remove_repeated_points(coords: Coords) -> Coords:
+    return [point for index, point in enumerate(coords) if index == 0 or point != coords[index - 1]]
+
+
+def _encode_value(value_type: type, value: Any) -> bytes:
+    data = bytearray()
+    if value_type is bool:
+        _write_field(data, 7, VARINT, int(value))
+    elif value_type is int:
+        if value >= 0:
+            _write_field(data, 5, VARINT, value)
+        else:
+            _write_field(data, 6, VARINT, zigzag(value))
+    elif value_type is float:
+        _write_field(data, 3, FIXED64, struct.pack("<d", value))
+    else:
+        _write_field(data, 1, LENGTH_DELIMITED, str(value).encode())
+
+    return bytes(data)
+
+
+def _write_field(data: bytearray, field_number: int, wire_type: int, value: int | bytes) -> None:
+    _write_varint(data, (field_number << 3) | wire_type)
+    if wire_type == VARINT:
+        _write_varint(data, value)
+    elif wire_type == LENGTH_DELIMITED:
+        _write_varint(data, len(value))
+        data += value
+    else:
+        data += value
+
+
+def _pack_varints(values: list[int]) -> bytes:
+    data = bytearray()
+    for value in values:
+        _write_varint(data, value)
+
+    return bytes(data)
+
+
+def _write_varint(data: bytearray, value: int) -> None:
+    while value >= 0x80:
+        data.append((value & 0x7F) | 0x80)
+        value >>= 7
+    data.append(value)
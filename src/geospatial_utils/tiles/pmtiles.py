@@ -0,0 +1,183 @@
+import gzip
+import struct
+from typing import NamedTuple
+
+PMTILES_MAGIC = b"PMTiles"
+PMTILES_VERSION = 3
+
+# The header is followed by the root directory, which must fit within the first 16 KiB of the archive
+HEADER_SIZE = 127
+MAX_ROOT_DIRECTORY_SIZE = 16_384 - HEADER_SIZE
+
+# Number of entries in each leaf directory when the root directory overflows, doubled until the root fits
+DEFAULT_LEAF_SIZE = 4096
+
+# Values of the compression and tile type fields of the header
+COMPRESSION_CODES = {"unknown": 0, "none": 1, "gzip": 2, "brotli": 3, "zstd": 4}
+TILE_TYPE_CODES = {"pbf": 1, "png": 2, "jpg": 3, "webp": 4, "avif": 5}
+
+HEADER_FORMAT = "<7sB11Q6B4iB2i"
+
+
+class Entry(NamedTuple):
+    """A directory entry: a run of tiles sharing the same content, or (with a run length of 0) a leaf directory."""
+
+    tile_id: int
+    offset: int
+    length: int
+    run_length: int
+
+
+class Header(NamedTuple):
+    root_offset: int
+    root_length: int
+    metadata_offset: int
+    metadata_length: int
+    leaf_directory_offset: int
+    leaf_directory_length: int
+    tile_data_offset: int
+    tile_data_length: int
+    addressed_tiles_count: int
+    tile_entries_count: int
+    tile_contents_count: int
+    clustered: bool
+    internal_compression: int
+    tile_compression: int
+    tile_type: int
+    min_zoom: int
+    max_zoom: int
+    min_lon_e7: int
+    min_lat_e7: int
+    max_lon_e7: int
+    max_lat_e7: int
+    center_zoom: int
+    center_lon_e7: int
+    center_lat_e7: int
+
+
+def pack_header(header: Header) -> bytes:
+    return struct.pack(HEADER_FORMAT, PMTILES_MAGIC, PMTILES_VERSION, *header)
+
+
+def unpack_header(data: bytes) -> Header:
+    """Read the header from the start of a PMTiles archive.
+
+    Raises:
+        ValueError: The data isn't a version 3 PMTiles archive.
+
+    """
+    magic, version, *fields = struct.unpack(HEADER_FORMAT, data[:HEADER_SIZE])
+    if magic != PMTILES_MAGIC or version != PMTILES_VERSION:
+        raise ValueError("The data is not a version 3 PMTiles archive.")
+
+    fields[11] = bool(fields[11])
+    return Header(*fields)
+
+
+def serialise_directory(entries: list[Entry]) -> bytes:
+    """Encode directory entries (sorted by tile ID) as gzip compressed columns of varints, as the spec requires.
+
+    Tile IDs are delta encoded, and offsets which directly follow the previous entry are encoded as 0.
+    """
+    data = bytearray()
+    _write_varint(data, len(entries))
+
+    previous_id = 0
+    for entry in entries:
+        _write_varint(data, entry.tile_id - previous_id)
+        previous_id = entry.tile_id
+
+    for entry in entries:
+        _write_varint(data, entry.run_length)
+    for entry in entries:
+        _write_varint(data, entry.length)
+
+    for index, entry in enumerate(entries):
+        previous = entries[index - 1] if index else None
+        if previous is not None and entry.offset == previous.offset + previous.length:
+            _write_varint(data, 0)
+        else:
+            _write_varint(data, entry.offset + 1)
+
+    return gzip.compress(bytes(data), mtime=0)
+
+
+def deserialise_directory(data: bytes) -> list[Entry]:
+    """Decode a gzip compressed directory, see serialise_directory."""
+    data = gzip.decompress(data)
+    position = 0
+
+    def read() -> int:
+        nonlocal position
+        value, position = _read_varint(data, position)
+        return value
+
+    count = read()
+    tile_ids = []
+    tile_id = 0
+    for _ in range(count):
+        tile_id += read()
+        tile_ids.append(tile_id)
+
+    run_lengths = [read() for _ in range(count)]
+    lengths = [read() for _ in range(count)]
+
+    entries: list[Entry] = []
+    for index in range(count):
+        value = read()
+        if value == 0 and index > 0:
+            offset = entries[-1].offset + entries[-1].length
+        else:
+            offset = value - 1
+        entries.append(Entry(tile_ids[index], offset, lengths[index], run_lengths[index]))
+
+    return entries
+
+
+def build_directories(entries: list[Entry], leaf_size: int = DEFAULT_LEAF_SIZE) -> tuple[bytes, bytes]:
+    """Build the root directory, splitting the entries into leaf directories if they don't fit within the root.
+
+    Args:
+        entries: The tile entries, sorted by tile ID.
+        leaf_size: Initial number of entries per leaf directory. Defaults to DEFAULT_LEAF_SIZE.
+
+    Returns:
+        The serialised root directory, and the concatenated serialised leaf directories (empty if there are none). The
+        offsets of the leaf entries within the root are relative to the start of the leaf directories.
+
+    """
+    root = serialise_directory(entries)
+    if len(root) <= MAX_ROOT_DIRECTORY_SIZE:
+        return root, b""
+
+    while True:
+        root_entries = []
+        leaves = bytearray()
+        for start in range(0, len(entries), leaf_size):
+            leaf = serialise_directory(entries[start : start + leaf_size])
+            root_entries.append(Entry(entries[start].tile_id, len(leaves), len(leaf), 0))
+            leaves += leaf
+
+        root = serialise_directory(root_entries)
+        if len(root) <= MAX_ROOT_DIRECTORY_SIZE:
+            return root, bytes(leaves)
+
+        leaf_size *= 2
+
+
+def _write_varint(data: bytearray, value: int) -> None:
+    while value >= 0x80:
+        data.append((value & 0x7F) | 0x80)
+        value >>= 7
+    data.append(value)
+
+
+def _read_varint(data: bytes, position: int) -> tuple[int, int]:
+    value = shift = 0
+    while True:
+        byte = data[position]
+        position += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, position
+        shift += 7
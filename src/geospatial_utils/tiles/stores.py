@@ -0,0 +1,366 @@
+import gzip
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from types import TracebackType
+from typing import Any
+
+from geospatial_utils.tiles.grid import Tile, get_lon_lat_bounds, get_tile_bounds, get_tile_id, to_tms_y
+from geospatial_utils.tiles.pmtiles import (
+    COMPRESSION_CODES,
+    HEADER_SIZE,
+    TILE_TYPE_CODES,
+    Entry,
+    Header,
+    build_directories,
+    pack_header,
+)
+
+PNG_FORMAT = "png"
+WEBP_FORMAT = "webp"
+MVT_FORMAT = "pbf"
+TILE_FORMATS = (PNG_FORMAT, WEBP_FORMAT, MVT_FORMAT)
+
+MBTILES_SUFFIX = ".mbtiles"
+PMTILES_SUFFIX = ".pmtiles"
+
+CREATE_MBTILES_TABLES = """
+CREATE TABLE IF NOT EXISTS metadata (name TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE IF NOT EXISTS tiles (
+    zoom_level INTEGER NOT NULL,
+    tile_column INTEGER NOT NULL,
+    tile_row INTEGER NOT NULL,
+    tile_data BLOB NOT NULL,
+    PRIMARY KEY (zoom_level, tile_column, tile_row)
+);
+"""
+
+# Number of tiles inserted into an MBTiles archive per transaction
+MBTILES_BATCH_SIZE = 1000
+
+
+class TileStore(ABC):
+    """Stores encoded tiles, either as files within a directory or within a single file archive.
+
+    Tiles can be written from multiple threads at once. The store must be closed (or used as a context manager) to
+    finish writing it. When used as a context manager and an exception is raised, the store is discarded instead, so
+    an incomplete tileset never replaces an existing one.
+
+    Args:
+        tile_format: Format of the tiles, one of TILE_FORMATS.
+        metadata: Optional metadata describing the tileset, e.g. its name, description and (for vector tiles) its
+            vector_layers. The zoom levels and bounds are added from the tiles written.
+
+    """
+
+    def __init__(self, tile_format: str, metadata: dict[str, Any] | None = None):
+        if tile_format not in TILE_FORMATS:
+            raise ValueError(f"{tile_format} is not a valid tile format, it should be one of {TILE_FORMATS}.")
+
+        self.tile_format = tile_format
+        self.metadata = dict(metadata or {})
+        self.tile_count = 0
+        self._lock = threading.Lock()
+        self._zooms: set[int] = set()
+        self._bounds: list[float] | None = None
+
+    def __enter__(self) -> "TileStore":
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+    def write(self, tile: Tile, data: bytes) -> None:
+        """Write an encoded tile."""
+        with self._lock:
+            self._write(tile, data)
+            self.tile_count += 1
+            self._zooms.add(tile.z)
+
+            min_x, min_y, max_x, max_y = get_tile_bounds(tile)
+            if self._bounds is None:
+                self._bounds = [min_x, min_y, max_x, max_y]
+            else:
+                self._bounds = [
+                    min(self._bounds[0], min_x),
+                    min(self._bounds[1], min_y),
+                    max(self._bounds[2], max_x),
+                    max(self._bounds[3], max_y),
+                ]
+
+    @abstractmethod
+    def close(self) -> None:
+        """Finish writing the store, replacing any existing output."""
+
+    def discard(self) -> None:
+        """Abandon writing the store, leaving any existing output untouched."""
+
+    @abstractmethod
+    def _write(self, tile: Tile, data: bytes) -> None:
+        pass
+
+    def get_metadata(self) -> dict[str, Any]:
+        """The metadata of the tileset, with the zoom levels, lon/lat bounds and centre of the tiles written."""
+        metadata = {"format": self.tile_format, **self.metadata}
+        if self._zooms:
+            min_lon, min_lat, max_lon, max_lat = get_lon_lat_bounds(tuple(self._bounds))
+            metadata.setdefault("minzoom", min(self._zooms))
+            metadata.setdefault("maxzoom", max(self._zooms))
+            metadata.setdefault("bounds", [min_lon, min_lat, max_lon, max_lat])
+            metadata.setdefault("center", [(min_lon + max_lon) / 2, (min_lat + max_lat) / 2, min(self._zooms)])
+
+        return metadata
+
+
+class DirectoryTileStore(TileStore):
+    """Stores each tile as a file, at {output_dir}/{z}/{x}/{y}.{tile_format}.
+
+    Args:
+        output_dir: The directory to save the tiles to.
+        tile_format: Format of the tiles, one of TILE_FORMATS.
+        metadata: Optional metadata, saved as metadata.json within the directory.
+        tms: Whether to number the rows with the TMS scheme, counting up from the south, instead of the XYZ scheme.
+            Defaults to False.
+
+    """
+
+    def __init__(
+        self, output_dir: str | Path, tile_format: str, metadata: dict[str, Any] | None = None, tms: bool = False
+    ):
+        super().__init__(tile_format, metadata)
+        self.output_dir = Path(output_dir)
+        self.tms = tms
+
+    def _write(self, tile: Tile, data: bytes) -> None:
+        tile_path = self.get_tile_path(tile)
+        tile_path.parent.mkdir(parents=True, exist_ok=True)
+        tile_path.write_bytes(data)
+
+    def get_tile_path(self, tile: Tile) -> Path:
+        y = to_tms_y(tile) if self.tms else tile.y
+        return self.output_dir.joinpath(str(tile.z), str(tile.x), f"{y}.{self.tile_format}")
+
+    def close(self) -> None:
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.output_dir.joinpath("metadata.json").write_text(json.dumps(self.get_metadata(), indent=2))
+
+
+class MBTilesStore(TileStore):
+    """Stores the tiles within an MBTiles (SQLite) archive, avoiding writing a file per tile.
+
+    Args:
+        output_path: Path to the .mbtiles archive. An existing archive is only replaced once the store is closed, as
+            the tiles are written to a temporary archive alongside it.
+        tile_format: Format of the tiles, one of TILE_FORMATS. Vector tiles must already be gzip compressed.
+        metadata: Optional metadata, saved in the metadata table.
+
+    """
+
+    def __init__(self, output_path: str | Path, tile_format: str, metadata: dict[str, Any] | None = None):
+        super().__init__(tile_format, metadata)
+        self.output_path = Path(output_path)
+        self.partial_path = get_partial_path(self.output_path)
+        self.partial_path.unlink(missing_ok=True)
+
+        self.connection = sqlite3.connect(self.partial_path, check_same_thread=False)
+        self.connection.executescript(CREATE_MBTILES_TABLES)
+        self._pending: list[tuple[int, int, int, bytes]] = []
+
+    def _write(self, tile: Tile, data: bytes) -> None:
+        self._pending.append((tile.z, tile.x, to_tms_y(tile), data))
+        if len(self._pending) >= MBTILES_BATCH_SIZE:
+            self._flush()
+
+    def _flush(self) -> None:
+        with self.connection:
+            self.connection.executemany("INSERT OR REPLACE INTO tiles VALUES (?, ?, ?, ?)", self._pending)
+        self._pending = []
+
+    def close(self) -> None:
+        self._flush()
+
+        metadata = self.get_metadata()
+        values = {
+            name: ",".join(str(item) for item in value) if isinstance(value, list) else str(value)
+            for name, value in metadata.items()
+            if name != "vector_layers"
+        }
+        if "vector_layers" in metadata:
+            values["json"] = json.dumps({"vector_layers": metadata["vector_layers"]})
+
+        with self.connection:
+            self.connection.executemany("INSERT OR REPLACE INTO metadata VALUES (?, ?)", values.items())
+        self.connection.close()
+        os.replace(self.partial_path, self.output_path)
+
+    def discard(self) -> None:
+        self.connection.close()
+        self.partial_path.unlink(missing_ok=True)
+
+
+class PMTilesStore(TileStore):
+    """Stores the tiles within a PMTiles (version 3) archive, a single file which can be served with HTTP range
+    requests straight from object storage.
+
+    Each distinct tile content is spooled to a temporary file as it's written, so repeated tiles (e.g. of the sea) are
+    only stored once. On close, the contents are copied into the archive in tile ID order (so it's clustered), after
+    the directories.
+
+    Args:
+        output_path: Path to the .pmtiles archive. An existing archive is only replaced once the store is closed.
+        tile_format: Format of the tiles, one of TILE_FORMATS.
+        metadata: Optional metadata, saved as gzip compressed JSON.
+        tile_compression: Compression already applied to the tiles, e.g. gzip for vector tiles. Defaults to none.
+
+    """
+
+    def __init__(
+        self,
+        output_path: str | Path,
+        tile_format: str,
+        metadata: dict[str, Any] | None = None,
+        tile_compression: str = "none",
+    ):
+        super().__init__(tile_format, metadata)
+        if tile_compression not in COMPRESSION_CODES:
+            raise ValueError(f"{tile_compression} is not a valid tile compression.")
+
+        self.output_path = Path(output_path)
+        self.tile_compression = tile_compression
+        self._contents_file = tempfile.TemporaryFile(dir=self.output_path.parent)
+        self._contents: dict[bytes, tuple[int, int]] = {}
+        self._tiles: list[tuple[int, int, int]] = []
+
+    def _write(self, tile: Tile, data: bytes) -> None:
+        digest = hashlib.sha256(data).digest()
+        if digest not in self._contents:
+            self._contents[digest] = (self._contents_file.tell(), len(data))
+            self._contents_file.write(data)
+
+        offset, length = self._contents[digest]
+        self._tiles.append((get_tile_id(tile), offset, length))
+
+    def close(self) -> None:
+        # Lay out each distinct content in the order of the first tile using it, merging runs of consecutive tile IDs
+        # sharing the same content
+        self._tiles.sort()
+        layout: dict[int, int] = {}
+        entries: list[Entry] = []
+        data_length = 0
+        for tile_id, spool_offset, length in self._tiles:
+            if spool_offset not in layout:
+                layout[spool_offset] = data_length
+                data_length += length
+
+            offset = layout[spool_offset]
+            previous = entries[-1] if entries else None
+            if previous is not None and previous.offset == offset and previous.tile_id + previous.run_length == tile_id:
+                entries[-1] = previous._replace(run_length=previous.run_length + 1)
+            else:
+                entries.append(Entry(tile_id, offset, length, 1))
+
+        summary = self.get_metadata()
+        root, leaves = build_directories(entries)
+        metadata = gzip.compress(json.dumps(summary).encode(), mtime=0)
+
+        metadata_offset = HEADER_SIZE + len(root)
+        leaf_offset = metadata_offset + len(metadata)
+        data_offset = leaf_offset + len(leaves)
+
+        min_lon, min_lat, max_lon, max_lat = summary.get("bounds", [0, 0, 0, 0])
+        center_lon, center_lat, center_zoom = summary.get("center", [0, 0, 0])
+        header = Header(
+            root_offset=HEADER_SIZE,
+            root_length=len(root),
+            metadata_offset=metadata_offset,
+            metadata_length=len(metadata),
+            leaf_directory_offset=leaf_offset,
+            leaf_directory_length=len(leaves),
+            tile_data_offset=data_offset,
+            tile_data_length=data_length,
+            addressed_tiles_count=len(self._tiles),
+            tile_entries_count=len(entries),
+            tile_contents_count=len(layout),
+            clustered=True,
+            internal_compression=COMPRESSION_CODES["gzip"],
+            tile_compression=COMPRESSION_CODES[self.tile_compression],
+            tile_type=TILE_TYPE_CODES[self.tile_format],
+            min_zoom=summary.get("minzoom", 0),
+            max_zoom=summary.get("maxzoom", 0),
+            min_lon_e7=round(min_lon * 1e7),
+            min_lat_e7=round(min_lat * 1e7),
+            max_lon_e7=round(max_lon * 1e7),
+            max_lat_e7=round(max_lat * 1e7),
+            center_zoom=center_zoom,
+            center_lon_e7=round(center_lon * 1e7),
+            center_lat_e7=round(center_lat * 1e7),
+        )
+
+        lengths = dict(self._contents.values())
+        partial_path = get_partial_path(self.output_path)
+        try:
+            with open(partial_path, "wb") as archive:
+                archive.write(pack_header(header) + root + metadata + leaves)
+                for spool_offset in sorted(layout, key=layout.get):
+                    self._contents_file.seek(spool_offset)
+                    archive.write(self._contents_file.read(lengths[spool_offset]))
+
+            os.replace(partial_path, self.output_path)
+        finally:
+            partial_path.unlink(missing_ok=True)
+            self._contents_file.close()
+
+    def discard(self) -> None:
+        # The spooled contents are deleted as the temporary file is closed
+        self._contents_file.close()
+
+
+def get_partial_path(output_path: Path) -> Path:
+    """The path an archive is written to before it's complete, alongside the output so it can be atomically moved."""
+    return output_path.with_name(f".{output_path.name}.partial")
+
+
+def open_tile_store(
+    output_path: str | Path,
+    tile_format: str,
+    metadata: dict[str, Any] | None = None,
+    tms: bool = False,
+    tile_compression: str = "none",
+) -> TileStore:
+    """Open the tile store for an output path: an MBTiles or PMTiles archive for the .mbtiles or .pmtiles suffixes,
+    otherwise a directory of tiles.
+
+    Args:
+        output_path: Path to the archive or directory.
+        tile_format: Format of the tiles, one of TILE_FORMATS.
+        metadata: Optional metadata describing the tileset.
+        tms: Whether to number the rows of a directory of tiles with the TMS scheme. MBTiles archives always use the
+            TMS scheme, and PMTiles archives address tiles by their tile ID. Defaults to False.
+        tile_compression: Compression already applied to the tiles, recorded in the header of PMTiles archives.
+            Defaults to none.
+
+    Returns:
+        The tile store.
+
+    """
+    suffix = Path(output_path).suffix.lower()
+    if suffix == MBTILES_SUFFIX:
+        return MBTilesStore(output_path, tile_format, metadata)
+
+    if suffix == PMTILES_SUFFIX:
+        return PMTilesStore(output_path, tile_format, metadata, tile_compression)
+
+    return DirectoryTileStore(output_path, tile_format, metadata, tms)
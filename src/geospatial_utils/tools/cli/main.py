@@ -1,9 +1,11 @@
 import argparse
 
-from geospatial_utils.tools import convert_to_cog
+from geospatial_utils.tools import convert_to_cog, export_vector, generate_tiles
 
 MODULES = [
-    convert_to_cog
+    convert_to_cog,
+    export_vector,
+    generate_tiles
 ]
 
 def construct_parser() -> argparse.Parser:
@@ -2,8 +2,28 @@
 
 import argparse
 import logging
+import os
+from collections.abc import Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from contextlib import nullcontext
 from pathlib import Path
 from types import SimpleNamespace
+from typing import NamedTuple
+
+from osgeo import gdal
+
+from geospatial_utils.raster.catalogue import RasterCatalogue
+from geospatial_utils.raster.cog import convert_to_cog
+from geospatial_utils.raster.constants import COG_DRIVER
+from geospatial_utils.raster.manifest import Fingerprint, OutputManifest, get_fingerprint
+from geospatial_utils.raster.mosaic import DEFAULT_MOSAIC_PROFILE, mosaic_to_cog
+from geospatial_utils.raster.reprojection import (
+    DEFAULT_COMPRESSION,
+    WARP_PROFILES,
+    WarpProfile,
+    get_profile_creation_options,
+    get_warp_profile,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -11,10 +31,26 @@ COMMAND = "convert_to_cog"
 DESCRIPTION = "Convert raster(s) to COG format, reprojected into EPSG 3857."
 
 DEFAULT_EPSG_CODE = 3857
+RASTER_GLOB = "*.tif"
+
+# Name of the manifest of completed conversions, saved in the output directory when running incrementally
+MANIFEST_FILENAME = ".convert_to_cog_manifest.sqlite"
+
+# Number of conversions queued per worker, so the pool is kept busy without discovering the whole directory up front
+TASKS_PER_WORKER = 2
+
+
+class ConversionResult(NamedTuple):
+    input_path: Path
+    output_path: Path
+    error: str | None = None
+
+    @property
+    def succeeded(self) -> bool:
+        return self.error is None
 
 
 def add_arguments(parser: argparse.ArgumentParser) -> argparse.ArgumentParser:
-    # Example parser entry. Delete before use
     input_group = parser.add_mutually_exclusive_group(required=True)
     input_group.add_argument("--raster_path", type=Path, help="Path to the raster to be converted")
     input_group.add_argument(
@@ -25,6 +61,11 @@ def add_arguments(parser: argparse.ArgumentParser) -> argparse.ArgumentParser:
             "will be processed."
         ),
     )
+    input_group.add_argument(
+        "--file_list",
+        type=Path,
+        help="Path to a text file listing the rasters to be converted, one path per line.",
+    )
 
     parser.add_argument(
         "--output_dir",
@@ -39,8 +80,143 @@ def add_arguments(parser: argparse.ArgumentParser) -> argparse.ArgumentParser:
         "--epsg_code",
         required=False,
         type=int,
+        default=DEFAULT_EPSG_CODE,
         help=f"The EPSG code to reproject converted data to. Defaults to {DEFAULT_EPSG_CODE}",
     )
+    parser.add_argument(
+        "--compression",
+        required=False,
+        type=str,
+        help=(
+            "Compression codec for the COG(s), e.g. DEFLATE, ZSTD or LERC. Defaults to that of the --profile, or "
+            f"{DEFAULT_COMPRESSION}"
+        ),
+    )
+    parser.add_argument(
+        "--compression_level",
+        required=False,
+        type=float,
+        help=(
+            "Compression level for DEFLATE (1-12) or ZSTD (1-22), or the maximum error for LERC. Defaults to that of "
+            "the --profile, or the COG driver default."
+        ),
+    )
+    parser.add_argument(
+        "--profile",
+        required=False,
+        choices=list(WARP_PROFILES),
+        help=(
+            "Warp performance profile, trading speed against output size. The other warp options override the "
+            "settings of the profile. Each profile uses every CPU for each raster, so is best combined with fewer "
+            f"--workers. Defaults to the GDAL defaults, or {DEFAULT_MOSAIC_PROFILE} for a --mosaic."
+        ),
+    )
+    parser.add_argument(
+        "--warp_threads",
+        required=False,
+        type=str,
+        help="Number of threads used to warp each raster, or ALL_CPUS.",
+    )
+    parser.add_argument(
+        "--warp_memory_limit",
+        required=False,
+        type=int,
+        help="Memory (in MB) the warper may use for each chunk it processes.",
+    )
+    parser.add_argument(
+        "--block_size",
+        required=False,
+        type=int,
+        help="Width and height (in pixels) of the tiles within the COG(s).",
+    )
+    parser.add_argument(
+        "--resampling",
+        required=False,
+        type=str,
+        help="Resampling algorithm used when warping, e.g. near, bilinear or cubic. Defaults to near.",
+    )
+    parser.add_argument(
+        "--overview_resampling",
+        required=False,
+        type=str,
+        help="Resampling algorithm used to compute the overviews of the COG(s), e.g. NEAREST or AVERAGE.",
+    )
+    parser.add_argument(
+        "--error_threshold",
+        required=False,
+        type=float,
+        help="Maximum error (in pixels) of the approximate warp transformer. Use 0 to transform every pixel exactly.",
+    )
+    parser.add_argument(
+        "--catalogue_path",
+        required=False,
+        type=Path,
+        help=(
+            "Path to a raster catalogue (created if it doesn't exist), used to skip rasters whose output is newer than "
+            "the raster. Any new or changed input rasters are added to the catalogue first, and rasters no longer in "
+            "--raster_dir are removed from it."
+        ),
+    )
+    parser.add_argument(
+        "--bbox",
+        required=False,
+        type=float,
+        nargs=4,
+        metavar=("MIN_LON", "MIN_LAT", "MAX_LON", "MAX_LAT"),
+        help=(
+            "Only convert (or mosaic) the input rasters which intersect this bounding box, according to the "
+            "catalogue. Requires --catalogue_path."
+        ),
+    )
+    parser.add_argument(
+        "--mosaic",
+        required=False,
+        type=str,
+        help=(
+            "Mosaic all of the rasters (e.g. adjacent tiles sharing a spatial reference) into a single COG with this "
+            "name, warping them together in one pass, instead of converting each raster separately. The mosaic is "
+            "always rebuilt from every raster (within the --bbox, if given), so it can't be combined with "
+            "--incremental."
+        ),
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help=(
+            "Record each completed conversion in a manifest within the output directory, and skip rasters which have "
+            "already been converted with the same parameters and haven't changed since. Not supported with --mosaic."
+        ),
+    )
+    parser.add_argument(
+        "--hash_inputs",
+        action="store_true",
+        help=(
+            "When running incrementally, also record a hash of the content of each raster, so rasters which have been "
+            "touched or copied without changing aren't converted again."
+        ),
+    )
+    parser.add_argument(
+        "--workers",
+        required=False,
+        type=int,
+        default=os.cpu_count(),
+        help="Number of worker processes used to convert rasters in parallel. Defaults to the number of CPUs.",
+    )
+    parser.add_argument(
+        "--gdal_cachemax",
+        required=False,
+        type=int,
+        help="GDAL block cache size (in MB) given to each worker process. Defaults to the GDAL default.",
+    )
+    parser.add_argument(
+        "--gdal_num_threads",
+        required=False,
+        type=int,
+        help=(
+            "Number of threads GDAL may use for I/O within each worker process (e.g. for compression), overriding that "
+            "of the --profile. Defaults to the number of CPUs divided by the number of workers."
+        ),
+    )
 
     return parser
 
@@ -58,15 +234,417 @@ def main() -> None:
 
 def run_from_cli(args: SimpleNamespace) -> None:
     """The entrypoint when running from the centralised CLI."""
+    profile = get_warp_profile(
+        args.profile or (DEFAULT_MOSAIC_PROFILE if args.mosaic else None),
+        warp_threads=args.warp_threads,
+        io_threads=args.gdal_num_threads,
+        warp_memory_limit=args.warp_memory_limit,
+        block_size=args.block_size,
+        resampling=args.resampling,
+        error_threshold=args.error_threshold,
+        overview_resampling=args.overview_resampling,
+    )
+
     # Call the main run function
-    run(raster_path=args.raster_path, raster_dir=args.raster_dir, output_dir=args.output_dir)
+    run(
+        raster_path=args.raster_path,
+        raster_dir=args.raster_dir,
+        file_list=args.file_list,
+        output_dir=args.output_dir,
+        epsg_code=args.epsg_code,
+        compression=args.compression,
+        compression_level=args.compression_level,
+        catalogue_path=args.catalogue_path,
+        bbox=args.bbox,
+        mosaic=args.mosaic,
+        profile=profile,
+        incremental=args.incremental,
+        hash_inputs=args.hash_inputs,
+        workers=args.workers,
+        gdal_cachemax=args.gdal_cachemax,
+        gdal_num_threads=args.gdal_num_threads,
+    )
+
+
+def run(
+    raster_path: str | Path | None,
+    raster_dir: str | Path | None,
+    output_dir: str | Path,
+    file_list: str | Path | None = None,
+    epsg_code: int = DEFAULT_EPSG_CODE,
+    compression: str | None = None,
+    compression_level: int | float | None = None,
+    catalogue_path: str | Path | None = None,
+    bbox: tuple[float, float, float, float] | None = None,
+    mosaic: str | None = None,
+    profile: WarpProfile | str | None = None,
+    incremental: bool = False,
+    hash_inputs: bool = False,
+    workers: int | None = None,
+    gdal_cachemax: int | None = None,
+    gdal_num_threads: int | None = None,
+) -> None:
+    """The main run function.
 
+    Args:
+        raster_path: Path to a single raster to convert. One of raster_path, raster_dir or file_list must be provided.
+        raster_dir: Directory of rasters to convert.
+        output_dir: Directory to save the converted raster(s) to.
+        file_list: Text file listing the rasters to convert, one path per line.
+        epsg_code: EPSG code to reproject the converted rasters to. Defaults to DEFAULT_EPSG_CODE.
+        compression: Compression codec for the COGs. Defaults to that of the profile.
+        compression_level: Compression level (or maximum error for LERC) for the COGs. Defaults to that of the profile.
+        catalogue_path: Optional path to a RasterCatalogue, used to skip rasters whose output is already up to date.
+            The input rasters are added to it before converting, and it's refreshed with the rasters in raster_dir.
+        bbox: Optional (min_lon, min_lat, max_lon, max_lat) bounding box. Only the rasters the catalogue finds
+            intersecting it are converted. Requires catalogue_path.
+        mosaic: Optional name of a single COG to mosaic all of the rasters into (see mosaic_to_cog), instead of
+            converting each raster separately. The rasters can still be selected by bbox, but aren't skipped as up to
+            date, as the mosaic is always rebuilt from all of them.
+        profile: The WarpProfile, or the name of one of the WARP_PROFILES. Defaults to DEFAULT_PROFILE, or
+            DEFAULT_MOSAIC_PROFILE when mosaicking.
+        incremental: Whether to record completed conversions in a manifest within the output directory (see
+            MANIFEST_FILENAME), skipping rasters which have already been converted with the same parameters and
+            haven't changed since. Not supported when mosaicking. Defaults to False.
+        hash_inputs: Whether to record (and compare) a hash of the content of each raster when running incrementally.
+            Defaults to False.
+        workers: Number of worker processes. Defaults to the number of CPUs.
+        gdal_cachemax: GDAL block cache size (in MB) for each worker. Defaults to the GDAL default.
+        gdal_num_threads: Number of GDAL threads for each worker. Defaults to the CPUs shared between the workers.
 
-def run(raster_path:str |  Path, raster_dir: str | Path, output_dir: str | Path) -> None:
-    """The main run function."""
+    Raises:
+        ValueError: None of raster_path, raster_dir or file_list has been provided.
+        ValueError: A bbox has been provided without a catalogue_path.
+        ValueError: Both a mosaic and incremental have been provided.
+
+    """
     logging.info("Converting to COG")
 
-    logging.info("Finished")
+    if raster_path:
+        raster_paths = [Path(raster_path)]
+    elif raster_dir:
+        raster_paths = find_rasters(raster_dir)
+    elif file_list:
+        raster_paths = read_file_list(file_list)
+    else:
+        raise ValueError("Either a raster_path, raster_dir or file_list should be provided.")
+
+    if bbox and not catalogue_path:
+        raise ValueError("A catalogue_path is required to select rasters by bbox.")
+
+    if mosaic and incremental:
+        raise ValueError("A mosaic can't be made incrementally, as it's always rebuilt from all of its rasters.")
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    if catalogue_path:
+        with RasterCatalogue(catalogue_path) as catalogue:
+            if raster_dir:
+                catalogue.refresh(raster_dir, RASTER_GLOB, recursive=False)
+            else:
+                catalogue.add(raster_paths)
+
+            if bbox:
+                raster_paths = select_rasters_in_bbox(raster_paths, catalogue, bbox)
+
+            if not mosaic:
+                raster_paths = skip_up_to_date_rasters(raster_paths, output_dir, epsg_code, catalogue)
+
+    if mosaic:
+        profile = profile or DEFAULT_MOSAIC_PROFILE
+
+    profile = get_warp_profile(profile, compression=compression, compression_level=compression_level)
+
+    if mosaic:
+        output_path = get_output_path(Path(f"{mosaic}.tif"), output_dir, epsg_code)
+        convert_mosaic(raster_paths, output_path, epsg_code, profile)
+        logging.info(f"Finished. Mosaicked the rasters into {output_path}.")
+        return
+
+    parameters = get_conversion_parameters(epsg_code, profile)
+    fingerprints: dict[Path, Fingerprint] = {}
+
+    with OutputManifest(output_dir.joinpath(MANIFEST_FILENAME)) if incremental else nullcontext() as manifest:
+        if manifest is not None:
+            raster_paths = skip_completed_rasters(
+                raster_paths, output_dir, epsg_code, manifest, parameters, fingerprints, hash_inputs
+            )
+
+        converted = failed = 0
+        for result in convert_rasters(
+            raster_paths,
+            output_dir=output_dir,
+            epsg_code=epsg_code,
+            profile=profile,
+            workers=workers,
+            gdal_cachemax=gdal_cachemax,
+            gdal_num_threads=gdal_num_threads,
+        ):
+            fingerprint = fingerprints.pop(result.input_path, None)
+            if result.succeeded:
+                converted += 1
+                logger.info(f"Converted {result.input_path} to {result.output_path}")
+
+                if manifest is not None:
+                    manifest.record(result.input_path, result.output_path, parameters, fingerprint)
+            else:
+                failed += 1
+                logger.error(f"Failed to convert {result.input_path}: {result.error}")
+
+    logging.info(f"Finished. Converted {converted} raster(s), {failed} failed.")
+
+
+def find_rasters(raster_dir: str | Path) -> Iterator[Path]:
+    """Lazily find the rasters to be converted within a directory.
+
+    Args:
+        raster_dir: Directory to search for .tif files.
+
+    Yields:
+        Path to each raster found.
+
+    """
+    for raster_path in Path(raster_dir).glob(RASTER_GLOB):
+        if raster_path.is_file():
+            yield raster_path
+
+
+def read_file_list(file_list: str | Path) -> list[Path]:
+    """Read the paths listed in a text file, one per line, ignoring blank lines."""
+    with open(file_list) as file:
+        return [Path(line.strip()) for line in file if line.strip()]
+
+
+def select_rasters_in_bbox(
+    raster_paths: Iterable[Path], catalogue: RasterCatalogue, bbox: tuple[float, float, float, float]
+) -> list[Path]:
+    """Filter the rasters down to those which the catalogue finds intersecting a (lon/lat) bounding box."""
+    intersecting = {entry.path for entry in catalogue.query(bbox)}
+    raster_paths = [raster_path for raster_path in raster_paths if str(raster_path.absolute()) in intersecting]
+
+    logger.info(f"{len(raster_paths)} raster(s) intersect the bbox {bbox}.")
+    return raster_paths
+
+
+def skip_up_to_date_rasters(
+    raster_paths: Iterable[Path], output_dir: str | Path, epsg_code: int, catalogue: RasterCatalogue
+) -> list[Path]:
+    """Filter out the rasters whose output is newer than the raster, according to a raster catalogue.
+
+    Args:
+        raster_paths: The rasters to be converted.
+        output_dir: Directory the converted rasters are saved to.
+        epsg_code: EPSG code the rasters are reprojected to.
+        catalogue: The RasterCatalogue, already refreshed with the rasters.
+
+    Returns:
+        The rasters which still need converting.
+
+    """
+    raster_paths = [
+        raster_path
+        for raster_path in raster_paths
+        if not catalogue.is_output_up_to_date(raster_path, get_output_path(raster_path, output_dir, epsg_code))
+    ]
+
+    logger.info(f"{len(raster_paths)} raster(s) need converting, the others are up to date.")
+    return raster_paths
+
+
+def get_conversion_parameters(epsg_code: int, profile: WarpProfile) -> dict[str, int | float | str | list[str] | None]:
+    """The parameters which determine the content of a converted raster, as recorded in the manifest."""
+    return {
+        "epsg_code": epsg_code,
+        "compression": profile.compression,
+        "compression_level": profile.compression_level,
+        "resampling": profile.resampling,
+        "error_threshold": profile.error_threshold,
+        "creation_options": get_profile_creation_options(COG_DRIVER, profile),
+    }
+
+
+def skip_completed_rasters(
+    raster_paths: Iterable[Path],
+    output_dir: str | Path,
+    epsg_code: int,
+    manifest: OutputManifest,
+    parameters: dict,
+    fingerprints: dict[Path, Fingerprint],
+    hash_inputs: bool = False,
+) -> Iterator[Path]:
+    """Lazily filter out the rasters whose conversion has already been completed, according to a manifest.
+
+    The fingerprint of each raster which still needs converting is taken before it's yielded, and stored in the
+    fingerprints dictionary so it can be recorded once the conversion completes.
+
+    Args:
+        raster_paths: The rasters to be converted.
+        output_dir: Directory the converted rasters are saved to.
+        epsg_code: EPSG code the rasters are reprojected to.
+        manifest: The manifest of completed conversions.
+        parameters: The conversion parameters, see get_conversion_parameters.
+        fingerprints: Dictionary the fingerprint of each yielded raster is stored in.
+        hash_inputs: Whether to hash the content of the rasters. Defaults to False.
+
+    Yields:
+        Path to each raster which still needs converting.
+
+    """
+    skipped = 0
+    for raster_path in raster_paths:
+        output_path = get_output_path(raster_path, output_dir, epsg_code)
+        if manifest.is_up_to_date(raster_path, output_path, parameters, hash_inputs):
+            skipped += 1
+            continue
+
+        fingerprints[raster_path] = get_fingerprint(raster_path, hash_inputs)
+        yield raster_path
+
+    logger.info(f"Skipped {skipped} raster(s) which were already converted.")
+
+
+def get_output_path(raster_path: str | Path, output_dir: str | Path, epsg_code: int) -> Path:
+    """Construct the path to save the converted version of a raster to."""
+    raster_path = Path(raster_path)
+    return Path(output_dir).joinpath(f"{raster_path.stem}_{epsg_code}_colourised_cog{raster_path.suffix}")
+
+
+def get_temp_path(output_path: Path) -> Path:
+    """Construct the path a raster is converted to, before it's renamed to its output path once complete."""
+    return output_path.with_name(f".{output_path.stem}.partial{output_path.suffix}")
+
+
+def convert_rasters(
+    raster_paths: Iterable[Path],
+    output_dir: str | Path,
+    epsg_code: int = DEFAULT_EPSG_CODE,
+    compression: str | None = None,
+    compression_level: int | float | None = None,
+    profile: WarpProfile | str | None = None,
+    workers: int | None = None,
+    gdal_cachemax: int | None = None,
+    gdal_num_threads: int | None = None,
+) -> Iterator[ConversionResult]:
+    """Convert rasters to COGs using a pool of worker processes, yielding each result as soon as it completes.
+
+    The raster paths are consumed lazily, with only a small number of conversions queued per worker at any one time.
+    A failure to convert one raster is captured within its ConversionResult and does not stop the other conversions.
+
+    Args:
+        raster_paths: The rasters to convert.
+        output_dir: Directory to save the converted rasters to.
+        epsg_code: EPSG code to reproject the converted rasters to. Defaults to DEFAULT_EPSG_CODE.
+        compression: Compression codec for the COGs. Defaults to that of the profile.
+        compression_level: Compression level (or maximum error for LERC) for the COGs. Defaults to that of the profile.
+        profile: The WarpProfile, or the name of one of the WARP_PROFILES. Defaults to DEFAULT_PROFILE.
+        workers: Number of worker processes. Defaults to the number of CPUs.
+        gdal_cachemax: GDAL block cache size (in MB) for each worker. Defaults to the GDAL default.
+        gdal_num_threads: Number of GDAL threads for each worker. Defaults to the CPUs shared between the workers.
+
+    Yields:
+        A ConversionResult for each raster, in the order that they finish.
+
+    """
+    cpu_count = os.cpu_count() or 1
+    workers = workers or cpu_count
+    if gdal_num_threads is None:
+        gdal_num_threads = max(1, cpu_count // workers)
+
+    raster_paths = iter(raster_paths)
+    pending: dict[Future, Path] = {}
+
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_initialise_worker, initargs=(gdal_cachemax, gdal_num_threads)
+    ) as executor:
+
+        def submit_next() -> bool:
+            raster_path = next(raster_paths, None)
+            if raster_path is None:
+                return False
+
+            output_path = get_output_path(raster_path, output_dir, epsg_code)
+            future = executor.submit(
+                _convert_raster, raster_path, output_path, epsg_code, compression, compression_level, profile
+            )
+            pending[future] = raster_path
+            return True
+
+        while len(pending) < workers * TASKS_PER_WORKER and submit_next():
+            pass
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                raster_path = pending.pop(future)
+                try:
+                    yield future.result()
+                except Exception as error:
+                    # The worker itself failed (e.g. it was killed), rather than the conversion raising an error
+                    output_path = get_output_path(raster_path, output_dir, epsg_code)
+                    yield ConversionResult(raster_path, output_path, repr(error))
+
+                submit_next()
+
+
+def convert_mosaic(
+    raster_paths: Iterable[Path],
+    output_path: Path,
+    epsg_code: int = DEFAULT_EPSG_CODE,
+    profile: WarpProfile | str = DEFAULT_MOSAIC_PROFILE,
+) -> None:
+    """Mosaic rasters into a single COG, written to a temporary file and renamed once complete (see mosaic_to_cog)."""
+    temp_path = get_temp_path(output_path)
+    try:
+        mosaic_to_cog(
+            input_paths=raster_paths,
+            output_path=temp_path,
+            output_epsg_code=epsg_code,
+            profile=profile,
+        )
+        os.replace(temp_path, output_path)
+    finally:
+        temp_path.unlink(missing_ok=True)
+
+
+def _initialise_worker(gdal_cachemax: int | None, gdal_num_threads: int | None) -> None:
+    """Set the per process GDAL resource budget for a worker."""
+    if gdal_cachemax is not None:
+        gdal.SetConfigOption("GDAL_CACHEMAX", str(gdal_cachemax))
+
+    if gdal_num_threads is not None:
+        gdal.SetConfigOption("GDAL_NUM_THREADS", str(gdal_num_threads))
+
+
+def _convert_raster(
+    raster_path: Path,
+    output_path: Path,
+    epsg_code: int,
+    compression: str | None,
+    compression_level: int | float | None,
+    profile: WarpProfile | str | None,
+) -> ConversionResult:
+    """Convert a single raster within a worker process, capturing any error in the result.
+
+    The COG is written to a temporary file alongside the output and renamed once complete, so an interrupted
+    conversion never leaves a partial file at the output path.
+    """
+    temp_path = get_temp_path(output_path)
+    try:
+        convert_to_cog(
+            input_path=raster_path,
+            output_path=temp_path,
+            output_epsg_code=epsg_code,
+            compression=compression,
+            compression_level=compression_level,
+            profile=profile,
+        )
+        os.replace(temp_path, output_path)
+    except Exception as error:
+        temp_path.unlink(missing_ok=True)
+        return ConversionResult(raster_path, output_path, str(error))
+
+    return ConversionResult(raster_path, output_path)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,232 @@
+"""Export a vector layer to a cloud-friendly format: FlatGeobuf, GeoParquet or Mapbox Vector Tiles."""
+
+import argparse
+import logging
+import os
+from pathlib import Path
+from types import SimpleNamespace
+
+from geospatial_utils.tiles.stores import MBTILES_SUFFIX, MVT_FORMAT, PMTILES_SUFFIX, open_tile_store
+from geospatial_utils.vector.export import (
+    DEFAULT_PARQUET_COMPRESSION,
+    DEFAULT_ROW_GROUP_SIZE,
+    export_flatgeobuf,
+    export_geoparquet,
+)
+from geospatial_utils.vector.tiling import (
+    DEFAULT_BUFFER,
+    DEFAULT_SIMPLIFICATION,
+    VectorTileOptions,
+    generate_vector_tiles,
+)
+from geospatial_utils.vector.vector_dataset import VectorDataset
+
+logger = logging.getLogger(__name__)
+
+COMMAND = "export_vector"
+DESCRIPTION = "Export a vector layer to FlatGeobuf, GeoParquet or vector tiles (as files, MBTiles or PMTiles)."
+
+FLATGEOBUF_FORMAT = "flatgeobuf"
+GEOPARQUET_FORMAT = "geoparquet"
+MVT_EXPORT_FORMAT = "mvt"
+EXPORT_FORMATS = [FLATGEOBUF_FORMAT, GEOPARQUET_FORMAT, MVT_EXPORT_FORMAT]
+
+DEFAULT_MIN_ZOOM = 0
+DEFAULT_MAX_ZOOM = 14
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> argparse.ArgumentParser:
+    parser.add_argument("--vector_path", required=True, type=Path, help="Path to the vector dataset to export")
+    parser.add_argument(
+        "--output_path",
+        required=True,
+        type=Path,
+        help=(
+            "Path to save the export to. For vector tiles, paths ending in "
+            f"{MBTILES_SUFFIX} or {PMTILES_SUFFIX} are written as a single archive, otherwise the tiles are saved as "
+            "{z}/{x}/{y} files within this directory. For GeoParquet with multiple workers, the directory to save "
+            "the part files to."
+        ),
+    )
+    parser.add_argument("--format", required=True, choices=EXPORT_FORMATS, help="Format to export the layer to")
+    parser.add_argument(
+        "--layer_name", required=False, type=str, help="Name of the layer to export. Defaults to the first layer."
+    )
+    parser.add_argument(
+        "--where", required=False, type=str, help="Attribute filter selecting the features to export, e.g. id > 5"
+    )
+    parser.add_argument(
+        "--columns", required=False, type=str, nargs="+", help="Names of the fields to export. Defaults to all fields."
+    )
+    parser.add_argument(
+        "--min_zoom",
+        required=False,
+        type=int,
+        default=DEFAULT_MIN_ZOOM,
+        help=f"The lowest zoom level of vector tiles. Defaults to {DEFAULT_MIN_ZOOM}",
+    )
+    parser.add_argument(
+        "--max_zoom",
+        required=False,
+        type=int,
+        default=DEFAULT_MAX_ZOOM,
+        help=f"The highest zoom level of vector tiles. Defaults to {DEFAULT_MAX_ZOOM}",
+    )
+    parser.add_argument(
+        "--simplification",
+        required=False,
+        type=float,
+        default=DEFAULT_SIMPLIFICATION,
+        help=(
+            "Tolerance (in tile coordinates) vector tile geometries are simplified to at every zoom level. "
+            f"0 disables it. Defaults to {DEFAULT_SIMPLIFICATION}"
+        ),
+    )
+    parser.add_argument(
+        "--buffer",
+        required=False,
+        type=int,
+        default=DEFAULT_BUFFER,
+        help=f"Width (in tile coordinates) of the margin around each vector tile. Defaults to {DEFAULT_BUFFER}",
+    )
+    parser.add_argument(
+        "--row_group_size",
+        required=False,
+        type=int,
+        default=DEFAULT_ROW_GROUP_SIZE,
+        help=f"Number of features in each GeoParquet row group. Defaults to {DEFAULT_ROW_GROUP_SIZE}",
+    )
+    parser.add_argument(
+        "--compression",
+        required=False,
+        type=str,
+        default=DEFAULT_PARQUET_COMPRESSION,
+        help=f"Compression codec of GeoParquet columns. Defaults to {DEFAULT_PARQUET_COMPRESSION}",
+    )
+    parser.add_argument(
+        "--workers",
+        required=False,
+        type=int,
+        default=os.cpu_count(),
+        help=(
+            "Number of processes writing vector tiles or GeoParquet part files in parallel. FlatGeobuf is always "
+            "written by a single process. Defaults to the number of CPUs."
+        ),
+    )
+
+    return parser
+
+
+def main() -> None:
+    """Entrypoint to the script."""
+
+    parser = argparse.ArgumentParser(prog=COMMAND, description=DESCRIPTION)
+
+    parser = add_arguments(parser)
+    args = parser.parse_args()
+
+    run_from_cli(args)
+
+
+def run_from_cli(args: SimpleNamespace) -> None:
+    """The entrypoint when running from the centralised CLI."""
+
+    # Call the main run function
+    run(
+        vector_path=args.vector_path,
+        output_path=args.output_path,
+        export_format=args.format,
+        layer_name=args.layer_name,
+        where=args.where,
+        columns=args.columns,
+        min_zoom=args.min_zoom,
+        max_zoom=args.max_zoom,
+        simplification=args.simplification,
+        buffer=args.buffer,
+        row_group_size=args.row_group_size,
+        compression=args.compression,
+        workers=args.workers,
+    )
+
+
+def run(
+    vector_path: str | Path,
+    output_path: str | Path,
+    export_format: str,
+    layer_name: str | None = None,
+    where: str | None = None,
+    columns: list[str] | None = None,
+    min_zoom: int = DEFAULT_MIN_ZOOM,
+    max_zoom: int = DEFAULT_MAX_ZOOM,
+    simplification: float = DEFAULT_SIMPLIFICATION,
+    buffer: int = DEFAULT_BUFFER,
+    row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+    compression: str = DEFAULT_PARQUET_COMPRESSION,
+    workers: int | None = None,
+) -> None:
+    """The main run function.
+
+    Args:
+        vector_path: Path to the vector dataset to export.
+        output_path: Path to save the export to.
+        export_format: One of EXPORT_FORMATS.
+        layer_name: Name of the layer to export. Defaults to the first layer.
+        where: Optional attribute filter selecting the features to export.
+        columns: Optional list of the names of the fields to export. Defaults to all fields.
+        min_zoom: The lowest zoom level of vector tiles. Defaults to DEFAULT_MIN_ZOOM.
+        max_zoom: The highest zoom level of vector tiles. Defaults to DEFAULT_MAX_ZOOM.
+        simplification: Tolerance (in tile coordinates) of vector tile simplification. Defaults to
+            DEFAULT_SIMPLIFICATION.
+        buffer: Width of the margin around each vector tile. Defaults to DEFAULT_BUFFER.
+        row_group_size: Number of features in each GeoParquet row group. Defaults to DEFAULT_ROW_GROUP_SIZE.
+        compression: Compression codec of GeoParquet columns. Defaults to DEFAULT_PARQUET_COMPRESSION.
+        workers: Number of processes. Defaults to the number of CPUs.
+
+    Raises:
+        IOError: The vector dataset does not exist.
+        ValueError: The export format is invalid.
+
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"{export_format} is not a valid export format. Expected one of {EXPORT_FORMATS}.")
+
+    logging.info(f"Exporting to {export_format}")
+
+    vector_ds = VectorDataset(vector_path, layer_name)
+
+    if export_format == FLATGEOBUF_FORMAT:
+        export_flatgeobuf(vector_ds, output_path, where=where, columns=columns)
+    elif export_format == GEOPARQUET_FORMAT:
+        export_geoparquet(
+            vector_ds,
+            output_path,
+            where=where,
+            columns=columns,
+            row_group_size=row_group_size,
+            compression=compression,
+            workers=workers,
+        )
+    else:
+        # Archives store the tiles gzip compressed, as servers return them as they're stored. Tiles saved as files
+        # are left uncompressed, as static file servers rarely set the Content-Encoding header for them
+        is_archive = Path(output_path).suffix.lower() in (MBTILES_SUFFIX, PMTILES_SUFFIX)
+        options = VectorTileOptions(
+            layer_name=vector_ds.layer.GetName(),
+            columns=columns,
+            where=where,
+            buffer=buffer,
+            simplification=simplification,
+            compress=is_archive,
+        )
+        metadata = {"name": Path(vector_path).stem, "type": "overlay"}
+        tile_compression = "gzip" if is_archive else "none"
+        with open_tile_store(output_path, MVT_FORMAT, metadata, tile_compression=tile_compression) as store:
+            tile_count = generate_vector_tiles(vector_ds, store, min_zoom, max_zoom, options=options, workers=workers)
+
+        logging.info(f"Wrote {tile_count} tile(s) for zoom levels {min_zoom} to {max_zoom}.")
+
+    logging.info(f"Finished. Exported {vector_path} to {output_path}.")
+
+
+if __name__ == "__main__":
+    main()
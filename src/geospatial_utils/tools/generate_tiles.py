@@ -0,0 +1,213 @@
+"""Render a raster into a pyramid of XYZ (WebMercator) tiles, saved as files or within an MBTiles or PMTiles archive."""
+
+import argparse
+import logging
+import os
+from pathlib import Path
+from types import SimpleNamespace
+
+from geospatial_utils.raster.raster_dataset import RasterDataset
+from geospatial_utils.raster.tiling import (
+    COLOUR_RAMPS,
+    DEFAULT_COLOUR_RAMP,
+    DEFAULT_RESAMPLING,
+    DEFAULT_WEBP_QUALITY,
+    generate_tiles,
+    get_native_zoom,
+)
+from geospatial_utils.tiles.grid import DEFAULT_TILE_SIZE
+from geospatial_utils.tiles.stores import MBTILES_SUFFIX, PMTILES_SUFFIX, PNG_FORMAT, WEBP_FORMAT, open_tile_store
+
+logger = logging.getLogger(__name__)
+
+COMMAND = "generate_tiles"
+DESCRIPTION = "Render a raster into XYZ tiles, saved as files or within an MBTiles or PMTiles archive."
+
+DEFAULT_MIN_ZOOM = 0
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> argparse.ArgumentParser:
+    parser.add_argument("--raster_path", required=True, type=Path, help="Path to the raster to be tiled")
+    parser.add_argument(
+        "--output_path",
+        required=True,
+        type=Path,
+        help=(
+            f"Path to save the tiles to. Paths ending in {MBTILES_SUFFIX} or {PMTILES_SUFFIX} are written as a single "
+            "archive, otherwise the tiles are saved as {z}/{x}/{y} files within this directory."
+        ),
+    )
+    parser.add_argument(
+        "--min_zoom",
+        required=False,
+        type=int,
+        default=DEFAULT_MIN_ZOOM,
+        help=f"The lowest zoom level to render. Defaults to {DEFAULT_MIN_ZOOM}",
+    )
+    parser.add_argument(
+        "--max_zoom",
+        required=False,
+        type=int,
+        help="The highest zoom level to render. Defaults to the zoom level matching the resolution of the raster.",
+    )
+    parser.add_argument(
+        "--band",
+        required=False,
+        type=int,
+        default=1,
+        help="Index of the band to colour (count starts at one). Ignored for RGB rasters. Defaults to 1",
+    )
+    parser.add_argument(
+        "--colour_ramp",
+        required=False,
+        choices=list(COLOUR_RAMPS),
+        default=DEFAULT_COLOUR_RAMP,
+        help=f"Colour ramp for single band rasters. Defaults to {DEFAULT_COLOUR_RAMP}",
+    )
+    parser.add_argument(
+        "--value_range",
+        required=False,
+        type=float,
+        nargs=2,
+        metavar=("MIN_VALUE", "MAX_VALUE"),
+        help="The values coloured with the ends of the colour ramp. Defaults to the minimum and maximum of the band.",
+    )
+    parser.add_argument(
+        "--tile_format",
+        required=False,
+        choices=[PNG_FORMAT, WEBP_FORMAT],
+        default=PNG_FORMAT,
+        help=f"Image format of the tiles. Defaults to {PNG_FORMAT}",
+    )
+    parser.add_argument(
+        "--quality",
+        required=False,
+        type=int,
+        default=DEFAULT_WEBP_QUALITY,
+        help=f"Quality (1 to 100) of WebP tiles. Defaults to {DEFAULT_WEBP_QUALITY}",
+    )
+    parser.add_argument(
+        "--resampling",
+        required=False,
+        type=str,
+        default=DEFAULT_RESAMPLING,
+        help=f"Resampling algorithm used to warp the highest zoom level, e.g. near. Defaults to {DEFAULT_RESAMPLING}",
+    )
+    parser.add_argument(
+        "--tile_size",
+        required=False,
+        type=int,
+        default=DEFAULT_TILE_SIZE,
+        help=f"Width and height (in pixels) of the tiles. Defaults to {DEFAULT_TILE_SIZE}",
+    )
+    parser.add_argument(
+        "--tms",
+        action="store_true",
+        help="Number the rows of tiles saved as files from the south (TMS), rather than from the north (XYZ).",
+    )
+    parser.add_argument(
+        "--workers",
+        required=False,
+        type=int,
+        default=os.cpu_count(),
+        help="Number of threads used to render tiles in parallel. Defaults to the number of CPUs.",
+    )
+
+    return parser
+
+
+def main() -> None:
+    """Entrypoint to the script."""
+
+    parser = argparse.ArgumentParser(prog=COMMAND, description=DESCRIPTION)
+
+    parser = add_arguments(parser)
+    args = parser.parse_args()
+
+    run_from_cli(args)
+
+
+def run_from_cli(args: SimpleNamespace) -> None:
+    """The entrypoint when running from the centralised CLI."""
+
+    # Call the main run function
+    run(
+        raster_path=args.raster_path,
+        output_path=args.output_path,
+        min_zoom=args.min_zoom,
+        max_zoom=args.max_zoom,
+        band_index=args.band,
+        colour_ramp=args.colour_ramp,
+        value_range=args.value_range,
+        tile_format=args.tile_format,
+        quality=args.quality,
+        resampling=args.resampling,
+        tile_size=args.tile_size,
+        tms=args.tms,
+        workers=args.workers,
+    )
+
+
+def run(
+    raster_path: str | Path,
+    output_path: str | Path,
+    min_zoom: int = DEFAULT_MIN_ZOOM,
+    max_zoom: int | None = None,
+    band_index: int = 1,
+    colour_ramp: str = DEFAULT_COLOUR_RAMP,
+    value_range: tuple[float, float] | None = None,
+    tile_format: str = PNG_FORMAT,
+    quality: int = DEFAULT_WEBP_QUALITY,
+    resampling: str = DEFAULT_RESAMPLING,
+    tile_size: int = DEFAULT_TILE_SIZE,
+    tms: bool = False,
+    workers: int | None = None,
+) -> None:
+    """The main run function.
+
+    Args:
+        raster_path: Path to the raster to tile.
+        output_path: Path to the .mbtiles or .pmtiles archive, or the directory, to save the tiles to.
+        min_zoom: The lowest zoom level to render. Defaults to DEFAULT_MIN_ZOOM.
+        max_zoom: The highest zoom level to render. Defaults to the native zoom level of the raster.
+        band_index: Index of the band to colour. Defaults to 1.
+        colour_ramp: Name of one of the COLOUR_RAMPS. Defaults to DEFAULT_COLOUR_RAMP.
+        value_range: The values coloured with the ends of the colour ramp. Defaults to the range of the band.
+        tile_format: Either PNG_FORMAT or WEBP_FORMAT. Defaults to PNG_FORMAT.
+        quality: Quality of WebP tiles. Defaults to DEFAULT_WEBP_QUALITY.
+        resampling: Resampling algorithm used to warp the highest zoom level. Defaults to DEFAULT_RESAMPLING.
+        tile_size: Width and height (in pixels) of the tiles. Defaults to DEFAULT_TILE_SIZE.
+        tms: Whether to number the rows of tiles saved as files from the south. Defaults to False.
+        workers: Number of threads. Defaults to the number of CPUs.
+
+    Raises:
+        IOError: The raster does not exist.
+
+    """
+    logging.info("Generating tiles")
+
+    raster_ds = RasterDataset(raster_path)
+    if max_zoom is None:
+        max_zoom = max(get_native_zoom(raster_ds, tile_size), min_zoom)
+
+    metadata = {"name": Path(raster_path).stem, "type": "overlay"}
+    with open_tile_store(output_path, tile_format, metadata, tms=tms) as store:
+        tile_count = generate_tiles(
+            raster_ds,
+            store,
+            min_zoom=min_zoom,
+            max_zoom=max_zoom,
+            band_index=band_index,
+            colour_ramp=colour_ramp,
+            value_range=value_range,
+            resampling=resampling,
+            tile_size=tile_size,
+            quality=quality,
+            workers=workers,
+        )
+
+    logging.info(f"Finished. Wrote {tile_count} tile(s) for zoom levels {min_zoom} to {max_zoom} to {output_path}.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+import struct
+from collections.abc import Iterator
+
+import numpy as np
+from osgeo import gdal, ogr, osr
+
+try:
+    import pyarrow as pa
+except ImportError:  # pragma: no cover - pyarrow is an optional dependency
+    pa = None
+
+# Number of features read per Arrow record batch
+DEFAULT_ARROW_BATCH_SIZE = 65_536
+
+# GDAL versions (as numbers from gdal.VersionInfo) which added reading layers as Arrow streams (GetArrowStreamAsNumPy
+# and GetArrowStreamAsPyArrow), and writing Arrow record batches to layers (WritePyArrow)
+ARROW_READ_GDAL_VERSION = 3_06_00_00
+ARROW_WRITE_GDAL_VERSION = 3_08_00_00
+
+WKB_EXTENSION_NAME = b"ogc.wkb"
+EXTENSION_NAME_KEY = b"ARROW:extension:name"
+
+# Base WKB geometry types (ignoring Z/M), grouped by how their coordinates are laid out
+POINT_TYPES = {1}
+LINESTRING_TYPES = {2, 8}  # LineString, CircularString
+POLYGON_TYPES = {3, 17}  # Polygon, Triangle
+COLLECTION_TYPES = {4, 5, 6, 7, 9, 10, 11, 12, 15, 16}
+
+# Extended WKB flags, used instead of the ISO type offsets by some writers
+EWKB_Z_FLAG = 0x80000000
+EWKB_M_FLAG = 0x40000000
+EWKB_SRID_FLAG = 0x20000000
+
+
+def has_arrow_stream() -> bool:
+    """Check whether GDAL can read layers as Arrow streams, see ARROW_READ_GDAL_VERSION."""
+    return int(gdal.VersionInfo()) >= ARROW_READ_GDAL_VERSION
+
+
+def is_arrow_supported(input_layer: ogr.Layer, output_layer: ogr.Layer | None = None) -> bool:
+    """Check whether layers can be read (and written) in Arrow record batches.
+
+    This requires pyarrow to be installed, and a GDAL version which can read Arrow streams (and write record batches),
+    see ARROW_READ_GDAL_VERSION and ARROW_WRITE_GDAL_VERSION.
+
+    Args:
+        input_layer: The layer to read from.
+        output_layer: Optional layer to write to.
+
+    Returns:
+        Whether the Arrow columnar path can be used.
+
+    """
+    if pa is None or not has_arrow_stream():
+        return False
+
+    return output_layer is None or int(gdal.VersionInfo()) >= ARROW_WRITE_GDAL_VERSION
+
+
+def iter_arrow_batches(layer: ogr.Layer, batch_size: int = DEFAULT_ARROW_BATCH_SIZE) -> Iterator["pa.RecordBatch"]:
+    """Read a layer as Arrow record batches, honouring any spatial, attribute or ignored field filters on the layer.
+
+    The geometries are encoded as WKB and the FIDs are not included.
+
+    Args:
+        layer: The layer to read.
+        batch_size: Maximum number of features per record batch. Defaults to DEFAULT_ARROW_BATCH_SIZE.
+
+    Yields:
+        Each record batch.
+
+    """
+    stream = layer.GetArrowStreamAsPyArrow(["INCLUDE_FID=NO", f"MAX_FEATURES_IN_BATCH={batch_size}"])
+    yield from stream
+
+
+def get_geometry_column_index(schema: "pa.Schema", geometry_column: str | None = None) -> int | None:
+    """Find the index of the WKB geometry column within an Arrow schema.
+
+    Args:
+        schema: The schema to search.
+        geometry_column: Optional name of the geometry column, used if no column has the ogc.wkb extension type.
+
+    Returns:
+        Index of the geometry column, or None if there isn't one.
+
+    """
+    for index, field in enumerate(schema):
+        if field.metadata and field.metadata.get(EXTENSION_NAME_KEY) == WKB_EXTENSION_NAME:
+            return index
+
+    for name in (geometry_column, "wkb_geometry"):
+        if name and name in schema.names:
+            return schema.get_field_index(name)
+
+    return None
+
+
+def transform_wkb_array(
+    wkb_array: "pa.Array", coord_transform: osr.CoordinateTransformation, swap_xy: bool = False
+) -> "pa.Array":
+    """Transform the coordinates of every WKB geometry in an Arrow binary array at once.
+
+    The coordinates of all of the geometries are gathered into a single array, transformed with one call to
+    TransformPoints and scattered back into a copy of the WKB data. As the number of coordinates doesn't change,
+    the layout of each WKB geometry is unchanged. Any M (measure) values are copied through untransformed.
+
+    Args:
+        wkb_array: Arrow binary (or large binary) array of WKB geometries.
+        coord_transform: The coordinate transformation to apply.
+        swap_xy: Whether to swap the x and y coordinates after transforming them. Defaults to False.
+
+    Returns:
+        New Arrow array of the transformed WKB geometries.
+
+    """
+    if isinstance(wkb_array, pa.ExtensionArray):
+        storage = transform_wkb_array(wkb_array.storage, coord_transform, swap_xy)
+        return pa.ExtensionArray.from_storage(wkb_array.type, storage)
+
+    validity, offsets_buffer, data_buffer = wkb_array.buffers()
+    if data_buffer is None:
+        return wkb_array
+
+    offset_dtype = np.int64 if pa.types.is_large_binary(wkb_array.type) else np.int32
+    offsets = np.frombuffer(offsets_buffer, dtype=offset_dtype)[
+        wkb_array.offset : wkb_array.offset + len(wkb_array) + 1
+    ]
+    data = np.frombuffer(data_buffer, dtype=np.uint8).copy()
+
+    run_starts, run_counts, run_dims, run_has_z = find_coordinate_runs(data, offsets)
+    if not run_counts.sum():
+        return wkb_array
+
+    # Byte offset of the x coordinate of each point, and whether each point has a z coordinate
+    run_first_point = np.cumsum(run_counts) - run_counts
+    point_in_run = np.arange(run_counts.sum()) - np.repeat(run_first_point, run_counts)
+    x_offsets = np.repeat(run_starts, run_counts) + point_in_run * np.repeat(run_dims * 8, run_counts)
+    has_z = np.repeat(run_has_z, run_counts)
+
+    coords = np.zeros((x_offsets.size, 3))
+    coords[:, 0] = _gather_doubles(data, x_offsets)
+    coords[:, 1] = _gather_doubles(data, x_offsets + 8)
+    coords[has_z, 2] = _gather_doubles(data, x_offsets[has_z] + 16)
+
+    # Empty points are encoded with NaN coordinates, which are left untouched
+    valid = ~np.isnan(coords[:, 0])
+    transformed = coords.copy()
+    if valid.any():
+        transformed[valid] = np.asarray(coord_transform.TransformPoints(coords[valid]))[:, :3]
+
+    if swap_xy:
+        transformed[:, [0, 1]] = transformed[:, [1, 0]]
+
+    _scatter_doubles(data, x_offsets, transformed[:, 0])
+    _scatter_doubles(data, x_offsets + 8, transformed[:, 1])
+    _scatter_doubles(data, x_offsets[has_z] + 16, transformed[has_z, 2])
+
+    return pa.Array.from_buffers(
+        wkb_array.type,
+        len(wkb_array),
+        [validity, offsets_buffer, pa.py_buffer(data)],
+        null_count=wkb_array.null_count,
+        offset=wkb_array.offset,
+    )
+
+
+def find_coordinate_runs(
+    data: np.ndarray, offsets: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Find the runs of coordinates within a buffer of concatenated little endian WKB geometries.
+
+    Only the geometry headers and ring/part counts are walked in Python, one per run, not one per coordinate.
+
+    Args:
+        data: The WKB data as an array of bytes.
+        offsets: Offsets of the start of each geometry within the data, followed by the end of the last geometry.
+
+    Returns:
+        The byte offset of the start of each run, the number of points in each run, the number of dimensions of the
+        points in each run and whether the points in each run have a z coordinate. The x, y and any z coordinate of
+        each point are followed by its M value, if it has one.
+
+    Raises:
+        ValueError: The WKB is big endian or contains an unsupported geometry type.
+
+    """
+    raw = data.tobytes()
+    starts: list[int] = []
+    counts: list[int] = []
+    dims: list[int] = []
+    z_flags: list[bool] = []
+
+    def walk(position: int) -> int:
+        if raw[position] != 1:
+            raise ValueError("Only little endian WKB geometries are supported.")
+
+        (geometry_type,) = struct.unpack_from("<I", raw, position + 1)
+        position += 5
+
+        if geometry_type & EWKB_SRID_FLAG:
+            position += 4
+
+        has_z = bool(geometry_type & EWKB_Z_FLAG)
+        has_m = bool(geometry_type & EWKB_M_FLAG)
+        geometry_type &= 0x0FFFFFFF
+
+        iso_flags, base_type = divmod(geometry_type, 1000)
+        has_z = has_z or iso_flags in (1, 3)
+        has_m = has_m or iso_flags in (2, 3)
+        point_dims = 2 + has_z + has_m
+
+        if base_type in POINT_TYPES:
+            starts.append(position)
+            counts.append(1)
+            dims.append(point_dims)
+            z_flags.append(has_z)
+            return position + 8 * point_dims
+
+        (count,) = struct.unpack_from("<I", raw, position)
+        position += 4
+
+        if base_type in LINESTRING_TYPES:
+            starts.append(position)
+            counts.append(count)
+            dims.append(point_dims)
+            z_flags.append(has_z)
+            return position + 8 * point_dims * count
+
+        if base_type in POLYGON_TYPES:
+            for _ in range(count):
+                (point_count,) = struct.unpack_from("<I", raw, position)
+                starts.append(position + 4)
+                counts.append(point_count)
+                dims.append(point_dims)
+                z_flags.append(has_z)
+                position += 4 + 8 * point_dims * point_count
+            return position
+
+        if base_type in COLLECTION_TYPES:
+            for _ in range(count):
+                position = walk(position)
+            return position
+
+        raise ValueError(f"The WKB geometry type {geometry_type} is not supported.")
+
+    for start, end in zip(offsets[:-1].tolist(), offsets[1:].tolist()):
+        if end > start:
+            walk(start)
+
+    return (
+        np.array(starts, dtype=np.int64),
+        np.array(counts, dtype=np.int64),
+        np.array(dims, dtype=np.int64),
+        np.array(z_flags, dtype=bool),
+    )
+
+
+def get_point_coords(data: np.ndarray, offsets: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Get the coordinates of a buffer of concatenated little endian WKB points, without parsing each geometry.
+
+    Args:
+        data: The WKB data as an array of bytes.
+        offsets: Offsets of the start of each point within the data, followed by the end of the last point.
+
+    Returns:
+        Arrays of the x and y coordinates of each point. Empty points have NaN coordinates.
+
+    Raises:
+        ValueError: The WKB is big endian or contains geometries other than points.
+
+    """
+    starts, counts, _, _ = find_coordinate_runs(data, offsets)
+    if len(starts) != len(offsets) - 1 or np.any(counts != 1):
+        raise ValueError("Only point geometries are supported.")
+
+    return _gather_doubles(data, starts), _gather_doubles(data, starts + 8)
+
+
+def _gather_doubles(data: np.ndarray, byte_offsets: np.ndarray) -> np.ndarray:
+    """Read little endian doubles from (possibly unaligned) byte offsets within a byte array."""
+    byte_indexes = byte_offsets[:, np.newaxis] + np.arange(8)
+    return data[byte_indexes].view("<f8").ravel()
+
+
+def _scatter_doubles(data: np.ndarray, byte_offsets: np.ndarray, values: np.ndarray) -> None:
+    """Write little endian doubles to (possibly unaligned) byte offsets within a byte array."""
+    byte_indexes = byte_offsets[:, np.newaxis] + np.arange(8)
+    data[byte_indexes] = np.ascontiguousarray(values, dtype="<f8").view(np.uint8).reshape(-1, 8)
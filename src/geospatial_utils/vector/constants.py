@@ -1,2 +1,8 @@
 SHAPEFILE_DRIVER = "ESRI Shapefile"
 GEOJSON_DRIVER = "GeoJSON"
+GEOPACKAGE_DRIVER = "GPKG"
+FLATGEOBUF_DRIVER = "FlatGeobuf"
+PARQUET_DRIVER = "Parquet"
+
+# Drivers which look up features by FID with an index, so a range of FIDs can be read without scanning the layer
+INDEXED_FID_DRIVERS = (GEOPACKAGE_DRIVER, "SQLite", "PostgreSQL", "OpenFileGDB")
@@ -0,0 +1,171 @@
+from pathlib import Path
+
+from osgeo import ogr
+
+from geospatial_utils.vector.constants import FLATGEOBUF_DRIVER, PARQUET_DRIVER
+from geospatial_utils.vector.io import DEFAULT_BATCH_SIZE, DEFAULT_SHARD_SIZE
+from geospatial_utils.vector.parallel import (
+    Shard,
+    ShardFilters,
+    get_fid_shards,
+    get_worker_dataset,
+    run_in_processes,
+)
+from geospatial_utils.vector.vector_dataset import VectorDataset
+
+# Number of features in each row group of a GeoParquet file. Readers skip whole row groups using their bbox statistics,
+# so smaller row groups allow finer spatial filtering at the cost of a larger footer
+DEFAULT_ROW_GROUP_SIZE = 65_536
+DEFAULT_PARQUET_COMPRESSION = "ZSTD"
+
+# Name of each part file of a GeoParquet dataset written in parallel
+PARQUET_PART_NAME = "part-{index:05d}.parquet"
+
+
+def export_flatgeobuf(
+    vector_ds: VectorDataset,
+    output_path: str | Path,
+    where: str | None = None,
+    columns: list[str] | None = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> None:
+    """Export the layer to FlatGeobuf, with a packed Hilbert R-tree spatial index.
+
+    The driver sorts the features along a Hilbert curve of their bounding box centres and writes a packed R-tree of
+    their bounding boxes at the start of the file, so clients can read just the index nodes and features within an
+    area of interest with HTTP range requests, without downloading the whole file.
+
+    The index can only be built once every feature is known, so the file is written by a single writer.
+
+    Args:
+        vector_ds: The layer to export.
+        output_path: Path to save the .fgb file to.
+        where: Optional attribute filter to only export the matching features. See apply_filters.
+        columns: Optional list of the names of the fields to export. Defaults to all fields.
+        batch_size: Number of features written between flushes. Defaults to DEFAULT_BATCH_SIZE.
+
+    Raises:
+        ValueError: GDAL was built without the FlatGeobuf driver.
+
+    """
+    _check_driver(FLATGEOBUF_DRIVER)
+    vector_ds.copy_layer(
+        output_path,
+        driver_name=FLATGEOBUF_DRIVER,
+        batch_size=batch_size,
+        where=where,
+        columns=columns,
+        layer_options=["SPATIAL_INDEX=YES"],
+    )
+
+
+def get_geoparquet_layer_options(
+    row_group_size: int = DEFAULT_ROW_GROUP_SIZE, compression: str = DEFAULT_PARQUET_COMPRESSION
+) -> list[str]:
+    """The layer creation options for a spatially sorted GeoParquet file with bbox statistics for each row group.
+
+    The features are sorted by their bounding boxes before they're written, so the features of each row group are
+    close together, and a bbox covering column is written, whose statistics give the extent of each row group.
+    """
+    return [
+        f"ROW_GROUP_SIZE={row_group_size}",
+        f"COMPRESSION={compression}",
+        "GEOMETRY_ENCODING=WKB",
+        "WRITE_COVERING_BBOX=YES",
+        "SORT_BY_BBOX=YES",
+    ]
+
+
+def export_geoparquet(
+    vector_ds: VectorDataset,
+    output_path: str | Path,
+    where: str | None = None,
+    columns: list[str] | None = None,
+    row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+    compression: str = DEFAULT_PARQUET_COMPRESSION,
+    workers: int | None = 1,
+    shard_size: int = DEFAULT_SHARD_SIZE,
+) -> list[Path]:
+    """Export the layer to GeoParquet, spatially sorted and with bbox statistics for each row group.
+
+    Clients (e.g. GDAL, DuckDB or pyarrow based readers) skip the row groups whose bbox statistics don't intersect
+    their area of interest, so they only fetch the byte ranges they need.
+
+    With multiple workers, the layer is split into shards of feature IDs, each of which is written to its own part
+    file of a GeoParquet dataset directory by a worker process. Readers treat the directory as a single dataset.
+
+    Args:
+        vector_ds: The layer to export.
+        output_path: Path to save the .parquet file to, or the directory to save the part files to when using
+            multiple workers.
+        where: Optional attribute filter to only export the matching features. See apply_filters.
+        columns: Optional list of the names of the fields to export. Defaults to all fields.
+        row_group_size: Number of features in each row group. Defaults to DEFAULT_ROW_GROUP_SIZE.
+        compression: Compression codec of the columns, e.g. ZSTD or SNAPPY. Defaults to DEFAULT_PARQUET_COMPRESSION.
+        workers: Number of worker processes. If more than one (or None, to use the number of CPUs), the dataset must
+            have been opened from a file. Defaults to 1, writing a single file in the calling process.
+        shard_size: Maximum number of features in each part file, when using multiple workers. Defaults to
+            DEFAULT_SHARD_SIZE.
+
+    Returns:
+        The paths of the files written, in feature ID order.
+
+    Raises:
+        ValueError: GDAL was built without the Parquet driver.
+        ValueError: Multiple workers were requested for a dataset which wasn't opened from a file.
+
+    """
+    _check_driver(PARQUET_DRIVER)
+    layer_options = get_geoparquet_layer_options(row_group_size, compression)
+
+    if workers == 1:
+        vector_ds.copy_layer(
+            output_path, driver_name=PARQUET_DRIVER, where=where, columns=columns, layer_options=layer_options
+        )
+        return [Path(output_path)]
+
+    if vector_ds.file_path is None:
+        raise ValueError("Only datasets opened from a file can be exported with multiple workers.")
+
+    output_dir = Path(output_path)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    with vector_ds.apply_filters(where=where, columns=[], include_geometry=False):
+        shards = get_fid_shards(vector_ds.layer, shard_size, vector_ds.ds.GetDriver().ShortName)
+
+    filters = ShardFilters(where=where, columns=columns)
+    tasks = (
+        (
+            str(vector_ds.file_path),
+            vector_ds.layer.GetName(),
+            shard,
+            filters,
+            str(output_dir.joinpath(PARQUET_PART_NAME.format(index=index))),
+            layer_options,
+        )
+        for index, shard in enumerate(shards)
+    )
+
+    return [Path(part_path) for part_path in run_in_processes(_export_part, tasks, workers)]
+
+
+def _export_part(
+    file_path: str, layer_name: str, shard: Shard, filters: ShardFilters, part_path: str, layer_options: list[str]
+) -> str:
+    """Write the features of a shard to a part file in a worker process."""
+    get_worker_dataset(VectorDataset, file_path, layer_name).copy_layer(
+        part_path,
+        driver_name=PARQUET_DRIVER,
+        layer_name=layer_name,
+        where=filters.where,
+        columns=filters.columns,
+        layer_options=layer_options,
+        shard=shard,
+    )
+
+    return part_path
+
+
+def _check_driver(driver_name: str) -> None:
+    if ogr.GetDriverByName(driver_name) is None:
+        raise ValueError(f"GDAL was built without the {driver_name} driver.")
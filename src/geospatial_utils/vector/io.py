@@ -1,9 +1,16 @@
 from pathlib import Path
+from types import TracebackType
 
-from osgeo import ogr, osr
+from osgeo import gdal, ogr, osr
 
 from geospatial_utils.vector.constants import SHAPEFILE_DRIVER
-from geospatial_utils.vector.types import Field
+from geospatial_utils.vector.types import Field, Record
+
+DEFAULT_BATCH_SIZE = 10_000
+
+# Number of features reprojected by a worker at a time. Shards are kept small, so there are enough of them to balance
+# the load between the workers and the results held in memory at once are bounded
+DEFAULT_SHARD_SIZE = 50_000
 
 
 def create_vector_dataset(
@@ -13,6 +20,7 @@ def create_vector_dataset(
     fields: list[Field] = [],
     driver_name: str = SHAPEFILE_DRIVER,
     geom_type: ogr.Geometry = ogr.wkbPolygon,
+    layer_options: list[str] | None = None,
 ) -> None:
     """Creates an empty gdal.Dataset with a single layer, ready for features to be added.
 
@@ -25,6 +33,7 @@ def create_vector_dataset(
         fields: A list of Field objects, each containing the name and the ogr.OFT field type to assign to the field.
         driver_name: Name of the driver to use to create the vector dataset. Defaults to SHAPEFILE_DRIVER.
         geom_type: Type of geometry that will be saved to the vector dataset. Defaults to ogr.wkbPolygon.
+        layer_options: Optional layer creation options for the driver, e.g. ["SPATIAL_INDEX=YES"].
 
     Returns:
         Opened gdal.Dataset and ogr.Layer objects.
@@ -32,7 +41,7 @@ def create_vector_dataset(
     """
     output_driver = ogr.GetDriverByName(driver_name)
     output_ds = output_driver.CreateDataSource(output_path)
-    output_layer = output_ds.CreateLayer(layer_name, srs=srs, geom_type=geom_type)
+    output_layer = output_ds.CreateLayer(layer_name, srs=srs, geom_type=geom_type, options=layer_options or [])
 
     for field in fields:
         field_definition = ogr.FieldDefn(field.name, field.type)
@@ -77,4 +86,121 @@ def write_feature_to_output_layer(
             field_value = feature_to_copy.GetField(field_name)
             output_feature.SetField(field_name, field_value)
 
-            output_layer.CreateFeature(output_feature)
+    output_layer.CreateFeature(output_feature)
+
+
+def write_record_to_output_layer(output_layer: ogr.Layer, record: Record) -> None:
+    """Write a Record to a new feature in a layer, e.g. one read or transformed in another process.
+
+    Args:
+        output_layer: The layer to write the feature to.
+        record: The record to write. Its geometry (if any) is WKB and its attributes are keyed by field name.
+
+    """
+    output_feature = ogr.Feature(output_layer.GetLayerDefn())
+
+    if record.geometry is not None:
+        output_feature.SetGeometry(ogr.CreateGeometryFromWkb(record.geometry))
+
+    for field_name, field_value in record.attributes.items():
+        output_feature.SetField(field_name, field_value)
+
+    output_layer.CreateFeature(output_feature)
+
+
+class BatchedFeatureWriter:
+    """Writes features to a layer in batches, committing each batch as a single transaction.
+
+    For drivers which support transactions (e.g. GeoPackage), the features are written within a transaction which is
+    committed every `batch_size` features. For other drivers the layer is flushed to disk at the same boundaries
+    instead. It should be used as a context manager, which commits the final batch on exit, or rolls it back if an
+    error occurs.
+
+    Args:
+        output_ds: The dataset containing the output layer.
+        output_layer: The layer to write the features to.
+        batch_size: Number of features to write per transaction. Defaults to DEFAULT_BATCH_SIZE.
+
+    """
+
+    def __init__(self, output_ds: gdal.Dataset, output_layer: ogr.Layer, batch_size: int = DEFAULT_BATCH_SIZE):
+        if batch_size < 1:
+            raise ValueError(f"The batch size must be positive, not {batch_size}.")
+
+        self.output_ds = output_ds
+        self.output_layer = output_layer
+        self.batch_size = batch_size
+        self.supports_transactions = bool(output_ds.TestCapability(ogr.ODsCTransactions))
+
+        self.feature_count = 0
+        self._in_transaction = False
+
+    def __enter__(self) -> "BatchedFeatureWriter":
+        self._start_batch()
+        return self
+
+    def __exit__(
+        self,
+        exc_type: type[BaseException] | None,
+        exc_value: BaseException | None,
+        traceback: TracebackType | None,
+    ) -> None:
+        if exc_type is not None and self._in_transaction:
+            self.output_ds.RollbackTransaction()
+            self._in_transaction = False
+            return
+
+        self.commit()
+
+    def write(
+        self,
+        output_geometry: ogr.Geometry | None = None,
+        feature_to_copy: ogr.Feature | None = None,
+        fields_to_transfer: list[str] = [],
+    ) -> None:
+        """Write a feature to the output layer, committing the batch once it's full.
+
+        See write_feature_to_output_layer for details of the arguments.
+        """
+        write_feature_to_output_layer(
+            output_layer=self.output_layer,
+            output_geometry=output_geometry,
+            feature_to_copy=feature_to_copy,
+            fields_to_transfer=fields_to_transfer,
+        )
+        self.add_written_features(1)
+
+    def write_record(self, record: Record) -> None:
+        """Write a Record to the output layer, committing the batch once it's full.
+
+        See write_record_to_output_layer for details of the arguments.
+        """
+        write_record_to_output_layer(self.output_layer, record)
+        self.add_written_features(1)
+
+    def add_written_features(self, count: int) -> None:
+        """Record that features have been written directly to the output layer, committing the batch once it's full.
+
+        Args:
+            count: The number of features written.
+
+        """
+        previous_batch = self.feature_count // self.batch_size
+        self.feature_count += count
+
+        if self.feature_count // self.batch_size != previous_batch:
+            self.commit()
+            self._start_batch()
+
+    def commit(self) -> None:
+        """Commit the features written so far, flushing them to disk."""
+        if self._in_transaction:
+            self.output_ds.CommitTransaction()
+            self._in_transaction = False
+        else:
+            self.output_layer.SyncToDisk()
+
+    def _start_batch(self) -> None:
+        if self.supports_transactions:
+            self.output_ds.StartTransaction()
+            self._in_transaction = True
@@ -0,0 +1,217 @@
+import os
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Any, NamedTuple, TypeVar
+
+import numpy as np
+from osgeo import ogr
+
+from geospatial_utils.vector.constants import INDEXED_FID_DRIVERS
+from geospatial_utils.vector.io import DEFAULT_SHARD_SIZE
+
+# Number of shards queued per worker, bounding the number of results held in memory at once
+TASKS_PER_WORKER = 2
+
+DatasetT = TypeVar("DatasetT")
+
+# Each worker process opens its own handle to each dataset, as OGR handles can't be shared between processes
+_worker_datasets: dict[tuple[Callable[[str, str], Any], str, str], Any] = {}
+
+
+class Shard(NamedTuple):
+    """A run of features of a layer.
+
+    Shards of layers whose driver indexes their FIDs are a contiguous range of feature IDs, inclusive of both ends,
+    selected with an attribute filter. Other shards are a range of positions within the (filtered) layer, read by
+    seeking to the start with SetNextByIndex, as an attribute filter on the FID would scan the whole layer.
+
+    Attributes:
+        first_fid: The lowest feature ID of the shard.
+        last_fid: The highest feature ID of the shard.
+        start_index: Position of the first feature of the shard within the layer, for shards read by position.
+        count: Number of features in the shard, for shards read by position.
+        fid_column: Name of the layer's FID column, if it has a named one (e.g. in a GeoPackage). Defaults to None,
+            which selects the features with OGR's FID special field.
+
+    """
+
+    first_fid: int
+    last_fid: int
+    start_index: int | None = None
+    count: int | None = None
+    fid_column: str | None = None
+
+    @property
+    def is_positional(self) -> bool:
+        return self.start_index is not None
+
+    @property
+    def where(self) -> str | None:
+        """OGR SQL attribute filter selecting the features of the shard, or None for shards read by position."""
+        if self.is_positional:
+            return None
+
+        fid = f'"{self.fid_column}"' if self.fid_column else "FID"
+        return f"{fid} >= {self.first_fid} AND {fid} <= {self.last_fid}"
+
+
+class ShardFilters(NamedTuple):
+    """Filters applied to the layer by each worker, in a form that can be sent to another process."""
+
+    bbox: tuple[float, float, float, float] | None = None
+    geometry_wkb: bytes | None = None
+    where: str | None = None
+    columns: list[str] | None = None
+
+    @property
+    def geometry(self) -> ogr.Geometry | None:
+        return ogr.CreateGeometryFromWkb(self.geometry_wkb) if self.geometry_wkb is not None else None
+
+    def with_shard(self, shard: Shard) -> "ShardFilters":
+        """Restrict the attribute filter to the features of a shard. Shards read by position don't change it."""
+        if shard.where is None:
+            return self
+
+        where = shard.where if self.where is None else f"({self.where}) AND {shard.where}"
+        return self._replace(where=where)
+
+
+def get_fid_shards(
+    layer: ogr.Layer, shard_size: int = DEFAULT_SHARD_SIZE, driver_name: str | None = None
+) -> list[Shard]:
+    """Split the features of a layer into shards which can each be read without scanning the rest of the layer.
+
+    Any filters set on the layer are honoured, so ignoring every field and the geometry beforehand means only the
+    feature IDs are read. Each shard contains up to shard_size features, so shards are balanced even when the feature
+    IDs have gaps.
+
+    Layers of the INDEXED_FID_DRIVERS are split into ranges of feature IDs. Other layers are split into ranges of
+    positions if the filtered layer can seek to a position quickly. Otherwise every shard would have to read the layer
+    from its start, making the total work grow with the number of shards, so a single shard is returned.
+
+    Args:
+        layer: The layer to split.
+        shard_size: Maximum number of features in each shard. Defaults to DEFAULT_SHARD_SIZE.
+        driver_name: Name of the driver of the dataset the layer belongs to. Defaults to None, which assumes the
+            driver doesn't index the feature IDs.
+
+    Returns:
+        The shards, in ascending feature ID (or position) order.
+
+    Raises:
+        ValueError: The shard size is not positive.
+
+    """
+    if shard_size < 1:
+        raise ValueError(f"The shard size must be positive, not {shard_size}.")
+
+    layer.ResetReading()
+    fids = np.fromiter((feature.GetFID() for feature in layer), dtype=np.int64)
+
+    if driver_name in INDEXED_FID_DRIVERS:
+        fids.sort()
+        # Drivers which pass the filter to their own SQL engine only know the FID by its column name
+        fid_column = layer.GetFIDColumn() or None
+        return [
+            Shard(int(fids[start]), int(fids[min(start + shard_size, fids.size) - 1]), fid_column=fid_column)
+            for start in range(0, fids.size, shard_size)
+        ]
+
+    if not layer.TestCapability(ogr.OLCFastSetNextByIndex):
+        shard_size = max(fids.size, 1)
+
+    shards = []
+    for start in range(0, fids.size, shard_size):
+        shard_fids = fids[start : start + shard_size]
+        shards.append(Shard(int(shard_fids.min()), int(shard_fids.max()), start, shard_fids.size))
+
+    return shards
+
+
+def iter_shard_features(layer: ogr.Layer, shard: Shard | None = None) -> Iterator[ogr.Feature]:
+    """Read the features of a shard of a layer, honouring any filters set on it, or every feature without a shard.
+
+    Shards selected by FID must have had their attribute filter applied to the layer (see ShardFilters.with_shard).
+    """
+    layer.ResetReading()
+    remaining = None
+    if shard is not None and shard.is_positional:
+        layer.SetNextByIndex(shard.start_index)
+        remaining = shard.count
+
+    # Iterating over the layer itself would reset the reading position
+    while remaining is None or remaining > 0:
+        feature = layer.GetNextFeature()
+        if feature is None:
+            return
+
+        yield feature
+        if remaining is not None:
+            remaining -= 1
+
+
+def get_worker_dataset(open_dataset: Callable[[str, str], DatasetT], file_path: str, layer_name: str) -> DatasetT:
+    """Get the calling worker process's own handle to a layer, opening it on first use.
+
+    Args:
+        open_dataset: Opens the layer from its file path and name, e.g. VectorDataset.
+        file_path: Path to the dataset.
+        layer_name: Name of the layer.
+
+    Returns:
+        The handle returned by open_dataset, reused by later tasks of the same worker.
+
+    """
+    key = (open_dataset, file_path, layer_name)
+    if key not in _worker_datasets:
+        _worker_datasets[key] = open_dataset(file_path, layer_name)
+
+    return _worker_datasets[key]
+
+
+def run_in_processes(
+    func: Callable[..., Any], tasks: Iterable[tuple], workers: int | None = None, preserve_order: bool = True
+) -> Iterator[Any]:
+    """Run func over each set of task arguments in a process pool, yielding the results.
+
+    Only a few tasks per worker are queued at once, so the results don't build up in memory.
+
+    Args:
+        func: The function to run. It must be picklable (i.e. defined at the top level of a module).
+        tasks: The arguments for each call of func.
+        workers: Number of worker processes. Defaults to the number of CPUs.
+        preserve_order: Whether to yield the results in the order of the tasks, rather than as soon as each one
+            finishes. Defaults to True.
+
+    Yields:
+        The result of each task.
+
+    """
+    workers = workers or os.cpu_count() or 1
+    tasks = iter(tasks)
+    pending: deque[Future] = deque()
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+
+        def submit_next() -> bool:
+            task = next(tasks, None)
+            if task is None:
+                return False
+
+            pending.append(pool.submit(func, *task))
+            return True
+
+        while len(pending) < workers * TASKS_PER_WORKER and submit_next():
+            pass
+
+        while pending:
+            if preserve_order:
+                future = pending.popleft()
+            else:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                future = next(iter(done))
+                pending.remove(future)
+
+            yield future.result()
+            submit_next()
@@ -0,0 +1,177 @@
+import json
+import os
+import uuid
+from pathlib import Path
+from typing import NamedTuple
+
+from osgeo import gdal, ogr
+
+from geospatial_utils.vector.constants import GEOJSON_DRIVER, GEOPACKAGE_DRIVER, SHAPEFILE_DRIVER
+
+SHAPEFILE_INDEX_SUFFIX = ".qix"
+CACHE_INDEX_SUFFIX = ".idx.gpkg"
+FINGERPRINT_SUFFIX = ".json"
+
+# Drivers without their own spatial index support, which are queried through an indexed GeoPackage copy instead
+CACHED_INDEX_DRIVERS = (GEOJSON_DRIVER, "GeoJSONSeq", "CSV", "KML", "GML")
+
+
+class SourceFingerprint(NamedTuple):
+    size: int
+    mtime_ns: int
+
+
+class SpatialIndex(NamedTuple):
+    dataset_path: Path
+    index_path: Path | None
+    driver_name: str
+
+
+def get_fingerprint(file_path: str | Path) -> SourceFingerprint:
+    """Get the size and modification time of a file, used to detect when an index built from it is out of date."""
+    stat = Path(file_path).stat()
+    return SourceFingerprint(size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+
+
+def get_spatial_index(file_path: str | Path, index_dir: str | Path | None = None) -> SpatialIndex:
+    """Get the location of the spatial index for a vector dataset, without building it.
+
+    Args:
+        file_path: Path to the vector dataset.
+        index_dir: Optional directory the index is stored in. Defaults to the directory of the dataset. Shapefile
+            indexes are always stored alongside the shapefile, as that's where the driver looks for them.
+
+    Returns:
+        SpatialIndex containing the path of the dataset to query, the path of the index (None for drivers that manage
+        their own index) and the name of the driver of the source dataset.
+
+    Raises:
+        IOError: The dataset doesn't exist or isn't a recognised vector format.
+
+    """
+    file_path = Path(file_path)
+    driver = gdal.IdentifyDriverEx(str(file_path), gdal.OF_VECTOR)
+    if driver is None:
+        raise IOError(f"The dataset; {file_path} does not exist or is not a vector dataset")
+
+    driver_name = driver.ShortName
+
+    if driver_name == SHAPEFILE_DRIVER:
+        return SpatialIndex(file_path, file_path.with_suffix(SHAPEFILE_INDEX_SUFFIX), driver_name)
+
+    if driver_name in CACHED_INDEX_DRIVERS:
+        index_path = Path(index_dir or file_path.parent).joinpath(f"{file_path.name}{CACHE_INDEX_SUFFIX}")
+        return SpatialIndex(index_path, index_path, driver_name)
+
+    return SpatialIndex(file_path, None, driver_name)
+
+
+def is_spatial_index_valid(file_path: str | Path, index_dir: str | Path | None = None) -> bool:
+    """Check whether the spatial index of a vector dataset exists and was built from the current version of the file.
+
+    Args:
+        file_path: Path to the vector dataset.
+        index_dir: Optional directory the index is stored in. See get_spatial_index.
+
+    Returns:
+        Whether the index can be used.
+
+    """
+    spatial_index = get_spatial_index(file_path, index_dir)
+    if spatial_index.index_path is None:
+        return True
+
+    fingerprint_path = _get_fingerprint_path(spatial_index.index_path)
+    if not spatial_index.index_path.exists() or not fingerprint_path.exists():
+        return False
+
+    try:
+        recorded = SourceFingerprint(**json.loads(fingerprint_path.read_text()))
+    except (ValueError, TypeError):
+        return False
+
+    return recorded == get_fingerprint(file_path)
+
+
+def ensure_spatial_index(
+    file_path: str | Path, layer_name: str | None = None, index_dir: str | Path | None = None
+) -> SpatialIndex:
+    """Build a persistent spatial index for a vector dataset, unless an up to date one already exists.
+
+    Shapefiles are indexed with a .qix file, which the shapefile driver uses automatically. Formats without spatial
+    index support (e.g. GeoJSON) are copied into a GeoPackage cache, which has an R-tree index. Every layer is copied
+    into the cache, as it's shared by all of the layers of the dataset. Other formats are
+    assumed to manage their own index. An index is rebuilt whenever the size or modification time of the source file
+    differs from when it was built.
+
+    Args:
+        file_path: Path to the vector dataset.
+        layer_name: Optional name of the layer of a shapefile to index. Defaults to the first layer.
+        index_dir: Optional directory to store the index in. See get_spatial_index.
+
+    Returns:
+        SpatialIndex containing the path of the dataset to query for indexed reads.
+
+    """
+    spatial_index = get_spatial_index(file_path, index_dir)
+    if is_spatial_index_valid(file_path, index_dir):
+        return spatial_index
+
+    fingerprint = get_fingerprint(file_path)
+
+    if spatial_index.driver_name == SHAPEFILE_DRIVER:
+        _build_shapefile_index(file_path, layer_name)
+    else:
+        _build_cache_index(file_path, spatial_index.index_path)
+
+    _write_fingerprint(spatial_index.index_path, fingerprint)
+
+    return spatial_index
+
+
+def _build_shapefile_index(file_path: str | Path, layer_name: str | None) -> None:
+    ds = ogr.Open(str(file_path), 1)
+    if ds is None:
+        raise IOError(f"The dataset; {file_path} could not be opened for update")
+
+    layer = ds.GetLayerByName(layer_name) if layer_name else ds.GetLayer()
+    ds.ExecuteSQL(f'CREATE SPATIAL INDEX ON "{layer.GetName()}"')
+
+    # Ensure the dataset is properly closed by deleting it
+    del layer, ds
+
+
+def _build_cache_index(file_path: str | Path, index_path: Path) -> None:
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    temp_path = _get_temp_path(index_path)
+
+    # The GeoPackage driver creates an R-tree spatial index for each layer by default
+    options = gdal.VectorTranslateOptions(format=GEOPACKAGE_DRIVER, layerCreationOptions=["SPATIAL_INDEX=YES"])
+    try:
+        output_ds = gdal.VectorTranslate(str(temp_path), str(file_path), options=options)
+        if output_ds is None:
+            raise IOError(f"Could not build a spatial index for {file_path}")
+
+        # Ensure the output dataset is properly closed by deleting it
+        del output_ds
+
+        os.replace(temp_path, index_path)
+    finally:
+        temp_path.unlink(missing_ok=True)
+
+
+def _get_temp_path(path: Path) -> Path:
+    """A unique path alongside a file to write it to before moving it into place, so processes building the same
+    index at once don't write to the same file."""
+    return path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+
+
+def _get_fingerprint_path(index_path: Path) -> Path:
+    return index_path.with_name(f"{index_path.name}{FINGERPRINT_SUFFIX}")
+
+
+def _write_fingerprint(index_path: Path, fingerprint: SourceFingerprint) -> None:
+    fingerprint_path = _get_fingerprint_path(index_path)
+    temp_path = _get_temp_path(fingerprint_path)
+    temp_path.write_text(json.dumps(fingerprint._asdict()))
+    os.replace(temp_path, fingerprint_path)
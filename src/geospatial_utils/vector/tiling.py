@@ -0,0 +1,311 @@
+import gzip
+from collections.abc import Iterator
+from typing import Any, NamedTuple
+
+import numpy as np
+from osgeo import ogr, osr
+
+from geospatial_utils.srs.bounds import transform_bounds
+from geospatial_utils.srs.cache import get_coordinate_transformation, get_srs
+from geospatial_utils.tiles.grid import (
+    MAX_ZOOM,
+    WEB_MERCATOR_EPSG,
+    Tile,
+    clamp_to_world,
+    get_children,
+    get_tile_bounds,
+    get_tile_range,
+)
+from geospatial_utils.tiles.mvt import DEFAULT_EXTENT, VectorTileLayer, encode_tile
+from geospatial_utils.tiles.stores import MVT_FORMAT, TileStore
+from geospatial_utils.vector.parallel import get_worker_dataset, run_in_processes
+from geospatial_utils.vector.types import Record
+from geospatial_utils.vector.vector_dataset import VectorDataset
+
+# Width of the margin (in tile coordinates) features are clipped to around each tile, so lines and polygon edges
+# crossing between tiles are drawn seamlessly
+DEFAULT_BUFFER = 64
+
+# Tolerance (in tile coordinates) geometries are simplified to, which scales with the size of the tiles of each zoom
+DEFAULT_SIMPLIFICATION = 1.0
+
+# Number of tiles rendered by a worker at a time
+TILES_PER_TASK = 64
+
+# Types of the fields of a layer, as described by the vector_layers metadata of a tileset
+NUMBER_FIELD_TYPES = (ogr.OFTInteger, ogr.OFTInteger64, ogr.OFTReal)
+
+
+class VectorTileOptions(NamedTuple):
+    """The options used to render each vector tile, in a form that can be sent to another process.
+
+    Attributes:
+        layer_name: Name of the layer within the tiles.
+        columns: Names of the fields to include as attributes. None includes every field.
+        where: Optional attribute filter selecting the features to include, as an OGR SQL WHERE clause.
+        extent: Width and height of each tile in tile coordinates.
+        buffer: Width of the margin (in tile coordinates) features are clipped to around each tile.
+        simplification: Tolerance (in tile coordinates) lines and polygons are simplified to. 0 disables it.
+        compress: Whether to gzip compress the tiles.
+
+    """
+
+    layer_name: str
+    columns: list[str] | None = None
+    where: str | None = None
+    extent: int = DEFAULT_EXTENT
+    buffer: int = DEFAULT_BUFFER
+    simplification: float = DEFAULT_SIMPLIFICATION
+    compress: bool = True
+
+
+def generate_vector_tiles(
+    vector_ds: VectorDataset,
+    store: TileStore,
+    min_zoom: int,
+    max_zoom: int,
+    options: VectorTileOptions | None = None,
+    workers: int | None = 1,
+) -> int:
+    """Render a layer into a pyramid of Mapbox Vector Tiles, written to a tile store.
+
+    Each tile reads only the features intersecting it (using any spatial index of the layer), reprojects them into
+    WebMercator, simplifies them to a tolerance which scales with the zoom level, clips them to the tile and its buffer
+    and quantises them into tile coordinates. Only the children of tiles containing features are rendered at the next
+    zoom level, so empty parts of the world are pruned early, and empty tiles are never written.
+
+    Args:
+        vector_ds: The layer to tile.
+        store: The TileStore to write the tiles to. Its tile format must be MVT_FORMAT.
+        min_zoom: The lowest zoom level to render.
+        max_zoom: The highest zoom level to render.
+        options: The VectorTileOptions. Defaults to a layer named after the source layer, with every field.
+        workers: Number of worker processes, each rendering batches of tiles of a zoom level in parallel. If more than
+            one (or None, to use the number of CPUs), the dataset must have been opened from a file. Defaults to 1,
+            rendering the tiles in the calling process.
+
+    Returns:
+        The number of tiles written.
+
+    Raises:
+        ValueError: The zoom levels are invalid.
+        ValueError: The tile format of the store isn't MVT_FORMAT.
+        ValueError: Multiple workers were requested for a dataset which wasn't opened from a file.
+
+    """
+    if not 0 <= min_zoom <= max_zoom <= MAX_ZOOM:
+        raise ValueError(f"The zoom levels {min_zoom} to {max_zoom} should be between 0 and {MAX_ZOOM}.")
+
+    if store.tile_format != MVT_FORMAT:
+        raise ValueError(f"Vector tiles can't be written to a store of {store.tile_format} tiles.")
+
+    if workers != 1 and vector_ds.file_path is None:
+        raise ValueError("Only datasets opened from a file can be tiled with multiple workers.")
+
+    options = options or VectorTileOptions(layer_name=vector_ds.layer.GetName())
+    store.metadata.setdefault("vector_layers", [get_vector_layer_metadata(vector_ds, options, min_zoom, max_zoom)])
+
+    # The extent of the features the attribute filter selects, so tiles are only rendered where those features are
+    with vector_ds.apply_filters(where=options.where, columns=[]) as layer:
+        extent = layer.GetExtent(force=True, can_return_null=True)
+    if extent is None:
+        return store.tile_count
+
+    min_x, max_x, min_y, max_y = extent
+    bounds = (min_x, min_y, max_x, max_y)
+    if vector_ds.srs is not None:
+        bounds = transform_bounds(bounds, vector_ds.srs, _get_web_mercator_srs())
+    tiles = list(get_tile_range(clamp_to_world(bounds), min_zoom).iter_tiles())
+
+    for zoom in range(min_zoom, max_zoom + 1):
+        occupied = []
+        for tile, data, has_features in _render_tiles_of_zoom(vector_ds, tiles, options, workers):
+            if data is not None:
+                store.write(tile, data)
+
+            # Features too small to be drawn at this zoom level may still be drawn by the tiles below it
+            if has_features:
+                occupied.append(tile)
+
+        tiles = [child for tile in occupied for child in get_children(tile)] if zoom < max_zoom else []
+
+    return store.tile_count
+
+
+def render_vector_tile(vector_ds: VectorDataset, tile: Tile, options: VectorTileOptions) -> bytes | None:
+    """Render the features of a layer intersecting a tile into a Mapbox Vector Tile.
+
+    Args:
+        vector_ds: The layer to render.
+        tile: The tile to render.
+        options: The VectorTileOptions.
+
+    Returns:
+        The encoded (and, if options.compress, gzip compressed) tile, or None if it would be empty.
+
+    """
+    data, _ = _render_tile(vector_ds, tile, options)
+    return data
+
+
+def _render_tile(vector_ds: VectorDataset, tile: Tile, options: VectorTileOptions) -> tuple[bytes | None, bool]:
+    """Render a tile, also returning whether any features intersect it (even if they're too small to be drawn)."""
+    tile_bounds = get_tile_bounds(tile)
+    min_x, min_y, max_x, max_y = tile_bounds
+    scale = options.extent / (max_x - min_x)
+    margin = options.buffer / scale
+    clip_bounds = (min_x - margin, min_y - margin, max_x + margin, max_y + margin)
+
+    # Only the features intersecting the clip bounds are read, using any spatial index of the layer
+    web_mercator_srs = _get_web_mercator_srs()
+    coord_transform = None
+    filter_bounds = clip_bounds
+    if vector_ds.srs is not None and not vector_ds.srs.IsSame(web_mercator_srs):
+        coord_transform = get_coordinate_transformation(vector_ds.srs, web_mercator_srs)
+        filter_bounds = transform_bounds(clip_bounds, web_mercator_srs, vector_ds.srs)
+
+    clip_geometry = _create_clip_geometry(clip_bounds)
+    layer = VectorTileLayer(options.layer_name, options.extent)
+    has_features = False
+    for record in vector_ds.iter_records(bbox=filter_bounds, where=options.where, columns=options.columns):
+        geometry = _prepare_geometry(record, coord_transform, clip_geometry, options.simplification / scale)
+        if geometry is None:
+            continue
+
+        has_features = True
+        dimension = geometry.GetDimension()
+        parts = list(_iter_parts(geometry, dimension))
+        if dimension == 0:
+            points = [point for part in parts for point in _to_tile_coords(part.GetPoints(), tile_bounds, scale)]
+            layer.add_points(points, record.attributes, record.fid)
+        elif dimension == 1:
+            lines = [_to_tile_coords(part.GetPoints(), tile_bounds, scale) for part in parts]
+            layer.add_lines(lines, record.attributes, record.fid)
+        else:
+            polygons = [
+                [
+                    _to_tile_coords(part.GetGeometryRef(index).GetPoints(), tile_bounds, scale)
+                    for index in range(part.GetGeometryCount())
+                ]
+                for part in parts
+            ]
+            layer.add_polygons(polygons, record.attributes, record.fid)
+
+    if not layer.features:
+        return None, has_features
+
+    data = encode_tile([layer])
+    return gzip.compress(data, mtime=0) if options.compress else data, has_features
+
+
+def get_vector_layer_metadata(
+    vector_ds: VectorDataset, options: VectorTileOptions, min_zoom: int, max_zoom: int
+) -> dict[str, Any]:
+    """Describe the layer of the tiles and its fields, as the vector_layers metadata of a tileset."""
+    fields = {
+        field.name: "Number" if field.type in NUMBER_FIELD_TYPES else "String"
+        for field in vector_ds.fields
+        if options.columns is None or field.name in options.columns
+    }
+    return {"id": options.layer_name, "fields": fields, "minzoom": min_zoom, "maxzoom": max_zoom}
+
+
+def _get_web_mercator_srs() -> osr.SpatialReference:
+    return get_srs(epsg_code=WEB_MERCATOR_EPSG, axis_mapping_strategy=osr.OAMS_TRADITIONAL_GIS_ORDER)
+
+
+def _render_tiles_of_zoom(
+    vector_ds: VectorDataset, tiles: list[Tile], options: VectorTileOptions, workers: int | None
+) -> Iterator[tuple[Tile, bytes | None, bool]]:
+    if workers == 1:
+        for tile in tiles:
+            yield tile, *_render_tile(vector_ds, tile, options)
+        return
+
+    tasks = (
+        (str(vector_ds.file_path), vector_ds.layer.GetName(), tiles[start : start + TILES_PER_TASK], options)
+        for start in range(0, len(tiles), TILES_PER_TASK)
+    )
+    for results in run_in_processes(_render_tiles, tasks, workers, preserve_order=False):
+        yield from results
+
+
+def _render_tiles(
+    file_path: str, layer_name: str, tiles: list[Tile], options: VectorTileOptions
+) -> list[tuple[Tile, bytes | None, bool]]:
+    """Render a batch of tiles in a worker process."""
+    vector_ds = get_worker_dataset(VectorDataset, file_path, layer_name)
+    return [(tile, *_render_tile(vector_ds, tile, options)) for tile in tiles]
+
+
+def _prepare_geometry(
+    record: Record, coord_transform: osr.CoordinateTransformation | None, clip_geometry: ogr.Geometry, tolerance: float
+) -> ogr.Geometry | None:
+    """Reproject, clip and simplify the geometry of a record, returning None if nothing of it is left."""
+    if record.geometry is None:
+        return None
+
+    geometry = ogr.CreateGeometryFromWkb(record.geometry)
+    if geometry.HasCurveGeometry():
+        geometry = geometry.GetLinearGeometry()
+    if coord_transform is not None:
+        geometry.Transform(coord_transform)
+
+    dimension = geometry.GetDimension()
+
+    # Clip before simplifying, so only the part of the geometry within the tile is simplified. Geometries entirely
+    # within the clip area are kept as they are, avoiding the cost of the intersection
+    clip_min_x, clip_max_x, clip_min_y, clip_max_y = clip_geometry.GetEnvelope()
+    min_x, max_x, min_y, max_y = geometry.GetEnvelope()
+    if not (clip_min_x <= min_x and max_x <= clip_max_x and clip_min_y <= min_y and max_y <= clip_max_y):
+        geometry = geometry.Intersection(clip_geometry)
+
+    if geometry is not None and not geometry.IsEmpty() and dimension > 0 and tolerance > 0:
+        geometry = geometry.SimplifyPreserveTopology(tolerance)
+
+    if geometry is None or geometry.IsEmpty() or not any(True for _ in _iter_parts(geometry, dimension)):
+        return None
+
+    # Clipping can return a collection of several dimensions, of which only those of the original geometry are kept
+    if geometry.GetDimension() != dimension:
+        collection = ogr.Geometry(ogr.wkbGeometryCollection)
+        for part in _iter_parts(geometry, dimension):
+            collection.AddGeometry(part)
+        geometry = collection
+
+    return geometry
+
+
+def _iter_parts(geometry: ogr.Geometry, dimension: int) -> Iterator[ogr.Geometry]:
+    """Iterate over the points, lines or polygons of a geometry (and any collections within it) of a dimension."""
+    if geometry.GetGeometryCount() and ogr.GT_Flatten(geometry.GetGeometryType()) != ogr.wkbPolygon:
+        for index in range(geometry.GetGeometryCount()):
+            yield from _iter_parts(geometry.GetGeometryRef(index), dimension)
+    elif not geometry.IsEmpty() and geometry.GetDimension() == dimension:
+        yield geometry
+
+
+def _create_clip_geometry(bounds: tuple[float, float, float, float]) -> ogr.Geometry:
+    """Create a rectangular polygon covering (min_x, min_y, max_x, max_y) bounds."""
+    min_x, min_y, max_x, max_y = bounds
+
+    ring = ogr.Geometry(ogr.wkbLinearRing)
+    for x_coord, y_coord in [(min_x, min_y), (max_x, min_y), (max_x, max_y), (min_x, max_y), (min_x, min_y)]:
+        ring.AddPoint_2D(x_coord, y_coord)
+
+    clip_geometry = ogr.Geometry(ogr.wkbPolygon)
+    clip_geometry.AddGeometry(ring)
+
+    return clip_geometry
+
+
+def _to_tile_coords(
+    coords: list[tuple[float, ...]], tile_bounds: tuple[float, float, float, float], scale: float
+) -> list[tuple[int, int]]:
+    """Quantise WebMercator coordinates into the integer coordinates of a tile, with y counted down from its top."""
+    min_x, _, _, max_y = tile_bounds
+    arr = np.asarray(coords, dtype=np.float64)[:, :2]
+    tile_x = np.round((arr[:, 0] - min_x) * scale).astype(np.int64)
+    tile_y = np.round((max_y - arr[:, 1]) * scale).astype(np.int64)
+
+    return list(zip(tile_x.tolist(), tile_y.tolist()))
@@ -1,6 +1,12 @@
-from typing import NamedTuple
+from typing import Any, NamedTuple
 
 
 class Field(NamedTuple):
     name: str
     type: str
+
+
+class Record(NamedTuple):
+    fid: int
+    geometry: bytes | None
+    attributes: dict[str, Any]
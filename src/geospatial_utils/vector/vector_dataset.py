@@ -1,23 +1,99 @@
+from collections.abc import Iterator
+from contextlib import contextmanager
 from pathlib import Path
 
+import numpy as np
 from osgeo import gdal, ogr, osr
 
-from geospatial_utils.vector.io import create_vector_dataset, write_feature_to_output_layer
-from geospatial_utils.vector.types import Field
+from geospatial_utils.srs.cache import get_coordinate_transformation, get_srs
+from geospatial_utils.vector.arrow import (
+    DEFAULT_ARROW_BATCH_SIZE,
+    get_geometry_column_index,
+    has_arrow_stream,
+    is_arrow_supported,
+    iter_arrow_batches,
+    pa,
+    transform_wkb_array,
+)
+from geospatial_utils.vector.io import (
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_SHARD_SIZE,
+    BatchedFeatureWriter,
+    create_vector_dataset,
+)
+from geospatial_utils.vector.parallel import (
+    Shard,
+    ShardFilters,
+    get_fid_shards,
+    get_worker_dataset,
+    iter_shard_features,
+    run_in_processes,
+)
+from geospatial_utils.vector.spatial_index import ensure_spatial_index
+from geospatial_utils.vector.types import Field, Record
+from geospatial_utils.vsi.remote import get_remote_config_options, is_remote_path, is_vsi_path, to_local_path
+
+# Special field names used to ignore the geometry and style when reading features
+IGNORED_GEOMETRY_FIELD = "OGR_GEOMETRY"
+IGNORED_STYLE_FIELD = "OGR_STYLE"
+
+# Names of the FID and geometry columns of exported tables, matching the fields of a Record
+FID_COLUMN = "fid"
+GEOMETRY_COLUMN = "geometry"
+
+# Names GDAL gives the FID and geometry columns of an Arrow stream when the layer doesn't name them
+DEFAULT_ARROW_FID_COLUMN = "OGC_FID"
+DEFAULT_ARROW_GEOMETRY_COLUMN = "wkb_geometry"
 
 
 class VectorDataset:
-    def __init__(self, ds: str | Path | gdal.Dataset, layer_name: str = None):
+    def __init__(
+        self,
+        ds: str | Path | gdal.Dataset,
+        layer_name: str = None,
+        use_spatial_index: bool = False,
+        index_dir: str | Path | None = None,
+    ):
+        """Open a vector dataset.
+
+        Args:
+            ds: Path to the vector dataset (including /vsi* paths and object store URIs, e.g. s3://bucket/key.fgb), or
+                an opened gdal.Dataset.
+            layer_name: Name of the layer to use. Defaults to the first layer.
+            use_spatial_index: Whether to build (or reuse) a persistent spatial index for the dataset, so spatially
+                filtered reads don't scan the whole layer. See ensure_spatial_index. Only used when ds is a local path.
+            index_dir: Optional directory to store the spatial index in. Defaults to the directory of the dataset.
+
+        Raises:
+            ValueError: A spatial index is requested for a dataset on a virtual file system.
+
+        """
+        self.driver_name = None
+        self.file_path = None
+
         if isinstance(ds, str | Path):
-            self.open_dataset(ds)
+            if use_spatial_index:
+                if is_vsi_path(to_local_path(ds)):
+                    raise ValueError(f"A spatial index can't be built for {ds}, as it's on a virtual file system.")
+
+                spatial_index = ensure_spatial_index(ds, layer_name, index_dir)
+                self.open_dataset(spatial_index.dataset_path)
+                # Outputs keep the format of the source dataset rather than that of the index
+                self.driver_name = spatial_index.driver_name
+            else:
+                self.open_dataset(ds)
         elif isinstance(ds, gdal.Dataset):
             self.ds = ds
         else:
             raise ValueError(f"{ds} is not a valid vector dataset.")
 
-        self.layer = self.get_layer()
+        self.driver_name = self.driver_name or self.ds.GetDriver().ShortName
+        self.layer = self.get_layer(layer_name)
         self.srs = self.layer.GetSpatialRef()
 
+        # OGR can't report the attribute filter of a layer, so the one set by apply_filters is tracked to restore it
+        self._where: str | None = None
+
     @property
     def fields(self) -> list[Field]:
         fields = [Field(field.name, field.type) for field in self.layer.schema]
@@ -28,10 +104,20 @@ class VectorDataset:
         return [field.name for field in self.layer.schema]
 
     def open_dataset(self, file_path: str | Path) -> None:
-        if not Path(file_path).exists():
+        """Open the vector dataset and store it as self.ds. Remote datasets are opened with the REMOTE_CONFIG_OPTIONS.
+
+        Raises:
+            IOError: The dataset doesn't exist or couldn't be opened.
+
+        """
+        file_path = to_local_path(file_path)
+        with gdal.config_options(get_remote_config_options() if is_remote_path(file_path) else {}):
+            self.ds = ogr.Open(str(file_path))
+
+        if self.ds is None:
             raise IOError(f"The dataset; {file_path} does not exist")
 
-        self.ds = ogr.Open(str(file_path))
+        self.file_path = file_path
 
     def get_layer(self, layer_name: str = None) -> ogr.Layer:
         if layer_name:
@@ -39,61 +125,617 @@ class VectorDataset:
 
         return self.ds.GetLayer()
 
+    @contextmanager
+    def apply_filters(
+        self,
+        bbox: tuple[float, float, float, float] | None = None,
+        geometry: ogr.Geometry | None = None,
+        where: str | None = None,
+        columns: list[str] | None = None,
+        include_geometry: bool = True,
+    ) -> Iterator[ogr.Layer]:
+        """Temporarily apply filters to the layer, so OGR only reads and decodes the features and fields needed.
+
+        The filters are pushed down to the driver, which can use spatial and attribute indexes where they exist. On
+        exit, the filters the layer had before are restored, so calls can be nested. OGR can't report an attribute
+        filter set directly on the layer, so when a where clause is given, only one set by an enclosing apply_filters
+        is restored.
+
+        Args:
+            bbox: Optional (min_x, min_y, max_x, max_y) bounding box, in the layer srs, that features must intersect.
+            geometry: Optional geometry that features must intersect. If it has a spatial reference which differs from
+                the layer, it's transformed into the layer srs.
+            where: Optional attribute filter, as an OGR SQL WHERE clause (e.g. "population > 1000").
+            columns: Optional list of the names of the fields to read. Other fields are not decoded.
+            include_geometry: Whether to read the geometries. Defaults to True.
+
+        Yields:
+            The filtered layer.
+
+        Raises:
+            ValueError: Both a bbox and a geometry have been provided.
+            ValueError: The columns include names which aren't fields of the layer.
+            ValueError: The attribute filter is invalid.
+
+        """
+        if bbox is not None and geometry is not None:
+            raise ValueError("Only one of a bbox or a geometry should be provided.")
+
+        unknown_columns = set(columns or []) - set(self.field_names)
+        if unknown_columns:
+            raise ValueError(f"The columns {sorted(unknown_columns)} are not fields of the layer.")
+
+        previous_spatial_filter = self.layer.GetSpatialFilter()
+        if previous_spatial_filter is not None:
+            previous_spatial_filter = previous_spatial_filter.Clone()
+        previous_where = self._where
+        previous_ignored_fields = self._get_ignored_fields()
+
+        try:
+            if bbox is not None:
+                self.layer.SetSpatialFilterRect(*bbox)
+            elif geometry is not None:
+                self.layer.SetSpatialFilter(self._to_layer_srs(geometry))
+
+            if where is not None:
+                if self.layer.SetAttributeFilter(where) != ogr.OGRERR_NONE:
+                    raise ValueError(f"The attribute filter `{where}` is invalid.")
+                self._where = where
+
+            ignored_fields = [IGNORED_STYLE_FIELD]
+            if columns is not None:
+                ignored_fields += [name for name in self.field_names if name not in columns]
+            if not include_geometry:
+                ignored_fields.append(IGNORED_GEOMETRY_FIELD)
+
+            self.layer.SetIgnoredFields(ignored_fields)
+
+            yield self.layer
+        finally:
+            if bbox is not None or geometry is not None:
+                self.layer.SetSpatialFilter(previous_spatial_filter)
+            if where is not None:
+                self.layer.SetAttributeFilter(previous_where)
+                self._where = previous_where
+            self.layer.SetIgnoredFields(previous_ignored_fields)
+
+    def _get_ignored_fields(self) -> list[str]:
+        """The names of the fields (including the special geometry and style fields) currently ignored by the layer."""
+        layer_defn = self.layer.GetLayerDefn()
+        ignored_fields = [
+            layer_defn.GetFieldDefn(index).GetName()
+            for index in range(layer_defn.GetFieldCount())
+            if layer_defn.GetFieldDefn(index).IsIgnored()
+        ]
+        if layer_defn.IsGeometryIgnored():
+            ignored_fields.append(IGNORED_GEOMETRY_FIELD)
+        if layer_defn.IsStyleIgnored():
+            ignored_fields.append(IGNORED_STYLE_FIELD)
+
+        return ignored_fields
+
+    def iter_records(
+        self,
+        bbox: tuple[float, float, float, float] | None = None,
+        geometry: ogr.Geometry | None = None,
+        where: str | None = None,
+        columns: list[str] | None = None,
+        include_geometry: bool = True,
+        sql: str | None = None,
+    ) -> Iterator[Record]:
+        """Lazily read the features matching the filters as lightweight records, rather than live ogr.Feature objects.
+
+        Args:
+            bbox: Optional (min_x, min_y, max_x, max_y) bounding box, in the layer srs, that features must intersect.
+            geometry: Optional geometry that features must intersect.
+            where: Optional attribute filter, as an OGR SQL WHERE clause. Can't be used with sql.
+            columns: Optional list of the names of the fields to read. Defaults to all fields. Can't be used with sql.
+            include_geometry: Whether to read the geometries. Defaults to True.
+            sql: Optional SQL statement to run against the dataset (using the dialect of the driver), reading its
+                results instead of the layer. Any bbox or geometry is applied as a spatial filter on the statement.
+
+        Yields:
+            A Record for each feature, containing its FID, geometry as WKB (or None) and a dictionary of field values.
+
+        Raises:
+            ValueError: Either a where clause or columns have been provided alongside sql.
+
+        """
+        if sql is None:
+            with self.apply_filters(bbox, geometry, where, columns, include_geometry) as layer:
+                yield from _read_records(layer, self.field_names if columns is None else columns, include_geometry)
+            return
+
+        if where is not None or columns is not None:
+            raise ValueError("The where and columns filters can't be used with sql, include them in the statement.")
+
+        spatial_filter = geometry
+        if bbox is not None:
+            spatial_filter = ogr.CreateGeometryFromWkt(_bbox_to_wkt(bbox))
+
+        if spatial_filter is not None:
+            spatial_filter = self._to_layer_srs(spatial_filter)
+
+        result_layer = self.ds.ExecuteSQL(sql, spatialFilter=spatial_filter)
+        if result_layer is None:
+            raise ValueError(f"The SQL statement `{sql}` is invalid.")
+
+        try:
+            field_names = [field.name for field in result_layer.schema]
+            yield from _read_records(result_layer, field_names, include_geometry)
+        finally:
+            self.ds.ReleaseResultSet(result_layer)
+
+    def to_arrow(
+        self,
+        bbox: tuple[float, float, float, float] | None = None,
+        geometry: ogr.Geometry | None = None,
+        where: str | None = None,
+        columns: list[str] | None = None,
+        include_geometry: bool = True,
+        batch_size: int = DEFAULT_ARROW_BATCH_SIZE,
+    ) -> "pa.Table":
+        """Read the features matching the filters into an Arrow table, without creating a Python object per feature.
+
+        The record batches of the Arrow stream are wrapped by the table without being copied. Without Arrow stream
+        support (see is_arrow_supported), the table is built from to_numpy instead.
+
+        Args:
+            bbox: Optional (min_x, min_y, max_x, max_y) bounding box, in the layer srs, that features must intersect.
+            geometry: Optional geometry that features must intersect.
+            where: Optional attribute filter, as an OGR SQL WHERE clause.
+            columns: Optional list of the names of the fields to read. Defaults to all fields.
+            include_geometry: Whether to read the geometries. Defaults to True.
+            batch_size: Maximum number of features read per record batch. Defaults to DEFAULT_ARROW_BATCH_SIZE.
+
+        Returns:
+            Table with a fid column, a column per field and (if included) a geometry column of WKB.
+
+        Raises:
+            ImportError: pyarrow is not installed.
+
+        """
+        if pa is None:
+            raise ImportError("pyarrow is required to export a layer as an Arrow table.")
+
+        if not is_arrow_supported(self.layer):
+            return pa.table(self.to_numpy(bbox, geometry, where, columns, include_geometry, batch_size))
+
+        with self.apply_filters(bbox, geometry, where, columns, include_geometry) as layer:
+            stream = layer.GetArrowStreamAsPyArrow(self._get_arrow_stream_options(batch_size))
+            table = pa.Table.from_batches(list(stream), schema=stream.schema)
+
+        return table.rename_columns(self._get_export_column_names(table.column_names))
+
+    def to_numpy(
+        self,
+        bbox: tuple[float, float, float, float] | None = None,
+        geometry: ogr.Geometry | None = None,
+        where: str | None = None,
+        columns: list[str] | None = None,
+        include_geometry: bool = True,
+        batch_size: int = DEFAULT_ARROW_BATCH_SIZE,
+    ) -> dict[str, np.ndarray]:
+        """Read the features matching the filters into a columnar table of NumPy arrays.
+
+        The features are read in batches through the Arrow stream interface, so each column is decoded into an array
+        by GDAL rather than a field at a time. Nullable fields are returned as masked arrays. Without Arrow stream
+        support (see has_arrow_stream), the columns are gathered from the records instead.
+
+        Args:
+            bbox: Optional (min_x, min_y, max_x, max_y) bounding box, in the layer srs, that features must intersect.
+            geometry: Optional geometry that features must intersect.
+            where: Optional attribute filter, as an OGR SQL WHERE clause.
+            columns: Optional list of the names of the fields to read. Defaults to all fields.
+            include_geometry: Whether to read the geometries. Defaults to True.
+            batch_size: Maximum number of features read per batch. Defaults to DEFAULT_ARROW_BATCH_SIZE.
+
+        Returns:
+            Dictionary of a fid array, an array per field and (if included) a geometry array of WKB bytes objects.
+
+        """
+        field_names = columns if columns is not None else self.field_names
+
+        with self.apply_filters(bbox, geometry, where, columns, include_geometry) as layer:
+            batches = []
+            if has_arrow_stream():
+                batches = list(layer.GetArrowStreamAsNumPy(self._get_arrow_stream_options(batch_size)))
+
+            if not batches:
+                return _records_to_columns(
+                    _read_records(layer, field_names, include_geometry), field_names, include_geometry
+                )
+
+        table = {}
+        for name, column_name in zip(batches[0], self._get_export_column_names(list(batches[0]))):
+            arrays = [batch[name] for batch in batches]
+            concatenate = np.ma.concatenate if isinstance(arrays[0], np.ma.MaskedArray) else np.concatenate
+            table[column_name] = concatenate(arrays)
+
+        return table
+
+    def _get_arrow_stream_options(self, batch_size: int) -> list[str]:
+        return ["INCLUDE_FID=YES", f"MAX_FEATURES_IN_BATCH={batch_size}", "GEOMETRY_ENCODING=WKB"]
+
+    def _get_export_column_names(self, column_names: list[str]) -> list[str]:
+        """Rename the FID and geometry columns of an Arrow stream to FID_COLUMN and GEOMETRY_COLUMN."""
+        renamed = {
+            self.layer.GetFIDColumn() or DEFAULT_ARROW_FID_COLUMN: FID_COLUMN,
+            self.layer.GetGeometryColumn() or DEFAULT_ARROW_GEOMETRY_COLUMN: GEOMETRY_COLUMN,
+        }
+        return [renamed.get(name, name) for name in column_names]
+
+    def _to_layer_srs(self, geometry: ogr.Geometry) -> ogr.Geometry:
+        """Transform a geometry into the layer srs, if it has a different spatial reference."""
+        geometry_srs = geometry.GetSpatialReference()
+        if geometry_srs is None or self.srs is None or geometry_srs.IsSame(self.srs):
+            return geometry
+
+        geometry = geometry.Clone()
+        geometry.Transform(get_coordinate_transformation(geometry_srs, self.srs))
+        return geometry
+
     def reproject_layer(
         self,
         output_path: str | Path,
         target_epsg: int | None = None,
         target_srs: osr.SpatialReference | None = None,
         swap_xy: bool = False,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        use_arrow: bool = True,
+        bbox: tuple[float, float, float, float] | None = None,
+        geometry: ogr.Geometry | None = None,
+        where: str | None = None,
+        columns: list[str] | None = None,
+        workers: int | None = 1,
+        shard_size: int = DEFAULT_SHARD_SIZE,
+        preserve_order: bool = True,
     ) -> None:
         """Reprojects the opened vector dataset into a new spatial reference system, saving to a new file.
 
         Args:
             output_path: Path to save the reprojected dataset to.
             target_epsg: EPSG code to reproject to. If this isn't used, then target_srs must be provided.
-            target_srs: osr.SpatialReference object to use to reproject the dataset to. If this isn't used then 
+            target_srs: osr.SpatialReference object to use to reproject the dataset to. If this isn't used then
                 target_epsg must be provided.
             swap_xy: Whether to swap the xy coordinate order. This is sometimes required when converting between WGS84
                 and other coordinate systems. Defaults to False.
+            batch_size: Number of features written per transaction (or between flushes to disk, for drivers that don't
+                support transactions). Defaults to DEFAULT_BATCH_SIZE.
+            use_arrow: Whether to read, transform and write the features in Arrow record batches when supported (see
+                is_arrow_supported), rather than one feature at a time. Defaults to True.
+            bbox: Optional bounding box to only reproject the features that intersect it. See apply_filters.
+            geometry: Optional geometry to only reproject the features that intersect it. See apply_filters.
+            where: Optional attribute filter to only reproject the matching features. See apply_filters.
+            columns: Optional list of the names of the fields to include in the output. Defaults to all fields.
+            workers: Number of worker processes to reproject the layer with. If more than one (or None, to use the
+                number of CPUs), the layer is split into shards of features (see get_fid_shards) which are
+                reprojected in parallel and written by a single writer. Only datasets opened from a file can be
+                reprojected in parallel. Defaults to 1, reprojecting the layer in the calling process.
+            shard_size: Maximum number of features in each shard, when using multiple workers. Defaults to
+                DEFAULT_SHARD_SIZE.
+            preserve_order: Whether to write the features in the same order as the source, when using multiple workers.
+                Otherwise each shard is written as soon as it's reprojected. Defaults to True.
 
         Raises:
             ValueError: Neither the target_epsg or target_srs variables have values.
+            ValueError: Multiple workers were requested for a dataset which wasn't opened from a file.
 
         """
         if target_srs is None and target_epsg is None:
             raise ValueError("Either a target_epsg or a target_srs should be provided.")
 
         if target_epsg and target_srs is None:
-            target_srs = osr.SpatialReference()
-            target_srs.ImportFromEPSG(target_epsg)
+            target_srs = get_srs(epsg_code=target_epsg)
 
-        coord_transform = osr.CoordinateTransformation(self.srs, target_srs)
+        coord_transform = get_coordinate_transformation(self.srs, target_srs)
 
         # Create output vector dataset with the same format (e.g shapefile) and geometry type as the source dataset
-        output_ds, output_layer = create_vector_dataset(
-            output_path=output_path,
-            layer_name="test",
-            srs=target_srs,
-            fields=self.fields,
-            driver_name=self.ds.GetDriver().ShortName,
+        output_ds, output_layer = self._create_output_dataset(output_path, target_srs, columns=columns)
+
+        if workers == 1:
+            with self.apply_filters(bbox, geometry, where, columns):
+                self._write_layer(output_ds, output_layer, coord_transform, swap_xy, batch_size, use_arrow, columns)
+        else:
+            filters = ShardFilters(
+                bbox=bbox,
+                geometry_wkb=bytes(self._to_layer_srs(geometry).ExportToIsoWkb()) if geometry is not None else None,
+                where=where,
+                columns=columns,
+            )
+            self._write_shards(
+                output_ds,
+                output_layer,
+                target_srs,
+                swap_xy,
+                batch_size,
+                use_arrow,
+                filters,
+                workers,
+                shard_size,
+                preserve_order,
+            )
+
+        # Ensure the output dataset is properly closed by deleting it
+        del output_ds, output_layer
+
+    def copy_layer(
+        self,
+        output_path: str | Path,
+        driver_name: str | None = None,
+        layer_name: str | None = None,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        use_arrow: bool = True,
+        bbox: tuple[float, float, float, float] | None = None,
+        geometry: ogr.Geometry | None = None,
+        where: str | None = None,
+        columns: list[str] | None = None,
+        layer_options: list[str] | None = None,
+        shard: Shard | None = None,
+    ) -> None:
+        """Copy the layer to a new vector dataset, optionally converting it to a different format.
+
+        Args:
+            output_path: Path to save the copy to.
+            driver_name: Name of the driver to write the copy with. Defaults to the driver of the opened dataset.
+            layer_name: Name of the output layer. Defaults to the filename of the output path without the extension.
+            batch_size: Number of features written per transaction (or between flushes to disk, for drivers that don't
+                support transactions). Defaults to DEFAULT_BATCH_SIZE.
+            use_arrow: Whether to copy the features in Arrow record batches when supported (see is_arrow_supported),
+                rather than one feature at a time. Defaults to True.
+            bbox: Optional bounding box to only copy the features that intersect it. See apply_filters.
+            geometry: Optional geometry to only copy the features that intersect it. See apply_filters.
+            where: Optional attribute filter to only copy the matching features. See apply_filters.
+            columns: Optional list of the names of the fields to include in the copy. Defaults to all fields.
+            layer_options: Optional layer creation options for the output driver.
+            shard: Optional Shard of the (filtered) layer to copy, from get_fid_shards. Used to copy the layer in parts
+                in worker processes.
+
+        """
+        output_ds, output_layer = self._create_output_dataset(
+            output_path, self.srs, driver_name, layer_name, columns, layer_options
+        )
+
+        if shard is not None:
+            where = ShardFilters(where=where).with_shard(shard).where
+
+        with self.apply_filters(bbox, geometry, where, columns):
+            self._write_layer(
+                output_ds, output_layer, batch_size=batch_size, use_arrow=use_arrow, columns=columns, shard=shard
+            )
+
+        # Ensure the output dataset is properly closed by deleting it
+        del output_ds, output_layer
+
+    def _create_output_dataset(
+        self,
+        output_path: str | Path,
+        srs: osr.SpatialReference,
+        driver_name: str | None = None,
+        layer_name: str | None = None,
+        columns: list[str] | None = None,
+        layer_options: list[str] | None = None,
+    ) -> tuple[gdal.Dataset, ogr.Layer]:
+        """Create an empty vector dataset with the same fields (or a subset of them) and geometry type as the layer."""
+        fields = self.fields
+        if columns is not None:
+            fields = [field for field in fields if field.name in columns]
+
+        return create_vector_dataset(
+            output_path=str(output_path),
+            layer_name=layer_name or Path(output_path).stem,
+            srs=srs,
+            fields=fields,
+            driver_name=driver_name or self.driver_name,
             geom_type=self.layer.GetGeomType(),
+            layer_options=layer_options,
         )
 
-        for feature in self.layer:
-            geometry = feature.GetGeometryRef()
-            geometry.Transform(coord_transform)
+    def _write_layer(
+        self,
+        output_ds: gdal.Dataset,
+        output_layer: ogr.Layer,
+        coord_transform: osr.CoordinateTransformation | None = None,
+        swap_xy: bool = False,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        use_arrow: bool = True,
+        columns: list[str] | None = None,
+        shard: Shard | None = None,
+    ) -> None:
+        """Write every feature of the layer (or of a shard of it) to the output layer, transforming the geometries if
+        required."""
+        # Arrow streams always start from the first feature, so shards read by position are written feature by feature
+        use_arrow = use_arrow and (shard is None or not shard.is_positional)
+
+        with BatchedFeatureWriter(output_ds, output_layer, batch_size) as writer:
+            if use_arrow and is_arrow_supported(self.layer, output_layer):
+                self._write_arrow_batches(writer, coord_transform, swap_xy)
+            else:
+                field_names = self.field_names if columns is None else columns
+                self._write_features(writer, coord_transform, swap_xy, field_names, shard)
+
+    def _write_shards(
+        self,
+        output_ds: gdal.Dataset,
+        output_layer: ogr.Layer,
+        target_srs: osr.SpatialReference,
+        swap_xy: bool,
+        batch_size: int,
+        use_arrow: bool,
+        filters: ShardFilters,
+        workers: int | None,
+        shard_size: int,
+        preserve_order: bool,
+    ) -> None:
+        """Reproject the layer shard by shard in a pool of worker processes, writing the results with a single writer.
+
+        Each worker opens its own handle to the dataset, reads and reprojects the features of a shard and sends them
+        back as WKB records (or Arrow record batches, when supported), which are written to the output layer here.
+        """
+        if self.file_path is None:
+            raise ValueError("Only datasets opened from a file can be reprojected with multiple workers.")
 
-            if swap_xy:
-                geometry.SwapXY()
+        with self.apply_filters(filters.bbox, filters.geometry, filters.where, columns=[], include_geometry=False):
+            shards = get_fid_shards(self.layer, shard_size, self.ds.GetDriver().ShortName)
 
-            write_feature_to_output_layer(
-                output_layer=output_layer,
-                output_geometry=feature.geometry(),
-                feature_to_copy=feature,
-                fields_to_transfer=self.field_names,
+        # Arrow streams always start from the first feature, so shards read by position are sent back as records
+        use_arrow = use_arrow and is_arrow_supported(self.layer, output_layer)
+        use_arrow = use_arrow and not any(shard.is_positional for shard in shards)
+        tasks = (
+            (
+                str(self.file_path),
+                self.layer.GetName(),
+                shard,
+                target_srs.ExportToWkt(),
+                target_srs.GetAxisMappingStrategy(),
+                swap_xy,
+                use_arrow,
+                filters,
             )
+            for shard in shards
+        )
 
-            output_ds.SyncToDisk()
+        with BatchedFeatureWriter(output_ds, output_layer, batch_size) as writer:
+            for result in run_in_processes(_reproject_shard, tasks, workers, preserve_order):
+                if not use_arrow:
+                    for record in result:
+                        writer.write_record(record)
+                    continue
 
-        # Ensure the output dataset is properly closed by deleting it
-        del output_ds, output_layer
+                for batch in result:
+                    self._write_arrow_batch(writer, batch)
+
+    def _write_features(
+        self,
+        writer: BatchedFeatureWriter,
+        coord_transform: osr.CoordinateTransformation | None,
+        swap_xy: bool,
+        field_names: list[str],
+        shard: Shard | None = None,
+    ) -> None:
+        """Write the layer (or a shard of it) one feature at a time."""
+        for feature in iter_shard_features(self.layer, shard):
+            geometry = feature.GetGeometryRef()
+
+            if geometry is not None and coord_transform is not None:
+                geometry.Transform(coord_transform)
+
+                if swap_xy:
+                    geometry.SwapXY()
+
+            writer.write(output_geometry=geometry, feature_to_copy=feature, fields_to_transfer=field_names)
+
+    def _write_arrow_batches(
+        self, writer: BatchedFeatureWriter, coord_transform: osr.CoordinateTransformation | None, swap_xy: bool
+    ) -> None:
+        """Write the layer in Arrow record batches, transforming the geometries of each batch at once."""
+        for batch in iter_arrow_batches(self.layer):
+            output_batch = batch
+            if coord_transform is not None:
+                output_batch = _transform_arrow_batch(batch, self.layer, coord_transform, swap_xy)
+
+            self._write_arrow_batch(writer, output_batch)
+
+    def _write_arrow_batch(self, writer: BatchedFeatureWriter, batch: "pa.RecordBatch") -> None:
+        options = []
+        geometry_index = get_geometry_column_index(batch.schema, self.layer.GetGeometryColumn())
+        if geometry_index is not None:
+            options.append(f"GEOMETRY_NAME={batch.schema.field(geometry_index).name}")
+
+        writer.output_layer.WritePyArrow(batch, options=options)
+        writer.add_written_features(batch.num_rows)
+
+
+def _reproject_shard(
+    file_path: str,
+    layer_name: str,
+    shard: Shard,
+    target_srs_wkt: str,
+    axis_mapping_strategy: int,
+    swap_xy: bool,
+    use_arrow: bool,
+    filters: ShardFilters,
+) -> list:
+    """Read and reproject the features of a shard in a worker process, returning Records or Arrow record batches."""
+    vector_ds = get_worker_dataset(VectorDataset, file_path, layer_name)
+    target_srs = get_srs(wkt=target_srs_wkt, axis_mapping_strategy=axis_mapping_strategy)
+    coord_transform = get_coordinate_transformation(vector_ds.srs, target_srs)
+
+    filters = filters.with_shard(shard)
+    with vector_ds.apply_filters(filters.bbox, filters.geometry, filters.where, filters.columns) as layer:
+        if use_arrow:
+            return [
+                _transform_arrow_batch(batch, layer, coord_transform, swap_xy) for batch in iter_arrow_batches(layer)
+            ]
+
+        field_names = vector_ds.field_names if filters.columns is None else filters.columns
+        records = _read_records(layer, field_names, include_geometry=True, shard=shard)
+        return [_transform_record(record, coord_transform, swap_xy) for record in records]
+
+
+def _transform_arrow_batch(
+    batch: "pa.RecordBatch", layer: ogr.Layer, coord_transform: osr.CoordinateTransformation, swap_xy: bool
+) -> "pa.RecordBatch":
+    """Transform the geometries of an Arrow record batch read from a layer."""
+    geometry_index = get_geometry_column_index(batch.schema, layer.GetGeometryColumn())
+    if geometry_index is None:
+        return batch
+
+    geometry_arr = transform_wkb_array(batch.column(geometry_index), coord_transform, swap_xy)
+    return batch.set_column(geometry_index, batch.schema.field(geometry_index), geometry_arr)
+
+
+def _transform_record(record: Record, coord_transform: osr.CoordinateTransformation, swap_xy: bool) -> Record:
+    if record.geometry is None:
+        return record
+
+    geometry = ogr.CreateGeometryFromWkb(record.geometry)
+    geometry.Transform(coord_transform)
+    if swap_xy:
+        geometry.SwapXY()
+
+    return record._replace(geometry=bytes(geometry.ExportToIsoWkb()))
+
+
+def _read_records(
+    layer: ogr.Layer, field_names: list[str], include_geometry: bool, shard: Shard | None = None
+) -> Iterator[Record]:
+    """Read each feature of a layer (or of a shard of it) into a Record."""
+    layer_defn = layer.GetLayerDefn()
+    field_indexes = [(name, layer_defn.GetFieldIndex(name)) for name in field_names]
+
+    for feature in iter_shard_features(layer, shard):
+        wkb = None
+        if include_geometry:
+            geometry = feature.GetGeometryRef()
+            wkb = bytes(geometry.ExportToIsoWkb()) if geometry is not None else None
+
+        attributes = {name: feature.GetField(index) for name, index in field_indexes}
+        yield Record(fid=feature.GetFID(), geometry=wkb, attributes=attributes)
+
+
+def _records_to_columns(
+    records: Iterator[Record], field_names: list[str], include_geometry: bool
+) -> dict[str, np.ndarray]:
+    """Gather records into a columnar table of NumPy arrays, with the same columns as VectorDataset.to_numpy."""
+    values: dict[str, list] = {name: [] for name in [FID_COLUMN, *field_names]}
+    geometries = []
+    for record in records:
+        values[FID_COLUMN].append(record.fid)
+        for name in field_names:
+            values[name].append(record.attributes[name])
+        geometries.append(record.geometry)
+
+    table = {FID_COLUMN: np.array(values.pop(FID_COLUMN), dtype=np.int64)}
+    for name, column in values.items():
+        table[name] = np.array(column, dtype=object if None in column else None)
+
+    if include_geometry:
+        table[GEOMETRY_COLUMN] = np.array(geometries, dtype=object)
+
+    return table
+
+
+def _bbox_to_wkt(bbox: tuple[float, float, float, float]) -> str:
+    min_x, min_y, max_x, max_y = bbox
+    return f"POLYGON (({min_x} {min_y}, {max_x} {min_y}, {max_x} {max_y}, {min_x} {max_y}, {min_x} {min_y}))"
@@ -0,0 +1,102 @@
+from pathlib import Path
+
+from osgeo import gdal
+
+VSI_PREFIX = "/vsi"
+
+# GDAL virtual file systems for each URI scheme of the object stores and web servers rasters are read from
+URI_SCHEME_FILE_SYSTEMS = {
+    "s3": "/vsis3/",
+    "gs": "/vsigs/",
+    "az": "/vsiaz/",
+    "http": "/vsicurl/",
+    "https": "/vsicurl/",
+}
+
+# Config options tuned for reading cloud optimised formats over HTTP range requests. The header of each file is read
+# in one request on open, directories aren't listed to find sibling files, and the blocks of each read are fetched
+# together in one request (merging consecutive ranges), into a larger per file cache
+REMOTE_CONFIG_OPTIONS = {
+    "GDAL_DISABLE_READDIR_ON_OPEN": "EMPTY_DIR",
+    "GDAL_INGESTED_BYTES_AT_OPEN": str(64 * 1024),
+    "GDAL_HTTP_MULTIRANGE": "YES",
+    "GDAL_HTTP_MERGE_CONSECUTIVE_RANGES": "YES",
+    "GDAL_HTTP_MULTIPLEX": "YES",
+    "GDAL_HTTP_MAX_RETRY": "3",
+    "GDAL_HTTP_RETRY_DELAY": "1",
+    "CPL_VSIL_CURL_CHUNK_SIZE": str(256 * 1024),
+    "VSI_CACHE": "TRUE",
+    "VSI_CACHE_SIZE": str(64 * 1024 * 1024),
+}
+
+
+def is_vsi_path(file_path: str | Path) -> bool:
+    """Check whether a path is on a GDAL virtual file system, e.g. /vsis3/bucket/key.tif or /vsizip/archive.zip."""
+    return str(file_path).startswith(VSI_PREFIX)
+
+
+def is_remote_path(file_path: str | Path) -> bool:
+    """Check whether a path is on one of the GDAL virtual file systems accessed over the network."""
+    return any(str(file_path).startswith(file_system) for file_system in set(URI_SCHEME_FILE_SYSTEMS.values()))
+
+
+def to_gdal_path(file_path: str | Path) -> str:
+    """Convert a local path, /vsi* path or object store URI into the path GDAL opens.
+
+    URIs are converted to their GDAL virtual file system, e.g. s3://bucket/key.tif becomes /vsis3/bucket/key.tif and
+    https://host/key.tif becomes /vsicurl/https://host/key.tif. Other paths are returned as a string, unchanged.
+
+    Args:
+        file_path: The local path, /vsi* path or URI. Note /vsicurl/ URLs must be passed as strings, as Path collapses
+            the double slash of their scheme.
+
+    Returns:
+        The path to open with GDAL.
+
+    """
+    file_path = str(file_path)
+    scheme, separator, location = file_path.partition("://")
+    if separator and scheme.lower() in URI_SCHEME_FILE_SYSTEMS:
+        file_system = URI_SCHEME_FILE_SYSTEMS[scheme.lower()]
+        return f"{file_system}{file_path}" if file_system == "/vsicurl/" else f"{file_system}{location}"
+
+    return file_path
+
+
+def to_local_path(file_path: str | Path) -> str | Path:
+    """Keep /vsi* paths and URIs as strings (as Path would mangle them), and convert anything else to a Path."""
+    file_path = to_gdal_path(file_path)
+    return file_path if is_vsi_path(file_path) else Path(file_path)
+
+
+def vsi_exists(file_path: str | Path) -> bool:
+    """Check whether a file exists, on either the local file system or a GDAL virtual file system."""
+    return gdal.VSIStatL(to_gdal_path(file_path)) is not None
+
+
+def get_remote_config_options(**overrides: str) -> dict[str, str]:
+    """Get the REMOTE_CONFIG_OPTIONS, with any overrides applied, for use with gdal.config_options.
+
+    Args:
+        **overrides: Config options to override or add, e.g. CPL_VSIL_CURL_CHUNK_SIZE="1048576".
+
+    Returns:
+        The config options.
+
+    """
+    return {**REMOTE_CONFIG_OPTIONS, **overrides}
+
+
+def configure_remote_access(**overrides: str) -> None:
+    """Apply the REMOTE_CONFIG_OPTIONS (with any overrides) to the whole process.
+
+    Datasets are opened with the REMOTE_CONFIG_OPTIONS anyway, but some of them (e.g. the multi-range and cache
+    settings) are read again each time data is read, so this should be called once at startup by applications which
+    read remote rasters heavily.
+
+    Args:
+        **overrides: Config options to override or add, e.g. VSI_CACHE_SIZE="268435456".
+
+    """
+    for key, value in get_remote_config_options(**overrides).items():
+        gdal.SetConfigOption(key, value)
@@ -0,0 +1,232 @@
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+import numpy as np
+from osgeo import gdal, ogr
+
+from geospatial_utils.raster.constants import MEM_DRIVER
+from geospatial_utils.raster.raster_dataset import RasterDataset
+from geospatial_utils.raster.windows import DEFAULT_MAX_WINDOW_MEMORY, Window
+from geospatial_utils.srs.cache import get_coordinate_transformation
+from geospatial_utils.vector.vector_dataset import FID_COLUMN, VectorDataset
+
+# Name of the field each feature's FID is selected into, so it can be burnt into the zone grid
+ZONE_FIELD = "zone_fid"
+
+# Value of the zone grid for pixels not covered by any feature (FIDs are never negative)
+NO_ZONE = -1
+
+
+class ZoneAccumulator:
+    """Accumulates the count, sum, minimum, maximum and (optionally) histogram of the pixels of each zone.
+
+    Each window is added with vectorised bincount style reductions over every pixel at once, so the cost scales with
+    the number of pixels rather than the number of pixels times the number of zones.
+
+    Args:
+        fids: The sorted FIDs of the zones.
+        bins: Optional number of equal width histogram bins per zone.
+        value_range: The lower and upper edge of the histogram bins. Values outside of the range aren't counted. If
+            both edges are equal (e.g. for a constant raster), every value within the range is counted in the first bin.
+
+    Raises:
+        ValueError: Bins are given without a value range, or with a lower edge above the upper edge.
+
+    """
+
+    def __init__(self, fids: np.ndarray, bins: int | None = None, value_range: tuple[float, float] | None = None):
+        if bins and (value_range is None or value_range[0] > value_range[1]):
+            raise ValueError(
+                f"The histogram value range {value_range} should be the lower and upper edge of the bins, with the "
+                "lower edge no higher than the upper edge."
+            )
+
+        self.fids = fids
+        self.bins = bins
+        self.value_range = value_range
+
+        zone_count = len(fids)
+        self.count = np.zeros(zone_count, dtype=np.int64)
+        self.sum = np.zeros(zone_count, dtype=np.float64)
+        self.min = np.full(zone_count, np.inf)
+        self.max = np.full(zone_count, -np.inf)
+        self.histogram = np.zeros((zone_count, bins), dtype=np.int64) if bins else None
+
+    def add(self, zones: np.ndarray, values: np.ndarray) -> None:
+        """Add the valid pixels of a window.
+
+        Args:
+            zones: The FID of the zone of each pixel, or NO_ZONE.
+            values: The value of each pixel, the same shape as zones.
+
+        """
+        zone_count = len(self.fids)
+        indexes = np.searchsorted(self.fids, zones)
+
+        self.count += np.bincount(indexes, minlength=zone_count)
+        self.sum += np.bincount(indexes, weights=values, minlength=zone_count)
+        np.minimum.at(self.min, indexes, values)
+        np.maximum.at(self.max, indexes, values)
+
+        if self.histogram is not None:
+            lower, upper = self.value_range
+            in_range = (values >= lower) & (values <= upper)
+            if upper > lower:
+                bin_indexes = ((values[in_range] - lower) * (self.bins / (upper - lower))).astype(np.int64)
+                bin_indexes = np.minimum(bin_indexes, self.bins - 1)
+            else:
+                bin_indexes = np.zeros(np.count_nonzero(in_range), dtype=np.int64)
+
+            flat_indexes = indexes[in_range] * self.bins + bin_indexes
+            self.histogram += np.bincount(flat_indexes, minlength=zone_count * self.bins).reshape(zone_count, self.bins)
+
+    def to_table(self) -> dict[str, np.ndarray]:
+        """The statistics of each zone as a columnar table, keyed by FID. Zones without any valid pixels have a count
+        and sum of zero, and a NaN minimum, maximum and mean."""
+        empty = self.count == 0
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = self.sum / self.count
+
+        table = {
+            FID_COLUMN: self.fids,
+            "count": self.count,
+            "sum": self.sum,
+            "min": np.where(empty, np.nan, self.min),
+            "max": np.where(empty, np.nan, self.max),
+            "mean": np.where(empty, np.nan, mean),
+        }
+        if self.histogram is not None:
+            table["histogram"] = self.histogram
+
+        return table
+
+
+def zonal_statistics(
+    raster_ds: RasterDataset,
+    vector_ds: VectorDataset,
+    band_index: int = 1,
+    where: str | None = None,
+    all_touched: bool = False,
+    bins: int | None = None,
+    value_range: tuple[float, float] | None = None,
+    max_memory: int | None = DEFAULT_MAX_WINDOW_MEMORY,
+) -> dict[str, np.ndarray]:
+    """Calculate statistics of the pixels of a raster band within each feature of a polygon layer.
+
+    The layer is rasterized into a grid of zone FIDs aligned to the raster, one block window at a time, with only the
+    features intersecting each window burnt into it. Each pixel is therefore rasterized and read once, and the
+    statistics of every zone are accumulated in a single streaming pass, rather than masking the raster once per
+    feature. The layer is reprojected into the raster srs on the fly if they differ.
+
+    Where features overlap, each pixel belongs to only one of them (the last one rasterized).
+
+    Args:
+        raster_ds: The raster.
+        vector_ds: The layer of zones.
+        band_index: Index of the band (count starts at one). Defaults to 1.
+        where: Optional attribute filter selecting the features to use as zones, as an OGR SQL WHERE clause.
+        all_touched: Whether every pixel touched by a feature belongs to it, rather than only the pixels whose centre
+            is within it. Defaults to False.
+        bins: Optional number of equal width histogram bins, e.g. to count the land cover classes within each zone.
+            For integer classes 0 to n - 1, use n bins and a value_range of (0, n).
+        value_range: The lower and upper edge of the histogram bins. Defaults to the minimum and maximum of the band.
+        max_memory: Maximum number of bytes to read for each window.
+
+    Returns:
+        Columnar table with the fid, count, sum, min, max and mean (and histogram, if bins are given) of each zone,
+        sorted by FID.
+
+    Raises:
+        ValueError: The attribute filter is invalid.
+
+    """
+    fids = np.sort(vector_ds.to_numpy(where=where, columns=[], include_geometry=False)[FID_COLUMN])
+    if bins and value_range is None:
+        statistics = raster_ds.get_statistics(band_index, max_memory=max_memory)
+        value_range = (statistics.minimum, statistics.maximum)
+
+    accumulator = ZoneAccumulator(fids, bins, value_range)
+    nodata = raster_ds.get_band(band_index).GetNoDataValue()
+
+    with _open_zone_layer(vector_ds, where) as zone_layer:
+        buffer = raster_ds.allocate_window_buffer(band_index, max_memory=max_memory)
+        for block_window, arr in raster_ds.read_blocks(band_index, max_memory=max_memory, buffer=buffer):
+            zones = _rasterize_window(raster_ds, vector_ds, zone_layer, block_window.window, all_touched)
+
+            valid = zones != NO_ZONE
+            if nodata is not None and not np.isnan(nodata):
+                valid &= arr != nodata
+            if np.issubdtype(arr.dtype, np.floating):
+                valid &= ~np.isnan(arr)
+
+            accumulator.add(zones[valid], arr[valid].astype(np.float64))
+
+    return accumulator.to_table()
+
+
+@contextmanager
+def _open_zone_layer(vector_ds: VectorDataset, where: str | None) -> Iterator[ogr.Layer]:
+    """Select the FID of each feature into the ZONE_FIELD, which RasterizeLayer can burn."""
+    sql = f'SELECT FID AS {ZONE_FIELD} FROM "{vector_ds.layer.GetName()}"'
+    if where is not None:
+        sql += f" WHERE {where}"
+
+    zone_layer = vector_ds.ds.ExecuteSQL(sql, dialect="OGRSQL")
+    if zone_layer is None:
+        raise ValueError(f"The attribute filter `{where}` is invalid.")
+
+    try:
+        yield zone_layer
+    finally:
+        vector_ds.ds.ReleaseResultSet(zone_layer)
+
+
+def _rasterize_window(
+    raster_ds: RasterDataset, vector_ds: VectorDataset, zone_layer: ogr.Layer, window: Window, all_touched: bool
+) -> np.ndarray:
+    """Rasterize the FIDs of the features intersecting a window into an array of the window's size."""
+    ul_x, x_res, x_rot, ul_y, y_rot, y_res = raster_ds.geotransform
+
+    window_ds = gdal.GetDriverByName(MEM_DRIVER).Create("", window.x_size, window.y_size, 1, gdal.GDT_Int64)
+    window_ds.SetGeoTransform(
+        (
+            ul_x + window.x_off * x_res + window.y_off * x_rot,
+            x_res,
+            x_rot,
+            ul_y + window.x_off * y_rot + window.y_off * y_res,
+            y_rot,
+            y_res,
+        )
+    )
+    if raster_ds.srs is not None:
+        window_ds.SetSpatialRef(raster_ds.srs)
+
+    band = window_ds.GetRasterBand(1)
+    band.Fill(NO_ZONE)
+
+    # Only the features intersecting the window are read, using any spatial index of the layer
+    pixel_x = [window.x_off, window.x_off + window.x_size, window.x_off + window.x_size, window.x_off]
+    pixel_y = [window.y_off, window.y_off, window.y_off + window.y_size, window.y_off + window.y_size]
+    x_coords, y_coords = raster_ds.convert_pixel_coords_to_native_srs(pixel_x, pixel_y)
+
+    ring = ogr.Geometry(ogr.wkbLinearRing)
+    for x_coord, y_coord in zip([*x_coords, x_coords[0]], [*y_coords, y_coords[0]]):
+        ring.AddPoint_2D(float(x_coord), float(y_coord))
+    window_geometry = ogr.Geometry(ogr.wkbPolygon)
+    window_geometry.AddGeometry(ring)
+
+    if raster_ds.srs is not None and vector_ds.srs is not None and not raster_ds.srs.IsSame(vector_ds.srs):
+        window_geometry.Transform(get_coordinate_transformation(raster_ds.srs, vector_ds.srs))
+
+    options = [f"ATTRIBUTE={ZONE_FIELD}"]
+    if all_touched:
+        options.append("ALL_TOUCHED=TRUE")
+
+    zone_layer.SetSpatialFilter(window_geometry)
+    try:
+        if gdal.RasterizeLayer(window_ds, [1], zone_layer, options=options) != gdal.CE_None:
+            raise ValueError(f"Could not rasterize the zones of the window {window}.")
+    finally:
+        zone_layer.SetSpatialFilter(None)
+
+    return band.ReadAsArray()
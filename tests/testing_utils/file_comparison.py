@@ -3,6 +3,7 @@ from pathlib import Path
 import numpy as np
 from osgeo import gdal, ogr
 
+from geospatial_utils.raster.raster_dataset import RasterDataset
 from geospatial_utils.vector.vector_dataset import VectorDataset
 from tests.testing_utils.exceptions import ComparisonError
 
@@ -33,7 +34,8 @@ def compare_raster_bands(expected_raster_ds: gdal.Dataset, actual_raster_ds: gda
     """
     Compare two raster bands.
 
-    For a specific band index, check the nodata values and data match that expected
+    For a specific band index, check the nodata values and data match that expected. The data is compared window by
+    window, so the bands never need to be read into memory in full.
 
     Args:
         expected_raster_ds: Opened gdal.Dataset containing the expected raster data.
@@ -56,11 +58,17 @@ def compare_raster_bands(expected_raster_ds: gdal.Dataset, actual_raster_ds: gda
             f"The nodata value for band {band_index} is `{actual_nodata} instead of the expected `{expected_nodata}`."
         )
 
-    expected_arr = expected_band.ReadAsArray()
-    actual_arr = actual_band.ReadAsArray()
+    expected_raster = RasterDataset(expected_raster_ds)
+    actual_raster = RasterDataset(actual_raster_ds)
 
-    if not np.isclose(expected_arr, actual_arr):
-        raise ComparisonError(f"The data for raster band {band_index} does not that expected.")
+    expected_buffer = expected_raster.allocate_window_buffer(band_index)
+    actual_buffer = np.empty_like(expected_buffer)
+
+    for block_window, expected_arr in expected_raster.read_blocks(band_index, buffer=expected_buffer):
+        actual_arr = actual_raster.read_window(block_window.window, band_index, buffer=actual_buffer)
+
+        if not np.allclose(expected_arr, actual_arr):
+            raise ComparisonError(f"The data for raster band {band_index} does not that expected.")
 
 
 def compare_vector_files(expected_vector_path: str | Path, actual_vector_path: str | Path) -> None:
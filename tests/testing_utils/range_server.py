@@ -0,0 +1,93 @@
+import io
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from functools import partial
+from http import HTTPStatus
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+BOUNDARY = "range_server_boundary"
+
+
+class RangeRequestHandler(SimpleHTTPRequestHandler):
+    """Serves files from a directory with support for single and multiple byte range requests, like an object store.
+
+    The Range header of each request is recorded in the range_requests list of the server.
+    """
+
+    def send_head(self) -> io.BytesIO | None:
+        range_header = self.headers.get("Range")
+        if range_header is None:
+            return super().send_head()
+
+        file_path = Path(self.translate_path(self.path))
+        if not file_path.is_file():
+            self.send_error(HTTPStatus.NOT_FOUND)
+            return None
+
+        self.server.range_requests.append(range_header)
+        content = file_path.read_bytes()
+        ranges = [_parse_range(byte_range, len(content)) for byte_range in range_header[6:].split(",")]
+
+        if len(ranges) == 1:
+            start, end = ranges[0]
+            body = content[start : end + 1]
+            self.send_response(HTTPStatus.PARTIAL_CONTENT)
+            self.send_header("Content-Type", "application/octet-stream")
+            self.send_header("Content-Range", f"bytes {start}-{end}/{len(content)}")
+        else:
+            body = b""
+            for start, end in ranges:
+                body += (
+                    f"--{BOUNDARY}\r\nContent-Type: application/octet-stream\r\n"
+                    f"Content-Range: bytes {start}-{end}/{len(content)}\r\n\r\n"
+                ).encode()
+                body += content[start : end + 1] + b"\r\n"
+            body += f"--{BOUNDARY}--\r\n".encode()
+
+            self.send_response(HTTPStatus.PARTIAL_CONTENT)
+            self.send_header("Content-Type", f"multipart/byteranges; boundary={BOUNDARY}")
+
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Accept-Ranges", "bytes")
+        self.end_headers()
+
+        return io.BytesIO(body)
+
+    def end_headers(self) -> None:
+        if self.headers.get("Range") is None:
+            self.send_header("Accept-Ranges", "bytes")
+
+        super().end_headers()
+
+    def log_message(self, format: str, *args: object) -> None:  # noqa: A002
+        pass
+
+
+def _parse_range(byte_range: str, size: int) -> tuple[int, int]:
+    start, end = byte_range.strip().split("-")
+    if not start:
+        return size - int(end), size - 1
+
+    return int(start), min(int(end), size - 1) if end else size - 1
+
+
+@contextmanager
+def serve_directory(directory: str | Path) -> Iterator[ThreadingHTTPServer]:
+    """Serve a directory over HTTP on a free local port, in a background thread.
+
+    Yields:
+        The server. Its files are at http://127.0.0.1:{server.server_port}/{file name}.
+
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", 0), partial(RangeRequestHandler, directory=str(directory)))
+    server.range_requests = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,98 @@
+from collections.abc import Callable
+from pathlib import Path
+
+import pytest
+
+from benchmarks.harness import (
+    Benchmark,
+    BenchmarkResult,
+    Regression,
+    compare_results,
+    load_results,
+    run_benchmark,
+    save_results,
+)
+
+
+def setup_sum(input_dir: Path) -> Callable[[Path], int]:
+    values = list(range(100_000))
+
+    def run(output_dir: Path) -> int:
+        output_dir.joinpath("sum.txt").write_text(str(sum(values)))
+        return len(values)
+
+    return run
+
+
+def prepare_large_input(input_dir: Path) -> None:
+    """Hold 200 MB in memory while writing a small input, like a generator of synthetic data."""
+    buffer = b"x" * 200 * 1024**2
+    input_dir.joinpath("input.txt").write_text(str(len(buffer)))
+
+
+def setup_read_input(input_dir: Path) -> Callable[[Path], int]:
+    input_path = input_dir.joinpath("input.txt")
+
+    def run(output_dir: Path) -> int:
+        return int(input_path.read_text())
+
+    return run
+
+
+def create_result(name: str, throughput: float, peak_memory_mb: float = 100.0) -> BenchmarkResult:
+    return BenchmarkResult(name, "items", 1000, 1000 / throughput, throughput, peak_memory_mb)
+
+
+class TestRunBenchmark:
+    def test_run_benchmark(self) -> None:
+        """Check a benchmark is timed in a separate process, recording its throughput and peak memory."""
+        result = run_benchmark(Benchmark("sum", "items", setup_sum), repeats=2)
+
+        assert result.name == "sum"
+        assert result.items == 100_000
+        assert result.throughput == pytest.approx(result.items / result.seconds)
+        assert result.peak_memory_mb > 0
+
+    def test_prepare_not_counted(self) -> None:
+        """Check inputs are prepared before the benchmark, without counting their memory in its peak memory."""
+        result = run_benchmark(Benchmark("read", "bytes", setup_read_input, prepare_large_input), repeats=1)
+
+        assert result.items == 200 * 1024**2
+        assert result.peak_memory_mb < 200
+
+    def test_save_results(self, working_dir: Path) -> None:
+        results = [create_result("a", 100.0), create_result("b", 200.0)]
+        save_results(results, working_dir.joinpath("results.json"))
+
+        assert load_results(working_dir.joinpath("results.json")) == {"a": results[0], "b": results[1]}
+
+
+class TestCompareResults:
+    def test_regressions(self) -> None:
+        """Check falls in throughput and growth in memory are only reported beyond their thresholds."""
+        baseline = {
+            "a": create_result("a", 100.0),
+            "b": create_result("b", 100.0),
+            "c": create_result("c", 100.0, peak_memory_mb=100.0),
+        }
+        current = {
+            "a": create_result("a", 95.0),
+            "b": create_result("b", 80.0),
+            "c": create_result("c", 150.0, peak_memory_mb=150.0),
+            "d": create_result("d", 1.0),
+        }
+
+        regressions = compare_results(baseline, current, threshold=0.1, memory_threshold=0.2)
+
+        assert regressions == [
+            Regression("b", "throughput", 100.0, 80.0, pytest.approx(-0.2)),
+            Regression("c", "peak_memory_mb", 100.0, 150.0, pytest.approx(0.5)),
+        ]
+
+    def test_different_sizes(self) -> None:
+        """Check results of benchmarks run with different sizes aren't compared."""
+        baseline = {"a": create_result("a", 100.0)}
+        current = {"a": create_result("a", 100.0)._replace(items=2000)}
+
+        with pytest.raises(ValueError, match="Please run both with the same sizes."):
+            compare_results(baseline, current)
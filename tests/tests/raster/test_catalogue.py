@@ -0,0 +1,104 @@
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+
+from geospatial_utils.raster.catalogue import RasterCatalogue, RefreshResult
+from geospatial_utils.raster.raster_dataset import RasterDataset
+
+
+@pytest.fixture
+def raster_dir(input_dir: Path, working_dir: Path) -> Path:
+    raster_dir = working_dir.joinpath("rasters")
+    raster_dir.joinpath("nested").mkdir(parents=True)
+
+    input_path = input_dir.joinpath("raster", "test_raster_3857.tif")
+    shutil.copy(input_path, raster_dir.joinpath("first.tif"))
+    shutil.copy(input_path, raster_dir.joinpath("nested", "second.tif"))
+
+    return raster_dir
+
+
+@pytest.fixture
+def catalogue(working_dir: Path) -> RasterCatalogue:
+    with RasterCatalogue(working_dir.joinpath("catalogue.sqlite")) as catalogue:
+        yield catalogue
+
+
+class TestRefresh:
+    def test_refresh(self, raster_dir: Path, catalogue: RasterCatalogue) -> None:
+        """Check only new or changed rasters are read, and removed rasters are dropped from the catalogue."""
+        assert catalogue.refresh(raster_dir) == RefreshResult(added=2, updated=0, removed=0, unchanged=0, failed=0)
+        assert catalogue.refresh(raster_dir) == RefreshResult(added=0, updated=0, removed=0, unchanged=2, failed=0)
+
+        first_path = raster_dir.joinpath("first.tif")
+        stat = first_path.stat()
+        os.utime(first_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        raster_dir.joinpath("nested", "second.tif").unlink()
+        raster_dir.joinpath("invalid.tif").write_text("not a raster")
+
+        assert catalogue.refresh(raster_dir) == RefreshResult(added=0, updated=1, removed=1, unchanged=0, failed=1)
+        assert [Path(entry.path).name for entry in catalogue.entries()] == ["first.tif"]
+
+    def test_entry(self, raster_dir: Path, catalogue: RasterCatalogue) -> None:
+        catalogue.refresh(raster_dir, hash_content=True)
+
+        raster_path = raster_dir.joinpath("first.tif")
+        raster_ds = RasterDataset(raster_path)
+        entry = catalogue.get(raster_path)
+
+        assert entry.epsg_code == 3857
+        assert (entry.x_size, entry.y_size) == raster_ds.size
+        assert (entry.min_x, entry.min_y, entry.max_x, entry.max_y) == raster_ds.bounds
+        assert entry.content_hash == catalogue.get(raster_dir.joinpath("nested", "second.tif")).content_hash
+
+    def test_persists(self, raster_dir: Path, working_dir: Path) -> None:
+        catalogue_path = working_dir.joinpath("catalogue.sqlite")
+        with RasterCatalogue(catalogue_path) as catalogue:
+            catalogue.refresh(raster_dir)
+
+        with RasterCatalogue(catalogue_path) as catalogue:
+            assert len(catalogue) == 2
+            assert catalogue.refresh(raster_dir).unchanged == 2
+
+
+class TestAdd:
+    def test_add(self, raster_dir: Path, catalogue: RasterCatalogue) -> None:
+        """Check only the given rasters are read, without removing the other entries."""
+        catalogue.refresh(raster_dir)
+        first_path = raster_dir.joinpath("first.tif")
+        other_path = shutil.copy(first_path, raster_dir.parent.joinpath("other.tif"))
+
+        assert catalogue.add([first_path, other_path, other_path]) == RefreshResult(
+            added=1, updated=0, removed=0, unchanged=1, failed=0
+        )
+        assert len(catalogue) == 3
+        assert catalogue.add([raster_dir.joinpath("missing.tif")]).failed == 1
+
+
+class TestQuery:
+    def test_query(self, raster_dir: Path, catalogue: RasterCatalogue) -> None:
+        """Check rasters are found by a longitude/latitude bbox, or a bbox in another srs."""
+        catalogue.refresh(raster_dir)
+
+        assert len(catalogue.query((-3.0, 53.9, -2.6, 54.2))) == 2
+        assert len(catalogue.query((-312_800, 7_171_800, -312_700, 7_171_900), bbox_epsg_code=3857)) == 2
+        assert catalogue.query((10.0, 10.0, 11.0, 11.0)) == []
+
+
+def test_is_output_up_to_date(raster_dir: Path, working_dir: Path, catalogue: RasterCatalogue) -> None:
+    raster_path = raster_dir.joinpath("first.tif")
+    output_path = working_dir.joinpath("output.tif")
+
+    assert not catalogue.is_output_up_to_date(raster_path, output_path)
+
+    catalogue.refresh(raster_dir)
+    shutil.copy(raster_path, output_path)
+
+    assert catalogue.is_output_up_to_date(raster_path, output_path)
+
+    stat = output_path.stat()
+    os.utime(raster_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert not catalogue.is_output_up_to_date(raster_path, output_path)
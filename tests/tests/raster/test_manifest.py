@@ -0,0 +1,74 @@
+import os
+import shutil
+from pathlib import Path
+
+import pytest
+
+from geospatial_utils.raster.manifest import OutputManifest, get_fingerprint
+
+PARAMETERS = {"epsg_code": 4326, "compression": "DEFLATE"}
+
+
+@pytest.fixture
+def input_path(input_dir: Path, working_dir: Path) -> Path:
+    return Path(shutil.copy(input_dir.joinpath("raster", "test_raster_3857.tif"), working_dir))
+
+
+@pytest.fixture
+def output_path(input_path: Path, working_dir: Path) -> Path:
+    output_path = working_dir.joinpath("output.tif")
+    output_path.write_bytes(b"output")
+    return output_path
+
+
+@pytest.fixture
+def manifest(working_dir: Path) -> OutputManifest:
+    with OutputManifest(working_dir.joinpath("manifest.sqlite")) as manifest:
+        yield manifest
+
+
+def touch(file_path: Path) -> None:
+    stat = file_path.stat()
+    os.utime(file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+class TestOutputManifest:
+    def test_recorded_output_is_up_to_date(self, input_path: Path, output_path: Path, manifest: OutputManifest) -> None:
+        assert not manifest.is_up_to_date(input_path, output_path, PARAMETERS)
+
+        manifest.record(input_path, output_path, PARAMETERS, get_fingerprint(input_path))
+
+        assert manifest.is_up_to_date(input_path, output_path, PARAMETERS)
+
+    def test_changed_parameters(self, input_path: Path, output_path: Path, manifest: OutputManifest) -> None:
+        manifest.record(input_path, output_path, PARAMETERS, get_fingerprint(input_path))
+
+        assert not manifest.is_up_to_date(input_path, output_path, {**PARAMETERS, "compression": "ZSTD"})
+
+    def test_missing_output(self, input_path: Path, output_path: Path, manifest: OutputManifest) -> None:
+        manifest.record(input_path, output_path, PARAMETERS, get_fingerprint(input_path))
+        output_path.unlink()
+
+        assert not manifest.is_up_to_date(input_path, output_path, PARAMETERS)
+
+    def test_changed_input(self, input_path: Path, output_path: Path, manifest: OutputManifest) -> None:
+        manifest.record(input_path, output_path, PARAMETERS, get_fingerprint(input_path))
+        touch(input_path)
+
+        assert not manifest.is_up_to_date(input_path, output_path, PARAMETERS)
+
+    def test_touched_input_with_same_content(
+        self, input_path: Path, output_path: Path, manifest: OutputManifest
+    ) -> None:
+        """Check an input whose modification time changed is still up to date if its content hash matches."""
+        manifest.record(input_path, output_path, PARAMETERS, get_fingerprint(input_path, hash_content=True))
+        touch(input_path)
+
+        assert manifest.is_up_to_date(input_path, output_path, PARAMETERS, hash_content=True)
+        # The new modification time was recorded, so the input doesn't have to be hashed again
+        assert manifest.is_up_to_date(input_path, output_path, PARAMETERS)
+
+        with input_path.open("ab") as file:
+            file.write(b"changed")
+
+        assert not manifest.is_up_to_date(input_path, output_path, PARAMETERS, hash_content=True)
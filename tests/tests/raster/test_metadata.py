@@ -0,0 +1,40 @@
+import shutil
+from pathlib import Path
+
+import numpy as np
+
+from geospatial_utils.raster.metadata import read_raster_metadata, scan_directory
+from geospatial_utils.raster.raster_dataset import RasterDataset
+
+
+def test_read_raster_metadata(input_dir: Path) -> None:
+    input_path = input_dir.joinpath("raster", "test_raster_3857.tif")
+    raster_ds = RasterDataset(input_path)
+
+    metadata = read_raster_metadata(input_path)
+
+    assert metadata.driver == "GTiff"
+    assert (metadata.x_size, metadata.y_size) == raster_ds.size
+    assert metadata.epsg_code == 3857
+    assert metadata.geotransform == raster_ds.geotransform
+    assert (metadata.min_x, metadata.min_y, metadata.max_x, metadata.max_y) == raster_ds.bounds
+
+
+def test_scan_directory(input_dir: Path, working_dir: Path) -> None:
+    """Check every matching raster in the tree is scanned, and files that aren't rasters are skipped."""
+    input_path = input_dir.joinpath("raster", "test_raster_3857.tif")
+    working_dir.joinpath("nested").mkdir()
+    shutil.copy(input_path, working_dir.joinpath("first.tif"))
+    shutil.copy(input_path, working_dir.joinpath("nested", "second.tif"))
+    working_dir.joinpath("nested", "invalid.tif").write_text("not a raster")
+    working_dir.joinpath("notes.txt").write_text("not a raster")
+
+    table = scan_directory(working_dir)
+
+    assert sorted(Path(path).name for path in table["path"]) == ["first.tif", "second.tif"]
+    assert all(len(column) == 2 for column in table.values())
+    np.testing.assert_array_equal(table["epsg_code"], [3857, 3857])
+
+    table = scan_directory(working_dir, recursive=False)
+
+    assert [Path(path).name for path in table["path"]] == ["first.tif"]
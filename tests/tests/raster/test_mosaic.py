@@ -0,0 +1,60 @@
+from pathlib import Path
+
+import pytest
+from osgeo import gdal
+
+from geospatial_utils.raster.mosaic import build_mosaic_vrt, mosaic_to_cog
+from geospatial_utils.raster.raster_dataset import RasterDataset
+
+
+def split_into_tiles(raster_path: Path, tile_dir: Path) -> list[Path]:
+    """Split a raster into a left and right tile."""
+    raster_ds = gdal.Open(str(raster_path))
+    x_size, y_size = raster_ds.RasterXSize, raster_ds.RasterYSize
+    half = x_size // 2
+
+    tile_paths = []
+    for index, (x_offset, width) in enumerate([(0, half), (half, x_size - half)]):
+        tile_path = tile_dir.joinpath(f"tile_{index}.tif")
+        gdal.Translate(str(tile_path), raster_ds, srcWin=[x_offset, 0, width, y_size])
+        tile_paths.append(tile_path)
+
+    return tile_paths
+
+
+class TestBuildMosaicVRT:
+    def test_mosaic_matches_original(self, input_dir: Path, working_dir: Path) -> None:
+        """Check the mosaic of the tiles of a raster has the same extent and size as the raster."""
+        input_path = input_dir.joinpath("raster", "test_raster_3857.tif")
+        tile_paths = split_into_tiles(input_path, working_dir)
+
+        mosaic_ds = build_mosaic_vrt(tile_paths)
+        input_ds = gdal.Open(str(input_path))
+
+        assert (mosaic_ds.RasterXSize, mosaic_ds.RasterYSize) == (input_ds.RasterXSize, input_ds.RasterYSize)
+        assert mosaic_ds.GetGeoTransform() == pytest.approx(input_ds.GetGeoTransform())
+
+    def test_no_rasters(self) -> None:
+        """Check an error is raised when there are no rasters to mosaic."""
+        with pytest.raises(ValueError, match="At least one raster"):
+            build_mosaic_vrt([])
+
+
+class TestMosaicToCOG:
+    @pytest.mark.parametrize("epsg_code", [3857, 4326])
+    def test_mosaic_to_cog(self, input_dir: Path, working_dir: Path, epsg_code: int) -> None:
+        """Check tiles are mosaicked into a single COG, whether or not they need warping."""
+        input_path = input_dir.joinpath("raster", "test_raster_3857.tif")
+        tile_paths = split_into_tiles(input_path, working_dir)
+        output_path = working_dir.joinpath("mosaic.tif")
+
+        mosaic_to_cog(tile_paths, output_path, output_epsg_code=epsg_code, compression="ZSTD")
+
+        output_ds = RasterDataset(output_path)
+        assert output_ds.epsg_code == str(epsg_code)
+        assert output_ds.ds.GetMetadataItem("LAYOUT", "IMAGE_STRUCTURE") == "COG"
+        assert output_ds.ds.GetMetadataItem("COMPRESSION", "IMAGE_STRUCTURE") == "ZSTD"
+
+        if epsg_code == 3857:
+            # Without warping, the mosaic is a lossless copy of the original raster
+            assert output_ds.size == RasterDataset(input_path).size
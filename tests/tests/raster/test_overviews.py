@@ -0,0 +1,118 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+from osgeo import gdal
+
+from geospatial_utils.raster.constants import GTIFF_DRIVER
+from geospatial_utils.raster.overviews import get_band_resampling, get_overview_levels
+from geospatial_utils.raster.raster_dataset import RasterDataset
+from geospatial_utils.raster.windows import Window
+
+
+def create_raster(raster_path: Path, size: int = 1024, band_count: int = 1) -> Path:
+    """Create a tiled GeoTIFF of zeros."""
+    ds = gdal.GetDriverByName(GTIFF_DRIVER).Create(
+        str(raster_path), size, size, band_count, gdal.GDT_Byte, options=["TILED=YES"]
+    )
+    for band_index in range(1, band_count + 1):
+        ds.GetRasterBand(band_index).Fill(0)
+
+    del ds
+    return raster_path
+
+
+class TestGetOverviewLevels:
+    @pytest.mark.parametrize(
+        ["x_size", "y_size", "expected_levels"],
+        [(256, 256, []), (257, 100, [2]), (1000, 400, [2, 4]), (100, 4096, [2, 4, 8, 16])],
+    )
+    def test_levels(self, x_size: int, y_size: int, expected_levels: list[int]) -> None:
+        """Check the raster is halved until its largest side fits within the minimum size."""
+        assert get_overview_levels(x_size, y_size, min_size=256) == expected_levels
+
+    def test_invalid_min_size(self) -> None:
+        """Check an error is raised for a minimum size which isn't positive."""
+        with pytest.raises(ValueError, match="must be positive"):
+            get_overview_levels(1000, 1000, min_size=0)
+
+
+class TestGetBandResampling:
+    def test_expand_single_algorithm(self) -> None:
+        """Check a single algorithm is used for every band."""
+        assert get_band_resampling("average", 3) == ["AVERAGE"] * 3
+
+    def test_band_count_mismatch(self) -> None:
+        """Check an error is raised when the number of algorithms doesn't match the number of bands."""
+        with pytest.raises(ValueError, match="2 resampling algorithms were given for 3 bands"):
+            get_band_resampling(["NEAREST", "AVERAGE"], 3)
+
+    def test_unsupported_algorithm(self) -> None:
+        """Check an error is raised for an unsupported algorithm."""
+        with pytest.raises(ValueError, match="SUM is not a supported"):
+            get_band_resampling("sum", 1)
+
+
+class TestBuildOverviews:
+    def test_internal_overviews(self, working_dir: Path) -> None:
+        """Check the overview levels are chosen from the raster size, and stored within the raster."""
+        raster_ds = RasterDataset(create_raster(working_dir.joinpath("raster.tif")))
+
+        levels = raster_ds.build_overviews(min_size=256)
+
+        assert levels == [2, 4]
+        assert raster_ds.overview_levels == [2, 4]
+        assert not working_dir.joinpath("raster.tif.ovr").exists()
+
+    def test_external_overviews(self, working_dir: Path) -> None:
+        """Check external overviews are stored in a .ovr file, leaving the raster untouched."""
+        raster_path = create_raster(working_dir.joinpath("raster.tif"))
+        modified_at = raster_path.stat().st_mtime_ns
+        raster_ds = RasterDataset(raster_path)
+
+        raster_ds.build_overviews(levels=[2, 4, 8], external=True, compression="DEFLATE")
+
+        assert raster_ds.overview_levels == [2, 4, 8]
+        assert working_dir.joinpath("raster.tif.ovr").exists()
+        assert raster_path.stat().st_mtime_ns == modified_at
+
+    def test_per_band_resampling(self) -> None:
+        """Check each band's overviews are computed with its own resampling algorithm."""
+        ds = gdal.GetDriverByName("MEM").Create("", 4, 4, 2, gdal.GDT_Float32)
+        data = np.array([[0, 4] * 2, [0, 0] * 2] * 2, dtype=np.float32)
+        for band_index in (1, 2):
+            ds.GetRasterBand(band_index).WriteArray(data)
+
+        raster_ds = RasterDataset(ds)
+        raster_ds.build_overviews(levels=[2], resampling=["NEAREST", "AVERAGE"])
+
+        assert ds.GetRasterBand(1).GetOverview(0).ReadAsArray()[0, 0] == 0
+        assert ds.GetRasterBand(2).GetOverview(0).ReadAsArray()[0, 0] == 1
+
+
+class TestRefreshOverviews:
+    @pytest.mark.parametrize("external", [False, True])
+    def test_refresh_changed_window(self, working_dir: Path, external: bool) -> None:
+        """Check refreshing only the changed window gives the same overviews as rebuilding them all."""
+        raster_path = create_raster(working_dir.joinpath("raster.tif"))
+        raster_ds = RasterDataset(raster_path)
+        raster_ds.build_overviews(levels=[2, 4], resampling="AVERAGE", external=external)
+
+        update_ds = gdal.OpenEx(str(raster_path), gdal.OF_RASTER | gdal.OF_UPDATE)
+        update_ds.GetRasterBand(1).WriteArray(np.full((100, 60), 200, dtype=np.uint8), 301, 450)
+        del update_ds
+
+        refreshed = raster_ds.refresh_overviews(Window(301, 450, 60, 100), resampling="AVERAGE")
+
+        assert refreshed == [[Window(150, 225, 31, 50), Window(75, 112, 16, 26)]]
+
+        expected_path = working_dir.joinpath("expected.tif")
+        gdal.Translate(str(expected_path), str(raster_path), creationOptions=["TILED=YES"])
+        expected_ds = RasterDataset(expected_path)
+        expected_ds.build_overviews(levels=[2, 4], resampling="AVERAGE")
+
+        for index in range(2):
+            np.testing.assert_array_equal(
+                raster_ds.get_band(1).GetOverview(index).ReadAsArray(),
+                expected_ds.get_band(1).GetOverview(index).ReadAsArray(),
+            )
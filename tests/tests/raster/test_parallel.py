@@ -0,0 +1,97 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from geospatial_utils.raster.parallel import (
+    PROCESS_EXECUTOR,
+    THREAD_EXECUTOR,
+    CountReducer,
+    HistogramReducer,
+    MinMaxReducer,
+    StatisticsReducer,
+    SumReducer,
+    map_blocks,
+    reduce_blocks,
+)
+from geospatial_utils.raster.raster_dataset import RasterDataset
+
+
+def double_first_band(arr: np.ndarray) -> np.ndarray:
+    return arr[0].astype(np.float32) * 2
+
+
+@pytest.fixture
+def input_path(input_dir: Path) -> Path:
+    return input_dir.joinpath("raster", "test_raster_3857.tif")
+
+
+@pytest.fixture
+def valid_values(input_path: Path) -> np.ndarray:
+    band = RasterDataset(input_path).get_band(1)
+    arr = band.ReadAsArray()
+    nodata = band.GetNoDataValue()
+
+    return arr.ravel() if nodata is None else arr[arr != nodata]
+
+
+class TestMapBlocks:
+    @pytest.mark.parametrize("executor", [THREAD_EXECUTOR, PROCESS_EXECUTOR])
+    def test_map_blocks(self, input_path: Path, working_dir: Path, executor: str) -> None:
+        """Check the function is applied to every window and the results written to the output raster."""
+        output_path = working_dir.joinpath("doubled.tif")
+
+        map_blocks(input_path, output_path, double_first_band, max_memory=4096, workers=2, executor=executor)
+
+        expected_arr = RasterDataset(input_path).get_band(1).ReadAsArray().astype(np.float32) * 2
+        actual_ds = RasterDataset(output_path)
+
+        np.testing.assert_array_equal(actual_ds.get_band(1).ReadAsArray(), expected_arr)
+        assert actual_ds.geotransform == RasterDataset(input_path).geotransform
+
+    def test_map_blocks_with_overlap(self, input_path: Path, working_dir: Path) -> None:
+        """Check the overlap is stripped from the function output before it's written."""
+        output_path = working_dir.joinpath("doubled.tif")
+
+        map_blocks(input_path, output_path, double_first_band, overlap=3, max_memory=4096, workers=2)
+
+        expected_arr = RasterDataset(input_path).get_band(1).ReadAsArray().astype(np.float32) * 2
+        np.testing.assert_array_equal(RasterDataset(output_path).get_band(1).ReadAsArray(), expected_arr)
+
+
+class TestReduceBlocks:
+    def test_sum(self, input_path: Path, valid_values: np.ndarray) -> None:
+        assert reduce_blocks(input_path, SumReducer(), max_memory=4096, workers=2) == pytest.approx(
+            valid_values.sum(dtype=np.float64)
+        )
+
+    def test_count(self, input_path: Path, valid_values: np.ndarray) -> None:
+        assert reduce_blocks(input_path, CountReducer(), max_memory=4096, workers=2) == valid_values.size
+
+    def test_min_max(self, input_path: Path, valid_values: np.ndarray) -> None:
+        assert reduce_blocks(input_path, MinMaxReducer(), max_memory=4096, workers=2) == (
+            valid_values.min(),
+            valid_values.max(),
+        )
+
+    def test_histogram(self, input_path: Path, valid_values: np.ndarray) -> None:
+        value_range = (float(valid_values.min()), float(valid_values.max()))
+        expected_counts, expected_edges = np.histogram(valid_values, bins=10, range=value_range)
+
+        counts, edges = reduce_blocks(input_path, HistogramReducer(10, value_range), max_memory=4096, workers=2)
+
+        np.testing.assert_array_equal(counts, expected_counts)
+        np.testing.assert_allclose(edges, expected_edges)
+
+    def test_statistics(self, input_path: Path, valid_values: np.ndarray) -> None:
+        """Check merging the statistics of each window in parallel gives the statistics of the whole band."""
+        x_size, y_size = RasterDataset(input_path).size
+
+        statistics = reduce_blocks(input_path, StatisticsReducer(x_size * y_size), max_memory=4096, workers=2)
+
+        assert statistics.mean == pytest.approx(valid_values.mean(dtype=np.float64))
+        assert statistics.std_dev == pytest.approx(valid_values.std(dtype=np.float64))
+
+    def test_invalid_executor(self, input_path: Path) -> None:
+        with pytest.raises(ValueError, match="is not a valid executor"):
+            reduce_blocks(input_path, CountReducer(), executor="gpu")
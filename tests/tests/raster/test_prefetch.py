@@ -0,0 +1,53 @@
+import asyncio
+from collections.abc import Iterator
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from geospatial_utils.raster.prefetch import WindowRequest, open_rasters, read_windows
+from geospatial_utils.raster.raster_dataset import RasterDataset
+from geospatial_utils.raster.windows import Window
+from tests.testing_utils.range_server import serve_directory
+
+RASTER_NAMES = ["test_raster_3857.tif", "test_raster_3857_cog_greyscale.tif"]
+
+
+@pytest.fixture
+def server(input_dir: Path) -> Iterator[ThreadingHTTPServer]:
+    with serve_directory(input_dir.joinpath("raster")) as server:
+        yield server
+
+
+def get_url(server: ThreadingHTTPServer, file_name: str) -> str:
+    return f"http://127.0.0.1:{server.server_port}/{file_name}"
+
+
+class TestOpenRasters:
+    def test_open_rasters(self, input_dir: Path, server: ThreadingHTTPServer) -> None:
+        """Check remote rasters are opened concurrently, in the order of their paths, with their metadata read."""
+        raster_datasets = asyncio.run(open_rasters([get_url(server, name) for name in RASTER_NAMES]))
+
+        for raster_ds, name in zip(raster_datasets, RASTER_NAMES):
+            local_ds = RasterDataset(input_dir.joinpath("raster", name))
+            assert raster_ds.size == local_ds.size
+            assert raster_ds.band_dtypes == local_ds.band_dtypes
+
+    def test_missing_raster(self, server: ThreadingHTTPServer) -> None:
+        """Check an error is raised when one of the rasters doesn't exist."""
+        with pytest.raises(IOError, match="does not exist"):
+            asyncio.run(open_rasters([get_url(server, RASTER_NAMES[0]), get_url(server, "missing.tif")]))
+
+
+class TestReadWindows:
+    def test_read_windows(self, input_dir: Path, server: ThreadingHTTPServer) -> None:
+        """Check windows read concurrently from several remote rasters match those read locally, in request order."""
+        windows = [Window(0, 0, 64, 64), Window(100, 50, 30, 120), Window(10, 10, 1, 1)]
+        requests = [WindowRequest(get_url(server, name), window) for window in windows for name in RASTER_NAMES]
+
+        arrays = asyncio.run(read_windows(requests, max_concurrency=2))
+
+        for request, array in zip(requests, arrays):
+            local_ds = RasterDataset(input_dir.joinpath("raster", request.path.rsplit("/", 1)[-1]))
+            np.testing.assert_array_equal(array, local_ds.read_window(request.window, request.band_index))
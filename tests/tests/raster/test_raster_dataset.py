@@ -1,6 +1,18 @@
 from pathlib import Path
 
+import numpy as np
+import pytest
+from osgeo import gdal
+
 from geospatial_utils.raster.raster_dataset import RasterDataset
+from geospatial_utils.raster.windows import Window
+
+
+@pytest.fixture
+def rotated_raster_ds() -> RasterDataset:
+    ds = gdal.GetDriverByName("MEM").Create("", 100, 100, 1, gdal.GDT_Byte)
+    ds.SetGeoTransform((1000.0, 10.0, 2.5, 5000.0, 1.5, -10.0))
+    return RasterDataset(ds)
 
 
 class TestRasterDataset:
@@ -33,3 +45,136 @@ class TestRasterDataset:
 
         assert actual_x == expected_x
         assert actual_y == expected_y
+
+    def test_convert_native_srs_to_pixel_coordinates_rotated(self, rotated_raster_ds: RasterDataset) -> None:
+        """Check converting to pixel coordinates accounts for both rotation terms of the geotransform."""
+        x_coord, y_coord = rotated_raster_ds.convert_pixel_coord_to_native_srs(37, 64)
+
+        assert rotated_raster_ds.convert_native_srs_to_pixel_coord(x_coord, y_coord) == (37, 64)
+
+    def test_convert_pixel_coords_to_native_srs(self, rotated_raster_ds: RasterDataset) -> None:
+        """Check the vectorised conversion to native srs coordinates matches the scalar conversion."""
+        pixel_x = np.array([0, 37, 99])
+        pixel_y = np.array([0, 64, 12])
+
+        actual_x, actual_y = rotated_raster_ds.convert_pixel_coords_to_native_srs(pixel_x, pixel_y)
+
+        expected = [rotated_raster_ds.convert_pixel_coord_to_native_srs(x, y) for x, y in zip(pixel_x, pixel_y)]
+        np.testing.assert_allclose(actual_x, [point.x for point in expected])
+        np.testing.assert_allclose(actual_y, [point.y for point in expected])
+
+    def test_convert_native_srs_to_pixel_coords(self, rotated_raster_ds: RasterDataset) -> None:
+        """Check the vectorised conversion to pixel coordinates round trips with the conversion to native srs."""
+        pixel_x = np.array([0, 37, 99])
+        pixel_y = np.array([0, 64, 12])
+
+        x_coords, y_coords = rotated_raster_ds.convert_pixel_coords_to_native_srs(pixel_x, pixel_y)
+        actual_x, actual_y = rotated_raster_ds.convert_native_srs_to_pixel_coords(x_coords, y_coords)
+
+        np.testing.assert_array_equal(actual_x, pixel_x)
+        np.testing.assert_array_equal(actual_y, pixel_y)
+
+
+class TestMetadata:
+    def test_metadata_properties(self, input_dir: Path) -> None:
+        """Check the metadata read lazily matches the dataset, for both the normal and metadata only modes."""
+        input_path = input_dir.joinpath("raster", "test_raster_3857.tif")
+        ds = gdal.Open(str(input_path))
+
+        for raster_ds in (RasterDataset(input_path), RasterDataset(input_path, metadata_only=True)):
+            assert raster_ds.epsg_code == "3857"
+            assert raster_ds.size == (ds.RasterXSize, ds.RasterYSize)
+            assert raster_ds.band_count == ds.RasterCount
+            assert raster_ds.band_dtypes[0] == ds.GetRasterBand(1).ReadAsArray(0, 0, 1, 1).dtype
+            assert raster_ds.nodata_values[0] == ds.GetRasterBand(1).GetNoDataValue()
+
+    def test_bounds_of_rotated_raster(self, rotated_raster_ds: RasterDataset) -> None:
+        """Check the bounds cover all four corners of a rotated raster."""
+        assert rotated_raster_ds.bounds == (1000.0, 4000.0, 2250.0, 5150.0)
+        assert rotated_raster_ds.epsg_code is None
+
+    def test_missing_raster(self, working_dir: Path) -> None:
+        with pytest.raises(IOError, match="does not exist"):
+            RasterDataset(working_dir.joinpath("missing.tif"))
+
+
+class TestReadBlocks:
+    def test_read_blocks(self, input_dir: Path) -> None:
+        """Check the windows read cover the whole band and contain the same data as reading the band in full."""
+        raster_ds = RasterDataset(input_dir.joinpath("raster", "test_raster_3857.tif"))
+        expected_arr = raster_ds.get_band(1).ReadAsArray()
+
+        actual_arr = np.zeros_like(expected_arr)
+        for block_window, arr in raster_ds.read_blocks(1, max_memory=expected_arr.nbytes // 4):
+            actual_arr[block_window.window.slices] = arr
+
+        np.testing.assert_array_equal(actual_arr, expected_arr)
+
+    def test_read_blocks_into_buffer_with_overlap(self, input_dir: Path) -> None:
+        """Check windows with an overlap are read into the caller's buffer."""
+        raster_ds = RasterDataset(input_dir.joinpath("raster", "test_raster_3857.tif"))
+        expected_arr = raster_ds.get_band(1).ReadAsArray()
+
+        max_memory = expected_arr.nbytes // 4
+        buffer = raster_ds.allocate_window_buffer(1, overlap=2, max_memory=max_memory)
+
+        actual_arr = np.zeros_like(expected_arr)
+        for block_window, arr in raster_ds.read_blocks(1, overlap=2, max_memory=max_memory, buffer=buffer):
+            assert np.shares_memory(arr, buffer)
+            np.testing.assert_array_equal(arr, expected_arr[block_window.read_window.slices])
+
+            actual_arr[block_window.window.slices] = arr[block_window.core_slices]
+
+        np.testing.assert_array_equal(actual_arr, expected_arr)
+
+    def test_buffer_too_small(self, input_dir: Path) -> None:
+        """Check an error is raised when the buffer can't hold the window."""
+        raster_ds = RasterDataset(input_dir.joinpath("raster", "test_raster_3857.tif"))
+
+        with pytest.raises(ValueError, match="is too small for the window"):
+            raster_ds.read_window(Window(0, 0, 10, 10), buffer=np.empty((5, 5)))
+
+
+class TestReadBands:
+    def test_read_bands(self) -> None:
+        """Check every band of a window is read with one call into a (bands, rows, columns) array."""
+        ds = gdal.GetDriverByName("MEM").Create("", 20, 10, 3, gdal.GDT_Int16)
+        for band_index in range(1, 4):
+            ds.GetRasterBand(band_index).Fill(band_index)
+
+        arr = RasterDataset(ds).read_bands(Window(2, 3, 5, 4))
+
+        assert arr.shape == (3, 4, 5)
+        assert arr.dtype == np.int16
+        np.testing.assert_array_equal(arr[:, 0, 0], [1, 2, 3])
+
+    def test_read_bands_into_buffer(self, input_dir: Path) -> None:
+        """Check a single band is read straight into a slice of the caller's buffer."""
+        raster_ds = RasterDataset(input_dir.joinpath("raster", "test_raster_3857.tif"))
+        window = Window(0, 0, 8, 6)
+        buffer = np.zeros((2, 1, 6, 8), dtype=raster_ds.get_band_dtype(1))
+
+        arr = raster_ds.read_bands(window, [1], buffer=buffer[1])
+
+        assert np.shares_memory(arr, buffer)
+        np.testing.assert_array_equal(buffer[1, 0], raster_ds.read_window(window, 1))
+
+    def test_mixed_band_types(self) -> None:
+        """Check an error is raised when the bands can't share one array."""
+        ds = gdal.GetDriverByName("MEM").Create("", 4, 4, 1, gdal.GDT_Byte)
+        ds.AddBand(gdal.GDT_Float32)
+
+        with pytest.raises(ValueError, match="have different data types"):
+            RasterDataset(ds).read_bands()
+
+
+class TestExportNpy:
+    def test_export_npy(self, input_dir: Path, working_dir: Path) -> None:
+        """Check the raster is exported window by window into a memory mapped .npy file."""
+        raster_ds = RasterDataset(input_dir.joinpath("raster", "test_raster_3857.tif"))
+        expected_arr = raster_ds.read_bands()
+        output_path = working_dir.joinpath("raster.npy")
+
+        raster_ds.export_npy(output_path, max_memory=expected_arr.nbytes // 4)
+
+        np.testing.assert_array_equal(np.load(output_path, mmap_mode="r"), expected_arr)
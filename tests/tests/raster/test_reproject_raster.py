@@ -1,8 +1,18 @@
 from pathlib import Path
 
 import pytest
+from osgeo import gdal
 
-from geospatial_utils.raster.reprojection import reproject_raster
+from geospatial_utils.raster.constants import COG_DRIVER, GTIFF_DRIVER
+from geospatial_utils.raster.reprojection import (
+    DEFAULT_PROFILE,
+    WARP_PROFILES,
+    get_creation_options,
+    get_profile_creation_options,
+    get_warp_kwargs,
+    get_warp_profile,
+    reproject_raster,
+)
 from tests.testing_utils.file_comparison import compare_raster_files
 
 
@@ -25,3 +35,103 @@ class TestReprojectRaster:
 
         with pytest.raises(ValueError, match="The raster is already projected to EPSG: 3857"):
             reproject_raster(input_path=input_path, output_path=output_path, output_epsg_code=3857)
+
+    def test_reproject_raster_to_cog(self, input_dir: Path, output_dir: Path, working_dir: Path) -> None:
+        """Test a raster is warped straight into a compressed COG, including overviews."""
+        input_path = input_dir.joinpath("raster", "test_raster_3857.tif")
+        expected_path = output_dir.joinpath("raster", "reprojection", "test_raster_4326.tif")
+
+        actual_path = working_dir.joinpath("test_raster_4326_cog.tif")
+
+        reproject_raster(
+            input_path=input_path,
+            output_path=actual_path,
+            output_epsg_code=4326,
+            output_format=COG_DRIVER,
+            compression="ZSTD",
+            compression_level=9,
+        )
+
+        compare_raster_files(expected_raster_path=expected_path, actual_raster_path=actual_path)
+
+        actual_ds = gdal.Open(str(actual_path))
+        assert actual_ds.GetMetadataItem("LAYOUT", "IMAGE_STRUCTURE") == "COG"
+        assert actual_ds.GetMetadataItem("COMPRESSION", "IMAGE_STRUCTURE") == "ZSTD"
+        assert not working_dir.joinpath("test_raster_4326_cog.tif.ovr").exists()
+
+    @pytest.mark.parametrize("profile", list(WARP_PROFILES))
+    def test_reproject_raster_with_profile(self, input_dir: Path, working_dir: Path, profile: str) -> None:
+        """Check a raster is reprojected into a COG with the compression and block size of each profile."""
+        input_path = input_dir.joinpath("raster", "test_raster_3857.tif")
+        output_path = working_dir.joinpath(f"test_raster_4326_{profile}.tif")
+
+        reproject_raster(input_path, output_path, output_epsg_code=4326, output_format=COG_DRIVER, profile=profile)
+
+        output_ds = gdal.Open(str(output_path))
+        assert output_ds.GetMetadataItem("LAYOUT", "IMAGE_STRUCTURE") == "COG"
+        assert output_ds.GetMetadataItem("COMPRESSION", "IMAGE_STRUCTURE") == WARP_PROFILES[profile].compression
+        assert output_ds.GetRasterBand(1).GetBlockSize() == [WARP_PROFILES[profile].block_size] * 2
+
+
+class TestGetCreationOptions:
+    def test_gtiff_defaults(self) -> None:
+        """Check the GeoTIFF creation options default to level 9 DEFLATE compression."""
+        assert get_creation_options(GTIFF_DRIVER) == ["TILED=YES", "COMPRESS=DEFLATE", "PREDICTOR=2", "ZLEVEL=9"]
+
+    @pytest.mark.parametrize(
+        ["compression", "compression_level", "expected_option"],
+        [("DEFLATE", 6, "LEVEL=6"), ("ZSTD", 15.0, "LEVEL=15"), ("LERC", 0.5, "MAX_Z_ERROR=0.5")],
+    )
+    def test_cog_compression_level(self, compression: str, compression_level: float, expected_option: str) -> None:
+        """Check the compression level is set using the option name the COG driver expects for each codec."""
+        creation_options = get_creation_options(COG_DRIVER, compression, compression_level)
+
+        assert f"COMPRESS={compression}" in creation_options
+        assert expected_option in creation_options
+
+    def test_level_for_unsupported_codec(self) -> None:
+        """Check an error is raised when a compression level is set for a codec that doesn't support one."""
+        with pytest.raises(ValueError, match="A compression level can't be set for LZW compression."):
+            get_creation_options(COG_DRIVER, "LZW", 5)
+
+
+class TestGetWarpProfile:
+    def test_default_profile(self) -> None:
+        """Check the default profile leaves the warp to the GDAL defaults."""
+        assert get_warp_profile() == DEFAULT_PROFILE
+        assert get_warp_kwargs(DEFAULT_PROFILE) == {"resampleAlg": "near"}
+
+    def test_overrides(self) -> None:
+        """Check the settings of a named profile are overridden, ignoring overrides which are None."""
+        profile = get_warp_profile("balanced", warp_threads=4, resampling="bilinear", block_size=None)
+
+        assert profile == WARP_PROFILES["balanced"]._replace(warp_threads=4, resampling="bilinear")
+
+    def test_compression_override_resets_level(self) -> None:
+        """Check the compression level of a profile isn't carried over to a different codec."""
+        assert get_warp_profile("archive", compression="LERC").compression_level is None
+        assert get_warp_profile("archive", compression="zstd").compression_level == 19
+
+    def test_unknown_profile(self) -> None:
+        """Check an error is raised for a profile name which doesn't exist."""
+        with pytest.raises(ValueError, match="quick is not a warp profile"):
+            get_warp_profile("quick")
+
+    def test_warp_kwargs(self) -> None:
+        """Check a profile is converted into multithreaded, memory limited warp options."""
+        warp_kwargs = get_warp_kwargs(WARP_PROFILES["archive"])
+
+        assert warp_kwargs["multithread"]
+        assert warp_kwargs["warpOptions"] == ["NUM_THREADS=ALL_CPUS"]
+        assert warp_kwargs["warpMemoryLimit"] == 512
+        assert warp_kwargs["errorThreshold"] == 0
+
+    @pytest.mark.parametrize(
+        ["output_format", "expected_options"],
+        [(COG_DRIVER, ["BLOCKSIZE=256"]), (GTIFF_DRIVER, ["BLOCKXSIZE=256", "BLOCKYSIZE=256"])],
+    )
+    def test_block_size(self, output_format: str, expected_options: list[str]) -> None:
+        """Check the block size is set using the option names each driver expects."""
+        creation_options = get_profile_creation_options(output_format, WARP_PROFILES["archive"])
+
+        assert creation_options[-len(expected_options) :] == expected_options
@@ -0,0 +1,74 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+from osgeo import gdal
+
+from geospatial_utils.raster.raster_dataset import RasterDataset
+from geospatial_utils.raster.sampling import BILINEAR, PointSampler, sample_points, sample_vector
+from geospatial_utils.srs.cache import get_srs
+from geospatial_utils.vector.vector_dataset import VectorDataset
+
+
+def create_raster(epsg_code: int) -> RasterDataset:
+    """A 4 x 4 raster of 1 metre (or degree) pixels, with the values 0 to 15 in band 1 (15 is nodata) and 100 to 115 in
+    band 2."""
+    ds = gdal.GetDriverByName("MEM").Create("", 4, 4, 2, gdal.GDT_Float32)
+    ds.SetGeoTransform((0.0, 1.0, 0.0, 4.0, 0.0, -1.0))
+    ds.SetSpatialRef(get_srs(epsg_code=epsg_code))
+    data = np.arange(16, dtype=np.float32).reshape(4, 4)
+    ds.GetRasterBand(1).WriteArray(data)
+    ds.GetRasterBand(1).SetNoDataValue(15)
+    ds.GetRasterBand(2).WriteArray(data + 100)
+
+    return RasterDataset(ds)
+
+
+class TestSamplePoints:
+    def test_nearest(self) -> None:
+        """Check each point takes the value of the pixel it falls in, with nodata and points outside masked."""
+        values = sample_points(create_raster(4326), [0.5, 3.9, 2.5, 5], [3.5, 0.1, 1.5, 5])
+
+        np.testing.assert_array_equal(values.data[:3], [[0, 100], [15, 115], [10, 110]])
+        np.testing.assert_array_equal(values.mask, [[False, False], [True, False], [False, False], [True, True]])
+
+    def test_bilinear(self) -> None:
+        """Check values are interpolated between pixel centres, ignoring those outside of the raster."""
+        values = sample_points(create_raster(4326), [1.0, 0.25], [3.0, 3.5], band_indexes=[2], interpolation=BILINEAR)
+
+        np.testing.assert_allclose(values[:, 0], [102.5, 100])
+
+    def test_reproject_points(self) -> None:
+        """Check the points are reprojected into the raster srs, in longitude/latitude order."""
+        values = sample_points(create_raster(3857), [0.00002], [0.00001], srs=4326, band_indexes=[1])
+
+        assert values[0, 0] == 10
+
+    def test_block_cache(self) -> None:
+        """Check blocks are read once and reused between batches of points."""
+        sampler = PointSampler(create_raster(4326), cache_size=2)
+        sampler.sample([0.5, 1.5, 2.5], [3.5, 3.5, 3.5])
+        sampler.sample([3.5], [3.5])
+
+        assert len(sampler._cache) == 1
+
+    def test_invalid_interpolation(self) -> None:
+        with pytest.raises(ValueError, match="is not a valid interpolation"):
+            sample_points(create_raster(4326), [0], [0], interpolation="cubic")
+
+
+class TestSampleVector:
+    def test_sample_vector(self, working_dir: Path) -> None:
+        """Check the points of a layer are sampled, keyed by their FIDs."""
+        vector_path = working_dir.joinpath("points.geojson")
+        features = [
+            {"type": "Feature", "properties": {}, "geometry": {"type": "Point", "coordinates": coordinates}}
+            for coordinates in ([0.5, 3.5], [2.5, 1.5])
+        ]
+        vector_path.write_text(json.dumps({"type": "FeatureCollection", "features": features}))
+
+        fids, values = sample_vector(create_raster(4326), VectorDataset(vector_path), band_indexes=[1])
+
+        np.testing.assert_array_equal(fids, [0, 1])
+        np.testing.assert_array_equal(values[:, 0], [0, 10])
@@ -0,0 +1,125 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+from osgeo import gdal
+
+from geospatial_utils.raster.constants import GTIFF_DRIVER
+from geospatial_utils.raster.raster_dataset import RasterDataset
+from geospatial_utils.raster.statistics import Moments, compute_moments, merge_moments, moments_to_statistics
+
+
+def create_raster(raster_path: Path, data: np.ndarray, nodata: float | None = None) -> Path:
+    """Create a tiled GeoTIFF of the data, with 16 x 16 blocks so it's read in several windows."""
+    ds = gdal.GetDriverByName(GTIFF_DRIVER).Create(
+        str(raster_path),
+        data.shape[1],
+        data.shape[0],
+        1,
+        gdal.GDT_Float32,
+        options=["TILED=YES", "BLOCKXSIZE=16", "BLOCKYSIZE=16"],
+    )
+    band = ds.GetRasterBand(1)
+    if nodata is not None:
+        band.SetNoDataValue(nodata)
+    band.WriteArray(data)
+
+    del ds
+    return raster_path
+
+
+class TestMergeMoments:
+    def test_merge_in_any_order(self) -> None:
+        """Check merging the moments of the parts of an array, in any order, gives the moments of the whole array."""
+        values = np.random.default_rng(0).normal(1000, 5, 1000)
+        parts = [compute_moments(part) for part in np.array_split(values, 7)]
+
+        forwards = Moments()
+        for part in parts:
+            forwards = merge_moments(forwards, part)
+        backwards = Moments()
+        for part in reversed(parts):
+            backwards = merge_moments(backwards, part)
+
+        for moments in (forwards, backwards):
+            statistics = moments_to_statistics(moments, values.size)
+            assert statistics.mean == pytest.approx(values.mean())
+            assert statistics.std_dev == pytest.approx(values.std())
+            assert (statistics.minimum, statistics.maximum) == (values.min(), values.max())
+
+    def test_no_valid_values(self) -> None:
+        """Check NaN values are ignored, and the statistics are NaN when nothing is valid."""
+        statistics = moments_to_statistics(compute_moments(np.array([np.nan, np.nan])), 2)
+
+        assert np.isnan(statistics.mean)
+        assert statistics.valid_percent == 0
+
+
+class TestGetStatistics:
+    @pytest.fixture
+    def data(self) -> np.ndarray:
+        data = np.arange(40 * 50, dtype=np.float32).reshape(40, 50)
+        data[:10] = -9999
+        return data
+
+    def test_exact_statistics(self, working_dir: Path, data: np.ndarray) -> None:
+        """Check the statistics of the valid pixels are calculated window by window, and cached in the .aux.xml."""
+        raster_path = create_raster(working_dir.joinpath("raster.tif"), data, nodata=-9999)
+        valid_values = data[data != -9999]
+
+        statistics = RasterDataset(raster_path).get_statistics(max_memory=1024)
+
+        assert statistics.mean == pytest.approx(valid_values.mean())
+        assert statistics.std_dev == pytest.approx(valid_values.std())
+        assert statistics.valid_percent == pytest.approx(75)
+        assert not statistics.approximate
+        assert working_dir.joinpath("raster.tif.aux.xml").exists()
+
+        assert RasterDataset(raster_path).get_statistics() == statistics
+
+    def test_approximate_statistics(self, working_dir: Path, data: np.ndarray) -> None:
+        """Check approximate statistics are cached separately, and not used when exact statistics are required."""
+        raster_path = create_raster(working_dir.joinpath("raster.tif"), data, nodata=-9999)
+        raster_ds = RasterDataset(raster_path)
+        raster_ds.build_overviews(levels=[2])
+
+        approximate = raster_ds.get_statistics(approximate=True)
+        exact = RasterDataset(raster_path).get_statistics()
+
+        assert approximate.approximate
+        assert not exact.approximate
+        assert RasterDataset(raster_path).get_statistics(approximate=True) == exact
+
+
+class TestGetHistogram:
+    def test_histogram(self, working_dir: Path) -> None:
+        """Check the histogram covers the range of the band by default, and is cached."""
+        data = np.repeat(np.arange(4, dtype=np.float32), 100).reshape(20, 20)
+        raster_path = create_raster(working_dir.joinpath("raster.tif"), data)
+
+        counts, bin_edges = RasterDataset(raster_path).get_histogram(bins=4, max_memory=256)
+
+        np.testing.assert_array_equal(counts, [100] * 4)
+        np.testing.assert_allclose(bin_edges, [0, 0.75, 1.5, 2.25, 3])
+
+        cached_counts, _ = RasterDataset(raster_path).get_histogram(bins=4)
+        np.testing.assert_array_equal(cached_counts, counts)
+
+    def test_constant_band(self, working_dir: Path) -> None:
+        """Check the range of a constant band is widened, so the bin edges (and cached histogram) match the counts."""
+        raster_path = create_raster(working_dir.joinpath("raster.tif"), np.full((20, 20), 5, dtype=np.float32))
+
+        counts, bin_edges = RasterDataset(raster_path).get_histogram(bins=2, max_memory=256)
+
+        np.testing.assert_array_equal(counts, [0, 400])
+        np.testing.assert_allclose(bin_edges, [4.5, 5, 5.5])
+
+        cached_counts, cached_edges = RasterDataset(raster_path).get_histogram(bins=2)
+        np.testing.assert_array_equal(cached_counts, counts)
+        np.testing.assert_allclose(cached_edges, bin_edges)
+
+    def test_no_valid_pixels(self, working_dir: Path) -> None:
+        raster_path = create_raster(working_dir.joinpath("raster.tif"), np.zeros((4, 4), dtype=np.float32), nodata=0)
+
+        with pytest.raises(ValueError, match="has no valid pixels"):
+            RasterDataset(raster_path).get_histogram()
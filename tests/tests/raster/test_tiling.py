@@ -0,0 +1,107 @@
+import sqlite3
+from pathlib import Path
+
+import numpy as np
+import pytest
+from osgeo import gdal
+
+from geospatial_utils.raster.raster_dataset import RasterDataset
+from geospatial_utils.raster.tiling import (
+    apply_colour_ramp,
+    downsample_rgba,
+    encode_tile,
+    generate_tiles,
+    get_colour_table,
+)
+from geospatial_utils.srs.cache import get_srs
+from geospatial_utils.tiles.grid import Tile, get_tile_bounds
+from geospatial_utils.tiles.stores import PNG_FORMAT, DirectoryTileStore, MBTilesStore
+
+
+def create_raster(raster_path: Path) -> RasterDataset:
+    """A 512 x 512 raster covering the upper right zoom level 2 tile of the world, with its left half nodata."""
+    min_x, _, max_x, max_y = get_tile_bounds(Tile(2, 3, 0))
+    resolution = (max_x - min_x) / 512
+
+    ds = gdal.GetDriverByName("GTiff").Create(str(raster_path), 512, 512, 1, gdal.GDT_Float32)
+    ds.SetGeoTransform((min_x, resolution, 0.0, max_y, 0.0, -resolution))
+    ds.SetSpatialRef(get_srs(epsg_code=3857))
+
+    data = np.tile(np.linspace(0, 100, 512, dtype=np.float32), (512, 1))
+    data[:, :256] = -1
+    ds.GetRasterBand(1).WriteArray(data)
+    ds.GetRasterBand(1).SetNoDataValue(-1)
+    ds.FlushCache()
+    del ds
+
+    return RasterDataset(raster_path)
+
+
+class TestColourRamp:
+    def test_apply_colour_ramp(self) -> None:
+        """Check values are stretched over the value range, with NaN values transparent."""
+        values = np.array([[0, 50, 100, np.nan]])
+        rgba = apply_colour_ramp(values, np.full(values.shape, 255), (0, 100), "greyscale")
+
+        np.testing.assert_array_equal(rgba[0, :, 0], [0, 127, 255, 0])
+        np.testing.assert_array_equal(rgba[0, :, 3], [255, 255, 255, 0])
+
+    def test_invalid_colour_ramp(self) -> None:
+        with pytest.raises(ValueError, match="is not a colour ramp"):
+            get_colour_table("rainbow")
+
+
+class TestDownsample:
+    def test_downsample(self) -> None:
+        """Check transparent child pixels don't darken the pixels they're averaged with."""
+        child = np.zeros((2, 2, 4), dtype=np.uint8)
+        child[0, 0] = (200, 100, 0, 255)
+
+        rgba = downsample_rgba([child, None, None, None])
+
+        np.testing.assert_array_equal(rgba[0, 0], [200, 100, 0, 64])
+        np.testing.assert_array_equal(rgba[1, 1], [0, 0, 0, 0])
+
+    def test_empty(self) -> None:
+        assert downsample_rgba([None, None, None, None]) is None
+
+
+class TestGenerateTiles:
+    def test_encode_tile(self) -> None:
+        data = encode_tile(np.zeros((256, 256, 4), dtype=np.uint8), PNG_FORMAT)
+
+        assert data.startswith(b"\x89PNG")
+
+    def test_generate_tiles(self, working_dir: Path) -> None:
+        """Check every zoom level is rendered, with the empty tiles of the nodata half of the raster skipped."""
+        raster_ds = create_raster(working_dir.joinpath("raster.tif"))
+        tile_dir = working_dir.joinpath("tiles")
+
+        with DirectoryTileStore(tile_dir, PNG_FORMAT) as store:
+            tile_count = generate_tiles(raster_ds, store, min_zoom=0, max_zoom=3, workers=2)
+
+        # Only the right half of the 2 x 2 zoom level 3 tiles within the raster has data
+        assert tile_count == 5
+        assert tile_dir.joinpath("3", "7", "0.png").exists()
+        assert not tile_dir.joinpath("3", "6", "0.png").exists()
+
+        tile_ds = gdal.Open(str(tile_dir.joinpath("0", "0", "0.png")))
+        assert tile_ds.RasterCount == 4
+
+    def test_mbtiles(self, working_dir: Path) -> None:
+        raster_ds = create_raster(working_dir.joinpath("raster.tif"))
+        output_path = working_dir.joinpath("tiles.mbtiles")
+
+        with MBTilesStore(output_path, PNG_FORMAT) as store:
+            generate_tiles(raster_ds, store, min_zoom=2, max_zoom=3, value_range=(0, 100))
+
+        with sqlite3.connect(output_path) as connection:
+            zooms = connection.execute("SELECT zoom_level, COUNT(*) FROM tiles GROUP BY zoom_level").fetchall()
+
+        assert zooms == [(2, 1), (3, 2)]
+
+    def test_invalid_zoom(self, working_dir: Path) -> None:
+        raster_ds = create_raster(working_dir.joinpath("raster.tif"))
+
+        with pytest.raises(ValueError, match="should be between 0 and"):
+            generate_tiles(raster_ds, DirectoryTileStore(working_dir, PNG_FORMAT), min_zoom=3, max_zoom=2)
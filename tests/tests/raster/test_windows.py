@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from geospatial_utils.raster.windows import (
+    BlockWindow,
+    Window,
+    allocate_aligned_array,
+    generate_windows,
+    get_window_size,
+)
+
+
+class TestGetWindowSize:
+    def test_natural_block_size(self) -> None:
+        """Check the natural block size is used when there is no memory ceiling."""
+        assert get_window_size(1000, 800, 256, 256, item_size=4, max_memory=None) == (256, 256)
+
+    def test_whole_block_rows(self) -> None:
+        """Check whole rows of blocks are used when they fit within the memory ceiling."""
+        # Each row of blocks is 1000 * 256 * 4 bytes, so three rows fit
+        assert get_window_size(1000, 2000, 256, 256, item_size=4, max_memory=3_100_000) == (1000, 768)
+
+    def test_blocks_along_row(self) -> None:
+        """Check a run of blocks along a row is used when a whole row of blocks doesn't fit."""
+        # Each block is 256 * 256 * 4 bytes, so two blocks fit
+        assert get_window_size(10_000, 2000, 256, 256, item_size=4, max_memory=600_000) == (512, 256)
+
+    def test_partial_block(self) -> None:
+        """Check part of a block is used when a single block doesn't fit."""
+        assert get_window_size(10_000, 2000, 256, 256, item_size=4, max_memory=10_240) == (256, 10)
+
+
+class TestGenerateWindows:
+    def test_windows_cover_raster(self) -> None:
+        """Check the windows tile the raster exactly, with the edge windows clipped to the raster extent."""
+        windows = [block_window.window for block_window in generate_windows(250, 130, 100, 100)]
+
+        assert windows == [
+            Window(0, 0, 100, 100),
+            Window(100, 0, 100, 100),
+            Window(200, 0, 50, 100),
+            Window(0, 100, 100, 30),
+            Window(100, 100, 100, 30),
+            Window(200, 100, 50, 30),
+        ]
+
+    def test_overlap(self) -> None:
+        """Check the read windows extend past the windows by the overlap, clipped to the raster extent."""
+        block_windows = list(generate_windows(200, 100, 100, 100, overlap=5))
+
+        assert block_windows[0] == BlockWindow(Window(0, 0, 100, 100), Window(0, 0, 105, 100))
+        assert block_windows[1] == BlockWindow(Window(100, 0, 100, 100), Window(95, 0, 105, 100))
+        assert block_windows[1].core_slices == (slice(0, 100), slice(5, 105))
+
+    def test_invalid_window_size(self) -> None:
+        """Check an error is raised for an empty window."""
+        with pytest.raises(ValueError, match="The window size must be positive"):
+            list(generate_windows(200, 100, 0, 100))
+
+
+class TestAllocateAlignedArray:
+    @pytest.mark.parametrize("dtype", [np.uint8, np.int16, np.float64])
+    def test_alignment(self, dtype: type) -> None:
+        """Check the array has the requested shape and type, and its data starts on the alignment boundary."""
+        arr = allocate_aligned_array((3, 5, 7), dtype, alignment=64)
+
+        assert arr.shape == (3, 5, 7)
+        assert arr.dtype == dtype
+        assert arr.flags.c_contiguous
+        assert arr.ctypes.data % 64 == 0
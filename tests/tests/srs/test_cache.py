@@ -0,0 +1,92 @@
+import threading
+
+import pytest
+from osgeo import osr
+
+from geospatial_utils.srs.cache import (
+    SRS_CACHE,
+    TRANSFORMATION_CACHE,
+    CacheInfo,
+    LRUCache,
+    cache_info,
+    clear_cache,
+    get_coordinate_transformation,
+    get_srs,
+)
+
+
+@pytest.fixture(autouse=True)
+def empty_cache() -> None:
+    clear_cache()
+
+
+class TestLRUCache:
+    def test_least_recently_used_dropped(self) -> None:
+        """Check the least recently used item is dropped once the cache is full."""
+        cache = LRUCache(max_size=2)
+        cache.get("a", lambda: 1)
+        cache.get("b", lambda: 2)
+        cache.get("a", lambda: 1)
+        cache.get("c", lambda: 3)
+
+        assert len(cache) == 2
+        assert cache.get("a", lambda: None) == (1, True)
+        assert cache.get("b", lambda: None) == (None, False)
+
+
+class TestGetSrs:
+    def test_srs_cached(self) -> None:
+        """Check the same spatial reference object is returned for repeated lookups of an EPSG code."""
+        srs = get_srs(epsg_code=3857)
+
+        assert get_srs(epsg_code=3857) is srs
+        assert srs.GetAuthorityCode(None) == "3857"
+        assert cache_info()[SRS_CACHE] == CacheInfo(hits=1, misses=1)
+
+    def test_axis_mapping_strategy(self) -> None:
+        """Check spatial references with different axis mapping strategies are cached separately."""
+        srs = get_srs(epsg_code=4326)
+        traditional_srs = get_srs(epsg_code=4326, axis_mapping_strategy=osr.OAMS_TRADITIONAL_GIS_ORDER)
+
+        assert srs is not traditional_srs
+        assert traditional_srs.GetAxisMappingStrategy() == osr.OAMS_TRADITIONAL_GIS_ORDER
+
+    def test_no_definition(self) -> None:
+        with pytest.raises(ValueError, match="Either an epsg_code or a wkt should be provided."):
+            get_srs()
+
+    def test_per_thread_instances(self) -> None:
+        """Check each thread gets its own spatial reference objects."""
+        srs = get_srs(epsg_code=3857)
+        thread_srs = []
+
+        thread = threading.Thread(target=lambda: thread_srs.append(get_srs(epsg_code=3857)))
+        thread.start()
+        thread.join()
+
+        assert thread_srs[0] is not srs
+        assert thread_srs[0].IsSame(srs)
+
+
+class TestGetCoordinateTransformation:
+    def test_transformation_cached(self) -> None:
+        """Check the transformation is reused for equivalent spatial references, including new srs objects."""
+        coord_transform = get_coordinate_transformation(4326, 3857)
+
+        source_srs = osr.SpatialReference()
+        source_srs.ImportFromEPSG(4326)
+
+        assert get_coordinate_transformation(source_srs, get_srs(epsg_code=3857)) is coord_transform
+        assert cache_info()[TRANSFORMATION_CACHE] == CacheInfo(hits=1, misses=1)
+
+    def test_axis_order(self) -> None:
+        """Check transformations are keyed on the axis order of the spatial references."""
+        traditional_srs = get_srs(epsg_code=4326, axis_mapping_strategy=osr.OAMS_TRADITIONAL_GIS_ORDER)
+
+        coord_transform = get_coordinate_transformation(4326, 3857)
+        traditional_transform = get_coordinate_transformation(traditional_srs, 3857)
+
+        assert coord_transform is not traditional_transform
+        assert traditional_transform.TransformPoint(1.0, 52.0)[0] == pytest.approx(
+            coord_transform.TransformPoint(52.0, 1.0)[0]
+        )
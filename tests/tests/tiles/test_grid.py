@@ -0,0 +1,61 @@
+import pytest
+
+from geospatial_utils.tiles.grid import (
+    WEB_MERCATOR_EXTENT,
+    Tile,
+    get_children,
+    get_lon_lat_bounds,
+    get_parent,
+    get_tile_bounds,
+    get_tile_id,
+    get_tile_range,
+    to_tms_y,
+)
+
+
+class TestTileGrid:
+    def test_tile_bounds(self) -> None:
+        """Check the tiles of zoom level 1 split the world into quarters, counting rows down from the north."""
+        assert get_tile_bounds(Tile(0, 0, 0)) == (
+            -WEB_MERCATOR_EXTENT,
+            -WEB_MERCATOR_EXTENT,
+            WEB_MERCATOR_EXTENT,
+            WEB_MERCATOR_EXTENT,
+        )
+        assert get_tile_bounds(Tile(1, 1, 0)) == (0, 0, WEB_MERCATOR_EXTENT, WEB_MERCATOR_EXTENT)
+
+    def test_lon_lat_bounds(self) -> None:
+        min_lon, min_lat, max_lon, max_lat = get_lon_lat_bounds(get_tile_bounds(Tile(0, 0, 0)))
+
+        assert (min_lon, max_lon) == pytest.approx((-180, 180))
+        assert (min_lat, max_lat) == pytest.approx((-85.0511, 85.0511), abs=1e-4)
+
+    def test_tile_range(self) -> None:
+        """Check bounds touching the edge of a tile don't include the tile beyond it."""
+        tile_range = get_tile_range((0, 0, WEB_MERCATOR_EXTENT, WEB_MERCATOR_EXTENT), 2)
+
+        assert tile_range == (2, 2, 0, 3, 1)
+        assert tile_range.tile_count == 4
+        assert list(tile_range.iter_tiles()) == [Tile(2, 2, 0), Tile(2, 3, 0), Tile(2, 2, 1), Tile(2, 3, 1)]
+        assert tile_range.contains(Tile(2, 3, 1))
+        assert not tile_range.contains(Tile(2, 1, 1))
+
+    def test_invalid_zoom(self) -> None:
+        with pytest.raises(ValueError, match="should be between 0 and"):
+            get_tile_range((0, 0, 1, 1), 31)
+
+    def test_children_and_parent(self) -> None:
+        children = get_children(Tile(1, 1, 0))
+
+        assert children == [Tile(2, 2, 0), Tile(2, 3, 0), Tile(2, 2, 1), Tile(2, 3, 1)]
+        assert {get_parent(child) for child in children} == {Tile(1, 1, 0)}
+
+    def test_tms_y(self) -> None:
+        assert to_tms_y(Tile(2, 0, 0)) == 3
+
+    def test_tile_id(self) -> None:
+        """Check tile IDs follow the Hilbert curve of each zoom level, after the tiles of the lower zoom levels."""
+        assert get_tile_id(Tile(0, 0, 0)) == 0
+        assert [get_tile_id(Tile(1, x, y)) for x, y in [(0, 0), (0, 1), (1, 1), (1, 0)]] == [1, 2, 3, 4]
+        assert get_tile_id(Tile(2, 0, 0)) == 5
+        assert get_tile_id(Tile(2, 2, 0)) == 19
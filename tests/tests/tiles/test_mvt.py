@@ -0,0 +1,78 @@
+import struct
+
+from geospatial_utils.tiles.mvt import (
+    CLOSE_PATH,
+    POLYGON,
+    VectorTileLayer,
+    encode_lines,
+    encode_points,
+    encode_polygons,
+    encode_tile,
+    get_ring_area,
+    zigzag,
+)
+
+
+class TestGeometryEncoding:
+    def test_zigzag(self) -> None:
+        assert [zigzag(value) for value in (0, -1, 1, -2, 2)] == [0, 1, 2, 3, 4]
+
+    def test_points(self) -> None:
+        """Check the example from the specification: a MoveTo with each point relative to the previous one."""
+        assert encode_points([(25, 17)]) == [9, 50, 34]
+        assert encode_points([(5, 7), (3, 2)]) == [17, 10, 14, 3, 9]
+
+    def test_lines(self) -> None:
+        """Check lines are drawn relative to the end of the previous line, and repeated or single points dropped."""
+        commands = encode_lines([[(2, 2), (2, 2), (2, 10), (10, 10)], [(1, 1)], [(1, 1), (3, 5)]])
+
+        assert commands == [9, 4, 4, 18, 0, 16, 16, 0, 9, 17, 17, 10, 4, 8]
+
+    def test_polygon_orientation(self) -> None:
+        """Check exterior rings are made clockwise (in tile coordinates) and interior rings anticlockwise."""
+        exterior = [(0, 0), (0, 10), (10, 10), (10, 0), (0, 0)]
+        interior = [(2, 2), (4, 2), (4, 4), (2, 4)]
+        assert get_ring_area(exterior[:-1]) < 0
+
+        commands = encode_polygons([[exterior, interior]])
+
+        # The exterior ring is reversed and its closing point dropped, as ClosePath draws back to its start
+        assert commands[:11] == [9, 20, 0, 26, 0, 20, 19, 0, 0, 19, 15]
+        assert commands[11:] == [9, 4, 8, 26, 4, 0, 0, 3, 3, 0, 15]
+        assert commands.count(CLOSE_PATH | (1 << 3)) == 2
+
+    def test_collapsed_polygon(self) -> None:
+        """Check polygons with no area are dropped."""
+        assert encode_polygons([[[(0, 0), (5, 5), (10, 10), (0, 0)]]]) == []
+
+
+class TestVectorTileLayer:
+    def test_attributes(self) -> None:
+        """Check the keys and values of attributes are shared between features, and None values are dropped."""
+        layer = VectorTileLayer("test")
+        layer.add_points([(1, 1)], {"name": "a", "value": 1.5, "flag": None}, fid=1)
+        layer.add_points([(2, 2)], {"name": "a", "value": 2}, fid=2)
+
+        assert len(layer.features) == 2
+        assert list(layer._keys) == ["name", "value"]
+        assert list(layer._values) == [(str, "a"), (float, 1.5), (int, 2)]
+
+        data = layer.encode()
+        assert data.startswith(bytes([0x78, 2, 0x0A, 4]) + b"test")
+        assert struct.pack("<d", 1.5) in data
+
+    def test_empty_features(self) -> None:
+        """Check features whose geometry collapses aren't added, and layers without features aren't encoded."""
+        layer = VectorTileLayer("test")
+        layer.add_lines([[(1, 1), (1, 1)]], {})
+        layer.add_polygons([[[(0, 0), (1, 1), (0, 0)]]], {})
+
+        assert layer.features == []
+        assert encode_tile([layer]) == b""
+
+    def test_polygon_feature(self) -> None:
+        layer = VectorTileLayer("test", extent=256)
+        layer.add_polygons([[[(0, 0), (10, 0), (10, 10), (0, 10)]]], {})
+
+        assert bytes([0x18, POLYGON]) in layer.features[0]
+        assert encode_tile([layer]).startswith(b"\x1a")
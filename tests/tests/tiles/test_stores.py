@@ -0,0 +1,139 @@
+import json
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from geospatial_utils.tiles.grid import Tile, get_tile_id
+from geospatial_utils.tiles.pmtiles import (
+    HEADER_SIZE,
+    Entry,
+    build_directories,
+    deserialise_directory,
+    serialise_directory,
+    unpack_header,
+)
+from geospatial_utils.tiles.stores import (
+    PNG_FORMAT,
+    DirectoryTileStore,
+    MBTilesStore,
+    PMTilesStore,
+    open_tile_store,
+)
+
+
+class TestDirectoryTileStore:
+    def test_write(self, working_dir: Path) -> None:
+        """Check each tile is saved to a {z}/{x}/{y} file, alongside the metadata of the tileset."""
+        with DirectoryTileStore(working_dir, PNG_FORMAT, {"name": "test"}) as store:
+            store.write(Tile(1, 1, 0), b"tile")
+
+        assert working_dir.joinpath("1", "1", "0.png").read_bytes() == b"tile"
+
+        metadata = json.loads(working_dir.joinpath("metadata.json").read_text())
+        assert metadata["name"] == "test"
+        assert (metadata["minzoom"], metadata["maxzoom"]) == (1, 1)
+        assert metadata["bounds"] == pytest.approx([0, 0, 180, 85.0511], abs=1e-4)
+
+    def test_tms(self, working_dir: Path) -> None:
+        with DirectoryTileStore(working_dir, PNG_FORMAT, tms=True) as store:
+            store.write(Tile(1, 1, 0), b"tile")
+
+        assert working_dir.joinpath("1", "1", "1.png").exists()
+
+    def test_invalid_format(self, working_dir: Path) -> None:
+        with pytest.raises(ValueError, match="is not a valid tile format"):
+            DirectoryTileStore(working_dir, "gif")
+
+
+class TestMBTilesStore:
+    def test_write(self, working_dir: Path) -> None:
+        """Check the tiles are saved with TMS rows, and the metadata table is filled in."""
+        output_path = working_dir.joinpath("tiles.mbtiles")
+        with open_tile_store(output_path, PNG_FORMAT, {"name": "test"}) as store:
+            assert isinstance(store, MBTilesStore)
+            store.write(Tile(1, 1, 0), b"tile")
+
+        with sqlite3.connect(output_path) as connection:
+            tiles = connection.execute("SELECT zoom_level, tile_column, tile_row, tile_data FROM tiles").fetchall()
+            metadata = dict(connection.execute("SELECT name, value FROM metadata"))
+
+        assert tiles == [(1, 1, 1, b"tile")]
+        assert metadata["name"] == "test"
+        assert metadata["format"] == PNG_FORMAT
+        assert metadata["minzoom"] == "1"
+
+    def test_discarded_on_error(self, working_dir: Path) -> None:
+        """Check an existing archive is left untouched, and no partial archive is left behind, after an error."""
+        output_path = working_dir.joinpath("tiles.mbtiles")
+        with open_tile_store(output_path, PNG_FORMAT) as store:
+            store.write(Tile(0, 0, 0), b"old")
+
+        with pytest.raises(RuntimeError), open_tile_store(output_path, PNG_FORMAT) as store:
+            store.write(Tile(0, 0, 0), b"new")
+            raise RuntimeError
+
+        with sqlite3.connect(output_path) as connection:
+            assert connection.execute("SELECT tile_data FROM tiles").fetchall() == [(b"old",)]
+
+        assert list(working_dir.iterdir()) == [output_path]
+
+
+class TestPMTilesStore:
+    def test_directory_round_trip(self) -> None:
+        entries = [Entry(0, 0, 10, 1), Entry(1, 10, 5, 3), Entry(7, 0, 10, 1)]
+
+        assert deserialise_directory(serialise_directory(entries)) == entries
+
+    def test_leaf_directories(self) -> None:
+        """Check entries which don't fit within the root directory are split into leaf directories."""
+        entries = [Entry(tile_id * 2, tile_id * 1000, 999, 1) for tile_id in range(20000)]
+
+        root, leaves = build_directories(entries, leaf_size=1000)
+        root_entries = deserialise_directory(root)
+
+        assert leaves
+        assert all(entry.run_length == 0 for entry in root_entries)
+
+        leaf = root_entries[1]
+        assert deserialise_directory(leaves[leaf.offset : leaf.offset + leaf.length])[0] == entries[leaf.tile_id // 2]
+
+    def test_write(self, working_dir: Path) -> None:
+        """Check the archive is clustered in tile ID order, with repeated tile contents stored once."""
+        output_path = working_dir.joinpath("tiles.pmtiles")
+        with open_tile_store(output_path, PNG_FORMAT) as store:
+            assert isinstance(store, PMTilesStore)
+            store.write(Tile(1, 1, 0), b"sea")
+            store.write(Tile(1, 0, 0), b"land")
+            store.write(Tile(1, 0, 1), b"sea")
+
+        data = output_path.read_bytes()
+        header = unpack_header(data)
+        entries = deserialise_directory(data[HEADER_SIZE : HEADER_SIZE + header.root_length])
+
+        assert header.clustered
+        assert (header.addressed_tiles_count, header.tile_contents_count) == (3, 2)
+        assert (header.min_zoom, header.max_zoom) == (1, 1)
+        assert [entry.tile_id for entry in entries] == [get_tile_id(Tile(1, 0, 0)), get_tile_id(Tile(1, 0, 1)), 4]
+
+        tile_data = data[header.tile_data_offset :]
+        assert [tile_data[entry.offset : entry.offset + entry.length] for entry in entries] == [b"land", b"sea", b"sea"]
+
+        metadata_end = header.metadata_offset + header.metadata_length
+        assert metadata_end == header.leaf_directory_offset
+
+    def test_discarded_on_error(self, working_dir: Path) -> None:
+        """Check an existing archive is left untouched, and no partial archive is left behind, after an error."""
+        output_path = working_dir.joinpath("tiles.pmtiles")
+        output_path.write_bytes(b"old")
+
+        with pytest.raises(RuntimeError), open_tile_store(output_path, PNG_FORMAT) as store:
+            store.write(Tile(0, 0, 0), b"new")
+            raise RuntimeError
+
+        assert output_path.read_bytes() == b"old"
+        assert list(working_dir.iterdir()) == [output_path]
+
+    def test_not_pmtiles(self) -> None:
+        with pytest.raises(ValueError, match="not a version 3 PMTiles archive"):
+            unpack_header(bytes(HEADER_SIZE))
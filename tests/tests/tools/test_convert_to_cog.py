@@ -1,7 +1,141 @@
+import shutil
 from pathlib import Path
 
+import pytest
+from osgeo import gdal
+
+from geospatial_utils.raster.raster_dataset import RasterDataset
+from geospatial_utils.tools.convert_to_cog import (
+    MANIFEST_FILENAME,
+    convert_rasters,
+    find_rasters,
+    get_output_path,
+    get_temp_path,
+    run,
+)
+
 
 class TestConvertToCOG:
-    def test_convert_to_cog(self, input_dir: Path, output_dir: Path, working_dir: Path) -> None:
-        # Add test code here
-        pass
\ No newline at end of file
+    def test_convert_to_cog(self, input_dir: Path, working_dir: Path) -> None:
+        """Check a single raster is reprojected and saved as a COG."""
+        input_path = input_dir.joinpath("raster", "test_raster_3857.tif")
+
+        run(raster_path=input_path, raster_dir=None, output_dir=working_dir, epsg_code=4326, workers=1)
+
+        output_path = working_dir.joinpath("test_raster_3857_4326_colourised_cog.tif")
+        assert output_path.exists()
+
+        output_ds = RasterDataset(output_path)
+        assert output_ds.epsg_code == "4326"
+        assert output_ds.ds.GetMetadataItem("LAYOUT", "IMAGE_STRUCTURE") == "COG"
+
+    def test_convert_raster_dir(self, input_dir: Path, working_dir: Path) -> None:
+        """Check every raster within a directory is converted."""
+        raster_dir = input_dir.joinpath("raster")
+
+        run(raster_path=None, raster_dir=raster_dir, output_dir=working_dir, epsg_code=3857, workers=2)
+
+        for raster_path in find_rasters(raster_dir):
+            output_path = get_output_path(raster_path, working_dir, 3857)
+            assert gdal.Open(str(output_path)).GetMetadataItem("LAYOUT", "IMAGE_STRUCTURE") == "COG"
+
+    def test_catalogue_skips_up_to_date_outputs(self, input_dir: Path, working_dir: Path) -> None:
+        """Check a rerun with a catalogue doesn't convert rasters whose output is already up to date."""
+        raster_dir = working_dir.joinpath("rasters")
+        raster_dir.mkdir()
+        shutil.copy(input_dir.joinpath("raster", "test_raster_3857.tif"), raster_dir)
+
+        output_dir = working_dir.joinpath("outputs")
+        catalogue_path = working_dir.joinpath("catalogue.sqlite")
+        output_path = get_output_path(raster_dir.joinpath("test_raster_3857.tif"), output_dir, 4326)
+
+        run(None, raster_dir, output_dir, epsg_code=4326, catalogue_path=catalogue_path, workers=1)
+        converted_at = output_path.stat().st_mtime_ns
+
+        run(None, raster_dir, output_dir, epsg_code=4326, catalogue_path=catalogue_path, workers=1)
+
+        assert output_path.stat().st_mtime_ns == converted_at
+
+    def test_catalogue_raster_path(self, input_dir: Path, working_dir: Path) -> None:
+        """Check a single raster is added to the catalogue, so it's selected by bbox and skipped once up to date."""
+        input_path = input_dir.joinpath("raster", "test_raster_3857.tif")
+        output_dir = working_dir.joinpath("outputs")
+        catalogue_path = working_dir.joinpath("catalogue.sqlite")
+        output_path = get_output_path(input_path, output_dir, 4326)
+        bbox = (-3.0, 53.9, -2.6, 54.2)
+
+        run(input_path, None, output_dir, epsg_code=4326, catalogue_path=catalogue_path, bbox=bbox, workers=1)
+        converted_at = output_path.stat().st_mtime_ns
+
+        run(input_path, None, output_dir, epsg_code=4326, catalogue_path=catalogue_path, bbox=bbox, workers=1)
+
+        assert output_path.stat().st_mtime_ns == converted_at
+
+    def test_incremental_rerun(self, input_dir: Path, working_dir: Path) -> None:
+        """Check an incremental rerun skips completed conversions, but redoes them when the parameters change."""
+        raster_dir = working_dir.joinpath("rasters")
+        raster_dir.mkdir()
+        shutil.copy(input_dir.joinpath("raster", "test_raster_3857.tif"), raster_dir)
+
+        output_dir = working_dir.joinpath("outputs")
+        output_path = get_output_path(raster_dir.joinpath("test_raster_3857.tif"), output_dir, 4326)
+
+        run(None, raster_dir, output_dir, epsg_code=4326, incremental=True, workers=1)
+        converted_at = output_path.stat().st_mtime_ns
+
+        assert output_dir.joinpath(MANIFEST_FILENAME).exists()
+        assert not get_temp_path(output_path).exists()
+
+        run(None, raster_dir, output_dir, epsg_code=4326, incremental=True, workers=1)
+
+        assert output_path.stat().st_mtime_ns == converted_at
+
+        run(None, raster_dir, output_dir, epsg_code=4326, compression="ZSTD", incremental=True, workers=1)
+
+        assert output_path.stat().st_mtime_ns != converted_at
+
+    def test_mosaic_file_list(self, input_dir: Path, working_dir: Path) -> None:
+        """Check the rasters listed in a file are mosaicked into a single COG."""
+        input_path = input_dir.joinpath("raster", "test_raster_3857.tif")
+        file_list = working_dir.joinpath("rasters.txt")
+        file_list.write_text(f"{input_path}\n\n{input_path}\n")
+
+        output_dir = working_dir.joinpath("outputs")
+        run(None, None, output_dir, file_list=file_list, epsg_code=4326, mosaic="mosaic")
+
+        output_path = get_output_path("mosaic.tif", output_dir, 4326)
+        assert gdal.Open(str(output_path)).GetMetadataItem("LAYOUT", "IMAGE_STRUCTURE") == "COG"
+        assert not get_temp_path(output_path).exists()
+        assert sorted(path.name for path in output_dir.iterdir()) == [output_path.name]
+
+    def test_bbox_requires_catalogue(self, working_dir: Path) -> None:
+        """Check an error is raised when selecting rasters by bbox without a catalogue."""
+        with pytest.raises(ValueError, match="catalogue_path is required"):
+            run(None, working_dir, working_dir, bbox=(-1.0, 50.0, 1.0, 52.0))
+
+    def test_incremental_mosaic(self, working_dir: Path) -> None:
+        """Check an error is raised rather than ignoring the manifest when mosaicking incrementally."""
+        with pytest.raises(ValueError, match="can't be made incrementally"):
+            run(None, working_dir, working_dir, mosaic="mosaic", incremental=True)
+
+
+class TestConvertRasters:
+    def test_failed_conversion_does_not_stop_batch(self, input_dir: Path, working_dir: Path) -> None:
+        """Check an invalid raster is reported as a failure, without stopping the other rasters from converting."""
+        raster_dir = working_dir.joinpath("rasters")
+        raster_dir.mkdir()
+        shutil.copy(input_dir.joinpath("raster", "test_raster_3857.tif"), raster_dir)
+        raster_dir.joinpath("invalid.tif").write_text("Not a raster")
+
+        output_dir = working_dir.joinpath("outputs")
+        output_dir.mkdir()
+
+        results = {
+            result.input_path.name: result
+            for result in convert_rasters(find_rasters(raster_dir), output_dir=output_dir, epsg_code=4326, workers=2)
+        }
+
+        assert results["test_raster_3857.tif"].succeeded
+        assert results["test_raster_3857.tif"].output_path.exists()
+        assert not results["invalid.tif"].succeeded
+        assert not results["invalid.tif"].output_path.exists()
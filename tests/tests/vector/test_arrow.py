@@ -0,0 +1,129 @@
+import struct
+
+import numpy as np
+import pytest
+from osgeo import ogr, osr
+
+from geospatial_utils.vector.arrow import find_coordinate_runs, transform_wkb_array
+
+pa = pytest.importorskip("pyarrow")
+
+
+def create_coord_transform() -> osr.CoordinateTransformation:
+    source_srs = osr.SpatialReference()
+    source_srs.ImportFromEPSG(4326)
+    source_srs.SetAxisMappingStrategy(osr.OAMS_TRADITIONAL_GIS_ORDER)
+
+    target_srs = osr.SpatialReference()
+    target_srs.ImportFromEPSG(3857)
+
+    return osr.CoordinateTransformation(source_srs, target_srs)
+
+
+GEOMETRIES_WKT = [
+    "POINT (1 52)",
+    "LINESTRING (-1 50, 0 51, 1 52)",
+    "POLYGON ((0 50, 1 50, 1 51, 0 50), (0.2 50.1, 0.5 50.1, 0.5 50.4, 0.2 50.1))",
+    "MULTIPOLYGON (((0 50, 1 50, 1 51, 0 50)), ((2 50, 3 50, 3 51, 2 50)))",
+    "POLYGON Z ((0 50 10, 1 50 20, 1 51 30, 0 50 10))",
+    "GEOMETRYCOLLECTION (POINT (1 52), LINESTRING (-1 50, 0 51))",
+]
+
+
+class TestFindCoordinateRuns:
+    def test_polygon_rings(self) -> None:
+        """Check each ring of a polygon is found as a separate run of coordinates."""
+        wkb = bytes(ogr.CreateGeometryFromWkt(GEOMETRIES_WKT[2]).ExportToIsoWkb(ogr.wkbNDR))
+
+        starts, counts, dims, has_z = find_coordinate_runs(np.frombuffer(wkb, dtype=np.uint8), np.array([0, len(wkb)]))
+
+        np.testing.assert_array_equal(starts, [13, 81])
+        np.testing.assert_array_equal(counts, [4, 4])
+        np.testing.assert_array_equal(dims, [2, 2])
+        np.testing.assert_array_equal(has_z, [False, False])
+        assert struct.unpack_from("<dd", wkb, starts[1]) == (0.2, 50.1)
+
+    @pytest.mark.parametrize(
+        ("wkt", "expected_dims", "expected_has_z"),
+        [
+            ("POINT Z (1 52 10)", 3, True),
+            ("POINT M (1 52 7)", 3, False),
+            ("POINT ZM (1 52 10 7)", 4, True),
+        ],
+    )
+    def test_dimensions(self, wkt: str, expected_dims: int, expected_has_z: bool) -> None:
+        """Check a z coordinate is only reported for geometries with one, not those with just M values."""
+        wkb = bytes(ogr.CreateGeometryFromWkt(wkt).ExportToIsoWkb(ogr.wkbNDR))
+
+        _, _, dims, has_z = find_coordinate_runs(np.frombuffer(wkb, dtype=np.uint8), np.array([0, len(wkb)]))
+
+        np.testing.assert_array_equal(dims, [expected_dims])
+        np.testing.assert_array_equal(has_z, [expected_has_z])
+
+    def test_big_endian(self) -> None:
+        """Check an error is raised for big endian WKB."""
+        wkb = bytes(ogr.CreateGeometryFromWkt("POINT (1 2)").ExportToIsoWkb(ogr.wkbXDR))
+
+        with pytest.raises(ValueError, match="Only little endian WKB geometries are supported."):
+            find_coordinate_runs(np.frombuffer(wkb, dtype=np.uint8), np.array([0, len(wkb)]))
+
+
+class TestTransformWkbArray:
+    def test_transform_wkb_array(self) -> None:
+        """Check the batch transformation matches transforming each geometry individually, including nulls."""
+        coord_transform = create_coord_transform()
+        geometries = [ogr.CreateGeometryFromWkt(wkt) for wkt in GEOMETRIES_WKT]
+        wkb_array = pa.array(
+            [bytes(geometry.ExportToIsoWkb(ogr.wkbNDR)) for geometry in geometries] + [None], type=pa.binary()
+        )
+
+        actual = transform_wkb_array(wkb_array, coord_transform)
+
+        assert actual.null_count == 1
+        for geometry, actual_wkb in zip(geometries, actual.to_pylist()):
+            geometry.Transform(coord_transform)
+            actual_geometry = ogr.CreateGeometryFromWkb(actual_wkb)
+
+            assert actual_geometry.GetGeometryType() == geometry.GetGeometryType()
+            assert actual_geometry.Equals(geometry) or actual_geometry.Distance(geometry) < 1e-6
+
+    def test_measured_geometries(self) -> None:
+        """Check the M values of XYM geometries are copied through, rather than transformed as z coordinates."""
+        coord_transform = create_coord_transform()
+        geometries = [
+            ogr.CreateGeometryFromWkt("POINT M (1 52 7)"),
+            ogr.CreateGeometryFromWkt("LINESTRING M (-1 50 1, 0 51 2, 1 52 3)"),
+            ogr.CreateGeometryFromWkt("LINESTRING ZM (0 50 10 1, 1 50 20 2, 1 51 30 3)"),
+        ]
+        wkb_array = pa.array([bytes(geometry.ExportToIsoWkb(ogr.wkbNDR)) for geometry in geometries])
+
+        actual = transform_wkb_array(wkb_array, coord_transform)
+
+        for geometry, actual_wkb in zip(geometries, actual.to_pylist()):
+            measures = [geometry.GetM(index) for index in range(geometry.GetPointCount())]
+            geometry.Transform(coord_transform)
+            actual_geometry = ogr.CreateGeometryFromWkb(actual_wkb)
+
+            assert actual_geometry.GetGeometryType() == geometry.GetGeometryType()
+            assert actual_geometry.Distance(geometry) < 1e-6
+            assert [actual_geometry.GetM(index) for index in range(actual_geometry.GetPointCount())] == measures
+            assert [actual_geometry.GetZ(index) for index in range(actual_geometry.GetPointCount())] == pytest.approx(
+                [geometry.GetZ(index) for index in range(geometry.GetPointCount())]
+            )
+
+    def test_sliced_array_with_swap_xy(self) -> None:
+        """Check a sliced array is transformed correctly and the coordinates swapped."""
+        coord_transform = create_coord_transform()
+        wkb_array = pa.array(
+            [bytes(ogr.CreateGeometryFromWkt(wkt).ExportToIsoWkb(ogr.wkbNDR)) for wkt in GEOMETRIES_WKT],
+            type=pa.large_binary(),
+        ).slice(1, 2)
+
+        actual = transform_wkb_array(wkb_array, coord_transform, swap_xy=True)
+
+        expected = ogr.CreateGeometryFromWkt(GEOMETRIES_WKT[1])
+        expected.Transform(coord_transform)
+        expected.SwapXY()
+
+        assert len(actual) == 2
+        assert ogr.CreateGeometryFromWkb(actual[0].as_py()).Distance(expected) < 1e-6
@@ -0,0 +1,65 @@
+from pathlib import Path
+
+import pytest
+from osgeo import gdal, ogr
+
+from geospatial_utils.vector.constants import GEOPACKAGE_DRIVER
+from geospatial_utils.vector.export import export_flatgeobuf, export_geoparquet
+from geospatial_utils.vector.vector_dataset import VectorDataset
+
+
+def read_ids(vector_path: Path) -> list[int]:
+    vector_ds = VectorDataset(vector_path)
+    return sorted(record.attributes["id"] for record in vector_ds.iter_records(include_geometry=False))
+
+
+class TestExportFlatGeobuf:
+    def test_export_flatgeobuf(self, input_dir: Path, working_dir: Path) -> None:
+        """Check the FlatGeobuf export has every feature and a spatial index to filter them with."""
+        input_path = input_dir.joinpath("vector", "test_vector_4326.geojson")
+        output_path = working_dir.joinpath("test.fgb")
+
+        export_flatgeobuf(VectorDataset(input_path), output_path, where="id <= 5")
+
+        assert read_ids(output_path) == [1, 2, 3, 4, 5]
+        assert VectorDataset(output_path).layer.TestCapability(ogr.OLCFastSpatialFilter)
+
+
+class TestExportGeoParquet:
+    @pytest.fixture(autouse=True)
+    def check_driver(self) -> None:
+        if gdal.GetDriverByName("Parquet") is None:
+            pytest.skip("GDAL was built without the Parquet driver.")
+
+    def test_export_geoparquet(self, input_dir: Path, working_dir: Path) -> None:
+        """Check a single GeoParquet file is written with every feature, in row groups of the requested size."""
+        input_path = input_dir.joinpath("vector", "test_vector_4326.geojson")
+        output_path = working_dir.joinpath("test.parquet")
+
+        output_paths = export_geoparquet(VectorDataset(input_path), output_path, row_group_size=4)
+
+        assert output_paths == [output_path]
+        assert read_ids(output_path) == list(range(1, 12))
+
+        pq = pytest.importorskip("pyarrow.parquet")
+        metadata = pq.ParquetFile(output_path).metadata
+        assert metadata.num_row_groups == 3
+        assert "bbox" in metadata.schema.names
+
+    def test_export_geoparquet_workers(self, input_dir: Path, working_dir: Path) -> None:
+        """Check the shards of features are written to separate part files with multiple workers."""
+        # GeoPackages index their FIDs, so they're always split into shards of shard_size features
+        input_path = working_dir.joinpath("test.gpkg")
+        VectorDataset(input_dir.joinpath("vector", "test_vector_4326.geojson")).copy_layer(
+            input_path, driver_name=GEOPACKAGE_DRIVER
+        )
+        output_dir = working_dir.joinpath("test")
+
+        output_paths = export_geoparquet(VectorDataset(input_path), output_dir, workers=2, shard_size=5)
+
+        assert [path.name for path in output_paths] == [
+            "part-00000.parquet",
+            "part-00001.parquet",
+            "part-00002.parquet",
+        ]
+        assert sorted(id_ for path in output_paths for id_ in read_ids(path)) == list(range(1, 12))
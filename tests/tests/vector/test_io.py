@@ -1,8 +1,10 @@
 from pathlib import Path
 
+import pytest
 from osgeo import gdal, ogr, osr
 
-from geospatial_utils.vector.io import create_vector_dataset, write_feature_to_output_layer
+from geospatial_utils.vector.constants import GEOPACKAGE_DRIVER
+from geospatial_utils.vector.io import BatchedFeatureWriter, create_vector_dataset, write_feature_to_output_layer
 from geospatial_utils.vector.types import Field
 from tests.testing_utils.file_comparison import compare_vector_files
 
@@ -56,4 +58,56 @@ class TestWriteFeatureToOutputLayer:
 
         output_ds.SyncToDisk()
 
+        assert output_layer.GetFeatureCount() == template_layer.GetFeatureCount()
         compare_vector_files(expected_vector_path=template_vector_path, actual_vector_path=output_path)
+
+
+class TestBatchedFeatureWriter:
+    def test_batched_feature_writer(self, input_dir: Path, working_dir: Path) -> None:
+        """Check features are written in transactions to a GeoPackage, including a final partial batch."""
+        template_vector_path = input_dir.joinpath("vector", "test_vector_4326.geojson")
+
+        template_ds = ogr.Open(template_vector_path)
+        template_layer = template_ds.GetLayer()
+        field_names = [field.name for field in template_layer.schema]
+
+        output_path = working_dir.joinpath("test.gpkg")
+
+        output_ds, output_layer = create_vector_dataset(
+            output_path=str(output_path),
+            layer_name="test",
+            srs=template_layer.GetSpatialRef(),
+            fields=[Field(field.name, field.type) for field in template_layer.schema],
+            driver_name=GEOPACKAGE_DRIVER,
+            geom_type=template_layer.GetGeomType(),
+        )
+
+        with BatchedFeatureWriter(output_ds, output_layer, batch_size=2) as writer:
+            assert writer.supports_transactions
+
+            for feature in template_layer:
+                writer.write(feature_to_copy=feature, fields_to_transfer=field_names)
+
+        assert writer.feature_count == template_layer.GetFeatureCount()
+        del output_ds, output_layer
+
+        compare_vector_files(expected_vector_path=template_vector_path, actual_vector_path=output_path)
+
+    def test_rollback_on_error(self, input_dir: Path, working_dir: Path) -> None:
+        """Check the uncommitted batch is rolled back when an error occurs while writing."""
+        srs = osr.SpatialReference()
+        srs.ImportFromEPSG(3857)
+
+        output_ds, output_layer = create_vector_dataset(
+            output_path=str(working_dir.joinpath("test.gpkg")),
+            layer_name="test",
+            srs=srs,
+            driver_name=GEOPACKAGE_DRIVER,
+        )
+
+        with pytest.raises(RuntimeError, match="Failed"):
+            with BatchedFeatureWriter(output_ds, output_layer, batch_size=100) as writer:
+                writer.write(output_geometry=ogr.CreateGeometryFromWkt("POLYGON ((0 0, 1 0, 1 1, 0 0))"))
+                raise RuntimeError("Failed")
+
+        assert output_layer.GetFeatureCount() == 0
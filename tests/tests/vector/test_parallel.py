@@ -0,0 +1,110 @@
+from pathlib import Path
+
+import pytest
+from osgeo import gdal
+
+from geospatial_utils.vector.constants import GEOPACKAGE_DRIVER
+from geospatial_utils.vector.parallel import (
+    Shard,
+    ShardFilters,
+    get_fid_shards,
+    iter_shard_features,
+    run_in_processes,
+)
+from geospatial_utils.vector.vector_dataset import VectorDataset
+
+
+def square(value: int) -> int:
+    return value * value
+
+
+class TestGetFidShards:
+    def test_shards_cover_every_feature(self, input_dir: Path, working_dir: Path) -> None:
+        input_path = working_dir.joinpath("test.gpkg")
+        VectorDataset(input_dir.joinpath("vector", "test_vector_4326.geojson")).copy_layer(
+            input_path, driver_name=GEOPACKAGE_DRIVER
+        )
+        input_ds = VectorDataset(input_path)
+
+        shards = get_fid_shards(input_ds.layer, shard_size=4, driver_name=GEOPACKAGE_DRIVER)
+
+        assert [shard.last_fid - shard.first_fid + 1 for shard in shards] == [4, 4, 3]
+        assert all(previous.last_fid < shard.first_fid for previous, shard in zip(shards, shards[1:]))
+
+    def test_shards_honour_layer_filters(self, input_dir: Path) -> None:
+        input_ds = VectorDataset(input_dir.joinpath("vector", "test_vector_4326.geojson"))
+
+        with input_ds.apply_filters(where="id > 9", columns=[], include_geometry=False) as layer:
+            shards = get_fid_shards(layer, shard_size=4)
+
+        assert len(shards) == 1
+
+    @pytest.mark.parametrize("driver_name", [None, GEOPACKAGE_DRIVER])
+    @pytest.mark.parametrize("where", [None, "id > 3"])
+    def test_features_read_once(self, input_dir: Path, working_dir: Path, driver_name: str | None, where: str) -> None:
+        """Check every feature is read from exactly one shard, for shards of both FID ranges and positions."""
+        input_ds = VectorDataset(input_dir.joinpath("vector", "test_vector_4326.geojson"))
+        if driver_name is not None:
+            input_path = working_dir.joinpath("test.gpkg")
+            input_ds.copy_layer(input_path, driver_name=driver_name)
+            input_ds = VectorDataset(input_path)
+
+        with input_ds.apply_filters(where=where, columns=[], include_geometry=False) as layer:
+            expected_fids = sorted(feature.GetFID() for feature in layer)
+            shards = get_fid_shards(layer, shard_size=3, driver_name=input_ds.ds.GetDriver().ShortName)
+
+        assert all(shard.is_positional == (driver_name is None) for shard in shards)
+
+        fids = []
+        for shard in shards:
+            filters = ShardFilters(where=where).with_shard(shard)
+            with input_ds.apply_filters(where=filters.where) as layer:
+                fids += [feature.GetFID() for feature in iter_shard_features(layer, shard)]
+
+        assert sorted(fids) == expected_fids
+
+    def test_named_fid_column(self, input_dir: Path, working_dir: Path) -> None:
+        input_path = working_dir.joinpath("test.gpkg")
+        gdal.VectorTranslate(
+            str(input_path),
+            str(input_dir.joinpath("vector", "test_vector_4326.geojson")),
+            format=GEOPACKAGE_DRIVER,
+            layerCreationOptions=["FID=ogc_fid"],
+        )
+        input_ds = VectorDataset(input_path)
+        expected_fids = sorted(feature.GetFID() for feature in input_ds.layer)
+
+        shards = get_fid_shards(input_ds.layer, shard_size=4, driver_name=GEOPACKAGE_DRIVER)
+
+        assert all(shard.fid_column == "ogc_fid" for shard in shards)
+
+        fids = []
+        for shard in shards:
+            with input_ds.apply_filters(where=shard.where) as layer:
+                fids += [feature.GetFID() for feature in iter_shard_features(layer, shard)]
+
+        assert sorted(fids) == expected_fids
+
+    def test_invalid_shard_size(self, input_dir: Path) -> None:
+        input_ds = VectorDataset(input_dir.joinpath("vector", "test_vector_4326.geojson"))
+
+        with pytest.raises(ValueError, match="must be positive"):
+            get_fid_shards(input_ds.layer, shard_size=0)
+
+
+def test_filters_with_shard() -> None:
+    filters = ShardFilters(where="id > 9").with_shard(Shard(0, 4))
+
+    assert filters.where == "(id > 9) AND FID >= 0 AND FID <= 4"
+    assert ShardFilters(where="id > 9").with_shard(Shard(0, 4, start_index=0, count=5)).where == "id > 9"
+    assert Shard(0, 4, fid_column="ogc_fid").where == '"ogc_fid" >= 0 AND "ogc_fid" <= 4'
+
+
+@pytest.mark.parametrize("preserve_order", [False, True])
+def test_run_in_processes(preserve_order: bool) -> None:
+    results = list(
+        run_in_processes(square, ((value,) for value in range(20)), workers=2, preserve_order=preserve_order)
+    )
+
+    expected = [value * value for value in range(20)]
+    assert (results if preserve_order else sorted(results)) == expected
@@ -0,0 +1,117 @@
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+from osgeo import gdal, ogr
+
+from geospatial_utils.vector.constants import GEOJSON_DRIVER, SHAPEFILE_DRIVER
+from geospatial_utils.vector.spatial_index import ensure_spatial_index, is_spatial_index_valid
+from geospatial_utils.vector.vector_dataset import VectorDataset
+
+
+@pytest.fixture
+def geojson_path(input_dir: Path, working_dir: Path) -> Path:
+    return Path(shutil.copy(input_dir.joinpath("vector", "test_vector_4326.geojson"), working_dir))
+
+
+@pytest.fixture
+def shapefile_path(geojson_path: Path) -> Path:
+    shapefile_path = geojson_path.with_suffix(".shp")
+    gdal.VectorTranslate(str(shapefile_path), str(geojson_path), format=SHAPEFILE_DRIVER)
+    return shapefile_path
+
+
+class TestEnsureSpatialIndex:
+    def test_geojson_index_is_built_and_reused(self, geojson_path: Path) -> None:
+        """Check a GeoJSON file is indexed with a GeoPackage cache, which isn't rebuilt while it's up to date."""
+        spatial_index = ensure_spatial_index(geojson_path)
+
+        assert spatial_index.driver_name == GEOJSON_DRIVER
+        assert spatial_index.dataset_path == spatial_index.index_path
+        assert spatial_index.index_path.exists()
+        assert is_spatial_index_valid(geojson_path)
+
+        built_at = spatial_index.index_path.stat().st_mtime_ns
+        ensure_spatial_index(geojson_path)
+
+        assert spatial_index.index_path.stat().st_mtime_ns == built_at
+
+    def test_index_is_invalidated_when_the_source_changes(self, geojson_path: Path) -> None:
+        ensure_spatial_index(geojson_path)
+
+        stat = geojson_path.stat()
+        os.utime(geojson_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+        assert not is_spatial_index_valid(geojson_path)
+
+        ensure_spatial_index(geojson_path)
+
+        assert is_spatial_index_valid(geojson_path)
+
+    def test_index_dir(self, geojson_path: Path, working_dir: Path) -> None:
+        index_dir = working_dir.joinpath("indexes")
+
+        spatial_index = ensure_spatial_index(geojson_path, index_dir=index_dir)
+
+        assert spatial_index.index_path.parent == index_dir
+        assert is_spatial_index_valid(geojson_path, index_dir)
+
+    def test_concurrent_builds(self, geojson_path: Path, working_dir: Path) -> None:
+        """Check builds of the same index at once each write their own temporary file, leaving none behind."""
+        index_dir = working_dir.joinpath("indexes")
+
+        with ThreadPoolExecutor(max_workers=4) as pool:
+            list(pool.map(lambda _: ensure_spatial_index(geojson_path, index_dir=index_dir), range(4)))
+
+        assert is_spatial_index_valid(geojson_path, index_dir)
+        assert not list(index_dir.glob("*.tmp"))
+
+    def test_multiple_layers(self, working_dir: Path) -> None:
+        """Check the cache of a dataset with several layers holds every layer, whichever was indexed first."""
+        kml_path = working_dir.joinpath("layers.kml")
+        kml_ds = ogr.GetDriverByName("KML").CreateDataSource(str(kml_path))
+        for layer_name in ["first", "second"]:
+            layer = kml_ds.CreateLayer(layer_name, None, ogr.wkbPoint)
+            feature = ogr.Feature(layer.GetLayerDefn())
+            feature.SetGeometry(ogr.CreateGeometryFromWkt("POINT (-2.76 54.0)"))
+            layer.CreateFeature(feature)
+        del layer, kml_ds
+
+        ensure_spatial_index(kml_path, "first")
+        spatial_index = ensure_spatial_index(kml_path, "second")
+
+        index_ds = ogr.Open(str(spatial_index.index_path))
+        assert index_ds.GetLayerByName("first") is not None
+        assert index_ds.GetLayerByName("second") is not None
+
+    def test_shapefile_index(self, shapefile_path: Path) -> None:
+        """Check a shapefile is indexed in place with a .qix file."""
+        spatial_index = ensure_spatial_index(shapefile_path)
+
+        assert spatial_index.dataset_path == shapefile_path
+        assert shapefile_path.with_suffix(".qix").exists()
+        assert is_spatial_index_valid(shapefile_path)
+
+
+class TestIndexedVectorDataset:
+    @pytest.mark.parametrize("source", ["geojson_path", "shapefile_path"])
+    def test_bbox_filter(self, source: str, request: pytest.FixtureRequest) -> None:
+        """Check spatially filtered reads through the index return the same features as the source."""
+        input_path = request.getfixturevalue(source)
+
+        input_ds = VectorDataset(input_path, use_spatial_index=True)
+        records = list(input_ds.iter_records(bbox=(-2.776, 54.001, -2.75, 54.012)))
+
+        assert [record.attributes["id"] for record in records] == [1]
+
+    def test_output_keeps_source_format(self, geojson_path: Path, working_dir: Path) -> None:
+        output_path = working_dir.joinpath("test.geojson")
+
+        input_ds = VectorDataset(geojson_path, use_spatial_index=True)
+        input_ds.copy_layer(output_path, where="id <= 5")
+
+        output_ds = VectorDataset(output_path)
+        assert output_ds.driver_name == GEOJSON_DRIVER
+        assert output_ds.layer.GetFeatureCount() == 5
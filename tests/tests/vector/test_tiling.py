@@ -0,0 +1,66 @@
+import json
+from pathlib import Path
+
+import pytest
+from osgeo import gdal
+
+from geospatial_utils.tiles.grid import Tile
+from geospatial_utils.tiles.stores import MVT_FORMAT, PNG_FORMAT, DirectoryTileStore, MBTilesStore
+from geospatial_utils.vector.tiling import VectorTileOptions, generate_vector_tiles, render_vector_tile
+from geospatial_utils.vector.vector_dataset import VectorDataset
+
+MAX_ZOOM = 10
+
+
+def read_tile_ids(tile_path: Path) -> set[int]:
+    """Read the ids of the features of a tile saved as a file with the MVT driver."""
+    ds = gdal.OpenEx(str(tile_path), gdal.OF_VECTOR, allowed_drivers=["MVT"])
+    return {feature.GetField("id") for feature in ds.GetLayerByName("test_vector_4326")}
+
+
+class TestGenerateVectorTiles:
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_generate_vector_tiles(self, input_dir: Path, working_dir: Path, workers: int) -> None:
+        """Check every feature is drawn within the tiles of the highest zoom level, and no empty tiles are written."""
+        vector_ds = VectorDataset(input_dir.joinpath("vector", "test_vector_4326.geojson"))
+        options = VectorTileOptions(layer_name="test_vector_4326", compress=False)
+
+        with DirectoryTileStore(working_dir, MVT_FORMAT) as store:
+            tile_count = generate_vector_tiles(vector_ds, store, 0, MAX_ZOOM, options=options, workers=workers)
+
+        tile_paths = sorted(working_dir.glob("*/*/*.pbf"))
+        assert len(tile_paths) == tile_count
+        assert MAX_ZOOM in {int(path.parts[-3]) for path in tile_paths}
+
+        ids = set()
+        for tile_path in working_dir.joinpath(str(MAX_ZOOM)).glob("*/*.pbf"):
+            ids |= read_tile_ids(tile_path)
+        assert ids == set(range(1, 12))
+
+        metadata = json.loads(working_dir.joinpath("metadata.json").read_text())
+        assert metadata["vector_layers"][0]["id"] == "test_vector_4326"
+        assert metadata["vector_layers"][0]["fields"] == {"id": "Number"}
+
+    def test_where_selects_no_features(self, input_dir: Path, working_dir: Path) -> None:
+        """Check no tiles are written when the attribute filter selects no features."""
+        vector_ds = VectorDataset(input_dir.joinpath("vector", "test_vector_4326.geojson"))
+        options = VectorTileOptions(layer_name="test_vector_4326", where="id > 100")
+
+        with DirectoryTileStore(working_dir, MVT_FORMAT) as store:
+            assert generate_vector_tiles(vector_ds, store, 0, 2, options=options) == 0
+
+        assert not list(working_dir.glob("*/*/*.pbf"))
+
+    def test_render_empty_tile(self, input_dir: Path) -> None:
+        """Check a tile with no features renders to None, rather than an empty tile."""
+        vector_ds = VectorDataset(input_dir.joinpath("vector", "test_vector_4326.geojson"))
+
+        assert render_vector_tile(vector_ds, Tile(1, 1, 1), VectorTileOptions(layer_name="test")) is None
+
+    def test_raster_store(self, input_dir: Path, working_dir: Path) -> None:
+        """Check vector tiles can't be written to a store of raster tiles."""
+        vector_ds = VectorDataset(input_dir.joinpath("vector", "test_vector_4326.geojson"))
+
+        with MBTilesStore(working_dir.joinpath("test.mbtiles"), PNG_FORMAT) as store:
+            with pytest.raises(ValueError, match="Vector tiles can't be written to a store of png tiles."):
+                generate_vector_tiles(vector_ds, store, 0, 2)
@@ -1,18 +1,188 @@
 from pathlib import Path
 
+import numpy as np
+import pytest
+from osgeo import ogr
+
+from geospatial_utils.srs.cache import get_coordinate_transformation, get_srs
+from geospatial_utils.vector.arrow import is_arrow_supported
+from geospatial_utils.vector.constants import GEOPACKAGE_DRIVER
 from geospatial_utils.vector.vector_dataset import VectorDataset
 from tests.testing_utils.file_comparison import compare_vector_files
 
 
 class TestReprojectVector:
-    def test_reproject_vector(self, input_dir: Path, output_dir: Path, working_dir: Path) -> None:
-        """Check a vector dataset is reprojected correctly."""
+    @pytest.mark.parametrize("use_arrow", [False, True])
+    def test_reproject_vector(self, input_dir: Path, output_dir: Path, working_dir: Path, use_arrow: bool) -> None:
+        """Check a vector dataset is reprojected correctly, using both the per feature and Arrow batch paths."""
         input_path = input_dir.joinpath("vector", "test_vector_4326.geojson")
         expected_path = output_dir.joinpath("vector", "reprojection", "test_vector_3857.geojson")
 
         output_path = working_dir.joinpath("test.geojson")
 
         input_ds = VectorDataset(input_path)
-        input_ds.reproject_layer(target_epsg=3857, output_path=output_path)
+        if use_arrow and not is_arrow_supported(input_ds.layer):
+            pytest.skip("The Arrow stream interface is not available.")
+
+        input_ds.reproject_layer(target_epsg=3857, output_path=output_path, use_arrow=use_arrow)
 
         compare_vector_files(expected_vector_path=expected_path, actual_vector_path=output_path)
+
+    @pytest.mark.parametrize("use_arrow", [False, True])
+    def test_reproject_vector_in_parallel(
+        self, input_dir: Path, output_dir: Path, working_dir: Path, use_arrow: bool
+    ) -> None:
+        """Check reprojecting the layer in shards across worker processes gives the same output, in the same order."""
+        input_path = input_dir.joinpath("vector", "test_vector_4326.geojson")
+        expected_path = output_dir.joinpath("vector", "reprojection", "test_vector_3857.geojson")
+
+        output_path = working_dir.joinpath("test.geojson")
+
+        input_ds = VectorDataset(input_path)
+        if use_arrow and not is_arrow_supported(input_ds.layer):
+            pytest.skip("The Arrow stream interface is not available.")
+
+        input_ds.reproject_layer(
+            target_epsg=3857, output_path=output_path, use_arrow=use_arrow, workers=2, shard_size=3
+        )
+
+        compare_vector_files(expected_vector_path=expected_path, actual_vector_path=output_path)
+
+    def test_reproject_vector_in_parallel_unordered(self, input_dir: Path, working_dir: Path) -> None:
+        input_path = input_dir.joinpath("vector", "test_vector_4326.geojson")
+        output_path = working_dir.joinpath("test.geojson")
+
+        VectorDataset(input_path).reproject_layer(
+            output_path, target_epsg=3857, where="id > 2", workers=2, shard_size=2, preserve_order=False
+        )
+
+        records = VectorDataset(output_path).iter_records(include_geometry=False)
+        assert sorted(record.attributes["id"] for record in records) == list(range(3, 12))
+
+
+class TestCopyLayer:
+    @pytest.mark.parametrize("use_arrow", [False, True])
+    def test_copy_layer(self, input_dir: Path, working_dir: Path, use_arrow: bool) -> None:
+        """Check a layer is copied into a different format."""
+        input_path = input_dir.joinpath("vector", "test_vector_4326.geojson")
+        output_path = working_dir.joinpath("test.gpkg")
+
+        input_ds = VectorDataset(input_path)
+        if use_arrow and not is_arrow_supported(input_ds.layer):
+            pytest.skip("The Arrow stream interface is not available.")
+
+        input_ds.copy_layer(output_path, driver_name=GEOPACKAGE_DRIVER, use_arrow=use_arrow)
+
+        output_ds = VectorDataset(output_path)
+        assert output_ds.layer.GetName() == "test"
+        assert output_ds.layer.GetFeatureCount() == input_ds.layer.GetFeatureCount()
+        compare_vector_files(expected_vector_path=input_path, actual_vector_path=output_path)
+
+
+class TestIterRecords:
+    @pytest.fixture
+    def input_ds(self, input_dir: Path) -> VectorDataset:
+        return VectorDataset(input_dir.joinpath("vector", "test_vector_4326.geojson"))
+
+    def test_bbox_filter(self, input_ds: VectorDataset) -> None:
+        """Check only the features intersecting the bounding box are read, and the filter is removed afterwards."""
+        records = list(input_ds.iter_records(bbox=(-2.776, 54.001, -2.75, 54.012)))
+
+        assert [record.attributes["id"] for record in records] == [1]
+        assert ogr.CreateGeometryFromWkb(records[0].geometry).GetGeometryName() == "POLYGON"
+        assert input_ds.layer.GetFeatureCount() == 11
+
+    def test_geometry_filter_in_another_srs(self, input_ds: VectorDataset) -> None:
+        """Check a geometry filter is transformed into the layer srs."""
+        geometry = ogr.CreateGeometryFromWkt("POINT (-2.765 54.007)")
+        geometry.AssignSpatialReference(input_ds.srs)
+        geometry.Transform(get_coordinate_transformation(input_ds.srs, 3857))
+        geometry.AssignSpatialReference(get_srs(epsg_code=3857))
+
+        records = list(input_ds.iter_records(geometry=geometry))
+
+        assert [record.attributes["id"] for record in records] == [1]
+
+    def test_attribute_filter(self, input_ds: VectorDataset) -> None:
+        records = list(input_ds.iter_records(where="id > 9"))
+
+        assert sorted(record.attributes["id"] for record in records) == [10, 11]
+
+    def test_columns_and_no_geometry(self, input_ds: VectorDataset) -> None:
+        """Check no fields or geometries are read when none are requested."""
+        records = list(input_ds.iter_records(columns=[], include_geometry=False))
+
+        assert len(records) == 11
+        assert all(record.attributes == {} and record.geometry is None for record in records)
+
+    def test_nested_filters(self, input_ds: VectorDataset) -> None:
+        """Check the filters set before apply_filters are restored on exit, rather than cleared."""
+        with input_ds.apply_filters(bbox=(-2.776, 54.001, -2.75, 54.012), where="id < 5", columns=[]) as layer:
+            with input_ds.apply_filters(where="id > 9", include_geometry=False):
+                assert layer.GetFeatureCount() == 0
+
+            assert layer.GetFeatureCount() == 1
+            assert layer.GetLayerDefn().GetFieldDefn(0).IsIgnored()
+            assert not layer.GetLayerDefn().IsGeometryIgnored()
+
+        assert input_ds.layer.GetFeatureCount() == 11
+        assert input_ds._get_ignored_fields() == []
+
+    def test_copy_without_columns(self, input_ds: VectorDataset, working_dir: Path) -> None:
+        """Check an empty list of columns copies the features without any fields."""
+        output_path = working_dir.joinpath("test.geojson")
+
+        input_ds.copy_layer(output_path, columns=[], use_arrow=False)
+
+        output_ds = VectorDataset(output_path)
+        assert output_ds.field_names == []
+        assert output_ds.layer.GetFeatureCount() == 11
+
+    def test_unknown_column(self, input_ds: VectorDataset) -> None:
+        with pytest.raises(ValueError, match="are not fields of the layer"):
+            list(input_ds.iter_records(columns=["name"]))
+
+    def test_sql(self, input_ds: VectorDataset) -> None:
+        records = list(input_ds.iter_records(sql="SELECT id FROM test_vector_4326 WHERE id < 3"))
+
+        assert sorted(record.attributes["id"] for record in records) == [1, 2]
+
+    def test_reproject_filtered_layer(self, input_ds: VectorDataset, working_dir: Path) -> None:
+        """Check only the filtered features are reprojected."""
+        output_path = working_dir.joinpath("test.geojson")
+
+        input_ds.reproject_layer(output_path, target_epsg=3857, where="id <= 5")
+
+        output_ds = VectorDataset(output_path)
+        assert output_ds.layer.GetFeatureCount() == 5
+        assert output_ds.srs.GetAuthorityCode(None) == "3857"
+
+
+class TestExport:
+    @pytest.fixture
+    def input_ds(self, input_dir: Path) -> VectorDataset:
+        return VectorDataset(input_dir.joinpath("vector", "test_vector_4326.geojson"))
+
+    def test_to_numpy(self, input_ds: VectorDataset) -> None:
+        """Check the filtered features are read into a column per field, alongside their FIDs and WKB geometries."""
+        table = input_ds.to_numpy(where="id <= 3", batch_size=2)
+
+        assert list(table) == ["fid", "id", "geometry"]
+        np.testing.assert_array_equal(np.sort(table["id"]), [1, 2, 3])
+        assert ogr.CreateGeometryFromWkb(bytes(table["geometry"][0])).GetGeometryName() == "POLYGON"
+
+    def test_to_numpy_without_geometry(self, input_ds: VectorDataset) -> None:
+        table = input_ds.to_numpy(columns=[], include_geometry=False)
+
+        assert list(table) == ["fid"]
+        assert len(table["fid"]) == 11
+
+    def test_to_arrow(self, input_ds: VectorDataset) -> None:
+        """Check the Arrow table has the same columns and values as the NumPy export."""
+        if not is_arrow_supported(input_ds.layer):
+            pytest.skip("The Arrow stream interface is not available.")
+
+        table = input_ds.to_arrow(bbox=(-2.776, 54.001, -2.75, 54.012))
+
+        assert table.column_names == ["fid", "id", "geometry"]
+        assert table.column("id").to_pylist() == [1]
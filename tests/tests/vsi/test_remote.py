@@ -0,0 +1,76 @@
+from collections.abc import Iterator
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+from geospatial_utils.raster.raster_dataset import RasterDataset
+from geospatial_utils.vector.vector_dataset import VectorDataset
+from geospatial_utils.vsi.remote import is_remote_path, to_gdal_path, to_local_path, vsi_exists
+from tests.testing_utils.range_server import serve_directory
+
+
+@pytest.fixture
+def server(input_dir: Path) -> Iterator[ThreadingHTTPServer]:
+    with serve_directory(input_dir) as server:
+        yield server
+
+
+def get_url(server: ThreadingHTTPServer, file_path: str) -> str:
+    return f"http://127.0.0.1:{server.server_port}/{file_path}"
+
+
+class TestPaths:
+    @pytest.mark.parametrize(
+        ["file_path", "expected_path"],
+        [
+            ("s3://bucket/rasters/raster.tif", "/vsis3/bucket/rasters/raster.tif"),
+            ("gs://bucket/raster.tif", "/vsigs/bucket/raster.tif"),
+            ("https://example.com/raster.tif", "/vsicurl/https://example.com/raster.tif"),
+            ("/vsis3/bucket/raster.tif", "/vsis3/bucket/raster.tif"),
+            (Path("data/raster.tif"), "data/raster.tif"),
+        ],
+    )
+    def test_to_gdal_path(self, file_path: str | Path, expected_path: str) -> None:
+        """Check object store URIs are converted to their GDAL virtual file system, and other paths are unchanged."""
+        assert to_gdal_path(file_path) == expected_path
+
+    def test_to_local_path(self) -> None:
+        """Check virtual file system paths are kept as strings, so the double slash of URLs isn't collapsed."""
+        assert to_local_path("https://example.com/raster.tif") == "/vsicurl/https://example.com/raster.tif"
+        assert to_local_path("data/raster.tif") == Path("data/raster.tif")
+
+    def test_is_remote_path(self) -> None:
+        """Check only the network file systems are treated as remote."""
+        assert is_remote_path("/vsis3/bucket/raster.tif")
+        assert not is_remote_path("/vsizip/archive.zip/raster.tif")
+        assert not is_remote_path("data/raster.tif")
+
+
+class TestRemoteDatasets:
+    def test_open_remote_raster(self, input_dir: Path, server: ThreadingHTTPServer) -> None:
+        """Check a raster is read over HTTP range requests, matching the local raster."""
+        remote_ds = RasterDataset(get_url(server, "raster/test_raster_3857.tif"))
+        local_ds = RasterDataset(input_dir.joinpath("raster", "test_raster_3857.tif"))
+
+        assert remote_ds.size == local_ds.size
+        assert remote_ds.geotransform == local_ds.geotransform
+        assert (remote_ds.get_band(1).ReadAsArray() == local_ds.get_band(1).ReadAsArray()).all()
+        assert server.range_requests
+
+    def test_open_remote_vector(self, server: ThreadingHTTPServer) -> None:
+        """Check a vector dataset is read over HTTP, without the path being checked on the local file system."""
+        vector_ds = VectorDataset(get_url(server, "vector/test_vector_4326.geojson"))
+
+        assert vector_ds.layer.GetFeatureCount() > 0
+        assert vector_ds.file_path.startswith("/vsicurl/http://")
+
+    def test_spatial_index_for_remote_vector(self, server: ThreadingHTTPServer) -> None:
+        """Check an error is raised when a spatial index is requested for a remote dataset."""
+        with pytest.raises(ValueError, match="virtual file system"):
+            VectorDataset(get_url(server, "vector/test_vector_4326.geojson"), use_spatial_index=True)
+
+    def test_vsi_exists(self, server: ThreadingHTTPServer) -> None:
+        """Check remote files are found without being opened."""
+        assert vsi_exists(get_url(server, "raster/test_raster_3857.tif"))
+        assert not vsi_exists(get_url(server, "raster/missing.tif"))
@@ -0,0 +1,89 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+from osgeo import gdal
+
+from geospatial_utils.raster.raster_dataset import RasterDataset
+from geospatial_utils.srs.cache import get_srs
+from geospatial_utils.vector.vector_dataset import VectorDataset
+from geospatial_utils.zonal.zonal_statistics import ZoneAccumulator, zonal_statistics
+
+
+def square(min_x: float, min_y: float, size: float) -> dict:
+    coordinates = [[min_x, min_y], [min_x + size, min_y], [min_x + size, min_y + size], [min_x, min_y + size]]
+    return {"type": "Polygon", "coordinates": [coordinates + [coordinates[0]]]}
+
+
+@pytest.fixture
+def raster_ds() -> RasterDataset:
+    """A 10 x 10 raster of the values 0 to 99, with 0 as nodata."""
+    ds = gdal.GetDriverByName("MEM").Create("", 10, 10, 1, gdal.GDT_Float32)
+    ds.SetGeoTransform((0.0, 1.0, 0.0, 10.0, 0.0, -1.0))
+    ds.SetSpatialRef(get_srs(epsg_code=4326))
+    band = ds.GetRasterBand(1)
+    band.SetNoDataValue(0)
+    band.WriteArray(np.arange(100, dtype=np.float32).reshape(10, 10))
+
+    return RasterDataset(ds)
+
+
+@pytest.fixture
+def vector_ds(working_dir: Path) -> VectorDataset:
+    """Zones covering the upper left and lower right quarters of the raster."""
+    vector_path = working_dir.joinpath("zones.geojson")
+    features = [
+        {"type": "Feature", "properties": {"name": name}, "geometry": geometry}
+        for name, geometry in [("upper_left", square(0, 5, 5)), ("lower_right", square(5, 0, 5))]
+    ]
+    vector_path.write_text(json.dumps({"type": "FeatureCollection", "features": features}))
+
+    return VectorDataset(vector_path)
+
+
+class TestZoneAccumulator:
+    def test_add_windows(self) -> None:
+        """Check the statistics of each zone are accumulated across windows, and empty zones are NaN."""
+        accumulator = ZoneAccumulator(np.array([3, 7, 9]), bins=2, value_range=(0, 10))
+        accumulator.add(np.array([3, 3, 9]), np.array([1.0, 6.0, 2.0]))
+        accumulator.add(np.array([3]), np.array([4.0]))
+
+        table = accumulator.to_table()
+
+        np.testing.assert_array_equal(table["count"], [3, 0, 1])
+        np.testing.assert_array_equal(table["sum"], [11, 0, 2])
+        np.testing.assert_array_equal(table["min"], [1, np.nan, 2])
+        np.testing.assert_array_equal(table["histogram"], [[2, 1], [0, 0], [1, 0]])
+
+    def test_single_value_range(self) -> None:
+        """Check every value within a range of a single value (e.g. a constant raster) is counted in the first bin."""
+        accumulator = ZoneAccumulator(np.array([3, 7]), bins=4, value_range=(5, 5))
+        accumulator.add(np.array([3, 3, 7]), np.array([5.0, 5.0, 6.0]))
+
+        np.testing.assert_array_equal(accumulator.to_table()["histogram"], [[2, 0, 0, 0], [0, 0, 0, 0]])
+
+    @pytest.mark.parametrize("value_range", [None, (10, 0)])
+    def test_invalid_value_range(self, value_range: tuple[float, float] | None) -> None:
+        with pytest.raises(ValueError, match="should be the lower and upper edge of the bins"):
+            ZoneAccumulator(np.array([3, 7]), bins=4, value_range=value_range)
+
+
+class TestZonalStatistics:
+    def test_zonal_statistics(self, raster_ds: RasterDataset, vector_ds: VectorDataset) -> None:
+        """Check the statistics of the valid pixels within each zone, read over several windows."""
+        table = zonal_statistics(raster_ds, vector_ds, bins=2, value_range=(0, 100), max_memory=80)
+
+        np.testing.assert_array_equal(table["fid"], [0, 1])
+        np.testing.assert_array_equal(table["count"], [24, 25])
+        np.testing.assert_array_equal(table["sum"], [550, 1925])
+        np.testing.assert_array_equal(table["min"], [1, 55])
+        np.testing.assert_array_equal(table["max"], [44, 99])
+        np.testing.assert_allclose(table["mean"], [550 / 24, 77])
+        np.testing.assert_array_equal(table["histogram"], [[24, 0], [0, 25]])
+
+    def test_attribute_filter(self, raster_ds: RasterDataset, vector_ds: VectorDataset) -> None:
+        table = zonal_statistics(raster_ds, vector_ds, where="name = 'lower_right'")
+
+        np.testing.assert_array_equal(table["fid"], [1])
+        np.testing.assert_array_equal(table["count"], [25])